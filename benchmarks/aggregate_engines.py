@@ -0,0 +1,90 @@
+"""Compare the pandas and numpy engines (and numpy threads) of pycytominer.aggregate()."""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pycytominer import aggregate
+
+
+def make_single_cells(
+    n_cells: int,
+    n_features: int,
+    n_wells: int,
+    nan_fraction: float,
+    shuffle: bool = False,
+    seed: int = 0,
+    dtype: np.typing.DTypeLike = np.float64,
+) -> pd.DataFrame:
+    """Build a synthetic single-cell plate with CellProfiler-style columns.
+
+    Cells are ordered by well, as in tables exported image by image, unless
+    shuffle=True. Features are generated directly in the given float dtype.
+    """
+    random_state = np.random.default_rng(seed)
+    wells = random_state.integers(0, n_wells, size=n_cells)
+    if not shuffle:
+        wells = np.sort(wells)
+
+    values = random_state.standard_normal(size=(n_cells, n_features), dtype=dtype)
+    if nan_fraction > 0:
+        values[random_state.random(values.shape, dtype=dtype) < nan_fraction] = np.nan
+
+    features_df = pd.DataFrame(
+        values, columns=[f"Cells_Feature_{idx}" for idx in range(n_features)]
+    )
+    # Insert metadata instead of concatenating to avoid copying the features
+    features_df.insert(0, "Metadata_Plate", "plate")
+    features_df.insert(1, "Metadata_Well", wells.astype(str))
+
+    return features_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-cells", type=int, default=200_000)
+    parser.add_argument("--n-features", type=int, default=1_000)
+    parser.add_argument("--n-wells", type=int, default=384)
+    parser.add_argument("--nan-fraction", type=float, default=0.01)
+    parser.add_argument("--shuffle", action="store_true", help="shuffle cell order")
+    parser.add_argument("--n-jobs", type=int, default=4, help="numpy engine threads")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    single_cell_df = make_single_cells(
+        args.n_cells, args.n_features, args.n_wells, args.nan_fraction, args.shuffle
+    )
+    print(
+        f"{args.n_cells} cells x {args.n_features} features, {args.n_wells} wells, "
+        f"{args.nan_fraction:.0%} NaN"
+    )
+
+    for operation in ["median", "mean"]:
+        results = {}
+        for engine, n_jobs in [("pandas", 1), ("numpy", 1), ("numpy", args.n_jobs)]:
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                results[engine, n_jobs] = aggregate(
+                    population_df=single_cell_df,
+                    strata=["Metadata_Plate", "Metadata_Well"],
+                    operation=operation,
+                    engine=engine,
+                    n_jobs=n_jobs,
+                )
+                timings.append(time.perf_counter() - start)
+            print(
+                f"{operation:>6} {engine:>6} n_jobs={n_jobs:<3}: "
+                f"{min(timings):8.3f} s (best of {args.repeats})"
+            )
+
+        pd.testing.assert_frame_equal(results["numpy", 1], results["pandas", 1])
+        pd.testing.assert_frame_equal(
+            results["numpy", args.n_jobs], results["numpy", 1], check_exact=True
+        )
+
+
+if __name__ == "__main__":
+    main()
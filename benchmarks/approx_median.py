@@ -0,0 +1,100 @@
+"""Compare the accuracy and speed of approx_median with the exact median in aggregate().
+
+Both operations run on the same in-memory plate and on the same plate streamed
+from parquet. Accuracy is reported as the rank error of the estimates, i.e. how
+far (as a fraction of the cells of a well) each estimate is from the middle rank.
+Peak memory is the largest amount traced by tracemalloc during aggregation, which
+for parquet inputs shows the bounded size of the approx_median state.
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from aggregate_engines import make_single_cells
+
+from pycytominer import aggregate
+
+STRATA = ["Metadata_Plate", "Metadata_Well"]
+
+
+def rank_errors(single_cell_df, aggregated_df, features) -> np.ndarray:
+    """Rank error of every aggregated value, allowing for ties."""
+    errors = []
+    for (_, well), well_df in single_cell_df.groupby(STRATA):
+        estimates = aggregated_df.loc[
+            aggregated_df.Metadata_Well == well, features
+        ].to_numpy()[0]
+        values = well_df.loc[:, features].to_numpy()
+        n_valid = (~np.isnan(values)).sum(axis=0)
+        below = (values < estimates).sum(axis=0) / n_valid
+        at_or_below = (values <= estimates).sum(axis=0) / n_valid
+        errors.append(np.maximum(np.maximum(below - 0.5, 0.5 - at_or_below), 0))
+
+    return np.concatenate(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-cells", type=int, default=500_000)
+    parser.add_argument("--n-features", type=int, default=200)
+    parser.add_argument("--n-wells", type=int, default=96)
+    parser.add_argument("--nan-fraction", type=float, default=0.01)
+    parser.add_argument("--approx-error", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    single_cell_df = make_single_cells(
+        args.n_cells, args.n_features, args.n_wells, args.nan_fraction, shuffle=True
+    )
+    features = single_cell_df.columns[len(STRATA) :].tolist()
+    print(
+        f"{args.n_cells} cells x {args.n_features} features, {args.n_wells} wells, "
+        f"approx_error={args.approx_error}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        parquet_path = pathlib.Path(tmpdir) / "single_cells.parquet"
+        single_cell_df.to_parquet(parquet_path)
+
+        for source, population_df in [
+            ("in-memory", single_cell_df),
+            ("parquet", parquet_path),
+        ]:
+            results = {}
+            for operation in ["median", "approx_median"]:
+                tracemalloc.start()
+                start = time.perf_counter()
+                results[operation] = aggregate(
+                    population_df=population_df,
+                    strata=STRATA,
+                    operation=operation,
+                    engine="numpy",
+                    batch_size=args.batch_size,
+                    approx_error=args.approx_error,
+                )
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(
+                    f"{source:>9} {operation:>13}: {elapsed:8.3f} s, "
+                    f"peak {peak / 2**20:8.1f} MiB"
+                )
+
+            errors = rank_errors(single_cell_df, results["approx_median"], features)
+            absolute_errors = np.abs(
+                results["approx_median"].loc[:, features].to_numpy()
+                - results["median"].loc[:, features].to_numpy()
+            )
+            print(
+                f"{source:>9} rank error: max {errors.max():.4f}, "
+                f"mean {errors.mean():.4f}; "
+                f"max absolute error {np.nanmax(absolute_errors):.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Compare the NumPy correlation_threshold with the previous long-form pair table.
+
+The previous implementation stacked the lower triangle of the correlation matrix
+into a DataFrame of about d^2 / 2 pairs and picked the excluded feature of every
+pair above the threshold with ``DataFrame.apply``. The NumPy implementation takes
+the pairs above the threshold with ``np.nonzero`` and compares the correlation
+sum ranks of both features of all pairs at once. Both return the same features.
+
+Features are built from shared latent factors, so that many pairs pass the
+threshold. The time of the correlation matrix itself is reported separately, as
+both implementations compute it the same way.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pycytominer.cyto_utils import get_correlation_matrix, get_pairwise_correlation
+from pycytominer.operations import correlation_threshold
+from pycytominer.operations.correlation_threshold import determine_high_cor_pair
+
+
+def previous_correlation_threshold(
+    population_df: pd.DataFrame, threshold: float
+) -> list[str]:
+    """Exclude features like correlation_threshold did with the long-form table."""
+    data_cor_df, pairwise_df = get_pairwise_correlation(population_df)
+    variable_cor_sum = data_cor_df.abs().sum().sort_values().index
+    pairwise_df = pairwise_df.query("correlation > @threshold")
+    if pairwise_df.shape[0] == 0:
+        return []
+    excluded = pairwise_df.apply(
+        lambda x: determine_high_cor_pair(x, variable_cor_sum), axis="columns"
+    )
+    return list(set(excluded.tolist()))
+
+
+def make_correlated_features(
+    n_samples: int, n_features: int, group_size: int, seed: int = 0
+) -> pd.DataFrame:
+    """Features in groups of group_size that share one latent factor."""
+    random_state = np.random.default_rng(seed)
+    latent = random_state.standard_normal((n_samples, n_features // group_size + 1))
+    values = latent[:, np.arange(n_features) // group_size]
+    values += random_state.standard_normal((n_samples, n_features)) * 0.3
+    return pd.DataFrame(
+        values, columns=[f"Cells_Feature_{idx}" for idx in range(n_features)]
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-samples", type=int, default=2000)
+    parser.add_argument("--n-features", type=int, nargs="+", default=[1000, 3000, 5000])
+    parser.add_argument("--group-size", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument(
+        "--skip-previous",
+        action="store_true",
+        help="Only time the NumPy implementation, e.g. for many features.",
+    )
+    args = parser.parse_args()
+
+    for n_features in args.n_features:
+        population_df = make_correlated_features(
+            args.n_samples, n_features, args.group_size
+        )
+
+        start = time.perf_counter()
+        get_correlation_matrix(population_df)
+        matrix_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        excluded = correlation_threshold(population_df, threshold=args.threshold)
+        numpy_time = time.perf_counter() - start
+        print(
+            f"d={n_features:>6}: correlation matrix {matrix_time:7.2f} s, "
+            f"numpy {numpy_time:7.2f} s, {len(excluded)} excluded",
+            end="",
+        )
+
+        if args.skip_previous:
+            print()
+            continue
+
+        start = time.perf_counter()
+        previous_excluded = previous_correlation_threshold(
+            population_df, threshold=args.threshold
+        )
+        previous_time = time.perf_counter() - start
+        # Both implementations spend matrix_time on the correlation matrix
+        selection_speedup = (previous_time - matrix_time) / max(
+            numpy_time - matrix_time, 1e-9
+        )
+        print(
+            f", previous {previous_time:7.2f} s ({previous_time / numpy_time:.1f}x "
+            f"in total, {selection_speedup:.0f}x without the matrix)"
+        )
+        if set(excluded) != set(previous_excluded):
+            raise RuntimeError("The excluded features do not match")
+
+
+if __name__ == "__main__":
+    main()
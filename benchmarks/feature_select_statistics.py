@@ -0,0 +1,111 @@
+"""Compare feature_select() with the feature selection operations run one by one.
+
+Before the operations shared their statistics, feature_select() ran
+variance_threshold, get_na_columns, drop_outlier_features, and noise_removal one
+after another, and every one of them selected the samples and features again and
+scanned the whole table (with value_counts of every feature apart, in the case of
+variance_threshold, see benchmarks/variance_threshold.py). feature_select() now computes the statistics of all of them
+in one scan over blocks of features (see FeatureStatistics). Both exclude the
+same features.
+
+Correlation is left out by default because it is computed the same way by both,
+add it with --correlation.
+"""
+
+import argparse
+import time
+
+import numpy as np
+from aggregate_engines import make_single_cells
+from variance_threshold import previous_variance_threshold
+
+from pycytominer import feature_select
+from pycytominer.cyto_utils import drop_outlier_features
+from pycytominer.operations import (
+    correlation_threshold,
+    get_na_columns,
+    noise_removal,
+)
+
+
+def sequential_feature_select(profiles_df, features, operations, samples):
+    """Exclude features with the operations one after another."""
+    remaining = features
+    for operation in operations:
+        if operation == "variance_threshold":
+            excluded = previous_variance_threshold(profiles_df, remaining, samples)
+        elif operation == "drop_na_columns":
+            excluded = get_na_columns(profiles_df, remaining, samples)
+        elif operation == "drop_outliers":
+            excluded = drop_outlier_features(profiles_df, remaining, samples, 4.5)
+        elif operation == "noise_removal":
+            excluded = noise_removal(
+                profiles_df, "Metadata_Well", remaining, samples, 1.0
+            )
+        else:
+            excluded = correlation_threshold(profiles_df, remaining, samples)
+        remaining = [feature for feature in remaining if feature not in excluded]
+
+    return remaining
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-cells", type=int, default=100_000)
+    parser.add_argument("--n-features", type=int, default=500)
+    parser.add_argument("--n-wells", type=int, default=384)
+    parser.add_argument("--nan-fraction", type=float, default=0.01)
+    parser.add_argument(
+        "--samples", default="all", help="e.g. \"Metadata_Well.astype('int') < 192\""
+    )
+    parser.add_argument("--correlation", action="store_true")
+    args = parser.parse_args()
+
+    profiles_df = make_single_cells(
+        args.n_cells, args.n_features, args.n_wells, nan_fraction=args.nan_fraction
+    )
+    features = profiles_df.columns[2:].tolist()
+    # Count-like features (every fourth feature) have few unique values
+    count_features = features[::4]
+    profiles_df.loc[:, count_features] = np.round(
+        profiles_df.loc[:, count_features] * 2
+    )
+    operations = [
+        "variance_threshold",
+        "drop_na_columns",
+        "drop_outliers",
+        "noise_removal",
+    ]
+    if args.correlation:
+        operations.append("correlation_threshold")
+    print(f"{args.n_cells} cells x {args.n_features} features: {operations}")
+
+    start = time.perf_counter()
+    result_df = feature_select(
+        profiles_df,
+        features=features,
+        samples=args.samples,
+        operation=operations,
+        outlier_cutoff=4.5,
+        noise_removal_perturb_groups="Metadata_Well",
+        noise_removal_stdev_cutoff=1.0,
+    )
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    remaining = sequential_feature_select(
+        profiles_df, features, operations, args.samples
+    )
+    sequential_elapsed = time.perf_counter() - start
+
+    kept = [feature for feature in result_df.columns if feature in features]
+    print(
+        f"feature_select {elapsed:7.2f} s, one by one {sequential_elapsed:7.2f} s "
+        f"({sequential_elapsed / elapsed:.1f}x), {len(kept)} features kept"
+    )
+    if kept != remaining:
+        raise RuntimeError("The selected features do not match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare peak memory of a float32 and a float64 profiling pipeline.
+
+Each dtype runs in its own process, which normalizes, aggregates, and feature
+selects a synthetic single-cell plate, and reports its peak resident set size.
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+
+from aggregate_engines import make_single_cells
+
+from pycytominer import aggregate, feature_select, normalize
+
+
+def run_pipeline(args: argparse.Namespace, dtype: str):
+    """Run the pipeline in the requested dtype and print timing and peak RSS."""
+    start = time.perf_counter()
+    single_cell_df = make_single_cells(
+        args.n_cells, args.n_features, args.n_wells, args.nan_fraction, dtype=dtype
+    )
+
+    normalized_df = normalize(
+        single_cell_df, samples="all", method="standardize", dtype=dtype
+    )
+    del single_cell_df
+
+    aggregated_df = aggregate(
+        normalized_df,
+        strata=["Metadata_Plate", "Metadata_Well"],
+        engine="numpy",
+        dtype=dtype,
+    )
+    del normalized_df
+
+    feature_select(
+        aggregated_df,
+        operation=["variance_threshold", "correlation_threshold"],
+        dtype=dtype,
+    )
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_rss_gb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024**2
+    print(
+        f"{dtype:>7}: peak RSS {peak_rss_gb:6.2f} GB, "
+        f"{time.perf_counter() - start:7.1f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-cells", type=int, default=5_000_000)
+    parser.add_argument("--n-features", type=int, default=50)
+    parser.add_argument("--n-wells", type=int, default=384)
+    parser.add_argument("--nan-fraction", type=float, default=0.01)
+    args = parser.parse_args()
+
+    print(
+        f"{args.n_cells} cells x {args.n_features} features, {args.n_wells} wells, "
+        f"{args.nan_fraction:.0%} NaN"
+    )
+    # A fresh process per dtype keeps peak RSS measurements independent
+    context = multiprocessing.get_context("spawn")
+    for dtype in ["float64", "float32"]:
+        process = context.Process(target=run_pipeline, args=(args, dtype))
+        process.start()
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the Spearman and approximate Kendall correlations of the correlation
+engine with ``DataFrame.corr()``.
+
+``DataFrame.corr(method="spearman")`` ranks both columns of every pair of
+features again, and ``method="kendall"`` compares all pairs of samples of every
+pair of features. The engine ranks every feature once with vectorized average
+ranks and computes Pearson correlations of the ranks in tiles of matrix
+products; "kendall_approx" converts these Spearman correlations to Kendall's tau.
+Pairs with missing values are ranked again among their complete samples from the
+sort order of every feature, so Spearman correlations are the same, and the
+largest difference of the approximate Kendall correlations is reported.
+
+For example, with missing values (which makes both re-rank every pair)::
+
+    python benchmarks/rank_correlation.py --nan-fraction 0.01
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pycytominer.cyto_utils import get_correlation_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-samples", type=int, default=2000)
+    parser.add_argument("--n-features", type=int, default=500)
+    parser.add_argument("--nan-fraction", type=float, default=0.0)
+    parser.add_argument(
+        "--kendall-features",
+        type=int,
+        default=50,
+        help="Number of features to compare exact Kendall correlations on.",
+    )
+    args = parser.parse_args()
+
+    random_state = np.random.default_rng(0)
+    latent = random_state.standard_normal((args.n_samples, args.n_features // 10 + 1))
+    values = np.exp(latent[:, np.arange(args.n_features) // 10])
+    values += random_state.standard_normal(values.shape) * 0.5
+    values[random_state.random(values.shape) < args.nan_fraction] = np.nan
+    profiles_df = pd.DataFrame(values)
+    print(f"{args.n_samples} samples x {args.n_features} features")
+
+    start = time.perf_counter()
+    cor = get_correlation_matrix(profiles_df, method="spearman")
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected_cor = profiles_df.corr(method="spearman")
+    pandas_elapsed = time.perf_counter() - start
+    difference = np.abs(cor.to_numpy() - expected_cor.to_numpy()).max()
+    print(
+        f"      spearman: engine {elapsed:7.2f} s, pandas {pandas_elapsed:7.2f} s, "
+        f"max difference {difference:.2g}"
+    )
+    if difference > 1e-9:
+        raise RuntimeError("The Spearman correlations do not match")
+
+    kendall_df = profiles_df.iloc[:, : args.kendall_features]
+    start = time.perf_counter()
+    cor = get_correlation_matrix(kendall_df, method="kendall_approx")
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected_cor = kendall_df.corr(method="kendall")
+    pandas_elapsed = time.perf_counter() - start
+    difference = np.abs(cor.to_numpy() - expected_cor.to_numpy()).max()
+    print(
+        f"{args.kendall_features:>4} kendall: engine {elapsed:7.2f} s, "
+        f"pandas {pandas_elapsed:7.2f} s, max difference {difference:.2g}"
+    )
+
+
+if __name__ == "__main__":
+    main()
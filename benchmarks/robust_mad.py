@@ -0,0 +1,84 @@
+"""Compare the RobustMAD partition kernels with the previous pandas and SciPy path.
+
+The previous path fit with ``DataFrame.median()`` and SciPy's
+``median_abs_deviation(nan_policy="omit")`` and transformed through aligned
+DataFrames. Both paths run on a NaN-free and a NaN-heavy block of profiles; the
+fitted medians and median absolute deviations are checked to be identical.
+
+The plate-scale comparison from the change request needs about 12 GB per float32
+block copy, for example::
+
+    python benchmarks/robust_mad.py --n-rows 1000000 --n-features 3000 \\
+        --dtype float32
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import median_abs_deviation
+
+from pycytominer.operations import RobustMAD
+
+
+def previous_fit_transform(profiles_df: pd.DataFrame) -> tuple:
+    """Fit and transform like RobustMAD did before the partition kernels."""
+    median = profiles_df.median()
+    mad = pd.Series(
+        median_abs_deviation(profiles_df, nan_policy="omit", scale=1 / 1.4826),
+        index=median.index,
+    )
+    return median, mad, (profiles_df - median) / (mad + 1e-18)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-rows", type=int, default=200_000)
+    parser.add_argument("--n-features", type=int, default=300)
+    parser.add_argument("--nan-fraction", type=float, default=0.2)
+    parser.add_argument("--dtype", default="float64")
+    parser.add_argument(
+        "--skip-previous",
+        action="store_true",
+        help="Only time the partition kernels, e.g. at plate scale.",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{args.n_rows} rows x {args.n_features} features, {args.dtype}")
+
+    for label, nan_fraction in [("NaN-free", 0.0), ("NaN-heavy", args.nan_fraction)]:
+        values = rng.standard_normal(
+            (args.n_rows, args.n_features), dtype=np.dtype(args.dtype).type
+        )
+        if nan_fraction > 0:
+            values[rng.random(values.shape) < nan_fraction] = np.nan
+        profiles_df = pd.DataFrame(values, copy=False)
+        del values
+
+        start = time.perf_counter()
+        scaler = RobustMAD().fit(profiles_df)
+        fit_time = time.perf_counter() - start
+        start = time.perf_counter()
+        scaler.transform(profiles_df)
+        transform_time = time.perf_counter() - start
+        print(
+            f"{label:>9}   partition: fit {fit_time:7.2f} s, "
+            f"transform {transform_time:7.2f} s"
+        )
+
+        if args.skip_previous:
+            continue
+
+        start = time.perf_counter()
+        median, mad, _ = previous_fit_transform(profiles_df)
+        previous_time = time.perf_counter() - start
+        print(f"{label:>9}    previous: fit + transform {previous_time:7.2f} s")
+
+        np.testing.assert_allclose(scaler.median, median, rtol=1e-6)
+        np.testing.assert_allclose(scaler.mad, mad, rtol=1e-6)
+
+
+if __name__ == "__main__":
+    main()
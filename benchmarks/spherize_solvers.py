@@ -0,0 +1,55 @@
+"""Compare the time and peak memory of the Spherize solvers.
+
+Each solver fits a ZCA-cor transform on the same synthetic single cells. Peak
+memory is the largest amount traced by tracemalloc during the fit; the "svd"
+solver holds a standardized copy of the profiles, while "eigh" only holds a d x d
+matrix and a block of rows. The whitening matrices of all solvers are compared
+with the first one.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from aggregate_engines import make_single_cells
+
+from pycytominer.operations import Spherize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-cells", type=int, default=200_000)
+    parser.add_argument("--n-features", type=int, default=500)
+    parser.add_argument("--n-wells", type=int, default=96)
+    parser.add_argument("--method", default="ZCA-cor")
+    parser.add_argument("--solvers", nargs="+", default=["eigh", "svd"])
+    args = parser.parse_args()
+
+    single_cell_df = make_single_cells(
+        args.n_cells, args.n_features, args.n_wells, nan_fraction=0.0
+    )
+    profiles_df = single_cell_df.filter(regex="^Cells_")
+    del single_cell_df
+    print(f"{args.n_cells} cells x {args.n_features} features, {args.method}")
+
+    reference = None
+    for solver in args.solvers:
+        tracemalloc.start()
+        start = time.perf_counter()
+        scaler = Spherize(method=args.method, solver=solver).fit(profiles_df)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+        if reference is None:
+            reference = scaler.W
+        difference = np.abs(scaler.W - reference).max() / np.abs(reference).max()
+        print(
+            f"{solver:>10}: {elapsed:7.2f} s, peak {peak:8.1f} MiB, "
+            f"rank {scaler.rank_}, max relative difference {difference:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare blockwise whitening with the previous Spherize transform.
+
+The previous transform created a standardized copy of the profiles with
+``StandardScaler.transform`` and multiplied it with the whitening matrix, and
+normalize() wrapped the product in a new block next to its own copy of the
+features. The blockwise kernel scales and multiplies blocks of rows that stay in
+cache, writing into a preallocated output, or into the feature block itself as
+normalize() does. Peak memory is the largest amount traced by tracemalloc on top
+of the profiles.
+
+For example, to time the plate-scale case with four BLAS threads::
+
+    python benchmarks/spherize_transform.py --n-cells 5000000 --n-features 1000 \\
+        --n-threads 4
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from aggregate_engines import make_single_cells
+
+from pycytominer.cyto_utils.normalizer_states import NormalizerState
+from pycytominer.operations import Spherize
+
+
+def traced(function):
+    """Run a function and return its result, time and peak traced memory."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-cells", type=int, default=200_000)
+    parser.add_argument("--n-features", type=int, default=500)
+    parser.add_argument("--n-wells", type=int, default=96)
+    parser.add_argument("--method", default="ZCA-cor")
+    parser.add_argument("--n-threads", type=int, default=None)
+    args = parser.parse_args()
+
+    single_cell_df = make_single_cells(
+        args.n_cells, args.n_features, args.n_wells, nan_fraction=0.0
+    )
+    profiles_df = single_cell_df.filter(regex="^Cells_")
+    del single_cell_df
+    features = profiles_df.columns.tolist()
+    print(
+        f"{args.n_cells} cells x {args.n_features} features, {args.method}, "
+        f"profiles {profiles_df.memory_usage().sum() / 2**20:.0f} MiB"
+    )
+
+    scaler = Spherize(method=args.method, n_threads=args.n_threads).fit(profiles_df)
+    state = NormalizerState.from_scaler(scaler, method="spherize", features=features)
+
+    def previous():
+        scaled = scaler.standard_scaler.transform(profiles_df.values)
+        return scaled @ scaler.W
+
+    expected, elapsed, peak = traced(previous)
+    print(f"  previous: {elapsed:7.2f} s, peak {peak:8.1f} MiB")
+
+    result, elapsed, peak = traced(lambda: scaler.transform(profiles_df).to_numpy())
+    print(f" blockwise: {elapsed:7.2f} s, peak {peak:8.1f} MiB (new output)")
+    np.testing.assert_allclose(result[::97], expected[::97], rtol=1e-7, atol=1e-9)
+    del result
+
+    # normalize() whitens its own float64 copy of the features in place
+    values = profiles_df.to_numpy(dtype=np.float64, copy=True)
+    result, elapsed, peak = traced(
+        lambda: state.transform_values(values, n_threads=args.n_threads)
+    )
+    print(f" blockwise: {elapsed:7.2f} s, peak {peak:8.1f} MiB (in place)")
+    np.testing.assert_allclose(result[::97], expected[::97], rtol=1e-7, atol=1e-9)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,4 +4,4 @@ from .aggregate import aggregate
 from .annotate import annotate
 from .consensus import consensus
 from .feature_select import feature_select
-from .normalize import normalize
+from .normalize import apply_normalizer, fit_normalizer, normalize, normalize_parquet
@@ -2,22 +2,54 @@
 Aggregate profiles based on given grouping variables.
 """
 
+import functools
+import operator
+import pathlib
+from collections.abc import Callable
 from typing import Any, Literal, Optional, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 
-from pycytominer.cyto_utils import check_aggregate_operation, infer_cp_features
+from pycytominer.cyto_utils import (
+    check_aggregate_engine,
+    check_aggregate_operation,
+    check_aggregate_operations,
+    check_approx_error,
+    check_float_dtype,
+    check_n_jobs,
+    check_trim_fraction,
+    infer_cp_features,
+)
+from pycytominer.cyto_utils.aggregate_states import AggregateState, statistic_columns
+from pycytominer.cyto_utils.group_kernels import (
+    aggregate_groups,
+    factorize_strata,
+    group_mean,
+    group_median,
+    group_statistics,
+    sketch_size,
+    sort_by_group,
+)
+from pycytominer.cyto_utils.load import (
+    load_parquet_batches,
+    load_parquet_schema,
+    load_profiles,
+    resolve_parquet_path,
+)
+from pycytominer.cyto_utils.profile_matrix import ProfileMatrix
 from pycytominer.cyto_utils.util import write_to_file_if_user_specifies_output_details
 
 
 @write_to_file_if_user_specifies_output_details
 def aggregate(
-    population_df: pd.DataFrame,
+    population_df: Union[pd.DataFrame, str, pathlib.Path],
     strata: list[str] = ["Metadata_Plate", "Metadata_Well"],
     features: Union[list[str], str] = "infer",
     image_features: bool = False,
-    operation: str = "median",
+    operation: Union[str, list[str]] = "median",
     output_file: Optional[str] = None,
     output_type: Literal[
         "csv", "parquet", "anndata_h5ad", "anndata_zarr", None
@@ -27,13 +59,24 @@ def aggregate(
     subset_data_df: Optional[pd.DataFrame] = None,
     compression_options: Optional[Union[str, dict[str, Any]]] = None,
     float_format: Optional[str] = None,
+    batch_size: int = 65536,
+    engine: str = "pandas",
+    n_jobs: int = 1,
+    dtype: np.typing.DTypeLike = np.float64,
+    approx_error: float = 0.01,
+    trim_fraction: float = 0.05,
+    weight_feature: Optional[str] = None,
 ) -> Union[pd.DataFrame, str]:
     """Combine population dataframe variables by strata groups using given operation.
 
     Parameters
     ----------
-    population_df : pd.DataFrame
-        DataFrame to group and aggregate.
+    population_df : pd.DataFrame or path
+        DataFrame to group and aggregate. If a path to a parquet file or parquet
+        dataset directory is provided, the data is streamed in batches of
+        ``batch_size`` rows and combined through mergeable per-stratum partial
+        states, so the full single-cell table is never held in memory. Other
+        paths are loaded with ``load_profiles()``.
     strata : list of str, default ["Metadata_Plate", "Metadata_Well"]
         Columns to groupby and aggregate.
     features : list of str, default "infer"
@@ -44,8 +87,21 @@ def aggregate(
         non-numeric ``Image_*`` columns, which helps avoid treating image
         payload columns as profile features in mixed tables such as
         OME-Arrow-backed inputs.
-    operation : str, default "median"
-        How the data is aggregated. Currently only supports one of ['mean', 'median'].
+    operation : str or list of str, default "median"
+        How the data is aggregated. Currently supports ['mean', 'median',
+        'approx_median', 'trimmed_mean', 'weighted_mean', 'std', 'mad', 'q25',
+        'q75', 'count']. "trimmed_mean" is the mean of every feature without its
+        smallest and largest values in each stratum (see ``trim_fraction``),
+        "weighted_mean" the mean weighted by ``weight_feature``, "std" is the
+        sample standard deviation, "mad" the median absolute deviation from the
+        median, "q25" and "q75" the linearly interpolated quartiles, and "count"
+        the number of non-missing values. "approx_median" estimates the median
+        from a mergeable quantile sketch with a fixed number of centroids per
+        feature (see ``approx_error``), so parquet inputs are aggregated in bounded
+        memory. It always uses the "numpy" engine. A list of operations, e.g.
+        ``["mean", "std", "q25", "q75", "mad"]``, computes all statistics from a
+        single grouping pass and suffixes every output feature with its
+        operation (e.g. ``Cells_x_mean``, ``Cells_x_std``), grouped by operation.
     output_file : str or file handle, optional
         If provided, will write aggregated profiles to file. If not specified, will return the aggregated profiles.
         We recommend naming the file based on the plate name.
@@ -65,6 +121,42 @@ def aggregate(
         Decimal precision to use in writing output file as input to
         pd.DataFrame.to_csv(float_format=float_format). For example, use "%.3g" for 3
         decimal precision.
+    batch_size : int, default 65536
+        Number of rows to read at a time when population_df is a parquet path.
+        With operation="mean" or "approx_median", memory is bounded by the number
+        of strata times the number of features. With operation="median", the exact median requires
+        keeping the (subset) feature values of every stratum.
+    engine : str, default "pandas"
+        How in-memory data is aggregated. One of ['pandas', 'numpy']. The "pandas"
+        engine uses ``DataFrame.groupby``. The "numpy" engine sorts rows once by
+        strata codes and reduces all features of each group together on a
+        contiguous 2D block, which is typically much faster for wide
+        CellProfiler tables with the median operation.
+    n_jobs : int, default 1
+        Number of threads used to aggregate strata groups in parallel. -1 uses all
+        CPUs. Groups are split into chunks that share the same in-memory feature
+        block, and the output is identical to a serial run. Requires
+        engine="numpy" for in-memory data; parquet inputs use it to finalize
+        medians.
+    dtype : dtype-like, default np.float64
+        Float dtype of the input and aggregated features, one of
+        ['float32', 'float64']. Using float32 halves the memory used by features,
+        for example to keep float32 parquet inputs from CytoTable in float32. Sums
+        and median midpoints are always accumulated in float64.
+    approx_error : float, default 0.01
+        Target rank error of operation="approx_median", as a fraction of the
+        non-missing values of a stratum. For example, 0.01 places the estimate
+        within about 1% of the ranks around the exact median. The sketch keeps
+        ``ceil(1 / approx_error)`` centroids per stratum and feature, and strata
+        with at most that many cells get their exact median.
+    trim_fraction : float, default 0.05
+        Fraction of the non-missing values of a stratum that operation="trimmed_mean"
+        drops from each tail of every feature, between 0 and 0.5. For example,
+        0.05 drops the top and bottom 5% of cells per feature.
+    weight_feature : str, optional
+        Column holding the per-cell weights of operation="weighted_mean", e.g. an
+        object area feature. Cells with a missing weight are ignored. Required for
+        operation="weighted_mean".
 
     Returns
     -------
@@ -78,54 +170,110 @@ def aggregate(
             output file.
     """
 
-    # Check that the operation is supported
-    operation = check_aggregate_operation(operation)
-
-    # Subset the data to specified samples
-    if isinstance(subset_data_df, pd.DataFrame):
-        population_df = subset_data_df.merge(
-            population_df, how="inner", on=subset_data_df.columns.tolist()
-        ).reindex(population_df.columns, axis="columns")
+    # Check that the operation and engine are supported
+    operation = (
+        check_aggregate_operation(operation)
+        if isinstance(operation, str)
+        else check_aggregate_operations(operation)
+    )
+    engine = check_aggregate_engine(engine)
+    n_jobs = check_n_jobs(n_jobs)
+    dtype = check_float_dtype(dtype)
+    approx_error = check_approx_error(approx_error)
+    trim_fraction = check_trim_fraction(trim_fraction)
+    if (
+        "weighted_mean" in ([operation] if isinstance(operation, str) else operation)
+        and weight_feature is None
+    ):
+        raise ValueError("operation='weighted_mean' requires a weight_feature")
+    if "approx_median" in ([operation] if isinstance(operation, str) else operation):
+        engine = "numpy"
+    if n_jobs > 1 and engine == "pandas" and isinstance(population_df, pd.DataFrame):
+        raise ValueError("n_jobs > 1 requires engine='numpy'")
 
-    # Subset dataframe to only specified variables if provided
-    strata_df = population_df[strata]
-
-    # Only extract single object column in preparation for count
-    if compute_object_count:
-        count_object_df = (
-            population_df
-            .loc[:, list(np.union1d(strata, [object_feature]))]
-            .groupby(strata)[object_feature]
-            .count()
-            .reset_index()
-            .rename(columns={f"{object_feature}": "Metadata_Object_Count"})
+    # Stream parquet inputs through partial states instead of loading them fully
+    if isinstance(population_df, (str, pathlib.PurePath)) and (
+        resolve_parquet_path(population_df) is not None
+    ):
+        population_df = _aggregate_parquet(
+            parquet_path=population_df,
+            strata=strata,
+            features=features,
+            image_features=image_features,
+            operation=operation,
+            compute_object_count=compute_object_count,
+            object_feature=object_feature,
+            subset_data_df=subset_data_df,
+            batch_size=batch_size,
+            n_jobs=n_jobs,
+            dtype=dtype,
+            approx_error=approx_error,
+            trim_fraction=trim_fraction,
+            weight_feature=weight_feature,
         )
+    else:
+        population_df = load_profiles(population_df)
 
-    if features == "infer":
-        features = infer_cp_features(population_df, image_features=image_features)
+        # Subset the data to specified samples
+        population_df = _subset_population_df(population_df, subset_data_df)
 
-    # recast as dataframe to protect against scenarios where a series may be returned
-    population_df = pd.DataFrame(population_df[features])
+        # Subset dataframe to only specified variables if provided
+        # (recast as dataframe in case a single strata column is given as a string)
+        strata_df = pd.DataFrame(population_df[strata])
 
-    # Fix dtype of input features (they should all be floats!)
-    population_df = population_df.astype(float)
+        # Only extract single object column in preparation for count
+        if compute_object_count:
+            count_object_df = (
+                population_df
+                .loc[:, list(np.union1d(strata, [object_feature]))]
+                .groupby(strata)[object_feature]
+                .count()
+                .reset_index()
+                .rename(columns={f"{object_feature}": "Metadata_Object_Count"})
+            )
 
-    # Merge back metadata used to aggregate by
-    population_df = pd.concat([strata_df, population_df], axis="columns")
+        if features == "infer":
+            features = infer_cp_features(population_df, image_features=image_features)
 
-    # Perform aggregating function
-    # Note: type ignore added below to address the change in variable types for
-    # label `population_df`.
-    population_df = population_df.groupby(strata, dropna=False)  # type: ignore[assignment]
+        # Per-cell weights, only needed by the weighted_mean operation
+        weights = (
+            population_df[weight_feature].to_numpy(dtype=np.float64, na_value=np.nan)
+            if weight_feature is not None
+            else None
+        )
 
-    if operation == "median":
-        population_df = population_df.median().reset_index()
-    else:
-        population_df = population_df.mean().reset_index()
+        # Gather the features into a single float block (they should all be
+        # floats!), which the engines only read, so an existing block is reused
+        population_df = ProfileMatrix.from_frame(
+            population_df,
+            features=list(features),
+            metadata_columns=[],
+            dtype=dtype,
+            copy=False,
+        ).feature_frame()
+
+        if engine == "numpy":
+            population_df = _aggregate_numpy(
+                strata_df=strata_df,
+                feature_df=population_df,
+                operation=operation,
+                n_jobs=n_jobs,
+                approx_error=approx_error,
+                trim_fraction=trim_fraction,
+                weights=weights,
+            )
+        else:
+            population_df = _aggregate_pandas(
+                strata_df=strata_df,
+                feature_df=population_df,
+                operation=operation,
+                trim_fraction=trim_fraction,
+                weights=weights,
+            )
 
-    # Compute objects counts
-    if compute_object_count:
-        population_df = count_object_df.merge(population_df, on=strata, how="right")
+        # Compute objects counts
+        if compute_object_count:
+            population_df = count_object_df.merge(population_df, on=strata, how="right")
 
     # Aggregated image number and object number do not make sense
     if columns_to_drop := [
@@ -136,3 +284,342 @@ def aggregate(
         population_df = population_df.drop(columns=columns_to_drop, axis="columns")
 
     return population_df
+
+
+def _subset_population_df(
+    population_df: pd.DataFrame, subset_data_df: Optional[pd.DataFrame]
+) -> pd.DataFrame:
+    """Keep only the rows of population_df that match a row of subset_data_df.
+
+    Rows are looked up through a hashed MultiIndex of the subset columns, so only
+    the matching rows are copied. The result matches an inner merge of
+    subset_data_df with population_df: rows follow the subset order, and subset
+    rows listed more than once (e.g. sampled with replacement) are repeated.
+
+    Parameters
+    ----------
+    population_df : pd.DataFrame
+        DataFrame to subset.
+    subset_data_df : pd.DataFrame, optional
+        Rows to keep, matched on all of its columns. If None, population_df is
+        returned as is.
+
+    Returns
+    -------
+    pd.DataFrame
+        Subset population_df.
+    """
+
+    if not isinstance(subset_data_df, pd.DataFrame):
+        return population_df
+
+    subset_columns = subset_data_df.columns.tolist()
+    population_keys = pd.MultiIndex.from_frame(population_df.loc[:, subset_columns])
+
+    # Positional lookups require unique keys, otherwise match every pair
+    if not population_keys.is_unique:
+        return subset_data_df.merge(
+            population_df, how="inner", on=subset_columns
+        ).reindex(population_df.columns, axis="columns")
+
+    positions = population_keys.get_indexer(pd.MultiIndex.from_frame(subset_data_df))
+
+    return population_df.take(positions[positions >= 0]).reset_index(drop=True)
+
+
+def _subset_filter_expression(subset_data_df: pd.DataFrame) -> pc.Expression:
+    """Build a parquet filter that keeps a superset of the rows in subset_data_df.
+
+    Every subset column must hold one of its subset values, which lets the reader
+    skip row groups and rows that cannot match before the exact semi-join.
+
+    Parameters
+    ----------
+    subset_data_df : pd.DataFrame
+        Rows to keep, matched on all of its columns.
+
+    Returns
+    -------
+    pyarrow.compute.Expression
+        Filter expression for pyarrow datasets.
+    """
+
+    expressions = []
+    for column in subset_data_df.columns:
+        values = subset_data_df[column].drop_duplicates()
+        expression = pc.field(column).isin(pa.array(values.dropna()))
+        if values.isna().any():
+            expression = expression | pc.field(column).is_null()
+        expressions.append(expression)
+
+    return functools.reduce(operator.and_, expressions)
+
+
+def _aggregate_pandas(
+    strata_df: pd.DataFrame,
+    feature_df: pd.DataFrame,
+    operation: Union[str, list[str]],
+    trim_fraction: float = 0.05,
+    weights: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Aggregate features by strata with a single pandas groupby.
+
+    Every operation reuses the same ``DataFrameGroupBy`` object, so strata are only
+    factorized once.
+
+    Parameters
+    ----------
+    strata_df : pd.DataFrame
+        Strata columns of the population.
+    feature_df : pd.DataFrame
+        Float feature columns of the population, aligned with strata_df.
+    operation : str or list of str
+        Aggregation operation(s), see :func:`aggregate`.
+    trim_fraction : float, default 0.05
+        Fraction of the values trimmed from each tail for operation="trimmed_mean".
+    weights : np.ndarray, optional
+        Per-row weights, required for operation="weighted_mean".
+
+    Returns
+    -------
+    pd.DataFrame
+        Aggregated profiles with the strata columns followed by the features.
+    """
+
+    strata = strata_df.columns.tolist()
+    grouped = pd.concat([strata_df, feature_df], axis="columns").groupby(
+        strata, dropna=False
+    )
+
+    statistics = []
+    for op in [operation] if isinstance(operation, str) else operation:
+        if op == "mad":
+            deviations_df = (feature_df - grouped.transform("median")).abs()
+            statistic_df = (
+                pd
+                .concat([strata_df, deviations_df], axis="columns")
+                .groupby(strata, dropna=False)
+                .median()
+            )
+        elif op == "trimmed_mean":
+            # Rank the non-missing values of every stratum and drop both tails
+            ranks_df = grouped.rank(method="first")
+            n_valid_df = grouped.transform("count")
+            n_trim_df = np.floor(n_valid_df * trim_fraction)
+            statistic_df = (
+                pd
+                .concat(
+                    [
+                        strata_df,
+                        feature_df.where(
+                            (ranks_df > n_trim_df)
+                            & (ranks_df <= n_valid_df - n_trim_df)
+                        ),
+                    ],
+                    axis="columns",
+                )
+                .groupby(strata, dropna=False)
+                .mean()
+            )
+        elif op == "weighted_mean":
+            if weights is None:
+                raise ValueError("operation='weighted_mean' requires weights")
+            # Weigh every non-missing value and sum the weights per feature
+            weight_df = feature_df.notna().mul(np.nan_to_num(weights), axis="index")
+            weighted_grouped = pd.concat(
+                [strata_df, feature_df.fillna(0) * weight_df], axis="columns"
+            ).groupby(strata, dropna=False)
+            weight_grouped = pd.concat([strata_df, weight_df], axis="columns").groupby(
+                strata, dropna=False
+            )
+            statistic_df = weighted_grouped.sum() / weight_grouped.sum().replace(
+                0, np.nan
+            )
+        elif op in ["q25", "q75"]:
+            statistic_df = grouped.quantile(0.25 if op == "q25" else 0.75)
+        else:
+            statistic_df = getattr(grouped, op)()
+
+        # All features share the dtype of the feature block
+        if feature_df.shape[1] > 0:
+            statistic_df = statistic_df.astype(feature_df.dtypes.iloc[0])
+        statistics.append(statistic_df)
+
+    aggregated_df = pd.concat(statistics, axis="columns")
+    aggregated_df.columns = pd.Index(
+        statistic_columns(feature_df.columns.tolist(), operation)
+    )
+
+    return aggregated_df.reset_index()
+
+
+def _aggregate_numpy(
+    strata_df: pd.DataFrame,
+    feature_df: pd.DataFrame,
+    operation: Union[str, list[str]],
+    n_jobs: int = 1,
+    approx_error: float = 0.01,
+    trim_fraction: float = 0.05,
+    weights: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """Aggregate features by strata with vectorized NumPy group kernels.
+
+    Rows are factorized into strata codes and sorted once, so that every group is
+    a contiguous slice of a single 2D float block. Each group is then reduced for
+    all features together.
+
+    Parameters
+    ----------
+    strata_df : pd.DataFrame
+        Strata columns of the population.
+    feature_df : pd.DataFrame
+        Float feature columns of the population, aligned with strata_df.
+    operation : str or list of str
+        Aggregation operation(s), see :func:`aggregate`.
+    n_jobs : int, default 1
+        Number of threads reducing chunks of groups in parallel.
+    approx_error : float, default 0.01
+        Target rank error of operation="approx_median".
+    trim_fraction : float, default 0.05
+        Fraction of the values trimmed from each tail for operation="trimmed_mean".
+    weights : np.ndarray, optional
+        Per-row weights, required for operation="weighted_mean".
+
+    Returns
+    -------
+    pd.DataFrame
+        Aggregated profiles with the same layout as a pandas groupby aggregation.
+    """
+
+    codes, uniques_df = factorize_strata(strata_df)
+    order, offsets = sort_by_group(codes, n_groups=uniques_df.shape[0])
+
+    operations = [operation] if isinstance(operation, str) else operation
+
+    reducer: Callable[..., np.ndarray]
+    if operation == "mean":
+        reducer = group_mean
+    elif operation == "median":
+        reducer = group_median
+    else:
+        reducer = functools.partial(
+            group_statistics,
+            operations=operations,
+            n_centroids=sketch_size(approx_error),
+            trim_fraction=trim_fraction,
+        )
+
+    values = feature_df.to_numpy()
+    aggregated = aggregate_groups(
+        values,
+        order,
+        offsets,
+        reducer=reducer,
+        n_jobs=n_jobs,
+        weights=weights if "weighted_mean" in operations else None,
+    )
+
+    return pd.concat(
+        [
+            uniques_df,
+            pd.DataFrame(
+                aggregated.astype(values.dtype, copy=False),
+                columns=pd.Index(
+                    statistic_columns(feature_df.columns.tolist(), operation)
+                ),
+            ),
+        ],
+        axis="columns",
+    )
+
+
+def _aggregate_parquet(
+    parquet_path: Union[str, pathlib.PurePath],
+    strata: list[str],
+    features: Union[list[str], str],
+    image_features: bool,
+    operation: Union[str, list[str]],
+    compute_object_count: bool,
+    object_feature: str,
+    subset_data_df: Optional[pd.DataFrame],
+    batch_size: int,
+    n_jobs: int = 1,
+    dtype: np.typing.DTypeLike = np.float64,
+    approx_error: float = 0.01,
+    trim_fraction: float = 0.05,
+    weight_feature: Optional[str] = None,
+) -> pd.DataFrame:
+    """Aggregate a parquet file or dataset batch by batch.
+
+    Each batch updates an :class:`~pycytominer.cyto_utils.aggregate_states.AggregateState`
+    that keeps mergeable per-stratum partial states, which are reduced into the
+    aggregated profiles once all batches are consumed.
+
+    Parameters
+    ----------
+    parquet_path : str or pathlib.PurePath
+        Parquet file or parquet dataset directory with single-cell profiles.
+    strata, features, image_features, operation, compute_object_count, object_feature, subset_data_df, batch_size, n_jobs, dtype, approx_error, trim_fraction, weight_feature
+        See :func:`aggregate`.
+
+    Returns
+    -------
+    pd.DataFrame
+        Aggregated profiles with strata, object counts (if requested), and features.
+    """
+
+    schema = load_parquet_schema(parquet_path)
+
+    if features == "infer":
+        # Nested arrow columns (e.g. image payloads) are never profile features
+        schema_df = schema.empty_table().to_pandas()
+        features = [
+            feature
+            for feature in infer_cp_features(schema_df, image_features=image_features)
+            if not pa.types.is_nested(schema.field(feature).type)
+        ]
+    elif isinstance(features, str):
+        features = [features]
+
+    columns = list(strata) + [column for column in features if column not in strata]
+    if compute_object_count and object_feature not in columns:
+        columns.append(object_feature)
+    if weight_feature is not None and weight_feature not in columns:
+        columns.append(weight_feature)
+    if isinstance(subset_data_df, pd.DataFrame):
+        columns += [
+            column for column in subset_data_df.columns if column not in columns
+        ]
+
+    missing_columns = [column for column in columns if column not in schema.names]
+    if missing_columns:
+        raise KeyError(
+            f"The following labels were missing: {pd.Index(missing_columns)}"
+        )
+
+    state = AggregateState(
+        strata=strata,
+        features=features,
+        operation=operation,
+        compute_object_count=compute_object_count,
+        object_feature=object_feature,
+        dtype=dtype,
+        approx_error=approx_error,
+        trim_fraction=trim_fraction,
+        weight_feature=weight_feature,
+    )
+    # Push the subset filter down to the reader so unsampled rows are not loaded
+    filter_expression = (
+        _subset_filter_expression(subset_data_df)
+        if isinstance(subset_data_df, pd.DataFrame)
+        else None
+    )
+    for batch_df in load_parquet_batches(
+        parquet_path,
+        columns=columns,
+        batch_size=batch_size,
+        filter_expression=filter_expression,
+    ):
+        state.update(_subset_population_df(batch_df, subset_data_df))
+
+    return state.finalize(n_jobs=n_jobs)
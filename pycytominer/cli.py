@@ -8,7 +8,14 @@ from typing import Any, Literal
 
 import fire
 
-from pycytominer import aggregate, annotate, consensus, feature_select, normalize
+from pycytominer import (
+    aggregate,
+    annotate,
+    consensus,
+    feature_select,
+    normalize,
+    normalize_parquet,
+)
 from pycytominer.cyto_utils.load import load_profiles
 
 
@@ -205,6 +212,8 @@ class PycytominerCLI:
         spherize_center: bool = True,
         spherize_method: str = "ZCA-cor",
         spherize_epsilon: float = 1e-6,
+        batch_size: int | None = None,
+        approx_error: float = 0.01,
     ) -> str:
         """Normalize profiles from a file and write the results to disk.
 
@@ -223,6 +232,10 @@ class PycytominerCLI:
             spherize_center: Whether to center data before sphering.
             spherize_method: Spherize method to use.
             spherize_epsilon: Spherize epsilon parameter.
+            batch_size: If set, stream a parquet input to a parquet output in
+                batches of this many rows instead of loading it fully.
+            approx_error: Quantile sketch rank error when streaming the median,
+                quantile, and rank based methods.
 
         Returns:
             The output file path.
@@ -236,6 +249,27 @@ class PycytominerCLI:
         else:
             meta_features_value = _split_csv_arg(meta_features)
 
+        if batch_size is not None:
+            if output_type != "parquet":
+                raise ValueError("batch_size requires output_type='parquet'.")
+            output_path = normalize_parquet(
+                profiles=profiles,
+                output_file=output_file,
+                features=features_value,
+                image_features=image_features,
+                meta_features=meta_features_value,
+                samples=samples,
+                method=method,
+                mad_robustize_epsilon=mad_robustize_epsilon,
+                spherize_center=spherize_center,
+                spherize_method=spherize_method,
+                spherize_epsilon=spherize_epsilon,
+                batch_size=batch_size,
+                approx_error=approx_error,
+            )
+            _announce_output_file(output_path)
+            return output_path
+
         result = normalize(
             profiles=profiles,
             features=features_value,
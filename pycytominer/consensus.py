@@ -4,10 +4,18 @@ Acquire consensus signatures for input samples
 
 from typing import Any, Literal, Optional, Union, cast
 
+import numpy as np
 import pandas as pd
 
 from pycytominer.aggregate import aggregate
-from pycytominer.cyto_utils import check_consensus_operation, load_profiles, modz
+from pycytominer.cyto_utils import (
+    cast_features,
+    check_consensus_operation,
+    check_float_dtype,
+    infer_cp_features,
+    load_profiles,
+    modz,
+)
 from pycytominer.cyto_utils.util import write_to_file_if_user_specifies_output_details
 
 
@@ -24,6 +32,7 @@ def consensus(
     compression_options: Optional[Union[str, dict[str, Any]]] = None,
     float_format: Optional[str] = None,
     modz_args: Optional[dict[str, Union[int, float, str]]] = {"method": "spearman"},
+    dtype: np.typing.DTypeLike = np.float64,
 ) -> Union[pd.DataFrame, str]:
     """Form level 5 consensus profile data.
 
@@ -56,6 +65,8 @@ def consensus(
     modz_args : dict, optional
         Additional custom arguments passed as kwargs if operation="modz".
         See pycytominer.cyto_utils.modz for more details.
+    dtype : dtype-like, default np.float64
+        Float dtype of the consensus features, one of ['float32', 'float64'].
 
     Returns
     -------
@@ -105,13 +116,19 @@ def consensus(
     """
     # Confirm that the operation is supported
     check_consensus_operation(operation)
+    dtype = check_float_dtype(dtype)
 
     # Load Data
     profiles = load_profiles(profiles)
 
     if operation == "modz":
+        if features == "infer":
+            features = infer_cp_features(profiles)
+        elif isinstance(features, str):
+            features = [features]
+
         consensus_df = modz(
-            population_df=profiles,
+            population_df=cast_features(profiles, features=features, dtype=dtype),
             replicate_columns=replicate_columns,
             features=features,
             method="spearman"
@@ -122,6 +139,7 @@ def consensus(
             else float(modz_args.get("min_weight", 0.01)),
             precision=4 if not modz_args else int(modz_args.get("precision", 4)),
         )
+        consensus_df = cast_features(consensus_df, features=features, dtype=dtype)
     else:
         consensus_df = cast(
             pd.DataFrame,
@@ -131,6 +149,7 @@ def consensus(
                 features=features,
                 operation=operation,
                 subset_data_df=None,
+                dtype=dtype,
             ),
         )
 
@@ -14,6 +14,7 @@ from .features import (
     label_compartment,
 )
 from .load import (
+    coerce_missing_value_strings,
     infer_delim,
     load_cytotable_profiles,
     load_npz_features,
@@ -23,20 +24,31 @@ from .load import (
 )
 from .modz import modz
 from .output import output
+from .sample_selection import SampleSelection, select_samples
 from .single_cell_ingest_utils import (
     assert_linking_cols_complete,
     get_default_linking_cols,
     provide_linking_cols_feature_name_update,
 )
 from .util import (
+    cast_features,
+    check_aggregate_engine,
     check_aggregate_operation,
+    check_aggregate_operations,
+    check_approx_error,
     check_compartments,
     check_consensus_operation,
     check_correlation_method,
     check_fields_of_view,
     check_fields_of_view_format,
+    check_float_dtype,
     check_image_features,
+    check_n_jobs,
+    check_trim_fraction,
+    correlation_blocks,
+    correlation_pairs,
     extract_image_features,
+    get_correlation_matrix,
     get_default_compartments,
     get_pairwise_correlation,
     load_known_metadata_dictionary,
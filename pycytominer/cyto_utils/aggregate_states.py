@@ -0,0 +1,660 @@
+"""
+Mergeable partial aggregation states for chunked or streaming aggregation.
+"""
+
+import json
+import os
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TypeVar, Union
+
+import numpy as np
+import pandas as pd
+
+from pycytominer.cyto_utils.group_kernels import (
+    centroid_median,
+    compress_centroids,
+    factorize_strata,
+    group_sum_count,
+    group_sum_squared_deviations,
+    group_weighted_sum,
+    order_statistics,
+    sketch_columns,
+    sketch_size,
+    sort_by_group,
+    take_rows,
+)
+from pycytominer.cyto_utils.util import (
+    check_aggregate_operation,
+    check_aggregate_operations,
+    check_approx_error,
+    check_float_dtype,
+    check_trim_fraction,
+)
+
+AggregateState_type = TypeVar("AggregateState_type", bound="AggregateState")
+
+
+def _normalize_strata_key(key: tuple) -> tuple:
+    """Make missing strata values hashable and comparable as dictionary keys."""
+    return tuple(None if pd.isna(value) else value for value in key)
+
+
+def statistic_columns(
+    features: list[str], operation: Union[str, list[str]]
+) -> list[str]:
+    """Name the aggregated feature columns of one or more operations.
+
+    Parameters
+    ----------
+    features : list of str
+        Aggregated features.
+    operation : str or list of str
+        A single operation keeps the feature names. A list of operations suffixes
+        every feature with each operation, grouped by operation.
+
+    Returns
+    -------
+    list of str
+        Output column names.
+    """
+
+    if isinstance(operation, str):
+        return list(features)
+
+    return [f"{feature}_{op}" for op in operation for feature in features]
+
+
+def _combine_sum_squared_deviations(
+    sums: np.ndarray,
+    counts: np.ndarray,
+    squared_deviations: np.ndarray,
+    other_sums: np.ndarray,
+    other_counts: np.ndarray,
+    other_squared_deviations: np.ndarray,
+) -> np.ndarray:
+    """Combine sums of squared deviations of two partitions (Chan et al.)."""
+    total_counts = counts + other_counts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = other_sums / np.maximum(other_counts, 1) - sums / np.maximum(counts, 1)
+        correction = np.where(
+            (counts > 0) & (other_counts > 0),
+            np.square(delta) * counts * other_counts / np.maximum(total_counts, 1),
+            0,
+        )
+
+    return squared_deviations + other_squared_deviations + correction
+
+
+class AggregateState:
+    """Per-stratum partial aggregates that can be updated batch by batch and merged.
+
+    Moments ("mean", "std", "count", "weighted_mean") are held as a sum, a
+    non-missing count, a sum of squared deviations, a weighted sum, and a sum of
+    weights per stratum and feature, so memory is bounded by the number of strata
+    times the number of features. Order statistics ("median", "trimmed_mean",
+    "mad", "q25", "q75") hold the observed values of each stratum, which yields
+    exact results but scales with the number of rows.
+    ``"approx_median"`` holds a fixed-size quantile sketch per stratum and
+    feature, so it is bounded like the moments while still estimating the median.
+
+    Attributes
+    ----------
+    strata : list of str
+        Columns to group by.
+    features : list of str
+        Feature columns to aggregate.
+    operation : str or list of str
+        Aggregation operation(s), see ``check_aggregate_operation()``. A list
+        computes every statistic and suffixes the output columns (see
+        :func:`statistic_columns`).
+    compute_object_count : bool
+        Whether or not to track object counts per stratum.
+    object_feature : str
+        Object number feature. Only used if compute_object_count=True.
+    dtype : np.dtype
+        Float dtype of the stored median values and the aggregated features. Sums
+        are always accumulated in float64.
+    approx_error : float
+        Target rank error of the median estimates of operation="approx_median".
+    trim_fraction : float
+        Fraction of the values of a stratum that operation="trimmed_mean" drops
+        from each tail of every feature.
+    weight_feature : str or None
+        Column holding the per-object weights of operation="weighted_mean".
+    """
+
+    def __init__(
+        self,
+        strata: list[str],
+        features: list[str],
+        operation: Union[str, list[str]] = "median",
+        compute_object_count: bool = False,
+        object_feature: str = "Metadata_ObjectNumber",
+        dtype: np.typing.DTypeLike = np.float64,
+        approx_error: float = 0.01,
+        trim_fraction: float = 0.05,
+        weight_feature: Optional[str] = None,
+    ):
+        self.strata = list(strata)
+        self.features = list(features)
+        self.operation: Union[str, list[str]] = (
+            check_aggregate_operation(operation)
+            if isinstance(operation, str)
+            else check_aggregate_operations(operation)
+        )
+        self.operations = (
+            [self.operation] if isinstance(self.operation, str) else self.operation
+        )
+        self.compute_object_count = compute_object_count
+        self.object_feature = object_feature
+        self.dtype = check_float_dtype(dtype)
+        self.approx_error = check_approx_error(approx_error)
+        self.trim_fraction = check_trim_fraction(trim_fraction)
+        self.weight_feature = weight_feature
+        if "weighted_mean" in self.operations and weight_feature is None:
+            raise ValueError("operation='weighted_mean' requires a weight_feature")
+        self.n_centroids = (
+            sketch_size(self.approx_error) if "approx_median" in self.operations else 0
+        )
+        self._order_operations = [
+            op
+            for op in self.operations
+            if op in ["median", "trimmed_mean", "mad", "q25", "q75"]
+        ]
+
+        self.n_groups = 0
+        self.strata_keys: list[tuple] = []
+        self.strata_dtypes: Optional[pd.Series] = None
+        self._key_rows: dict[tuple, int] = {}
+
+        n_features = len(self.features)
+        self.sums: np.ndarray = np.zeros((0, n_features), dtype=np.float64)
+        self.counts: np.ndarray = np.zeros((0, n_features), dtype=np.int64)
+        self.squared_deviations: np.ndarray = np.zeros((0, n_features))
+        self.weighted_sums: np.ndarray = np.zeros((0, n_features))
+        self.weight_sums: np.ndarray = np.zeros((0, n_features))
+        self.object_counts: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.values: list[list[np.ndarray]] = []
+        self.centroid_means: np.ndarray = np.zeros((0, self.n_centroids, n_features))
+        self.centroid_weights: np.ndarray = np.zeros((0, self.n_centroids, n_features))
+
+    def _check_compatible(self, other: "AggregateState"):
+        """Confirm that two states aggregate the same data in the same way."""
+        if (
+            self.strata != other.strata
+            or self.features != other.features
+            or self.operation != other.operation
+            or self.compute_object_count != other.compute_object_count
+            or self.dtype != other.dtype
+            or self.approx_error != other.approx_error
+            or self.trim_fraction != other.trim_fraction
+            or self.weight_feature != other.weight_feature
+        ):
+            raise ValueError(
+                "Cannot merge aggregate states with different strata, features, "
+                "operation, compute_object_count, dtype, approx_error, "
+                "trim_fraction, or weight_feature settings"
+            )
+
+    def _resize(self, n_groups: int):
+        """Grow the state arrays so that they can hold n_groups strata."""
+        capacity = self.sums.shape[0]
+        if n_groups > capacity:
+            new_capacity = max(n_groups, 2 * capacity)
+            extra = new_capacity - capacity
+            n_features = len(self.features)
+            self.sums = np.concatenate([self.sums, np.zeros((extra, n_features))])
+            self.counts = np.concatenate([
+                self.counts,
+                np.zeros((extra, n_features), dtype=np.int64),
+            ])
+            self.squared_deviations = np.concatenate([
+                self.squared_deviations,
+                np.zeros((extra, n_features)),
+            ])
+            self.weighted_sums = np.concatenate([
+                self.weighted_sums,
+                np.zeros((extra, n_features)),
+            ])
+            self.weight_sums = np.concatenate([
+                self.weight_sums,
+                np.zeros((extra, n_features)),
+            ])
+            self.object_counts = np.concatenate([
+                self.object_counts,
+                np.zeros(extra, dtype=np.int64),
+            ])
+            sketch_shape = (extra, self.n_centroids, n_features)
+            self.centroid_means = np.concatenate([
+                self.centroid_means,
+                np.full(sketch_shape, np.nan),
+            ])
+            self.centroid_weights = np.concatenate([
+                self.centroid_weights,
+                np.zeros(sketch_shape),
+            ])
+
+    def _rows_for_keys(self, keys: list[tuple]) -> np.ndarray:
+        """Look up (or allocate) the state row for each strata key."""
+        rows = np.empty(len(keys), dtype=np.int64)
+        for idx, key in enumerate(keys):
+            normalized_key = _normalize_strata_key(key)
+            row = self._key_rows.get(normalized_key)
+            if row is None:
+                row = self.n_groups
+                self._key_rows[normalized_key] = row
+                self.strata_keys.append(key)
+                self.values.append([])
+                self.n_groups += 1
+            rows[idx] = row
+
+        self._resize(self.n_groups)
+
+        return rows
+
+    def update(
+        self: AggregateState_type, population_df: pd.DataFrame
+    ) -> AggregateState_type:
+        """Add a batch of single-cell rows to the state.
+
+        Parameters
+        ----------
+        population_df : pd.DataFrame
+            Batch holding at least the strata and feature columns (and the object
+            feature when compute_object_count=True, and the weight feature for
+            operation="weighted_mean").
+
+        Returns
+        -------
+        self
+            The updated state.
+        """
+
+        if self.strata_dtypes is None:
+            self.strata_dtypes = population_df.loc[:, self.strata].dtypes
+
+        if population_df.shape[0] == 0:
+            return self
+
+        codes, uniques_df = factorize_strata(population_df.loc[:, self.strata])
+        rows = self._rows_for_keys(list(uniques_df.itertuples(index=False, name=None)))
+        order, offsets = sort_by_group(codes, n_groups=len(rows))
+
+        # Fix dtype of input features (they should all be floats!)
+        sorted_values = take_rows(
+            population_df.loc[:, self.features].astype(self.dtype).to_numpy(), order
+        )
+
+        if self.compute_object_count:
+            has_object = population_df[self.object_feature].notna().to_numpy()[order]
+            self.object_counts[rows] += np.add.reduceat(
+                has_object, offsets[:-1], dtype=np.int64
+            )
+
+        if {"mean", "std", "count"}.intersection(self.operations):
+            sums, counts = group_sum_count(sorted_values, offsets)
+            squared_deviations = None
+            if "std" in self.operations:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    means = np.where(counts > 0, sums / counts, 0)
+                squared_deviations = group_sum_squared_deviations(
+                    sorted_values, offsets, means
+                )
+            self._add_moments(rows, sums, counts, squared_deviations)
+
+        if "weighted_mean" in self.operations:
+            weighted_sums, weight_sums = group_weighted_sum(
+                sorted_values,
+                population_df[self.weight_feature].to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )[order],
+                offsets,
+            )
+            self.weighted_sums[rows] += weighted_sums
+            self.weight_sums[rows] += weight_sums
+
+        for idx, row in enumerate(rows):
+            group_values = sorted_values[offsets[idx] : offsets[idx + 1]]
+            if self._order_operations:
+                self.values[row].append(group_values)
+            if self.n_centroids > 0:
+                self._merge_sketch(row, *sketch_columns(group_values, self.n_centroids))
+
+        return self
+
+    def _add_moments(
+        self,
+        rows: np.ndarray,
+        sums: np.ndarray,
+        counts: np.ndarray,
+        squared_deviations: Optional[np.ndarray] = None,
+    ):
+        """Add the moments of another partition of the same strata rows."""
+        if squared_deviations is not None:
+            self.squared_deviations[rows] = _combine_sum_squared_deviations(
+                self.sums[rows],
+                self.counts[rows],
+                self.squared_deviations[rows],
+                sums,
+                counts,
+                squared_deviations,
+            )
+        self.sums[rows] += sums
+        self.counts[rows] += counts
+
+    def merge(
+        self: AggregateState_type, other: "AggregateState"
+    ) -> AggregateState_type:
+        """Combine another partial state (e.g. from a different chunk) into this one.
+
+        Parameters
+        ----------
+        other : AggregateState
+            State built with the same strata, features, and operation.
+
+        Returns
+        -------
+        self
+            The merged state.
+        """
+
+        self._check_compatible(other)
+
+        if self.strata_dtypes is None:
+            self.strata_dtypes = other.strata_dtypes
+
+        if other.n_groups == 0:
+            return self
+
+        rows = self._rows_for_keys(other.strata_keys)
+        self._add_moments(
+            rows,
+            other.sums[: other.n_groups],
+            other.counts[: other.n_groups],
+            other.squared_deviations[: other.n_groups]
+            if "std" in self.operations
+            else None,
+        )
+        self.weighted_sums[rows] += other.weighted_sums[: other.n_groups]
+        self.weight_sums[rows] += other.weight_sums[: other.n_groups]
+        self.object_counts[rows] += other.object_counts[: other.n_groups]
+        for other_row, row in enumerate(rows):
+            self.values[row].extend(other.values[other_row])
+            if self.n_centroids > 0:
+                self._merge_sketch(
+                    row,
+                    other.centroid_means[other_row],
+                    other.centroid_weights[other_row],
+                )
+
+        return self
+
+    def _merge_sketch(self, row: int, means: np.ndarray, weights: np.ndarray):
+        """Merge sketch centroids into the sketch of a state row."""
+        if not self.centroid_weights[row].any():
+            self.centroid_means[row] = means
+            self.centroid_weights[row] = weights
+            return
+
+        self.centroid_means[row], self.centroid_weights[row] = compress_centroids(
+            np.concatenate([self.centroid_means[row], means]),
+            np.concatenate([self.centroid_weights[row], weights]),
+            self.n_centroids,
+        )
+
+    def drop_strata(
+        self: AggregateState_type, strata_keys: list[tuple]
+    ) -> AggregateState_type:
+        """Remove strata and their partial states, e.g. to recompute them.
+
+        Parameters
+        ----------
+        strata_keys : list of tuple
+            Strata values (in the order of self.strata) to remove. Keys that are
+            not part of the state are ignored.
+
+        Returns
+        -------
+        self
+            The state without the dropped strata.
+        """
+
+        keep = np.ones(self.n_groups, dtype=bool)
+        for key in strata_keys:
+            row = self._key_rows.get(_normalize_strata_key(key))
+            if row is not None:
+                keep[row] = False
+
+        rows = np.flatnonzero(keep)
+        self.strata_keys = [self.strata_keys[row] for row in rows]
+        self.values = [self.values[row] for row in rows]
+        self.sums = self.sums[rows]
+        self.counts = self.counts[rows]
+        self.squared_deviations = self.squared_deviations[rows]
+        self.weighted_sums = self.weighted_sums[rows]
+        self.weight_sums = self.weight_sums[rows]
+        self.object_counts = self.object_counts[rows]
+        self.centroid_means = self.centroid_means[rows]
+        self.centroid_weights = self.centroid_weights[rows]
+        self.n_groups = len(rows)
+        self._key_rows = {
+            _normalize_strata_key(key): row for row, key in enumerate(self.strata_keys)
+        }
+
+        return self
+
+    def save(self, path: Union[str, pathlib.Path]):
+        """Write the state to a NumPy .npz file.
+
+        The file is written to a temporary file first and then moved into place, so
+        an interrupted save never leaves a partial state behind. Strata values must
+        be strings or numbers.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Output file.
+        """
+
+        n_features = len(self.features)
+        group_values = [
+            np.concatenate(chunks)
+            if chunks
+            else np.empty((0, n_features), dtype=self.dtype)
+            for chunks in self.values
+        ]
+        config = {
+            "strata": self.strata,
+            "features": self.features,
+            "operation": self.operation,
+            "compute_object_count": self.compute_object_count,
+            "object_feature": self.object_feature,
+            "dtype": self.dtype.name,
+            "approx_error": self.approx_error,
+            "trim_fraction": self.trim_fraction,
+            "weight_feature": self.weight_feature,
+        }
+        strata_dtypes = (
+            None
+            if self.strata_dtypes is None
+            else {column: str(dtype) for column, dtype in self.strata_dtypes.items()}
+        )
+        strata_keys = [
+            [value.item() if isinstance(value, np.generic) else value for value in key]
+            for key in self.strata_keys
+        ]
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as state_file:
+            np.savez(
+                state_file,
+                config=np.array(json.dumps(config)),
+                strata_dtypes=np.array(json.dumps(strata_dtypes)),
+                strata_keys=np.array(json.dumps(strata_keys)),
+                sums=self.sums[: self.n_groups],
+                counts=self.counts[: self.n_groups],
+                squared_deviations=self.squared_deviations[: self.n_groups],
+                weighted_sums=self.weighted_sums[: self.n_groups],
+                weight_sums=self.weight_sums[: self.n_groups],
+                object_counts=self.object_counts[: self.n_groups],
+                centroid_means=self.centroid_means[: self.n_groups],
+                centroid_weights=self.centroid_weights[: self.n_groups],
+                value_counts=np.array(
+                    [len(values) for values in group_values], dtype=np.int64
+                ),
+                values=np.concatenate(group_values)
+                if group_values
+                else np.empty((0, n_features), dtype=self.dtype),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls: type[AggregateState_type], path: Union[str, pathlib.Path]
+    ) -> AggregateState_type:
+        """Read a state written by :meth:`save`.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            State file.
+
+        Returns
+        -------
+        AggregateState
+            The restored state, which can be updated, merged, and finalized.
+        """
+
+        with np.load(path) as state_file:
+            state = cls(**json.loads(str(state_file["config"])))
+
+            strata_dtypes = json.loads(str(state_file["strata_dtypes"]))
+            if strata_dtypes is not None:
+                state.strata_dtypes = pd.Series(strata_dtypes, dtype=object)
+
+            state._rows_for_keys([
+                tuple(key) for key in json.loads(str(state_file["strata_keys"]))
+            ])
+            state.sums[: state.n_groups] = state_file["sums"]
+            state.counts[: state.n_groups] = state_file["counts"]
+            state.squared_deviations[: state.n_groups] = state_file[
+                "squared_deviations"
+            ]
+            state.weighted_sums[: state.n_groups] = state_file["weighted_sums"]
+            state.weight_sums[: state.n_groups] = state_file["weight_sums"]
+            state.object_counts[: state.n_groups] = state_file["object_counts"]
+            state.centroid_means[: state.n_groups] = state_file["centroid_means"]
+            state.centroid_weights[: state.n_groups] = state_file["centroid_weights"]
+
+            if state._order_operations:
+                offsets = np.cumsum(state_file["value_counts"])[:-1]
+                for row, values in enumerate(
+                    np.split(state_file["values"], offsets, axis=0)
+                ):
+                    if values.shape[0] > 0:
+                        state.values[row].append(values)
+
+        return state
+
+    def _compute_features(self, n_jobs: int = 1) -> np.ndarray:
+        """Reduce the partial states into one aggregated row per stratum."""
+        counts = self.counts[: self.n_groups]
+        results: dict[str, np.ndarray] = {
+            operation: np.full((self.n_groups, len(self.features)), np.nan)
+            for operation in self.operations
+        }
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if "mean" in results:
+                results["mean"] = np.where(
+                    counts > 0, self.sums[: self.n_groups] / counts, np.nan
+                )
+            if "std" in results:
+                results["std"] = np.where(
+                    counts > 1,
+                    np.sqrt(self.squared_deviations[: self.n_groups] / (counts - 1)),
+                    np.nan,
+                )
+            if "count" in results:
+                results["count"] = counts.astype(np.float64)
+            if "weighted_mean" in results:
+                weight_sums = self.weight_sums[: self.n_groups]
+                results["weighted_mean"] = np.where(
+                    weight_sums != 0,
+                    self.weighted_sums[: self.n_groups] / weight_sums,
+                    np.nan,
+                )
+
+        def reduce_row(row: int):
+            if self.n_centroids > 0:
+                results["approx_median"][row] = centroid_median(
+                    self.centroid_means[row], self.centroid_weights[row]
+                )
+            if self._order_operations and self.values[row]:
+                for operation, result in order_statistics(
+                    np.concatenate(self.values[row]),
+                    self._order_operations,
+                    trim_fraction=self.trim_fraction,
+                ).items():
+                    results[operation][row] = result
+
+        if n_jobs == 1:
+            for row in range(self.n_groups):
+                reduce_row(row)
+        else:
+            # Strata are independent, and NumPy sorts release the GIL
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                list(executor.map(reduce_row, range(self.n_groups)))
+
+        return np.concatenate(
+            [results[operation] for operation in self.operations], axis=1
+        )
+
+    def finalize(self, n_jobs: int = 1) -> pd.DataFrame:
+        """Produce the aggregated profiles in the same layout as ``aggregate()``.
+
+        Parameters
+        ----------
+        n_jobs : int, default 1
+            Number of threads used to reduce order statistics and approx_median
+            states. The output does not depend on n_jobs.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per stratum, sorted by strata, holding the strata columns, the
+            object count column (if computed), and the aggregated features.
+        """
+
+        strata_df = pd.DataFrame(self.strata_keys, columns=self.strata)
+        if self.strata_dtypes is not None:
+            strata_df = strata_df.astype(self.strata_dtypes.to_dict())
+
+        # Sort strata the same way pandas groupby does
+        sort_codes, _ = factorize_strata(strata_df)
+        order = np.argsort(sort_codes, kind="stable")
+
+        aggregated_df = pd.concat(
+            [
+                strata_df.iloc[order].reset_index(drop=True),
+                pd.DataFrame(
+                    self._compute_features(n_jobs=n_jobs)[order].astype(self.dtype),
+                    columns=pd.Index(statistic_columns(self.features, self.operation)),
+                ),
+            ],
+            axis="columns",
+        )
+
+        if self.compute_object_count:
+            object_counts = pd.Series(self.object_counts[: self.n_groups][order])
+            # Like aggregate(), which counts objects with a groupby that drops
+            # missing strata, strata with a missing value have no object count
+            has_missing = aggregated_df.loc[:, self.strata].isna().any(axis=1)
+            if has_missing.any():
+                object_counts = object_counts.where(~has_missing.to_numpy())
+            aggregated_df.insert(
+                len(self.strata), "Metadata_Object_Count", object_counts
+            )
+
+        return aggregated_df
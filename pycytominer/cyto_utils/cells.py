@@ -2,6 +2,8 @@
 Class to interact with single cell morphological profiles.
 """
 
+import pathlib
+from collections.abc import Iterable, Iterator
 from typing import Optional, Union, cast
 
 import numpy as np
@@ -18,6 +20,7 @@ from pycytominer.cyto_utils import (
     check_compartments,
     check_fields_of_view,
     check_fields_of_view_format,
+    check_trim_fraction,
     extract_image_features,
     get_default_compartments,
     get_default_linking_cols,
@@ -25,6 +28,7 @@ from pycytominer.cyto_utils import (
     output,
     provide_linking_cols_feature_name_update,
 )
+from pycytominer.cyto_utils.aggregate_states import AggregateState
 
 default_compartments = get_default_compartments()
 default_linking_cols = get_default_linking_cols()
@@ -43,6 +47,15 @@ class SingleCells:
         The columns to groupby and aggregate single cells.
     aggregation_operation : str, default "median"
         Operation to perform single cell aggregation.
+    aggregation_trim_fraction : float, default 0.05
+        Fraction of the cells of a stratum dropped from each tail of every feature
+        when aggregation_operation="trimmed_mean".
+    aggregation_weight_feature : str, optional
+        Measurement (without the compartment prefix, e.g. "AreaShape_Area") used
+        to weigh cells when aggregation_operation="weighted_mean". Every
+        compartment is weighted by its own measurement, e.g.
+        "Cells_AreaShape_Area" for the cells compartment. Image features are
+        aggregated with their unweighted mean.
     output_file : str, default None
         If specified, the location to write the file.
     compartments : list of str, default ["cells", "cytoplasm", "nuclei"]
@@ -77,8 +90,10 @@ class SingleCells:
         Object number feature.
     default_datatype_float: type
         Numpy floating point datatype to use for load_compartment and resulting
-        dataframes. This parameter may be used to assist with performance-related
-        issues by reducing the memory required for floating-point data.
+        dataframes, including aggregated profiles and single-cell profiles
+        normalized by merge_single_cells(). This parameter may be used to assist
+        with performance-related issues by reducing the memory required for
+        floating-point data.
         For example, using np.float32 instead of np.float64 for this parameter
         will reduce memory consumed by float columns by roughly 50%.
         Please note: using any besides np.float64 are experimentally
@@ -107,6 +122,8 @@ class SingleCells:
         sql_file: str,
         strata: list[str] = ["Metadata_Plate", "Metadata_Well"],
         aggregation_operation: str = "median",
+        aggregation_trim_fraction: float = 0.05,
+        aggregation_weight_feature: Optional[str] = None,
         output_file: Optional[str] = None,
         compartments: list[str] = default_compartments,
         compartment_linking_cols: dict[str, dict[str, str]] = default_linking_cols,
@@ -131,6 +148,15 @@ class SingleCells:
 
         # Check if correct operation is specified
         aggregation_operation = check_aggregate_operation(aggregation_operation)
+        aggregation_trim_fraction = check_trim_fraction(aggregation_trim_fraction)
+        if (
+            aggregation_operation == "weighted_mean"
+            and aggregation_weight_feature is None
+        ):
+            raise ValueError(
+                "aggregation_operation='weighted_mean' requires an "
+                "aggregation_weight_feature"
+            )
 
         # Check that the subsample_frac is between 0 and 1
         if not subsample_frac > 0 and subsample_frac <= 1:
@@ -141,6 +167,8 @@ class SingleCells:
         self.load_image_data = load_image_data
         self.image_table_name = image_table_name
         self.aggregation_operation = aggregation_operation.lower()
+        self.aggregation_trim_fraction = aggregation_trim_fraction
+        self.aggregation_weight_feature = aggregation_weight_feature
         self.output_file = output_file
         self.merge_cols = merge_cols
         self.image_cols = image_cols
@@ -606,6 +634,9 @@ class SingleCells:
         compute_counts: bool = False,
         add_image_features: bool = False,
         n_aggregation_memory_strata: int = 1,
+        engine: str = "pandas",
+        n_jobs: int = 1,
+        cache_dir: Optional[Union[str, pathlib.Path]] = None,
     ) -> pd.DataFrame:
         """Aggregate morphological profiles. Uses pycytominer.aggregate()
 
@@ -626,6 +657,19 @@ class SingleCells:
             For example, if aggregating by "well", then n_aggregation_memory_strata=1
             means that one "well" will be pulled from the SQLite database into
             memory at a time.
+        engine : str, default "pandas"
+            Aggregation engine passed to pycytominer.aggregate(). One of
+            ['pandas', 'numpy'].
+        n_jobs : int, default 1
+            Number of threads passed to pycytominer.aggregate(). Values above 1
+            require engine="numpy".
+        cache_dir : str or pathlib.Path, optional
+            Directory of a persistent aggregation cache. If provided, per-stratum
+            partial aggregates are stored in this directory together with the image
+            keys (merge_cols) that contributed to them. Later calls only read
+            compartment rows of new images and of strata whose images changed,
+            and merge them into the cached state. Cannot be combined with
+            subsampling.
 
         Returns
         -------
@@ -635,42 +679,41 @@ class SingleCells:
 
         check_compartments(compartment)
 
-        if (self.subsample_frac < 1 or self.subsample_n != "all") and compute_subsample:
+        is_subsampled = self.subsample_frac < 1 or self.subsample_n != "all"
+        if is_subsampled and cache_dir is not None:
+            raise ValueError("cache_dir cannot be combined with subsampling")
+
+        if is_subsampled and compute_subsample:
             self.get_subsample(compartment=compartment)
 
         # Load image data if not already loaded
         if not self.image_data_loaded:
             self.load_image(image_table_name=self.image_table_name)
 
-        # Iteratively call aggregate() on chunks of the full compartment table
-        object_dfs: list[Union[pd.DataFrame, str, None]] = []
-        for compartment_df in self._compartment_df_generator(
-            compartment=compartment,
-            n_aggregation_memory_strata=n_aggregation_memory_strata,
-        ):
-            population_df = self.image_df.merge(
-                compartment_df,
-                how="inner",
-                on=self.merge_cols,
-            ).rename(self.linking_col_rename, axis="columns")
-
-            if self.features == "infer":
-                aggregate_features: Union[str, list[str]] = infer_cp_features(
-                    population_df, compartments=compartment
+        # Either update the cached aggregates, or iteratively call aggregate() on
+        # chunks of the full compartment table
+        partial_object_dfs: Iterable[Union[pd.DataFrame, str]] = (
+            [
+                self._aggregate_compartment_cached(
+                    compartment=compartment,
+                    cache_dir=cache_dir,
+                    compute_counts=compute_counts,
+                    n_aggregation_memory_strata=n_aggregation_memory_strata,
+                    n_jobs=n_jobs,
                 )
-            else:
-                aggregate_features = self.features
-
-            partial_object_df = aggregate(
-                population_df=population_df,
-                strata=self.strata,
-                compute_object_count=compute_counts,
-                operation=self.aggregation_operation,
-                subset_data_df=self.subset_data_df,
-                features=aggregate_features,
-                object_feature=self.object_feature,
+            ]
+            if cache_dir is not None
+            else self._aggregate_compartment_chunks(
+                compartment=compartment,
+                compute_counts=compute_counts,
+                n_aggregation_memory_strata=n_aggregation_memory_strata,
+                engine=engine,
+                n_jobs=n_jobs,
             )
+        )
 
+        object_dfs: list[Union[pd.DataFrame, str, None]] = []
+        for partial_object_df in partial_object_dfs:
             if compute_counts and self.fields_of_view_feature not in self.strata:
                 fields_count_df = aggregate_fields_count(
                     self.image_df, self.strata, self.fields_of_view_feature
@@ -689,7 +732,10 @@ class SingleCells:
                         self.image_feature_categories,
                         self.image_cols,
                         self.strata,
-                        self.aggregation_operation,
+                        # Image features have no per-object weights
+                        "mean"
+                        if self.aggregation_operation == "weighted_mean"
+                        else self.aggregation_operation,
                     )
 
                 # check that aggregate_image_features returned a dataframe
@@ -727,32 +773,85 @@ class SingleCells:
 
         return object_df
 
-    def _compartment_df_generator(
+    def _aggregate_compartment_chunks(
         self,
         compartment: str,
-        n_aggregation_memory_strata: int = 1,
-    ):
-        """A generator function that returns chunks of the entire compartment
-        table from disk.
-
-        We want to return dataframes with all compartment entries within unique
-        combinations of self.merge_cols when aggregated by self.strata
+        compute_counts: bool,
+        n_aggregation_memory_strata: int,
+        engine: str,
+        n_jobs: int,
+    ) -> Iterator[Union[pd.DataFrame, str]]:
+        """Call pycytominer.aggregate() on chunks of the compartment table.
 
         Parameters
         ----------
-        compartment : str
-            Compartment to aggregate.
-        n_aggregation_memory_strata : int, default 1
-            Number of unique strata to pull from the database into working memory
-            at once.  Typically 1 is fastest.  A larger number uses more memory.
+        compartment, compute_counts, n_aggregation_memory_strata, engine, n_jobs
+            See :meth:`aggregate_compartment`.
 
         Returns
         -------
-        image_df : Iterator[pd.DataFrame]
-            A generator whose __next__() call returns a chunk of the compartment
-            table, where rows comprising a unique aggregation stratum are not split
-            between chunks, and thus groupby aggregations are valid
+        Iterator[pd.DataFrame]
+            A generator of aggregated profiles, one per chunk of strata.
+        """
+
+        for compartment_df in self._compartment_df_generator(
+            compartment=compartment,
+            n_aggregation_memory_strata=n_aggregation_memory_strata,
+        ):
+            population_df = self.image_df.merge(
+                compartment_df,
+                how="inner",
+                on=self.merge_cols,
+            ).rename(self.linking_col_rename, axis="columns")
+
+            if self.features == "infer":
+                aggregate_features: Union[str, list[str]] = infer_cp_features(
+                    population_df, compartments=compartment
+                )
+            else:
+                aggregate_features = self.features
 
+            yield aggregate(
+                population_df=population_df,
+                strata=self.strata,
+                compute_object_count=compute_counts,
+                operation=self.aggregation_operation,
+                subset_data_df=self.subset_data_df,
+                features=aggregate_features,
+                object_feature=self.object_feature,
+                engine=engine,
+                n_jobs=n_jobs,
+                dtype=self.default_datatype_float,
+                trim_fraction=self.aggregation_trim_fraction,
+                weight_feature=self._compartment_weight_feature(compartment),
+            )
+
+    def _aggregate_compartment_cached(
+        self,
+        compartment: str,
+        cache_dir: Union[str, pathlib.Path],
+        compute_counts: bool,
+        n_aggregation_memory_strata: int,
+        n_jobs: int,
+    ) -> pd.DataFrame:
+        """Aggregate a compartment through a persistent, incremental cache.
+
+        The cache holds an AggregateState with per-stratum partial aggregates and
+        the image keys (merge_cols and strata) that contributed to it. Images are
+        identified by their merge_cols values; cytominer-database derives
+        TableNumber from the image data, so re-processed images get new keys.
+        Compartment rows of new images are merged into the cached state. Strata
+        that lost images (removed or re-processed) are recomputed from scratch.
+
+        Parameters
+        ----------
+        compartment, cache_dir, compute_counts, n_aggregation_memory_strata, n_jobs
+            See :meth:`aggregate_compartment`.
+
+        Returns
+        -------
+        pd.DataFrame
+            Aggregated profiles of all strata.
         """
 
         if not (n_aggregation_memory_strata > 0):
@@ -760,15 +859,148 @@ class SingleCells:
                 "Number of strata to pull into memory at once (n_aggregation_memory_strata) must be > 0"
             )
 
-        # Obtain data types of all columns of the compartment table
-        cols = "*"
+        cache_path = pathlib.Path(cache_dir)
+        cache_path.mkdir(parents=True, exist_ok=True)
+        state_file = cache_path / f"{compartment}_aggregate_state.npz"
+        images_file = cache_path / f"{compartment}_aggregate_images.parquet"
+
+        dtype_dict = self._compartment_sqlite_dtypes(compartment=compartment)
+
+        if self.features == "infer":
+            compartment_row1 = pd.read_sql(
+                sql=f"select * from {compartment} limit 1", con=self.conn
+            ).rename(self.linking_col_rename, axis="columns")
+            features = infer_cp_features(compartment_row1, compartments=compartment)
+        else:
+            features = list(self.features)
+
+        state = AggregateState(
+            strata=self.strata,
+            features=features,
+            operation=self.aggregation_operation,
+            compute_object_count=compute_counts,
+            object_feature=self.object_feature,
+            dtype=self.default_datatype_float,
+            trim_fraction=self.aggregation_trim_fraction,
+            weight_feature=self._compartment_weight_feature(compartment),
+        )
+
+        image_cols = list(dict.fromkeys([*self.merge_cols, *self.strata]))
+        image_keys_df = self.image_df.loc[:, image_cols].drop_duplicates()
+        cached_images_df = image_keys_df.iloc[0:0]
+
+        if state_file.exists() and images_file.exists():
+            cached_state = AggregateState.load(state_file)
+            try:
+                state._check_compatible(cached_state)
+            except ValueError:
+                # Settings changed, so the cached state is rebuilt from scratch
+                pass
+            else:
+                state = cached_state
+                cached_images_df = pd.read_parquet(images_file)
+
+        # Compare the current images with the images held by the cache
+        images_df = image_keys_df.merge(
+            cached_images_df, how="outer", on=image_cols, indicator=True
+        )
+        stale_strata_df = images_df.loc[
+            images_df["_merge"] == "right_only", self.strata
+        ].drop_duplicates()
+        state.drop_strata(list(stale_strata_df.itertuples(index=False, name=None)))
+
+        # Read new images and all images of strata that lost images
+        read_images_df = image_keys_df.merge(
+            pd.concat([
+                images_df.loc[images_df["_merge"] == "left_only", image_cols],
+                image_keys_df.merge(stale_strata_df, how="inner", on=self.strata),
+            ]).drop_duplicates(),
+            how="inner",
+            on=image_cols,
+        )
+
+        read_images_df = read_images_df.assign(
+            chunk=read_images_df.groupby(self.strata).ngroup()
+            // n_aggregation_memory_strata
+        )
+        for _, chunk_df in read_images_df.groupby("chunk"):
+            image_condition = _sqlite_key_condition(
+                chunk_df.loc[:, self.merge_cols].drop_duplicates(), dtypes=dtype_dict
+            )
+            compartment_df = pd.read_sql(
+                sql=f"select * from {compartment} where {image_condition}",
+                con=self.conn,
+            )
+            state.update(
+                self.image_df.merge(
+                    compartment_df, how="inner", on=self.merge_cols
+                ).rename(self.linking_col_rename, axis="columns")
+            )
+
+        if (
+            not read_images_df.empty
+            or not stale_strata_df.empty
+            or not state_file.exists()
+        ):
+            state.save(state_file)
+            image_keys_df.to_parquet(images_file, index=False)
+
+        aggregated_df = state.finalize(n_jobs=n_jobs)
+
+        # Aggregated image number and object number do not make sense
+        return aggregated_df.drop(
+            columns=[
+                column
+                for column in ["ImageNumber", "ObjectNumber"]
+                if column in aggregated_df.columns
+            ]
+        )
+
+    def _compartment_weight_feature(self, compartment: str) -> Optional[str]:
+        """Name the weight column of a compartment for weighted_mean aggregation.
+
+        Parameters
+        ----------
+        compartment : str
+            Compartment to aggregate.
+
+        Returns
+        -------
+        str or None
+            The aggregation_weight_feature prefixed with the compartment, or None
+            if the aggregation does not use weights.
+        """
+
+        if self.aggregation_operation != "weighted_mean":
+            return None
+
+        return f"{compartment.title()}_{self.aggregation_weight_feature}"
+
+    def _compartment_sqlite_dtypes(self, compartment: str) -> dict[str, str]:
+        """Look up the SQLite datatype of the compartment table columns.
+
+        Parameters
+        ----------
+        compartment : str
+            Compartment table to inspect.
+
+        Returns
+        -------
+        dict[str, str]
+            SQLite datatype (e.g. "integer" or "text") per column name.
+        """
+
         compartment_row1 = pd.read_sql(
-            sql=f"select {cols} from {compartment} limit 1",
+            sql=f"select * from {compartment} limit 1",
             con=self.conn,
         )
         all_columns = compartment_row1.columns
         if self.features != "infer":  # allow to get only some features
-            all_columns = all_columns[all_columns.isin(pd.Index(self.features))]
+            all_columns = all_columns[
+                all_columns.isin(
+                    pd.Index([*self.features, *self.merge_cols, "ObjectNumber"])
+                )
+            ]
 
         typeof_str = ", ".join([f"typeof({x})" for x in all_columns])
         compartment_dtypes = pd.read_sql(
@@ -778,13 +1010,50 @@ class SingleCells:
         # Strip the characters "typeof(" from the beginning and ")" from the end of
         # compartment column names returned by SQLite
         strip_typeof = lambda s: s[7:-1]
-        dtype_dict = dict(
+        return dict(
             zip(
                 [strip_typeof(s) for s in compartment_dtypes.columns],  # column names
                 compartment_dtypes.iloc[0].values,  # corresponding data types
             )
         )
 
+    def _compartment_df_generator(
+        self,
+        compartment: str,
+        n_aggregation_memory_strata: int = 1,
+    ):
+        """A generator function that returns chunks of the entire compartment
+        table from disk.
+
+        We want to return dataframes with all compartment entries within unique
+        combinations of self.merge_cols when aggregated by self.strata
+
+        Parameters
+        ----------
+        compartment : str
+            Compartment to aggregate.
+        n_aggregation_memory_strata : int, default 1
+            Number of unique strata to pull from the database into working memory
+            at once.  Typically 1 is fastest.  A larger number uses more memory.
+
+        Returns
+        -------
+        image_df : Iterator[pd.DataFrame]
+            A generator whose __next__() call returns a chunk of the compartment
+            table, where rows comprising a unique aggregation stratum are not split
+            between chunks, and thus groupby aggregations are valid
+
+        """
+
+        if not (n_aggregation_memory_strata > 0):
+            raise ValueError(
+                "Number of strata to pull into memory at once (n_aggregation_memory_strata) must be > 0"
+            )
+
+        # Obtain data types of all columns of the compartment table
+        cols = "*"
+        dtype_dict = self._compartment_sqlite_dtypes(compartment=compartment)
+
         # Obtain all valid strata combinations, and their merge_cols values
         df_unique_mergecols = (
             self
@@ -802,14 +1071,89 @@ class SingleCells:
             n=n_aggregation_memory_strata,
         )
 
+        # Push the subset down to SQLite, so that unsampled objects are never loaded
+        subset_conditions = self._sqlite_subset_conditions(
+            dtypes=dtype_dict, n=n_aggregation_memory_strata
+        )
+
         # The generator, for each group of compartment values
-        for strata_condition in strata_conditions:
+        for chunk_idx, strata_condition in enumerate(strata_conditions):
+            if subset_conditions is not None:
+                strata_condition = (
+                    f"({strata_condition}) and {subset_conditions.get(chunk_idx, '0')}"
+                )
             specific_compartment_query = (
                 f"select {cols} from {compartment} where {strata_condition}"
             )
             image_df_chunk = pd.read_sql(sql=specific_compartment_query, con=self.conn)
             yield image_df_chunk
 
+    def _sqlite_subset_conditions(
+        self, dtypes: dict[str, str], n: int = 1
+    ) -> Optional[dict[int, str]]:
+        """Build SQLite conditions that select only the objects in subset_data_df.
+
+        Conditions are grouped the same way as the strata chunks of
+        _compartment_df_generator(), so that every chunk only matches the
+        subset objects of its own images.
+
+        Parameters
+        ----------
+        dtypes : dict[str, str]
+            Dictionary to look up SQLite datatype based on column name
+        n : int
+            Number of strata per chunk (n_aggregation_memory_strata).
+
+        Returns
+        -------
+        dict[int, str] or None
+            Condition per chunk index (chunks without subset objects are absent),
+            or None if there is no subset or it lacks the object key columns.
+        """
+
+        if self.subset_data_df is None:
+            return None
+
+        # The subset holds object numbers renamed as metadata when aggregating
+        object_col = next(
+            (
+                col
+                for col in [self.linking_col_rename.get("ObjectNumber"), "ObjectNumber"]
+                if col is not None and col in self.subset_data_df.columns
+            ),
+            None,
+        )
+        if (
+            object_col is None
+            or "ObjectNumber" not in dtypes
+            or not all(
+                col in self.subset_data_df.columns and col in dtypes
+                for col in self.merge_cols
+            )
+        ):
+            return None
+
+        # Assign every image to its chunk of strata
+        image_chunk_df = self.image_df.loc[:, self.merge_cols].assign(
+            chunk=self.image_df.groupby(self.strata).ngroup() // n
+        )
+        image_chunk_df = image_chunk_df[image_chunk_df["chunk"] >= 0]
+
+        subset_keys_df = (
+            self.subset_data_df
+            .loc[:, [*self.merge_cols, object_col]]
+            .rename(columns={object_col: "ObjectNumber"})
+            .drop_duplicates()
+            .merge(image_chunk_df, how="inner", on=self.merge_cols)
+        )
+
+        return {
+            cast(int, chunk_idx): _sqlite_key_condition(
+                keys_df.drop(columns="chunk"), dtypes=dtypes
+            )
+            for chunk_idx, keys_df in subset_keys_df.groupby("chunk")
+        }
+
     def merge_single_cells(
         self,
         compute_subsample: bool = False,
@@ -948,6 +1292,7 @@ class SingleCells:
                 features = normalize_args["features"]
 
             normalize_args["features"] = features
+            normalize_args.setdefault("dtype", self.default_datatype_float)
 
             # ignore mypy warnings below as these reference root package imports
             sc_df = normalize(profiles=sc_df, **normalize_args)  # type: ignore[operator]
@@ -978,6 +1323,9 @@ class SingleCells:
         compression_options: Optional[str] = None,
         float_format: Optional[str] = None,
         n_aggregation_memory_strata: int = 1,
+        engine: str = "pandas",
+        n_jobs: int = 1,
+        cache_dir: Optional[Union[str, pathlib.Path]] = None,
         **kwargs,
     ):
         """Aggregate and merge compartments. This is the primary entry to this class.
@@ -996,6 +1344,16 @@ class SingleCells:
         n_aggregation_memory_strata : int, default 1
             Number of unique strata to pull from the database into working memory
             at once.  Typically 1 is fastest.  A larger number uses more memory.
+        engine : str, default "pandas"
+            Aggregation engine passed to pycytominer.aggregate(). One of
+            ['pandas', 'numpy']. The "numpy" engine is typically faster for the
+            median operation on wide feature tables.
+        n_jobs : int, default 1
+            Number of threads passed to pycytominer.aggregate(). Values above 1
+            require engine="numpy".
+        cache_dir : str or pathlib.Path, optional
+            Directory of a persistent, incremental aggregation cache passed to
+            aggregate_compartment(). Cannot be combined with subsampling.
 
         Returns
         -------
@@ -1015,12 +1373,18 @@ class SingleCells:
                     compute_counts=True,
                     add_image_features=self.add_image_features,
                     n_aggregation_memory_strata=n_aggregation_memory_strata,
+                    engine=engine,
+                    n_jobs=n_jobs,
+                    cache_dir=cache_dir,
                 )
             else:
                 aggregated = aggregated.merge(
                     self.aggregate_compartment(
                         compartment=compartment,
                         n_aggregation_memory_strata=n_aggregation_memory_strata,
+                        engine=engine,
+                        n_jobs=n_jobs,
+                        cache_dir=cache_dir,
                     ),
                     on=self.strata,
                     how="inner",
@@ -1102,3 +1466,42 @@ def _sqlite_strata_conditions(df: pd.DataFrame, dtypes: dict[str, str], n: int =
         " or ".join(conditions[i : (i + n)]) for i in range(0, len(conditions), n)
     ]
     return grouped_conditions
+
+
+def _sqlite_key_condition(df: pd.DataFrame, dtypes: dict[str, str]) -> str:
+    """Create a SQLite condition matching exactly the key rows of a DataFrame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        A dataframe where columns are key columns of a compartment table
+        and rows are the key combinations to select
+    dtypes : dict[str, str]
+        Dictionary to look up SQLite datatype based on column name
+
+    Returns
+    -------
+    condition : str
+        A valid SQLite conditional using row values
+
+    Examples
+    --------
+    >>> _sqlite_key_condition(
+    ...     pd.DataFrame({"ImageNumber": [1, 2], "ObjectNumber": [3, 1]}),
+    ...     dtypes={"ImageNumber": "integer", "ObjectNumber": "integer"},
+    ... )
+    '(ImageNumber, ObjectNumber) in (values (1, 3), (2, 1))'
+    """
+    formatted_df = pd.DataFrame({
+        col: (
+            "'" + df[col].astype(str).str.replace("'", "''") + "'"
+            if dtypes[col] == "text"
+            else df[col].astype(str)
+        )
+        for col in df.columns
+    })
+    rows = ", ".join(
+        f"({', '.join(row)})" for row in formatted_df.itertuples(index=False, name=None)
+    )
+
+    return f"({', '.join(df.columns)}) in (values {rows})"
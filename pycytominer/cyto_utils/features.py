@@ -8,6 +8,8 @@ from typing import Optional, Union
 
 import pandas as pd
 
+from pycytominer.cyto_utils.sample_selection import SampleSelection, select_samples
+
 blocklist_file = os.path.join(
     os.path.dirname(__file__), "..", "data", "blocklist_features.txt"
 )
@@ -179,7 +181,7 @@ def count_na_features(population_df: pd.DataFrame, features: list[str]) -> pd.Da
 def drop_outlier_features(
     population_df: pd.DataFrame,
     features: Union[str, list[str]] = "infer",
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     outlier_cutoff: Union[int, float] = 500,
 ) -> list[str]:
     """Exclude a feature if its min or max absolute value is greater than the threshold.
@@ -192,11 +194,13 @@ def drop_outlier_features(
         Features present in the population dataframe. If "infer",
         then assume CellProfiler feature conventions
         (start with ``Cells_``, ``Nuclei_``, or ``Cytoplasm_``)
-    samples : str, default "all"
+    samples : str or SampleSelection, default "all"
         List of samples to perform operation on. The function uses a pd.DataFrame.query()
         function, so you should  structure samples in this fashion. An example is
         "Metadata_treatment == 'control'" (include all quotes).
-        If "all", use all samples to calculate.
+        If "all", use all samples to calculate. A SampleSelection of population_df
+        reuses a query that was already evaluated (see
+        :class:`pycytominer.cyto_utils.sample_selection.SampleSelection`).
     outlier_cutoff : int or float, default 500
         Threshold to remove features if absolute value is greater.
         See https://github.com/cytomining/pycytominer/issues/237 for details.
@@ -207,13 +211,6 @@ def drop_outlier_features(
         Features greater than the threshold.
     """
 
-    # Subset the DataFrame if specific samples are specified
-    # If "all", use the entire DataFrame without subsetting
-    if samples != "all":
-        # Using pandas query to filter rows based on the conditions provided in the
-        # samples parameter
-        population_df = population_df.query(expr=samples)
-
     # Infer  CellProfiler features if 'features' is set to 'infer'
     if features == "infer":
         # Infer CellProfiler features
@@ -224,7 +221,9 @@ def drop_outlier_features(
         # this would be more tailored to non-CellProfiler features
         feature_list = [features] if isinstance(features, str) else list(features)
 
-    population_df = population_df.loc[:, feature_list]
+    # Subset the DataFrame to the samples (all of them if samples is "all") and the
+    # features of interest, copying only the selected features
+    population_df = select_samples(population_df, samples, columns=feature_list)
 
     # Get the max and min values for each feature
     max_feature_values = population_df.max().abs()
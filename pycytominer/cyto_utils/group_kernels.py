@@ -0,0 +1,1211 @@
+"""
+Vectorized kernels for computing per-group statistics over feature blocks
+"""
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Bytes of the column blocks copied at a time by median_mad_columns()
+median_mad_block_bytes = 64 * 2**20
+
+# Bytes of the column blocks ranked at a time by rank_columns()
+rank_block_bytes = 64 * 2**20
+
+
+def factorize_strata(strata_df: pd.DataFrame) -> tuple[np.ndarray, pd.DataFrame]:
+    """Assign an integer group code to every row based on its strata values.
+
+    Group codes follow the same ordering as ``pd.DataFrame.groupby(sort=True)``,
+    and missing strata values form their own group (``dropna=False``), so results
+    indexed by these codes line up with pandas groupby output.
+
+    Parameters
+    ----------
+    strata_df : pd.DataFrame
+        DataFrame holding only the strata columns.
+
+    Returns
+    -------
+    tuple of (np.ndarray, pd.DataFrame)
+        The first element holds one group code per row. The second element holds
+        the unique strata combinations, where row ``i`` corresponds to code ``i``.
+    """
+
+    strata = strata_df.columns.tolist()
+    grouper = strata_df.groupby(strata, dropna=False, sort=True)
+
+    codes = grouper.ngroup().to_numpy(dtype=np.int64)
+    uniques_df = grouper.size().index.to_frame(index=False).loc[:, strata]
+
+    return codes, uniques_df
+
+
+def take_rows(values: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Gather rows of a 2D block into a column-contiguous (Fortran-ordered) block.
+
+    Feature blocks extracted from pandas are usually column-contiguous, where
+    fancy row indexing is very slow. Gathering along the contiguous axis of the
+    transpose keeps every feature contiguous, which also suits the column-wise
+    group kernels in this module.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)``.
+    order : np.ndarray
+        Row positions to gather.
+
+    Returns
+    -------
+    np.ndarray
+        Fortran-ordered block of shape ``(len(order), n_features)``.
+    """
+
+    return np.take(np.asfortranarray(values).T, order, axis=1).T
+
+
+def sort_by_group(codes: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray]:
+    """Compute a row order that makes every group contiguous.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Group code for every row, as returned by :func:`factorize_strata`.
+    n_groups : int
+        Total number of groups.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The first element is the stable row order that sorts rows by group code.
+        The second element holds ``n_groups + 1`` offsets such that the rows of
+        group ``i`` are found at ``order[offsets[i]:offsets[i + 1]]``.
+    """
+
+    order = np.argsort(codes, kind="stable")
+    offsets = np.zeros(n_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=n_groups), out=offsets[1:])
+
+    return order, offsets
+
+
+def group_sum_count(
+    sorted_values: np.ndarray, offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """NaN-aware per-group sums and non-missing counts of a sorted feature block.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``. Every group must hold at least one row.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Per-group sums (accumulated in float64) and per-group counts of non-missing
+        values, both of shape ``(n_groups, n_features)``.
+    """
+
+    n_groups = offsets.shape[0] - 1
+    if n_groups == 0:
+        empty_shape = (0, sorted_values.shape[1])
+        return np.zeros(empty_shape), np.zeros(empty_shape, dtype=np.int64)
+
+    group_sizes = np.diff(offsets)[:, np.newaxis]
+    missing = np.isnan(sorted_values)
+    if not missing.any():
+        sums = np.add.reduceat(sorted_values, offsets[:-1], axis=0, dtype=np.float64)
+        counts = np.broadcast_to(group_sizes, sums.shape).copy()
+        return sums, counts
+
+    sums = np.add.reduceat(
+        np.where(missing, 0, sorted_values), offsets[:-1], axis=0, dtype=np.float64
+    )
+    counts = group_sizes - np.add.reduceat(
+        missing, offsets[:-1], axis=0, dtype=np.int64
+    )
+
+    return sums, counts
+
+
+def nanmedian_columns(values: np.ndarray) -> np.ndarray:
+    """NaN-aware median of every column of a 2D block.
+
+    Unlike ``np.nanmedian(values, axis=0)``, which falls back to a per-column
+    Python loop when NaNs are present, this sorts the whole block once and picks
+    the middle element(s) of every column with vectorized indexing. Sorting
+    column-contiguous (Fortran-ordered) blocks is fastest.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)``.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 column medians of shape ``(n_features,)``. Columns without any
+        non-missing values are NaN.
+    """
+
+    n_rows, n_features = values.shape
+    if n_rows == 0:
+        return np.full(n_features, np.nan)
+
+    sorted_block, n_valid = sort_columns(values)
+
+    return sorted_median(sorted_block, n_valid)
+
+
+def median_mad_columns(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """NaN-aware median and median absolute deviation of every column of a 2D block.
+
+    Columns are copied in blocks of about ``median_mad_block_bytes``, with NaNs
+    replaced by +inf so that they are placed behind all values. The median of every
+    column is selected with an in-place partition, which is linear in the number of
+    rows unlike a sort. The copy is then turned into absolute deviations from the
+    median in place, and a second partition selects the median absolute deviation.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D float block of shape ``(n_rows, n_features)``. It is not modified.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Float64 column medians and unscaled median absolute deviations, both of
+        shape ``(n_features,)``. Columns without any non-missing values are NaN.
+    """
+
+    n_rows, n_features = values.shape
+    medians = np.full(n_features, np.nan)
+    mads = np.full(n_features, np.nan)
+    if n_rows == 0:
+        return medians, mads
+
+    step = max(median_mad_block_bytes // (n_rows * values.dtype.itemsize), 1)
+    for start in range(0, n_features, step):
+        columns = slice(start, start + step)
+        block = np.array(values[:, columns], order="F")
+        missing = np.isnan(block)
+        n_valid = n_rows - missing.sum(axis=0)
+        block[missing] = np.inf
+
+        medians[columns] = partition_median(block, n_valid)
+        block -= medians[columns]
+        np.abs(block, out=block)
+        mads[columns] = partition_median(block, n_valid)
+
+    return medians, mads
+
+
+def partition_median(block: np.ndarray, n_valid: np.ndarray) -> np.ndarray:
+    """Median of every column of a block whose missing values are +inf.
+
+    The columns of ``block`` are partitioned in place around their middle elements.
+
+    Parameters
+    ----------
+    block : np.ndarray
+        2D block with +inf in place of missing values.
+    n_valid : np.ndarray
+        Number of non-missing values of every column.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 column medians. Columns without any non-missing values are NaN.
+    """
+
+    lower = np.maximum((n_valid - 1) // 2, 0)
+    upper = n_valid // 2
+    if (n_valid == n_valid[0]).all():
+        block.partition(np.unique([lower[0], upper[0]]), axis=0)
+    else:
+        # Every column needs different order statistics
+        for column in range(block.shape[1]):
+            block[:, column].partition(np.unique([lower[column], upper[column]]))
+
+    columns = np.arange(block.shape[1])
+
+    # Average the middle values in float64 so float32 inputs lose no precision
+    medians = (block[lower, columns].astype(np.float64) + block[upper, columns]) / 2
+    medians[n_valid == 0] = np.nan
+
+    return medians
+
+
+def sort_columns(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sort every column of a non-empty 2D block and count its non-missing values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)`` with ``n_rows > 0``.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The column-sorted block, with NaNs at the end of every column, and the
+        number of non-missing values of every column.
+    """
+
+    n_rows = values.shape[0]
+
+    # np.sort places NaNs at the end of every column
+    sorted_block = np.sort(values, axis=0)
+    n_valid = n_rows - np.isnan(sorted_block[-1]).astype(np.int64)
+    if (n_valid < n_rows).any():
+        n_valid = n_rows - np.isnan(sorted_block).sum(axis=0)
+
+    return sorted_block, n_valid
+
+
+def sorted_median(sorted_block: np.ndarray, n_valid: np.ndarray) -> np.ndarray:
+    """Median of every column of a block sorted by :func:`sort_columns`.
+
+    Parameters
+    ----------
+    sorted_block : np.ndarray
+        Column-sorted 2D block with NaNs at the end of every column.
+    n_valid : np.ndarray
+        Number of non-missing values of every column.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 column medians. Columns without any non-missing values are NaN.
+    """
+
+    lower = np.take_along_axis(
+        sorted_block, np.maximum((n_valid - 1) // 2, 0)[np.newaxis, :], axis=0
+    )[0]
+    upper = np.take_along_axis(sorted_block, (n_valid // 2)[np.newaxis, :], axis=0)[0]
+
+    # Average the middle values in float64 so float32 inputs lose no precision
+    medians = (lower.astype(np.float64) + upper) / 2
+    medians[n_valid == 0] = np.nan
+
+    return medians
+
+
+def sorted_quantile(
+    sorted_block: np.ndarray, n_valid: np.ndarray, quantile: float
+) -> np.ndarray:
+    """Quantile of every column of a block sorted by :func:`sort_columns`.
+
+    Quantiles interpolate linearly between the closest ranks, like
+    ``np.nanquantile`` and ``DataFrameGroupBy.quantile`` by default.
+
+    Parameters
+    ----------
+    sorted_block : np.ndarray
+        Column-sorted 2D block with NaNs at the end of every column.
+    n_valid : np.ndarray
+        Number of non-missing values of every column.
+    quantile : float
+        Quantile to compute, between 0 and 1.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 column quantiles. Columns without any non-missing values are NaN.
+    """
+
+    position = np.maximum(n_valid - 1, 0) * quantile
+    lower_rank = np.floor(position).astype(np.int64)
+    upper_rank = np.minimum(lower_rank + 1, np.maximum(n_valid - 1, 0))
+
+    lower = np.take_along_axis(sorted_block, lower_rank[np.newaxis, :], axis=0)[0]
+    upper = np.take_along_axis(sorted_block, upper_rank[np.newaxis, :], axis=0)[0]
+
+    lower = lower.astype(np.float64)
+    quantiles = lower + (position - lower_rank) * (upper - lower)
+    quantiles[n_valid == 0] = np.nan
+
+    return quantiles
+
+
+def sorted_ranks(
+    sorted_block: np.ndarray,
+    n_valid: np.ndarray,
+    values: np.ndarray,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Mid-ranks of values among the columns of a block sorted by :func:`sort_columns`.
+
+    The mid-rank of a value is the number of reference values below it plus half
+    the number of reference values equal to it, ``(left + right) / 2`` for the
+    ``np.searchsorted`` insertion points on either side. A reference value that is
+    ranked against its own column gets its average 1-based rank minus 0.5, so ties
+    share one rank. Every column of ``values`` is argsorted first, so that the
+    insertion points are searched in increasing order, which keeps the search in
+    cache and is several times faster than searching unsorted values.
+
+    Parameters
+    ----------
+    sorted_block : np.ndarray
+        Column-sorted 2D reference block with NaNs at the end of every column.
+    n_valid : np.ndarray
+        Number of non-missing reference values of every column.
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)`` to rank, with the columns of
+        ``sorted_block``.
+    out : np.ndarray, optional
+        Float array of the shape of ``values`` the ranks are written to. It may be
+        ``values`` itself.
+
+    Returns
+    -------
+    np.ndarray
+        Mid-ranks between 0 and ``n_valid`` of every column, NaN for missing
+        values.
+    """
+
+    if out is None:
+        # Keep the columns of values contiguous in the output
+        out = np.empty_like(values, dtype=np.float64)
+
+    for column in range(values.shape[1]):
+        reference = sorted_block[: n_valid[column], column]
+        # Sorting a strided column of a row-major block is several times slower
+        column_values = np.ascontiguousarray(values[:, column])
+
+        # Sorting NaNs falls back from numpy's vectorized argsort, so they are
+        # sorted as +inf instead; their ranks are replaced below
+        missing = np.isnan(column_values)
+        order = np.argsort(
+            np.where(missing, np.inf, column_values) if missing.any() else column_values
+        )
+        sorted_values = column_values[order]
+
+        if np.array_equal(sorted_values[: reference.shape[0]], reference) and (
+            reference.shape[0] == sorted_values.shape[0]
+            or np.isnan(sorted_values[reference.shape[0]])
+        ):
+            # The values are the reference itself (e.g. all profiles ranked among
+            # themselves): every run of tied values spans its own insertion points
+            ranks: np.ndarray = np.full(sorted_values.shape[0], np.nan)
+            ranks[: reference.shape[0]] = _run_midpoints(reference)
+        else:
+            ranks = (
+                np.searchsorted(reference, sorted_values, side="left")
+                + np.searchsorted(reference, sorted_values, side="right")
+            ) / 2
+            ranks[np.isnan(sorted_values)] = np.nan
+        out[order, column] = ranks
+
+    return out
+
+
+def sorted_value_counts(
+    sorted_block: np.ndarray, n_valid: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Number of unique values and the two largest value counts of every column.
+
+    Equal values are adjacent in a sorted column, so every unique value is a run,
+    and its count is the length of the run. Runs start where a value differs from
+    the previous one, which counts the unique values of all columns at once. Only
+    values equal to the previous one (repeats) make a run longer than one, so the
+    longest runs are found among the runs of repeats of all columns, which are
+    few for continuous features and short lists of runs for discrete ones. This
+    gives ``nunique()`` and the first two counts of ``value_counts()`` of every
+    column without counting the values of each column apart.
+
+    Parameters
+    ----------
+    sorted_block : np.ndarray
+        Column-sorted 2D block with NaNs at the end of every column.
+    n_valid : np.ndarray
+        Number of non-missing values of every column.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        The number of unique non-missing values of every column, and an array of
+        shape ``(2, n_features)`` with the counts of its most common and second
+        most common value (zero if the column has fewer unique values).
+    """
+
+    n_rows, n_features = sorted_block.shape
+    top_counts = np.zeros((2, n_features), dtype=np.int64)
+    if n_rows == 0:
+        return np.zeros(n_features, dtype=np.int64), top_counts
+
+    is_valid = np.arange(n_rows)[:, np.newaxis] < n_valid
+    repeats = np.empty((n_rows, n_features), dtype=bool, order="F")
+    repeats[0] = False
+    np.equal(sorted_block[1:], sorted_block[:-1], out=repeats[1:])
+    repeats &= is_valid
+    n_unique = n_valid - repeats.sum(axis=0)
+
+    # Without repeats, every value is counted once
+    top_counts[0] = n_unique >= 1
+    top_counts[1] = n_unique >= 2
+    repeat_positions = np.flatnonzero(repeats.ravel(order="F"))
+    if repeat_positions.shape[0] == 0:
+        return n_unique, top_counts
+
+    # The repeats of a run are consecutive in the column-major block, and runs of
+    # different columns are never consecutive as the first row never repeats
+    starts_run = np.empty(repeat_positions.shape[0], dtype=bool)
+    starts_run[0] = True
+    np.not_equal(np.diff(repeat_positions), 1, out=starts_run[1:])
+    run_starts = np.flatnonzero(starts_run)
+    run_lengths = np.diff(run_starts, append=repeat_positions.shape[0]) + 1
+    columns = repeat_positions[run_starts] // n_rows
+
+    # Sort the runs by column and decreasing length
+    order = np.lexsort((-run_lengths, columns))
+    columns, run_lengths = columns[order], run_lengths[order]
+    is_first = np.empty(columns.shape[0], dtype=bool)
+    is_first[0] = True
+    np.not_equal(columns[1:], columns[:-1], out=is_first[1:])
+    top_counts[0, columns[is_first]] = run_lengths[is_first]
+
+    # The second longest run is the next run of the same column, if it repeats
+    is_second = np.zeros(columns.shape[0], dtype=bool)
+    is_second[1:] = is_first[:-1] & ~is_first[1:]
+    top_counts[1, columns[is_second]] = run_lengths[is_second]
+
+    return n_unique, top_counts
+
+
+def _run_midpoints(sorted_values: np.ndarray) -> np.ndarray:
+    """Midpoint of the positions spanned by the run of equal values of every entry."""
+    n_values = sorted_values.shape[0]
+    if n_values == 0:
+        return np.empty(0)
+
+    starts_run = np.empty(n_values, dtype=bool)
+    starts_run[0] = True
+    np.not_equal(sorted_values[1:], sorted_values[:-1], out=starts_run[1:])
+    if starts_run.all():
+        return np.arange(n_values) + 0.5
+
+    run_starts = np.flatnonzero(starts_run)
+    run_ends = np.append(run_starts[1:], n_values)
+    runs = np.cumsum(starts_run) - 1
+
+    return (run_starts + run_ends)[runs] / 2
+
+
+def rank_columns(values: np.ndarray) -> np.ndarray:
+    """Average 1-based ranks of the values of every column of a 2D block.
+
+    Ties share the average of the ranks they span and missing values are not
+    ranked, like ``pd.DataFrame.rank()``. Blocks of columns are argsorted at once,
+    and the runs of tied values are found with cumulative maxima and minima of
+    their first and last positions, so no column is ranked in a Python loop.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)``. Missing values are NaN.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 Fortran-ordered ranks between 1 and the number of non-missing
+        values of every column, NaN for missing values.
+    """
+
+    n_rows, n_features = values.shape
+    ranks = np.empty((n_rows, n_features), dtype=np.float64, order="F")
+    block_columns = max(1, rank_block_bytes // (8 * max(n_rows, 1)))
+    positions = np.arange(n_rows)[:, np.newaxis]
+
+    for start in range(0, n_features, block_columns):
+        block = np.array(values[:, start : start + block_columns], dtype=np.float64)
+        # Sorting NaNs falls back from numpy's vectorized argsort, so they are
+        # sorted as +inf instead and the runs are cut at the non-missing values
+        missing = np.isnan(block)
+        n_valid = n_rows - missing.sum(axis=0)
+        block[missing] = np.inf
+        order = np.argsort(block, axis=0)
+        sorted_block = np.take_along_axis(block, order, axis=0)
+
+        starts_run = np.ones(sorted_block.shape, dtype=bool)
+        np.not_equal(sorted_block[1:], sorted_block[:-1], out=starts_run[1:])
+        if starts_run.all():
+            sorted_ranks = np.broadcast_to(positions + 1.0, sorted_block.shape)
+        else:
+            run_starts = np.maximum.accumulate(
+                np.where(starts_run, positions, 0), axis=0
+            )
+            ends_run = np.ones(sorted_block.shape, dtype=bool)
+            ends_run[:-1] = starts_run[1:]
+            run_ends = np.minimum.accumulate(
+                np.where(ends_run, positions + 1, n_rows)[::-1], axis=0
+            )[::-1]
+            # A run of +inf may hold both infinite and missing values
+            run_ends = np.minimum(run_ends, n_valid)
+            sorted_ranks = (run_starts + 1 + run_ends) / 2
+
+        block_ranks = np.empty(sorted_block.shape)
+        np.put_along_axis(block_ranks, order, sorted_ranks, axis=0)
+        block_ranks[missing] = np.nan
+        ranks[:, start : start + block_columns] = block_ranks
+
+    return ranks
+
+
+def sorted_trimmed_mean(
+    sorted_block: np.ndarray, n_valid: np.ndarray, trim_fraction: float
+) -> np.ndarray:
+    """Trimmed mean of every column of a block sorted by :func:`sort_columns`.
+
+    Like ``scipy.stats.trim_mean``, ``floor(n_valid * trim_fraction)`` values are
+    dropped from each tail of every column before averaging.
+
+    Parameters
+    ----------
+    sorted_block : np.ndarray
+        Column-sorted 2D block with NaNs at the end of every column.
+    n_valid : np.ndarray
+        Number of non-missing values of every column.
+    trim_fraction : float
+        Fraction of the non-missing values to drop from each tail.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 column trimmed means. Columns without any non-missing values are
+        NaN.
+    """
+
+    n_trim = np.floor(n_valid * trim_fraction).astype(np.int64)
+    n_kept = n_valid - 2 * n_trim
+
+    # Keep the ranks between the trimmed tails of every column
+    ranks = np.arange(sorted_block.shape[0])[:, np.newaxis]
+    kept = (ranks >= n_trim) & (ranks < n_valid - n_trim)
+    sums = np.where(kept, sorted_block, 0).sum(axis=0, dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n_kept > 0, sums / n_kept, np.nan)
+
+
+def group_median(sorted_values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """NaN-aware per-group medians of a sorted feature block.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``.
+
+    Returns
+    -------
+    np.ndarray
+        Per-group medians of shape ``(n_groups, n_features)``.
+    """
+
+    n_groups = offsets.shape[0] - 1
+    medians = np.empty((n_groups, sorted_values.shape[1]), dtype=np.float64)
+    for group in range(n_groups):
+        medians[group] = nanmedian_columns(
+            sorted_values[offsets[group] : offsets[group + 1]]
+        )
+
+    return medians
+
+
+def group_mean(sorted_values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """NaN-aware per-group means of a sorted feature block.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``.
+
+    Returns
+    -------
+    np.ndarray
+        Per-group means of shape ``(n_groups, n_features)``. Features without any
+        non-missing values in a group are NaN.
+    """
+
+    sums, counts = group_sum_count(sorted_values, offsets)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def split_groups(offsets: np.ndarray, n_chunks: int) -> list[tuple[int, int]]:
+    """Split consecutive groups into chunks holding a similar number of rows.
+
+    Parameters
+    ----------
+    offsets : np.ndarray
+        Group offsets as returned by :func:`sort_by_group`.
+    n_chunks : int
+        Desired number of chunks. Fewer chunks are returned when there are not
+        enough groups.
+
+    Returns
+    -------
+    list of tuple of (int, int)
+        Half-open ``(first_group, last_group)`` ranges covering all groups.
+    """
+
+    n_groups = offsets.shape[0] - 1
+    row_targets = np.linspace(0, offsets[-1], max(n_chunks, 1) + 1)
+    bounds = np.unique(
+        np.concatenate(([0], np.searchsorted(offsets, row_targets[1:-1]), [n_groups]))
+    )
+
+    return [(int(first), int(last)) for first, last in zip(bounds[:-1], bounds[1:])]
+
+
+def aggregate_groups(
+    values: np.ndarray,
+    order: np.ndarray,
+    offsets: np.ndarray,
+    reducer: Callable[..., np.ndarray],
+    n_jobs: int = 1,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Apply a group kernel to every group of a feature block, optionally in threads.
+
+    Groups are split into chunks of consecutive groups. Each thread gathers the
+    rows of its chunk directly from the shared input block and reduces them with
+    ``reducer``, so the input is never pickled or copied between workers. NumPy
+    releases the GIL while gathering, sorting, and reducing, so threads run in
+    parallel. Every group is reduced independently, so the output does not depend
+    on n_jobs.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Unsorted 2D feature block of shape ``(n_rows, n_features)``.
+    order : np.ndarray
+        Row order that sorts rows by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into the sorted rows.
+    reducer : callable
+        Group kernel such as :func:`group_median` that takes a sorted block and
+        its offsets and returns an array of shape ``(n_groups, n_outputs)``.
+    n_jobs : int, default 1
+        Number of threads to use.
+    weights : np.ndarray, optional
+        Row weights of shape ``(n_rows,)``. If provided, the weights of the
+        gathered rows are passed to ``reducer`` as ``sorted_weights``.
+
+    Returns
+    -------
+    np.ndarray
+        Stacked reducer output for all groups.
+    """
+
+    def reduce_chunk(chunk: tuple[int, int]) -> np.ndarray:
+        first, last = chunk
+        chunk_order = order[offsets[first] : offsets[last]]
+        weight_kwargs = (
+            {} if weights is None else {"sorted_weights": weights[chunk_order]}
+        )
+        return reducer(
+            take_rows(values, chunk_order),
+            offsets[first : last + 1] - offsets[first],
+            **weight_kwargs,
+        )
+
+    n_groups = offsets.shape[0] - 1
+    if n_jobs == 1 or n_groups <= 1:
+        return reduce_chunk((0, n_groups))
+
+    # Use more chunks than threads to balance uneven groups and bound the
+    # size of the gathered blocks held in memory at once
+    chunks = split_groups(offsets, n_chunks=4 * n_jobs)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        results = list(executor.map(reduce_chunk, chunks))
+
+    return np.concatenate(results, axis=0)
+
+
+def sketch_size(approx_error: float) -> int:
+    """Number of centroids per feature that a quantile sketch needs for an error.
+
+    Parameters
+    ----------
+    approx_error : float
+        Target rank error of the approximate median, as a fraction of the number
+        of non-missing values.
+
+    Returns
+    -------
+    int
+        Number of centroids kept per feature.
+    """
+
+    return max(int(np.ceil(1 / approx_error)), 1)
+
+
+def compress_centroids(
+    means: np.ndarray, weights: np.ndarray, n_centroids: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Merge weighted centroids of every column into a fixed number of centroids.
+
+    This is the merge step of a t-digest-like quantile sketch with a uniform
+    scale function: centroids are sorted by value and pooled into
+    ``n_centroids`` bins of equal rank width. Binning and pooling are vectorized
+    across all columns, so merging two sketches costs a sort of their centroids.
+    Columns with at most ``n_centroids`` values of weight 1 keep every value.
+
+    Parameters
+    ----------
+    means : np.ndarray
+        Centroid values of shape ``(n, n_features)``. Centroids with zero weight
+        (including missing values) are ignored.
+    weights : np.ndarray
+        Centroid weights of shape ``(n, n_features)``.
+    n_centroids : int
+        Number of centroids to keep per feature.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Float64 centroid means and weights, both of shape
+        ``(n_centroids, n_features)``. Within every column, non-empty centroids
+        come first sorted by value, followed by empty centroids (NaN means and zero
+        weights).
+    """
+
+    n_features = means.shape[1]
+    weights = np.where(np.isnan(means), 0, weights)
+
+    order = np.argsort(means, axis=0, kind="stable")
+    means = np.take_along_axis(means, order, axis=0)
+    weights = np.take_along_axis(weights, order, axis=0)
+
+    cumulative = np.cumsum(weights, axis=0)
+    totals = np.maximum(cumulative[-1:], 1) if means.shape[0] else 1
+    bins = np.minimum(
+        ((cumulative - weights / 2) / totals * n_centroids).astype(np.int64),
+        n_centroids - 1,
+    )
+
+    # Pool centroids per (bin, column) with a single flat bincount
+    flat_bins = (bins * n_features + np.arange(n_features)).ravel()
+    size = n_centroids * n_features
+    pooled_weights = np.bincount(flat_bins, weights.ravel(), minlength=size)
+    pooled_sums = np.bincount(
+        flat_bins, (np.where(weights > 0, means, 0) * weights).ravel(), minlength=size
+    )
+
+    pooled_weights = pooled_weights.reshape(n_centroids, n_features)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pooled_means = np.where(
+            pooled_weights > 0,
+            pooled_sums.reshape(n_centroids, n_features) / pooled_weights,
+            np.nan,
+        )
+
+    # Move empty centroids behind the non-empty ones of every column
+    order = np.argsort(pooled_weights == 0, axis=0, kind="stable")
+
+    return (
+        np.take_along_axis(pooled_means, order, axis=0),
+        np.take_along_axis(pooled_weights, order, axis=0),
+    )
+
+
+def sketch_columns(
+    values: np.ndarray, n_centroids: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Build a quantile sketch of every column of a 2D block.
+
+    Every column is sorted once and its non-missing values are split into
+    ``n_centroids`` bins of equal rank width. The bins of all columns are summed
+    with a single ``np.add.reduceat`` over the flattened, column-contiguous
+    block. Columns with at most ``n_centroids`` non-missing values keep every
+    value as its own centroid.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)``.
+    n_centroids : int
+        Number of centroids to keep per feature.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Centroid means and weights of shape ``(n_centroids, n_features)``, laid
+        out like the output of :func:`compress_centroids`.
+    """
+
+    n_rows, n_features = values.shape
+    if n_rows == 0 or n_features == 0:
+        return (
+            np.full((n_centroids, n_features), np.nan),
+            np.zeros((n_centroids, n_features)),
+        )
+
+    # np.sort places NaNs at the end of every column, and zeros add nothing
+    sorted_block = np.sort(np.asfortranarray(values), axis=0)
+    n_valid = np.full(n_features, n_rows)
+    if np.isnan(sorted_block[-1]).any():
+        missing = np.isnan(sorted_block)
+        n_valid -= missing.sum(axis=0)
+        np.putmask(sorted_block, missing, 0)
+
+    bounds = (
+        np.linspace(0, 1, n_centroids + 1)[:, np.newaxis] * n_valid[np.newaxis, :]
+    ).astype(np.int64)
+    weights = np.diff(bounds, axis=0).astype(np.float64)
+
+    # Bins of column j start at j * n_rows + bounds[:, j] in the flat block
+    starts = bounds[:-1] + n_rows * np.arange(n_features)[np.newaxis, :]
+    sums = np.add.reduceat(
+        sorted_block.ravel(order="F"), starts.ravel(order="F"), dtype=np.float64
+    ).reshape((n_centroids, n_features), order="F")
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(weights > 0, sums / weights, np.nan)
+
+    if n_valid.min() >= n_centroids:
+        return means, weights
+
+    # Move empty bins behind the non-empty ones of every column
+    order = np.argsort(weights == 0, axis=0, kind="stable")
+
+    return (
+        np.take_along_axis(means, order, axis=0),
+        np.take_along_axis(weights, order, axis=0),
+    )
+
+
+def centroid_quantile(
+    means: np.ndarray, weights: np.ndarray, quantile: float
+) -> np.ndarray:
+    """Estimate a quantile of every column from sketch centroids.
+
+    Every centroid is placed at the midpoint of the rank range it covers, and the
+    quantile is interpolated linearly between the two centroids around the target
+    rank ``quantile * (total - 1) + 0.5``. Columns whose centroids all have
+    weight 1 yield the exact quantile of ``np.quantile``.
+
+    Parameters
+    ----------
+    means : np.ndarray
+        Centroid means sorted within every column, as returned by
+        :func:`compress_centroids`.
+    weights : np.ndarray
+        Centroid weights.
+    quantile : float
+        Quantile to estimate, between 0 and 1.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 quantile estimates of shape ``(n_features,)``. Columns without any
+        weight are NaN.
+    """
+
+    n_features = means.shape[1]
+    totals = weights.sum(axis=0)
+    targets = quantile * np.maximum(totals - 1, 0) + 0.5
+    centers = np.cumsum(weights, axis=0) - weights / 2
+
+    # Empty centroids come last and never bracket the target rank
+    n_valid = (weights > 0).sum(axis=0)
+    centers = np.where(weights > 0, centers, np.inf)
+    upper = np.minimum((centers < targets).sum(axis=0), np.maximum(n_valid - 1, 0))
+    lower = np.maximum(upper - 1, 0)
+
+    columns = np.arange(n_features)
+    lower_center, upper_center = centers[lower, columns], centers[upper, columns]
+    lower_mean, upper_mean = means[lower, columns], means[upper, columns]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.clip(
+            (targets - lower_center) / (upper_center - lower_center), 0, 1
+        )
+    fraction = np.where(upper > lower, fraction, 1)
+    quantiles = lower_mean + fraction * (upper_mean - lower_mean)
+    quantiles[totals == 0] = np.nan
+
+    return quantiles
+
+
+def centroid_median(means: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Estimate the median of every column from sketch centroids.
+
+    See :func:`centroid_quantile`; the median interpolates around half the total
+    weight.
+
+    Parameters
+    ----------
+    means : np.ndarray
+        Centroid means sorted within every column, as returned by
+        :func:`compress_centroids`.
+    weights : np.ndarray
+        Centroid weights.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 median estimates of shape ``(n_features,)``. Columns without any
+        weight are NaN.
+    """
+
+    return centroid_quantile(means, weights, 0.5)
+
+
+def group_approx_median(
+    sorted_values: np.ndarray, offsets: np.ndarray, n_centroids: int
+) -> np.ndarray:
+    """Approximate per-group medians of a sorted feature block with quantile sketches.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``.
+    n_centroids : int
+        Number of sketch centroids per feature (see :func:`sketch_size`).
+
+    Returns
+    -------
+    np.ndarray
+        Per-group median estimates of shape ``(n_groups, n_features)``.
+    """
+
+    n_groups = offsets.shape[0] - 1
+    medians = np.empty((n_groups, sorted_values.shape[1]), dtype=np.float64)
+    for group in range(n_groups):
+        medians[group] = centroid_median(
+            *sketch_columns(
+                sorted_values[offsets[group] : offsets[group + 1]], n_centroids
+            )
+        )
+
+    return medians
+
+
+def group_sum_squared_deviations(
+    sorted_values: np.ndarray, offsets: np.ndarray, means: np.ndarray
+) -> np.ndarray:
+    """NaN-aware per-group sums of squared deviations from the group means.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``. Every group must hold at least one row.
+    means : np.ndarray
+        Per-group means of shape ``(n_groups, n_features)``.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 sums of squared deviations of shape ``(n_groups, n_features)``.
+    """
+
+    if offsets.shape[0] == 1:
+        return np.zeros((0, sorted_values.shape[1]))
+
+    deviations = sorted_values - np.repeat(means, np.diff(offsets), axis=0)
+    squared = np.square(deviations, out=deviations)
+    np.putmask(squared, np.isnan(squared), 0)
+
+    return np.add.reduceat(squared, offsets[:-1], axis=0, dtype=np.float64)
+
+
+def group_weighted_sum(
+    sorted_values: np.ndarray, sorted_weights: np.ndarray, offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """NaN-aware per-group weighted sums and sums of weights of a sorted block.
+
+    Values are only weighted where both the value and the row weight are
+    non-missing, so every feature gets its own sum of weights.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    sorted_weights : np.ndarray
+        Row weights of shape ``(n_rows,)`` in the same order as ``sorted_values``.
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``. Every group must hold at least one row.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Per-group weighted sums and sums of weights, both accumulated in float64
+        and of shape ``(n_groups, n_features)``.
+    """
+
+    n_groups = offsets.shape[0] - 1
+    if n_groups == 0:
+        empty_shape = (0, sorted_values.shape[1])
+        return np.zeros(empty_shape), np.zeros(empty_shape)
+
+    valid = ~np.isnan(sorted_values)
+    weights = np.where(
+        valid, np.nan_to_num(sorted_weights.astype(np.float64))[:, np.newaxis], 0
+    )
+    weighted_sums = np.add.reduceat(
+        np.where(valid, sorted_values, 0) * weights, offsets[:-1], axis=0
+    )
+    weight_sums = np.add.reduceat(weights, offsets[:-1], axis=0)
+
+    return weighted_sums, weight_sums
+
+
+def group_statistics(
+    sorted_values: np.ndarray,
+    offsets: np.ndarray,
+    operations: list[str],
+    n_centroids: int = 100,
+    trim_fraction: float = 0.05,
+    sorted_weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Compute several NaN-aware per-group statistics of a sorted feature block.
+
+    Moments share one set of per-group sums and counts, and order statistics
+    share one column sort per group, so every statistic reuses the same
+    factorization, row order, and sorted groups.
+
+    Parameters
+    ----------
+    sorted_values : np.ndarray
+        2D feature block whose rows are sorted by group (see :func:`sort_by_group`).
+    offsets : np.ndarray
+        Group offsets into ``sorted_values``.
+    operations : list of str
+        Statistics to compute, each one of ['mean', 'median', 'approx_median',
+        'trimmed_mean', 'weighted_mean', 'std', 'mad', 'q25', 'q75', 'count'].
+        "trimmed_mean" is the mean without the ``trim_fraction`` smallest and
+        largest values, "weighted_mean" the mean weighted by ``sorted_weights``,
+        "std" the sample standard deviation (ddof=1), "mad" the median absolute
+        deviation from the median, "q25"/"q75" the linearly interpolated
+        quartiles, and "count" the number of non-missing values.
+    n_centroids : int, default 100
+        Number of sketch centroids per feature for "approx_median".
+    trim_fraction : float, default 0.05
+        Fraction of the non-missing values trimmed from each tail for
+        "trimmed_mean".
+    sorted_weights : np.ndarray, optional
+        Row weights in the same order as ``sorted_values``. Required for
+        "weighted_mean".
+
+    Returns
+    -------
+    np.ndarray
+        Float64 array of shape ``(n_groups, len(operations) * n_features)`` that
+        stacks the statistics in the order of ``operations``.
+    """
+
+    n_groups = offsets.shape[0] - 1
+    n_features = sorted_values.shape[1]
+    results: dict[str, np.ndarray] = {}
+
+    if {"mean", "std", "count"}.intersection(operations):
+        sums, counts = group_sum_count(sorted_values, offsets)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            results["mean"] = np.where(counts > 0, sums / counts, np.nan)
+            if "std" in operations:
+                results["std"] = np.sqrt(
+                    np.where(
+                        counts > 1,
+                        group_sum_squared_deviations(
+                            sorted_values, offsets, np.nan_to_num(results["mean"])
+                        )
+                        / (counts - 1),
+                        np.nan,
+                    )
+                )
+        results["count"] = counts.astype(np.float64)
+
+    if "weighted_mean" in operations:
+        if sorted_weights is None:
+            raise ValueError("weighted_mean requires sorted_weights")
+        weighted_sums, weight_sums = group_weighted_sum(
+            sorted_values, sorted_weights, offsets
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            results["weighted_mean"] = np.where(
+                weight_sums != 0, weighted_sums / weight_sums, np.nan
+            )
+
+    order_operations = [
+        operation
+        for operation in operations
+        if operation in ["median", "trimmed_mean", "mad", "q25", "q75"]
+    ]
+    if order_operations:
+        for operation in order_operations:
+            results[operation] = np.full((n_groups, n_features), np.nan)
+        for group in range(n_groups):
+            if offsets[group + 1] == offsets[group]:
+                continue
+            group_values = sorted_values[offsets[group] : offsets[group + 1]]
+            for operation, result in order_statistics(
+                group_values, order_operations, trim_fraction=trim_fraction
+            ).items():
+                results[operation][group] = result
+
+    if "approx_median" in operations:
+        results["approx_median"] = group_approx_median(
+            sorted_values, offsets, n_centroids
+        )
+
+    return np.concatenate([results[operation] for operation in operations], axis=1)
+
+
+def order_statistics(
+    values: np.ndarray, operations: list[str], trim_fraction: float = 0.05
+) -> dict[str, np.ndarray]:
+    """Compute order statistics of every column of a non-empty 2D block.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_rows, n_features)`` with ``n_rows > 0``.
+    operations : list of str
+        Statistics to compute, each one of ['median', 'trimmed_mean', 'mad',
+        'q25', 'q75'] (see :func:`group_statistics`).
+    trim_fraction : float, default 0.05
+        Fraction of the non-missing values trimmed from each tail for
+        "trimmed_mean".
+
+    Returns
+    -------
+    dict of str to np.ndarray
+        Float64 column statistics of shape ``(n_features,)`` per operation.
+    """
+
+    quantiles = {"q25": 0.25, "q75": 0.75}
+
+    sorted_block, n_valid = sort_columns(values)
+    medians = sorted_median(sorted_block, n_valid)
+
+    results = {}
+    for operation in operations:
+        if operation == "median":
+            results[operation] = medians
+        elif operation == "trimmed_mean":
+            results[operation] = sorted_trimmed_mean(
+                sorted_block, n_valid, trim_fraction
+            )
+        elif operation == "mad":
+            results[operation] = nanmedian_columns(np.abs(values - medians))
+        else:
+            results[operation] = sorted_quantile(
+                sorted_block, n_valid, quantiles[operation]
+            )
+
+    return results
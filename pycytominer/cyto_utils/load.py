@@ -4,14 +4,27 @@ Module for loading profiles from files or dataframes.
 
 import csv
 import gzip
+import numbers
 import pathlib
+import warnings
+from collections.abc import Iterator
 from typing import Any, Optional, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
 
 from pycytominer.cyto_utils.anndata_utils import AnnDataLike
 
+# Strings that CellProfiler-style exports use for missing feature values, matched
+# after whitespace stripping and lowercasing
+missing_value_strings = frozenset({"", "na", "n/a", "nan", "none", "null"})
+
+# Element-wise type of the cells of object arrays
+_type_of = np.frompyfunc(type, 1, 1)
+
 
 def is_path_a_parquet_file(file: Union[str, pathlib.Path]) -> bool:
     """Checks if the provided file path is a parquet file.
@@ -284,6 +297,95 @@ def load_cytotable_profiles(
     )
 
 
+def load_parquet_schema(
+    profiles: Union[str, pathlib.Path, pathlib.PurePath],
+) -> pa.Schema:
+    """Read the schema of a parquet file or dataset without loading any rows.
+
+    Parameters
+    ----------
+    profiles : path-like
+        Parquet file, parquet dataset directory, or Iceberg-style table directory.
+
+    Returns
+    -------
+    pyarrow.Schema
+        Schema shared by all fragments of the parquet source.
+
+    Raises
+    ------
+    ValueError
+        Raised when the path does not point to a parquet-backed source.
+    """
+
+    parquet_path = resolve_parquet_path(profiles)
+    if parquet_path is None:
+        raise ValueError(f"{profiles} is not a parquet file or dataset.")
+
+    return ds.dataset(parquet_path, format="parquet").schema
+
+
+def load_parquet_batches(
+    profiles: Union[str, pathlib.Path, pathlib.PurePath],
+    columns: Optional[list[str]] = None,
+    batch_size: int = 65536,
+    filter_expression: Optional[pc.Expression] = None,
+) -> Iterator[pd.DataFrame]:
+    """Lazily read a parquet file or dataset as a sequence of DataFrame batches.
+
+    Only one batch (at most ``batch_size`` rows) is materialized in memory at a
+    time, and only the parquet row group it is read from is buffered, which allows
+    processing profiles that are larger than available memory.
+
+    Parameters
+    ----------
+    profiles : path-like
+        Parquet file, parquet dataset directory, or Iceberg-style table directory.
+    columns : list of str, optional
+        Columns to read. If not specified, all columns are read.
+    batch_size : int, default 65536
+        Maximum number of rows per batch.
+    filter_expression : pyarrow.compute.Expression, optional
+        Row filter pushed down to the parquet reader, for example
+        ``pc.field("ImageNumber").isin([1, 2])``. Row groups whose statistics
+        cannot match are skipped, and filtered rows are never converted to pandas.
+
+    Returns
+    -------
+    Iterator[pd.DataFrame]
+        A generator of DataFrame batches in file order.
+
+    Raises
+    ------
+    ValueError
+        Raised when the path does not point to a parquet-backed source.
+    """
+
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer.")
+
+    parquet_path = resolve_parquet_path(profiles)
+    if parquet_path is None:
+        raise ValueError(f"{profiles} is not a parquet file or dataset.")
+
+    dataset = ds.dataset(parquet_path, format="parquet")
+    # Scan one row group at a time: a dataset-wide scan keeps decoding row groups
+    # ahead of a slow consumer, so its memory grows with the size of the file
+    for fragment in dataset.get_fragments(filter=filter_expression):
+        for row_group in fragment.split_by_row_group(
+            filter_expression, schema=dataset.schema
+        ):
+            for batch in row_group.to_batches(
+                schema=dataset.schema,
+                columns=columns,
+                filter=filter_expression,
+                batch_size=batch_size,
+                batch_readahead=0,
+                fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=False),
+            ):
+                yield batch.to_pandas()
+
+
 def infer_delim(file: Union[str, pathlib.Path, Any]) -> str:
     """
     Sniff the delimiter in the given file
@@ -310,8 +412,94 @@ def infer_delim(file: Union[str, pathlib.Path, Any]) -> str:
     return dialect.delimiter
 
 
+def coerce_missing_value_strings(
+    profiles: pd.DataFrame, columns: Optional[list[str]] = None
+) -> list[str]:
+    """Replace missing-value strings in numeric object columns with NaN, in place.
+
+    CSV exports often encode missing feature values as strings such as "nan" or
+    "None", which makes pandas read the column as object dtype. A column is
+    coerced to float64 only if every string in it is one of
+    ``missing_value_strings`` (case-insensitive, ignoring surrounding whitespace)
+    and all other non-missing values are numbers. Columns with any other string
+    or non-numeric content are left untouched.
+
+    All affected columns are screened together in a single pass over their cells,
+    and the coerced columns are cast and assigned in bulk.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Profiles whose columns are coerced in place.
+    columns : list of str, optional
+        Columns to inspect. If not specified, all columns are inspected.
+
+    Returns
+    -------
+    list of str
+        The coerced columns, in the order of ``columns``.
+    """
+
+    if columns is None:
+        columns = profiles.columns.tolist()
+
+    # Numeric columns need no cleanup, and only columns holding strings can be
+    # affected; infer_dtype classifies each column in a single compiled pass
+    candidates = [
+        column
+        for column in columns
+        if not pd.api.types.is_numeric_dtype(profiles[column])
+        and pd.api.types.infer_dtype(profiles[column], skipna=True)
+        in ["string", "mixed", "mixed-integer"]
+    ]
+    if not candidates:
+        return []
+
+    block = profiles.loc[:, candidates].to_numpy(dtype=object)
+
+    # Classify the few distinct cell types instead of every cell, and normalize and
+    # match the strings of all columns with one arrow compute call
+    types = _type_of(block)
+    is_string = np.zeros(block.shape, dtype=bool)
+    is_other = np.zeros(block.shape, dtype=bool)
+    for cell_type in pd.unique(types.ravel()):
+        if issubclass(cell_type, str):
+            is_string |= types == cell_type
+        elif not issubclass(cell_type, numbers.Number):
+            is_other |= types == cell_type
+    # Missing values such as None or pd.NA are neither strings nor numbers
+    is_non_numeric = is_other
+    is_non_numeric[is_other] = ~pd.isna(block[is_other])
+
+    is_token = np.zeros(block.shape, dtype=bool)
+    is_token[is_string] = pc.is_in(
+        pc.utf8_lower(
+            pc.utf8_trim_whitespace(pa.array(block[is_string], type=pa.string()))
+        ),
+        value_set=pa.array(sorted(missing_value_strings), type=pa.string()),
+    ).to_numpy(zero_copy_only=False)
+
+    is_coerced = is_string.any(axis=0) & ~(
+        (is_string & ~is_token) | is_non_numeric
+    ).any(axis=0)
+    if not is_coerced.any():
+        return []
+
+    coerced_columns = [candidates[index] for index in np.flatnonzero(is_coerced)]
+    coerced_block = block[:, is_coerced]
+    coerced_block[is_token[:, is_coerced]] = np.nan
+    profiles[coerced_columns] = pd.DataFrame(
+        coerced_block.astype(np.float64),
+        index=profiles.index,
+        columns=pd.Index(coerced_columns),
+    )
+
+    return coerced_columns
+
+
 def load_profiles(
     profiles: Union[str, pathlib.Path, pathlib.PurePath, pd.DataFrame, AnnDataLike],
+    coerce_missing_strings: bool = False,
 ) -> pd.DataFrame:
     """
     Unless a dataframe is provided, load the given profile dataframe from path or string.
@@ -330,6 +518,11 @@ def load_profiles(
     profiles :
         {str, pathlib.Path, pathlib.PurePath, pandas.DataFrame, ad.AnnData}
         File location, warehouse root, or in-memory profile data.
+    coerce_missing_strings : bool, default False
+        Whether to replace missing-value strings such as "nan" or "None" in
+        otherwise numeric columns with NaN (see
+        :func:`coerce_missing_value_strings`). A warning reports the coerced
+        columns. DataFrame inputs are not modified.
 
     Return
     ------
@@ -341,6 +534,27 @@ def load_profiles(
         Raised if the provided profile does not exists
     """
 
+    profiles_df = _read_profiles(profiles)
+
+    if coerce_missing_strings:
+        if profiles_df is profiles:
+            # Replace columns of a shallow copy, leaving the input untouched
+            profiles_df = profiles_df.copy(deep=False)
+        coerced_columns = coerce_missing_value_strings(profiles_df)
+        if coerced_columns:
+            warnings.warn(
+                "Replaced missing-value strings with NaN in "
+                f"{len(coerced_columns)} columns: {coerced_columns}"
+            )
+
+    return profiles_df
+
+
+def _read_profiles(
+    profiles: Union[str, pathlib.Path, pathlib.PurePath, pd.DataFrame, AnnDataLike],
+) -> pd.DataFrame:
+    """Read profiles for :func:`load_profiles`, returning DataFrames unchanged."""
+
     # If already a dataframe, return it
     if isinstance(profiles, pd.DataFrame):
         return profiles
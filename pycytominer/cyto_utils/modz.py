@@ -10,7 +10,8 @@ import pandas as pd
 from pycytominer.cyto_utils.features import infer_cp_features
 from pycytominer.cyto_utils.util import (
     check_correlation_method,
-    get_pairwise_correlation,
+    correlation_blocks,
+    get_correlation_matrix,
 )
 
 
@@ -52,28 +53,39 @@ def modz_base(
     # Step 1: Extract pairwise correlations of samples
     # Transpose so samples are columns
     population_df = population_df.transpose()
-    cor_df, pair_df = get_pairwise_correlation(population_df, method=method)
-
-    # Round correlation results
-    pair_df = pair_df.round(precision)
-
-    # create a copy of cor_df values for use with np.fill_diagonal
-    cor_df_values = cor_df.values.copy()
+    values = population_df.to_numpy(dtype=np.float64)
+    if method != "kendall":
+        # Reduce the correlation tiles without holding the full matrix
+        correlation_tiles = correlation_blocks(values, method=method)
+    else:
+        correlation_tiles = iter([
+            (0, 0, get_correlation_matrix(population_df, method=method).to_numpy())
+        ])
 
     # Step 2: Identify sample weights
-    # Fill diagonal of correlation_matrix with np.nan
-    np.fill_diagonal(cor_df_values, np.nan)
-
-    # reconstitute the changed data as a new dataframe to avoid read-only behavior
-    cor_df = pd.DataFrame(
-        data=cor_df_values, index=cor_df.index, columns=cor_df.columns
-    )
-
-    # Remove negative values
-    cor_df = cor_df.clip(lower=0)
-
-    # Get average correlation for each profile (will ignore NaN)
-    raw_weights = cor_df.mean(axis=1)
+    # Get average correlation for each profile, ignoring the correlation of every
+    # profile with itself, negative correlations (clipped to zero), and NaN
+    n_samples = values.shape[1]
+    cor_sums = np.zeros(n_samples)
+    cor_counts = np.zeros(n_samples)
+    for start_a, start_b, tile in correlation_tiles:
+        block_a = slice(start_a, start_a + tile.shape[0])
+        block_b = slice(start_b, start_b + tile.shape[1])
+        tile = np.clip(tile, 0, None)
+        if start_a == start_b:
+            np.fill_diagonal(tile, np.nan)
+        is_valid = ~np.isnan(tile)
+        tile[~is_valid] = 0
+
+        cor_sums[block_a] += tile.sum(axis=1)
+        cor_counts[block_a] += is_valid.sum(axis=1)
+        if start_a != start_b:
+            # The tile below the diagonal is the transpose of this one
+            cor_sums[block_b] += tile.sum(axis=0)
+            cor_counts[block_b] += is_valid.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        raw_weights = pd.Series(cor_sums / cor_counts, index=population_df.columns)
 
     # Threshold weights (any value < min_weight will become min_weight)
     raw_weights = raw_weights.clip(lower=min_weight)
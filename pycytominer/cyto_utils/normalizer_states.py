@@ -0,0 +1,530 @@
+"""
+Fitted normalization parameters that can be saved and applied to chunks of profiles,
+and the statistics that fit them over batches
+"""
+
+import json
+import os
+import pathlib
+from typing import Any, Optional, TypeVar, Union
+
+import numpy as np
+from scipy.special import ndtri
+
+from pycytominer.cyto_utils.group_kernels import (
+    centroid_median,
+    centroid_quantile,
+    compress_centroids,
+    sketch_columns,
+    sketch_size,
+)
+from pycytominer.cyto_utils.profile_matrix import ProfileMatrix
+from pycytominer.operations.transform import (
+    RankTransform,
+    RobustMAD,
+    Spherize,
+    rank_transform,
+    whiten_blocks,
+)
+
+NormalizerState_type = TypeVar("NormalizerState_type", bound="NormalizerState")
+
+
+class NormalizerState:
+    """Fitted parameters of a normalization method.
+
+    Every method is applied as ``(x - center) / scale``, followed by a
+    multiplication with the whitening matrix for "spherize". "quantile" and
+    "rank_int" instead replace every value by its rank among the sorted reference
+    values of its feature (see :class:`pycytominer.operations.RankTransform`).
+    Profiles are normalized row by row, so chunks of a table can be normalized
+    independently (e.g. on different nodes) with the same state.
+
+    Attributes
+    ----------
+    method : str
+        Normalization method, one of ['standardize', 'robustize', 'mad_robustize',
+        'spherize', 'quantile', 'rank_int', 'control_zscore'].
+    features : list of str
+        Features the parameters were fit on, in the order of the parameters.
+    center : np.ndarray
+        Float64 value subtracted from every feature, of shape ``(n_features,)``.
+        The mean for "standardize", the median for "robustize", "mad_robustize",
+        and "control_zscore", the mean (or zero without centering) for
+        "spherize", and zero otherwise.
+    scale : np.ndarray
+        Float64 value every centered feature is divided by, of shape
+        ``(n_features,)``. The standard deviation for "standardize" (and the
+        "-cor" spherize methods), the interquartile range for "robustize", the
+        interquartile range divided by that of the standard normal distribution
+        for "control_zscore", the scaled median absolute deviation plus epsilon
+        for "mad_robustize", and one otherwise.
+    whitening : np.ndarray or None
+        Whitening matrix ``W`` of shape ``(n_features, n_features)`` for
+        "spherize", None otherwise.
+    quantiles : np.ndarray or None
+        Float64 reference values of "quantile" and "rank_int", sorted within every
+        column of shape ``(n_quantiles, n_features)`` with NaNs at the end of
+        columns with fewer values, None otherwise.
+    output_features : list of str
+        Names of the normalized features. Principal component methods of
+        "spherize" name them ``PC1``, ``PC2``, and so on.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        features: list[str],
+        center: np.ndarray,
+        scale: np.ndarray,
+        whitening: Optional[np.ndarray] = None,
+        output_features: Optional[list[str]] = None,
+        quantiles: Optional[np.ndarray] = None,
+    ):
+        n_features = len(features)
+        self.method = method
+        self.features = list(features)
+        self.center = np.asarray(center, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.whitening = (
+            None if whitening is None else np.asarray(whitening, dtype=np.float64)
+        )
+        self.output_features = (
+            list(features) if output_features is None else list(output_features)
+        )
+        self.quantiles = (
+            None if quantiles is None else np.asarray(quantiles, dtype=np.float64)
+        )
+
+        if (
+            self.center.shape != (n_features,)
+            or self.scale.shape != (n_features,)
+            or len(self.output_features) != n_features
+            or (
+                self.whitening is not None
+                and self.whitening.shape != (n_features, n_features)
+            )
+            or (
+                self.quantiles is not None
+                and (self.quantiles.ndim != 2 or self.quantiles.shape[1] != n_features)
+            )
+        ):
+            raise ValueError(
+                f"Normalization parameters do not match the {n_features} features"
+            )
+
+    @classmethod
+    def from_scaler(
+        cls: type[NormalizerState_type],
+        scaler: Any,
+        method: str,
+        features: list[str],
+    ) -> NormalizerState_type:
+        """Extract the parameters of a fitted scaler.
+
+        Parameters
+        ----------
+        scaler : StandardScaler, RobustScaler, RobustMAD, Spherize, or RankTransform
+            Scaler fitted by ``normalize()`` for the method.
+        method : str
+            Normalization method of the scaler.
+        features : list of str
+            Features the scaler was fit on.
+
+        Returns
+        -------
+        NormalizerState
+            The fitted parameters.
+        """
+
+        n_features = len(features)
+        whitening = None
+        output_features = None
+        quantiles = None
+
+        if method == "standardize":
+            center, scale = scaler.mean_, scaler.scale_
+        elif method in ["robustize", "control_zscore"]:
+            center, scale = scaler.center_, scaler.scale_
+        elif method == "mad_robustize":
+            center = scaler.median.to_numpy()
+            scale = (scaler.mad + scaler.epsilon).to_numpy()
+        elif method == "spherize":
+            if scaler.method in ["PCA-cor", "ZCA-cor"]:
+                center = scaler.standard_scaler.mean_
+                scale = scaler.standard_scaler.scale_
+            else:
+                center = (
+                    scaler.mean_centerer.mean_
+                    if scaler.center
+                    else np.zeros(n_features)
+                )
+                scale = np.ones(n_features)
+            whitening = scaler.W
+            if scaler.method in ["PCA", "PCA-cor"]:
+                output_features = [f"PC{idx}" for idx in range(1, n_features + 1)]
+        elif method in ["quantile", "rank_int"]:
+            center, scale = np.zeros(n_features), np.ones(n_features)
+            quantiles = scaler.quantiles_
+        else:
+            raise ValueError(f"Cannot extract parameters of method {method}")
+
+        return cls(
+            method=method,
+            features=features,
+            center=center,
+            scale=scale,
+            whitening=whitening,
+            output_features=output_features,
+            quantiles=quantiles,
+        )
+
+    def transform_values(
+        self, values: np.ndarray, n_threads: Optional[int] = None
+    ) -> np.ndarray:
+        """Normalize a 2D float block of features.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Float block of shape ``(n_profiles, n_features)`` with columns in the
+            order of ``features``. It is scaled (or ranked) in place, except for a
+            "spherize" block that is not float64.
+        n_threads : int, optional
+            Maximum number of BLAS threads for the "spherize" matrix products. The
+            BLAS default is used if not given.
+
+        Returns
+        -------
+        np.ndarray
+            The normalized block. For "spherize", a float64 block.
+        """
+
+        if self.quantiles is not None:
+            # Ranks of a float32 block are exact up to 2**23 reference values
+            n_valid = self.quantiles.shape[0] - np.isnan(self.quantiles).sum(axis=0)
+            return rank_transform(
+                values,
+                self.quantiles,
+                n_valid,
+                output_distribution="normal"
+                if self.method == "rank_int"
+                else "uniform",
+                out=values,
+            )
+
+        if self.whitening is None:
+            values -= self.center
+            values /= self.scale
+            return values
+
+        # Whiten blocks of rows, writing back into float64 values whenever the
+        # whitened block has the same shape
+        in_place = values.dtype == np.float64 and self.whitening.shape[1] == len(
+            self.features
+        )
+
+        return whiten_blocks(
+            values,
+            center=self.center,
+            scale=self.scale,
+            whitening=self.whitening,
+            out=values if in_place else None,
+            n_threads=n_threads,
+        )
+
+    def transform(
+        self, profile_matrix: ProfileMatrix, n_threads: Optional[int] = None
+    ) -> ProfileMatrix:
+        """Normalize the features of a profile matrix.
+
+        Parameters
+        ----------
+        profile_matrix : ProfileMatrix
+            Profiles whose features match ``features``. The feature block is
+            scaled in place, see :meth:`transform_values`.
+        n_threads : int, optional
+            Maximum number of BLAS threads for the "spherize" matrix products.
+
+        Returns
+        -------
+        ProfileMatrix
+            The normalized profiles, with ``output_features`` as features.
+        """
+
+        if profile_matrix.features != self.features:
+            raise ValueError(
+                "The profile features do not match the features of the normalizer"
+            )
+
+        return ProfileMatrix(
+            values=self.transform_values(profile_matrix.values, n_threads=n_threads),
+            features=self.output_features,
+            metadata=profile_matrix.metadata,
+        )
+
+    def save(self, path: Union[str, pathlib.Path]):
+        """Write the parameters to a NumPy .npz file.
+
+        The file is written to a temporary file first and then moved into place, so
+        an interrupted save never leaves a partial file behind.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Output file.
+        """
+
+        config = {
+            "method": self.method,
+            "features": self.features,
+            "output_features": self.output_features,
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as state_file:
+            np.savez(
+                state_file,
+                config=np.array(json.dumps(config)),
+                center=self.center,
+                scale=self.scale,
+                whitening=np.empty((0, 0))
+                if self.whitening is None
+                else self.whitening,
+                quantiles=np.empty((0, 0))
+                if self.quantiles is None
+                else self.quantiles,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls: type[NormalizerState_type], path: Union[str, pathlib.Path]
+    ) -> NormalizerState_type:
+        """Read parameters written by :meth:`save`.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Parameter file.
+
+        Returns
+        -------
+        NormalizerState
+            The restored parameters.
+        """
+
+        with np.load(path) as state_file:
+            config = json.loads(str(state_file["config"]))
+            whitening = state_file["whitening"]
+            # Files written before the rank methods have no quantiles
+            quantiles = (
+                state_file["quantiles"]
+                if "quantiles" in state_file.files
+                else np.empty((0, 0))
+            )
+
+            return cls(
+                method=config["method"],
+                features=config["features"],
+                center=state_file["center"],
+                scale=state_file["scale"],
+                whitening=None if whitening.size == 0 else whitening,
+                output_features=config["output_features"],
+                quantiles=None if quantiles.size == 0 else quantiles,
+            )
+
+
+class NormalizerAccumulator:
+    """Mergeable fit statistics of a normalization method over batches of profiles.
+
+    "standardize" keeps the per-feature count, mean, and sum of squared deviations,
+    which are merged across batches with the parallel Welford update of Chan et al.,
+    so the fitted means and standard deviations match a fit on all profiles.
+    "robustize", "control_zscore", "mad_robustize", "quantile", and "rank_int"
+    keep a fixed-size quantile sketch per feature, so their medians, interquartile
+    ranges, median absolute deviations, and ranks are approximate once more than
+    ``sketch_size(approx_error)`` profiles are seen.
+    "spherize" merges the mean and the scatter matrix of the features (see
+    :meth:`pycytominer.operations.Spherize.partial_fit`), so its whitening matrix
+    matches a fit on all profiles. Memory is independent of the number of profiles.
+
+    Attributes
+    ----------
+    method : str
+        Normalization method, one of ['standardize', 'robustize', 'mad_robustize',
+        'spherize', 'quantile', 'rank_int', 'control_zscore'].
+    features : list of str
+        Features in the column order of the batches.
+    mad_robustize_epsilon : float or None
+        Added to the median absolute deviation for "mad_robustize", for which it
+        must be a float.
+    approx_error : float
+        Target rank error of the sketch quantiles.
+    spherize_center, spherize_method, spherize_epsilon
+        Parameters of the "spherize" transform, see :func:`pycytominer.normalize`.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        features: list[str],
+        mad_robustize_epsilon: Optional[float] = 1e-18,
+        approx_error: float = 0.01,
+        spherize_center: bool = True,
+        spherize_method: str = "ZCA-cor",
+        spherize_epsilon: float = 1e-6,
+    ):
+        avail_methods = [
+            "standardize",
+            "robustize",
+            "mad_robustize",
+            "spherize",
+            "quantile",
+            "rank_int",
+            "control_zscore",
+        ]
+        if method not in avail_methods:
+            raise ValueError(
+                f"Fit statistics of method {method} cannot be accumulated over "
+                f"batches, use one of {avail_methods}"
+            )
+
+        n_features = len(features)
+        self.method = method
+        self.features = list(features)
+        self.mad_robustize_epsilon = mad_robustize_epsilon
+        self.approx_error = approx_error
+        self.n_centroids = sketch_size(approx_error)
+
+        self.scaler: Optional[Union[RobustMAD, Spherize, RankTransform]] = None
+        if method == "mad_robustize":
+            if mad_robustize_epsilon is None:
+                raise ValueError("mad_robustize_epsilon must be a float")
+            self.scaler = RobustMAD(
+                epsilon=mad_robustize_epsilon, approx_error=approx_error
+            )
+        elif method == "spherize":
+            self.scaler = Spherize(
+                epsilon=spherize_epsilon,
+                center=spherize_center,
+                method=spherize_method,
+                solver="eigh",
+            )
+            self.scaler._reset_scatter(n_features)
+        elif method in ["quantile", "rank_int"]:
+            self.scaler = RankTransform(
+                output_distribution="normal" if method == "rank_int" else "uniform",
+                approx_error=approx_error,
+            )
+
+        self.counts = np.zeros(n_features)
+        self.means = np.zeros(n_features)
+        self.sum_squared_deviations = np.zeros(n_features)
+        self.centroid_means = np.full((self.n_centroids, n_features), np.nan)
+        self.centroid_weights = np.zeros((self.n_centroids, n_features))
+
+    def update(self, values: np.ndarray) -> "NormalizerAccumulator":
+        """Add a batch of reference profiles.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Float block of shape ``(n_profiles, n_features)`` with columns in the
+            order of ``features``. Missing values are ignored.
+
+        Returns
+        -------
+        NormalizerAccumulator
+            The updated accumulator.
+        """
+
+        if values.shape[0] == 0:
+            return self
+
+        if isinstance(self.scaler, (RobustMAD, RankTransform)):
+            self.scaler.partial_fit(values)
+            return self
+
+        if isinstance(self.scaler, Spherize):
+            # The whitening matrix is only computed once, in finalize()
+            self.scaler._update_scatter(values)
+            return self
+
+        if self.method != "standardize":
+            means, weights = sketch_columns(values, self.n_centroids)
+            if self.centroid_weights.any():
+                means, weights = compress_centroids(
+                    np.concatenate([self.centroid_means, means]),
+                    np.concatenate([self.centroid_weights, weights]),
+                    self.n_centroids,
+                )
+            self.centroid_means, self.centroid_weights = means, weights
+            return self
+
+        is_valid = ~np.isnan(values)
+        batch_counts = is_valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            batch_means = np.where(
+                batch_counts > 0,
+                np.nansum(values, axis=0, dtype=np.float64) / batch_counts,
+                0,
+            )
+        deviations = np.where(is_valid, values - batch_means, 0)
+        batch_sum_squared_deviations = np.einsum("ij,ij->j", deviations, deviations)
+
+        # Chan et al. merge of two (count, mean, sum of squared deviations) triples
+        totals = self.counts + batch_counts
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(totals > 0, batch_counts / totals, 0)
+        delta = batch_means - self.means
+        self.means += delta * weight
+        self.sum_squared_deviations += (
+            batch_sum_squared_deviations + delta**2 * self.counts * weight
+        )
+        self.counts = totals
+
+        return self
+
+    def finalize(self) -> NormalizerState:
+        """Compute the normalization parameters from the accumulated statistics.
+
+        Constant features get a scale of one, like the scikit-learn scalers.
+
+        Returns
+        -------
+        NormalizerState
+            The fitted parameters.
+        """
+
+        if isinstance(self.scaler, Spherize):
+            self.scaler._fit_scatter()
+        if self.scaler is not None:
+            return NormalizerState.from_scaler(
+                self.scaler, method=self.method, features=self.features
+            )
+
+        eps = np.finfo(np.float64).eps
+
+        if self.method == "standardize":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                variances = self.sum_squared_deviations / self.counts
+            center = np.where(self.counts > 0, self.means, np.nan)
+            # Same constant feature bound as sklearn's StandardScaler
+            is_constant = variances <= (
+                self.counts * eps * variances + (self.counts * center * eps) ** 2
+            )
+            scale = np.where(is_constant, 1.0, np.sqrt(variances))
+        else:
+            center = centroid_median(self.centroid_means, self.centroid_weights)
+            scale = centroid_quantile(
+                self.centroid_means, self.centroid_weights, 0.75
+            ) - centroid_quantile(self.centroid_means, self.centroid_weights, 0.25)
+            scale = np.where(scale < 10 * eps, 1.0, scale)
+            if self.method == "control_zscore":
+                # Same unit variance scale as RobustScaler(unit_variance=True)
+                scale /= ndtri(0.75) - ndtri(0.25)
+
+        return NormalizerState(
+            method=self.method, features=self.features, center=center, scale=scale
+        )
@@ -0,0 +1,142 @@
+"""
+Contiguous feature matrix representation of profiles used inside pipeline functions
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ProfileMatrix:
+    """Profiles held as one contiguous 2D float block of features plus metadata.
+
+    Pipeline functions convert input DataFrames once with :meth:`from_frame`,
+    operate on ``values`` directly, and convert back with :meth:`to_frame` at the
+    API boundary. Features are stored column-contiguous (Fortran order), which is
+    the memory layout pandas uses for a single float block, so wrapping the block
+    in a DataFrame (:meth:`feature_frame`, :meth:`to_frame`) does not copy it.
+
+    Attributes
+    ----------
+    values : np.ndarray
+        Float feature block of shape ``(n_profiles, n_features)``.
+    features : list of str
+        Feature names, one per column of ``values``.
+    metadata : pd.DataFrame
+        Non-feature columns with one row per profile. Its index is used as the
+        index of all DataFrames built from the matrix.
+    """
+
+    def __init__(self, values: np.ndarray, features: list[str], metadata: pd.DataFrame):
+        if values.ndim != 2 or values.shape != (metadata.shape[0], len(features)):
+            raise ValueError(
+                f"values of shape {values.shape} do not match {metadata.shape[0]} "
+                f"profiles and {len(features)} features"
+            )
+
+        self.values = values
+        self.features = list(features)
+        self.metadata = metadata
+
+    @classmethod
+    def from_frame(
+        cls,
+        profiles: pd.DataFrame,
+        features: list[str],
+        metadata_columns: Optional[list[str]] = None,
+        dtype: Optional[np.typing.DTypeLike] = None,
+        copy: bool = True,
+    ) -> "ProfileMatrix":
+        """Copy the features of a DataFrame into a single float block.
+
+        Every feature column is written straight into the preallocated block, so
+        the features are copied exactly once, regardless of how many blocks the
+        input DataFrame holds or of a dtype conversion.
+
+        Parameters
+        ----------
+        profiles : pd.DataFrame
+            Profiles with numeric feature columns.
+        features : list of str
+            Feature columns to copy into the block.
+        metadata_columns : list of str, optional
+            Columns to keep as metadata. Defaults to all non-feature columns in
+            their original order.
+        dtype : dtype-like, optional
+            Float dtype of the block. Defaults to float32 if all features are
+            float32, and float64 otherwise.
+        copy : bool, default True
+            If False and the features already share a single block of ``dtype``,
+            ``values`` is a view of that block instead of a copy. Only use this
+            when ``values`` is not modified in place.
+
+        Returns
+        -------
+        ProfileMatrix
+            The profiles as a feature block plus metadata.
+        """
+
+        if dtype is None:
+            # Nullable pandas dtypes are resolved to their NumPy counterparts
+            feature_dtypes = [
+                feature_dtype
+                if isinstance(feature_dtype, np.dtype)
+                else np.dtype(getattr(feature_dtype, "numpy_dtype", object))
+                for feature_dtype in profiles.dtypes[features]
+            ]
+            dtype = np.result_type(np.float32, *feature_dtypes)
+            if not np.issubdtype(dtype, np.floating):
+                dtype = np.float64
+        dtype = np.dtype(dtype)
+
+        if not copy and all(
+            feature_dtype == dtype for feature_dtype in profiles.dtypes[features]
+        ):
+            values = np.asfortranarray(profiles.loc[:, features].to_numpy())
+        else:
+            values = np.empty(
+                (profiles.shape[0], len(features)), dtype=dtype, order="F"
+            )
+            for idx, feature in enumerate(features):
+                values[:, idx] = profiles[feature].to_numpy()
+
+        if metadata_columns is None:
+            feature_set = set(features)
+            metadata_columns = [
+                column for column in profiles.columns if column not in feature_set
+            ]
+
+        return cls(
+            values=values, features=features, metadata=profiles.loc[:, metadata_columns]
+        )
+
+    def feature_frame(self) -> pd.DataFrame:
+        """Wrap the feature block in a DataFrame without copying it.
+
+        Returns
+        -------
+        pd.DataFrame
+            Features with the metadata index, sharing memory with ``values``.
+        """
+
+        return pd.DataFrame(
+            self.values,
+            columns=pd.Index(self.features),
+            index=self.metadata.index,
+            copy=False,
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Convert the matrix into a profiles DataFrame.
+
+        Returns
+        -------
+        pd.DataFrame
+            Metadata columns followed by the features. The features share memory
+            with ``values``.
+        """
+
+        return pd.concat(
+            [self.metadata, self.feature_frame()], axis="columns", copy=False
+        )
@@ -0,0 +1,166 @@
+"""
+Reusable selection of the reference samples of a profile table
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+class SampleSelection:
+    """Rows of a profile table chosen by a ``samples`` query, evaluated once.
+
+    Pipeline functions take ``samples`` as a ``pd.DataFrame.query()`` string.
+    Evaluating the query with ``DataFrame.query()`` parses it again and copies
+    every column of the matching rows. A SampleSelection evaluates the query once
+    into a boolean mask over the rows of one table. It is accepted wherever
+    ``samples`` is, and selects the rows (and only the requested columns) of that
+    table without evaluating the query again.
+
+    Attributes
+    ----------
+    mask : np.ndarray
+        Boolean array with one entry per row of the table.
+    index : pd.Index
+        Row index of the table the selection was made on.
+    query : str
+        The query the mask was evaluated from, "all" if every row is selected.
+    n_samples : int
+        Number of selected rows.
+    """
+
+    def __init__(self, mask: np.ndarray, index: pd.Index, query: str = "<mask>"):
+        mask = np.asarray(mask)
+        if mask.dtype != bool or mask.shape != (len(index),):
+            raise ValueError(
+                f"The sample mask must be a boolean array with one entry for each "
+                f"of the {len(index)} profiles"
+            )
+
+        self.mask = mask
+        self.index = index
+        self.query = query
+        self.n_samples = int(np.count_nonzero(mask))
+
+    @classmethod
+    def from_query(
+        cls, profiles: pd.DataFrame, samples: Union[str, "SampleSelection"] = "all"
+    ) -> "SampleSelection":
+        """Evaluate a ``samples`` query on a table of profiles.
+
+        Parameters
+        ----------
+        profiles : pd.DataFrame
+            Profiles holding the columns of the query.
+        samples : str or SampleSelection, default "all"
+            ``pd.DataFrame.query()`` expression, such as
+            "Metadata_treatment == 'control'", or "all" to select every row. A
+            SampleSelection is checked against ``profiles`` and returned as is.
+
+        Returns
+        -------
+        SampleSelection
+            The selected rows of ``profiles``.
+        """
+
+        if isinstance(samples, SampleSelection):
+            samples.check_profiles(profiles)
+            return samples
+
+        if samples == "all":
+            return cls(np.ones(profiles.shape[0], dtype=bool), profiles.index, "all")
+
+        result = profiles.eval(samples)
+        if not (isinstance(result, pd.Series) and pd.api.types.is_bool_dtype(result)):
+            raise ValueError(
+                f"The samples query {samples} does not evaluate to one boolean per "
+                "profile"
+            )
+
+        return cls(result.to_numpy(dtype=bool), profiles.index, samples)
+
+    def __repr__(self) -> str:
+        return (
+            f"SampleSelection({self.query!r}, {self.n_samples} of "
+            f"{self.mask.shape[0]} profiles)"
+        )
+
+    def __str__(self) -> str:
+        return self.query
+
+    @property
+    def is_all(self) -> bool:
+        """Whether every row is selected."""
+        return self.n_samples == self.mask.shape[0]
+
+    def check_profiles(self, profiles: pd.DataFrame):
+        """Check that the selection was made on a table with the rows of ``profiles``.
+
+        Parameters
+        ----------
+        profiles : pd.DataFrame
+            Profiles to select rows of.
+        """
+
+        if profiles.shape[0] != self.mask.shape[0] or not (
+            profiles.index is self.index or profiles.index.equals(self.index)
+        ):
+            raise ValueError(
+                f"The sample selection {self.query} was made on a different table "
+                "of profiles"
+            )
+
+    def select(
+        self, profiles: pd.DataFrame, columns: Optional[list[str]] = None
+    ) -> pd.DataFrame:
+        """Select the rows, and optionally the columns, of ``profiles``.
+
+        Parameters
+        ----------
+        profiles : pd.DataFrame
+            Profiles of the table the selection was made on.
+        columns : list of str, optional
+            Columns to keep. Only these columns of the selected rows are copied.
+
+        Returns
+        -------
+        pd.DataFrame
+            The selected profiles. ``profiles`` itself if every row and column is
+            selected.
+        """
+
+        self.check_profiles(profiles)
+
+        if self.is_all:
+            return profiles if columns is None else profiles.loc[:, columns]
+
+        if columns is None:
+            return profiles.loc[self.mask]
+
+        return profiles.loc[self.mask, columns]
+
+
+def select_samples(
+    profiles: pd.DataFrame,
+    samples: Union[str, SampleSelection] = "all",
+    columns: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """Select the rows of a ``samples`` query or selection, and optionally columns.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Profiles to select rows of.
+    samples : str or SampleSelection, default "all"
+        Query or selection, see :meth:`SampleSelection.from_query`.
+    columns : list of str, optional
+        Columns to keep. Only these columns of the selected rows are copied.
+
+    Returns
+    -------
+    pd.DataFrame
+        The selected profiles.
+    """
+
+    return SampleSelection.from_query(profiles, samples).select(profiles, columns)
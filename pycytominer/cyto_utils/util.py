@@ -5,19 +5,28 @@ Miscellaneous utility functions
 import inspect
 import os
 import warnings
+from collections.abc import Iterator
 from functools import wraps
-from typing import Callable, Literal, Union, cast
+from typing import Callable, Literal, Optional, Union, cast
 
 import numpy as np
 import pandas as pd
 
 from pycytominer.cyto_utils.features import convert_compartment_format_to_list
+from pycytominer.cyto_utils.group_kernels import rank_columns
 from pycytominer.cyto_utils.output import output
 
 default_metadata_file = os.path.join(
     os.path.dirname(__file__), "..", "data", "metadata_feature_dictionary.txt"
 )
 
+# Bytes of a float64 correlation tile computed at a time by correlation_blocks()
+correlation_tile_bytes = 8 * 2**20
+
+# Pairs of correlation tiles with missing values whose variance over the complete
+# samples is below this fraction of their sum of squares are computed again
+correlation_cancellation = 1e-6
+
 
 def get_default_compartments() -> list[str]:
     """Returns default compartments.
@@ -95,13 +104,16 @@ def load_known_metadata_dictionary(
     return metadata_dict
 
 
-def check_correlation_method(method: str) -> Literal["pearson", "kendall", "spearman"]:
+def check_correlation_method(
+    method: str,
+) -> Literal["pearson", "kendall", "spearman", "kendall_approx"]:
     """Confirm that the input method is currently supported.
 
     Parameters
     ----------
     method : str
-        The correlation metric to use.
+        The correlation metric to use. "kendall_approx" approximates Kendall's tau
+        from Spearman correlations, see :func:`correlation_blocks`.
 
     Returns
     -------
@@ -111,14 +123,14 @@ def check_correlation_method(method: str) -> Literal["pearson", "kendall", "spea
     """
 
     method = method.lower()
-    avail_methods = ["pearson", "spearman", "kendall"]
+    avail_methods = ["pearson", "spearman", "kendall", "kendall_approx"]
 
     if method not in avail_methods:
         raise ValueError(
             f"method {method} not supported, select one of {avail_methods}"
         )
 
-    return cast(Literal["pearson", "kendall", "spearman"], method)
+    return cast(Literal["pearson", "kendall", "spearman", "kendall_approx"], method)
 
 
 def check_aggregate_operation(operation: str) -> str:
@@ -137,7 +149,18 @@ def check_aggregate_operation(operation: str) -> str:
     """
 
     operation = operation.lower()
-    avail_ops = ["mean", "median"]
+    avail_ops = [
+        "mean",
+        "median",
+        "approx_median",
+        "trimmed_mean",
+        "weighted_mean",
+        "std",
+        "mad",
+        "q25",
+        "q75",
+        "count",
+    ]
 
     if operation not in avail_ops:
         raise ValueError(
@@ -147,6 +170,187 @@ def check_aggregate_operation(operation: str) -> str:
     return operation
 
 
+def check_aggregate_operations(operations: list[str]) -> list[str]:
+    """Confirm that a list of aggregation operations is currently supported.
+
+    Parameters
+    ----------
+    operations : list of str
+        Aggregation operations to compute together.
+
+    Returns
+    -------
+    list of str
+        Correctly formatted operation methods.
+
+    """
+
+    operations = [check_aggregate_operation(operation) for operation in operations]
+
+    if len(operations) == 0 or len(set(operations)) < len(operations):
+        raise ValueError("operation must list one or more distinct operations")
+
+    return operations
+
+
+def check_aggregate_engine(engine: str) -> str:
+    """Confirm that the input aggregation engine is currently supported.
+
+    Parameters
+    ----------
+    engine : str
+        Aggregation engine to use.
+
+    Returns
+    -------
+    str
+        Correctly formatted engine.
+
+    """
+
+    engine = engine.lower()
+    avail_engines = ["pandas", "numpy"]
+
+    if engine not in avail_engines:
+        raise ValueError(
+            f"engine {engine} not supported, select one of {avail_engines}"
+        )
+
+    return engine
+
+
+def check_n_jobs(n_jobs: int) -> int:
+    """Confirm that the input number of parallel jobs is valid.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Number of parallel jobs. Negative values count back from the number of
+        available CPUs, so -1 uses all CPUs and -2 all but one.
+
+    Returns
+    -------
+    int
+        Number of parallel jobs to use (at least 1).
+
+    """
+
+    if not isinstance(n_jobs, (int, np.integer)) or n_jobs == 0:
+        raise ValueError("n_jobs must be a non-zero integer")
+
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+
+    return int(n_jobs)
+
+
+def check_float_dtype(dtype: np.typing.DTypeLike) -> np.dtype:
+    """Confirm that the input float dtype for feature processing is supported.
+
+    Parameters
+    ----------
+    dtype : dtype-like
+        Float dtype such as "float32", np.float32, or float.
+
+    Returns
+    -------
+    np.dtype
+        The validated dtype.
+
+    """
+
+    avail_dtypes = ["float32", "float64"]
+    try:
+        float_dtype = np.dtype(dtype)
+    except TypeError:
+        float_dtype = None
+
+    if float_dtype is None or float_dtype.name not in avail_dtypes:
+        raise ValueError(f"dtype {dtype} not supported, select one of {avail_dtypes}")
+
+    return float_dtype
+
+
+def check_approx_error(approx_error: float) -> float:
+    """Confirm that the rank error of an approximate aggregation is supported.
+
+    Parameters
+    ----------
+    approx_error : float
+        Target rank error as a fraction of the number of values.
+
+    Returns
+    -------
+    float
+        The validated rank error.
+
+    """
+
+    if not 0 < approx_error < 1:
+        raise ValueError("approx_error must be between 0 and 1 (exclusive)")
+
+    return float(approx_error)
+
+
+def check_trim_fraction(trim_fraction: float) -> float:
+    """Confirm that the fraction trimmed from each tail of a trimmed mean is valid.
+
+    Parameters
+    ----------
+    trim_fraction : float
+        Fraction of the non-missing values to drop from each tail.
+
+    Returns
+    -------
+    float
+        The validated trim fraction.
+
+    """
+
+    if not 0 <= trim_fraction < 0.5:
+        raise ValueError("trim_fraction must be at least 0 and smaller than 0.5")
+
+    return float(trim_fraction)
+
+
+def cast_features(
+    df: pd.DataFrame, features: list[str], dtype: np.typing.DTypeLike
+) -> pd.DataFrame:
+    """Cast the numeric feature columns of a DataFrame to a float dtype.
+
+    Non-numeric columns listed in features (e.g. image payloads) are left as is,
+    as are columns that already have the requested dtype.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame holding the features.
+    features : list of str
+        Feature columns to cast.
+    dtype : dtype-like
+        Float dtype to cast to. See :func:`check_float_dtype`.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with cast feature columns.
+
+    """
+
+    float_dtype = check_float_dtype(dtype)
+    cast_dtypes = {
+        feature: float_dtype
+        for feature in features
+        if pd.api.types.is_numeric_dtype(df[feature])
+        and df[feature].dtype != float_dtype
+    }
+
+    if not cast_dtypes:
+        return df
+
+    return df.astype(cast_dtypes)
+
+
 def check_consensus_operation(operation: str) -> str:
     """Confirm that the input operation for consensus is currently supported.
 
@@ -377,6 +581,447 @@ def extract_image_features(
     return image_features_df
 
 
+def standardize_columns(values: np.ndarray) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """Center and scale every column of a 2D block once, for correlation tiles.
+
+    Pearson correlations do not change under a positive affine transform of each
+    column, so correlations of the standardized columns equal those of the
+    original columns, with less cancellation in the tile sums.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_samples, n_features)``. Missing values are NaN.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray or None)
+        Float64 standardized copy of ``values`` and the float64 mask of its
+        non-missing values. Without missing values, every column has unit norm,
+        constant columns are NaN, and the mask is None. Otherwise, every column has
+        zero mean and unit standard deviation over its non-missing values, which
+        are zero in the copy.
+    """
+
+    standardized = np.array(values, dtype=np.float64, order="F")
+    missing = np.isnan(standardized)
+
+    if not missing.any():
+        standardized -= standardized.mean(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            norms = np.linalg.norm(standardized, axis=0)
+            standardized /= np.where(norms > 0, norms, np.nan)
+        return standardized, None
+
+    valid = (~missing).astype(np.float64)
+    counts = valid.sum(axis=0)
+    standardized[missing] = 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, standardized.sum(axis=0) / counts, 0)
+        standardized -= means
+        standardized[missing] = 0
+        stds = np.sqrt((standardized**2).sum(axis=0) / np.maximum(counts, 1))
+        # Constant columns stay zero, and their correlations NaN
+        standardized /= np.where(stds > 0, stds, 1)
+
+    return standardized, valid
+
+
+def correlation_blocks(
+    values: np.ndarray, block_columns: Optional[int] = None, method: str = "pearson"
+) -> Iterator[tuple[int, int, np.ndarray]]:
+    """Compute the correlation matrix of the columns of a block tile by tile.
+
+    The columns are standardized once (see :func:`standardize_columns`), and every
+    tile of ``block_columns x block_columns`` correlations is computed with BLAS
+    matrix products, so only the tiles (and not the ``d x d`` matrix) are held in
+    memory. Without missing values a tile is a single product. With missing
+    values, correlations are computed over the pairwise-complete samples, like
+    ``pd.DataFrame.corr()``: the counts, sums, and sums of squares of every pair
+    are products of the values and their non-missing masks. Pairs whose complete
+    samples lose their variance to cancellation in these sums (see
+    ``correlation_cancellation``) are computed again, centered around the means
+    of their complete samples.
+
+    Spearman correlations are the Pearson correlations of the average ranks of
+    every column (see :func:`pycytominer.cyto_utils.group_kernels.rank_columns`).
+    Like ``pd.DataFrame.corr(method="spearman")``, pairs with a column with missing
+    values are ranked again among their pairwise-complete samples, which takes a
+    sort per pair instead of a matrix product. "kendall_approx" converts Spearman correlations to Kendall's tau with the relation of the
+    Gaussian copula, ``tau = 2 / pi * arcsin(2 * sin(pi / 6 * rho))``, which only
+    takes one ranking of every column instead of comparing all pairs of samples of
+    every pair of columns.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_samples, n_features)``. Missing values are NaN.
+        Infinite values are missing too, like in ``pd.DataFrame.corr()``.
+    block_columns : int, optional
+        Number of columns per tile. Defaults to the number of columns of a float64
+        tile of at most ``correlation_tile_bytes``.
+    method : str, default "pearson"
+        "pearson", "spearman", or "kendall_approx".
+
+    Yields
+    ------
+    tuple of (int, int, np.ndarray)
+        The first columns ``start_a <= start_b`` of the tile and the correlations
+        between columns ``start_a:start_a + block_columns`` (rows of the tile) and
+        ``start_b:start_b + block_columns``. Correlations of constant columns, or
+        of pairs with fewer than two complete samples, are NaN.
+    """
+
+    method = check_correlation_method(method)
+    if method == "kendall":
+        raise ValueError(
+            "Kendall correlations are not computed in tiles, use kendall_approx"
+        )
+
+    if np.isinf(values).any():
+        values = np.where(np.isinf(values), np.nan, values)
+
+    n_features = values.shape[1]
+    if block_columns is None:
+        block_columns = max(1, int(np.sqrt(correlation_tile_bytes / 8)))
+
+    if method == "kendall_approx":
+        for start_a, start_b, tile in correlation_blocks(
+            values, block_columns, method="spearman"
+        ):
+            tile = np.arcsin(2 * np.sin(np.pi / 6 * tile), out=tile)
+            yield start_a, start_b, np.multiply(tile, 2 / np.pi, out=tile)
+        return
+
+    if method == "spearman":
+        has_missing = np.isnan(values).any(axis=0)
+        for start_a, start_b, tile in correlation_blocks(
+            rank_columns(values), block_columns
+        ):
+            # Columns with missing values are ranked again among the complete
+            # rows of every pair
+            rows, columns = np.nonzero(
+                has_missing[start_a : start_a + block_columns, np.newaxis]
+                | has_missing[np.newaxis, start_b : start_b + block_columns]
+            )
+            # A tile on the diagonal holds every pair twice
+            is_pair = start_a + rows <= start_b + columns
+            rows, columns = rows[is_pair], columns[is_pair]
+            if rows.shape[0] > 0:
+                tile[rows, columns] = _pairwise_complete_rank_correlations(
+                    values, start_a + rows, start_b + columns
+                )
+                if start_a == start_b:
+                    tile[columns, rows] = tile[rows, columns]
+            yield start_a, start_b, np.clip(tile, -1, 1, out=tile)
+        return
+
+    standardized, valid = standardize_columns(values)
+
+    for start_a in range(0, n_features, block_columns):
+        block_a = slice(start_a, start_a + block_columns)
+        values_a = standardized[:, block_a]
+        if valid is not None:
+            valid_a = valid[:, block_a]
+            squares_a = values_a**2
+
+        for start_b in range(start_a, n_features, block_columns):
+            block_b = slice(start_b, start_b + block_columns)
+            values_b = standardized[:, block_b]
+
+            if valid is None:
+                tile = values_a.T @ values_b
+                yield start_a, start_b, np.clip(tile, -1, 1, out=tile)
+                continue
+
+            valid_b = valid[:, block_b]
+            counts = valid_a.T @ valid_b
+            sums_a = values_a.T @ valid_b
+            sums_b = valid_a.T @ values_b
+            square_sums_a = squares_a.T @ valid_b
+            square_sums_b = valid_a.T @ values_b**2
+            with np.errstate(invalid="ignore", divide="ignore"):
+                covariances = values_a.T @ values_b - sums_a * sums_b / counts
+                variances_a = square_sums_a - sums_a**2 / counts
+                variances_b = square_sums_b - sums_b**2 / counts
+                denominators = np.sqrt(variances_a * variances_b)
+                tile = np.where(
+                    (counts > 1) & (denominators > 0),
+                    covariances / denominators,
+                    np.nan,
+                )
+
+            # The columns are centered over all of their non-missing samples, so
+            # a pair whose complete samples have a mean far from the column mean
+            # (e.g. an outlier masked by the partner column) loses its variance
+            # to cancellation, and is computed again around its pairwise means
+            rows, columns = np.nonzero(
+                (counts > 1)
+                & (
+                    (variances_a < correlation_cancellation * square_sums_a)
+                    | (variances_b < correlation_cancellation * square_sums_b)
+                )
+            )
+            if rows.shape[0] > 0:
+                tile[rows, columns] = _pairwise_complete_correlations(
+                    values, start_a + rows, start_b + columns
+                )
+            yield start_a, start_b, np.clip(tile, -1, 1, out=tile)
+
+
+def _pairwise_complete_correlations(
+    values: np.ndarray, pair_a: np.ndarray, pair_b: np.ndarray
+) -> np.ndarray:
+    """Pearson correlations of pairs of columns, centered over their complete rows.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_samples, n_features)``. Missing values are NaN.
+    pair_a, pair_b : np.ndarray
+        Positions of both columns of every pair.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 correlations of the pairs, NaN for pairs with a constant column or
+        fewer than two complete samples.
+    """
+
+    correlations = np.full(pair_a.shape[0], np.nan)
+    for column, chunk in _pair_chunks(values.shape[0], pair_a):
+        values_a = values[:, [column]].astype(np.float64)
+        values_b = values[:, pair_b[chunk]].astype(np.float64)
+        complete = ~np.isnan(values_a) & ~np.isnan(values_b)
+        counts = complete.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centered_a = np.where(complete, values_a, 0)
+            centered_a -= centered_a.sum(axis=0) / counts
+            centered_a[~complete] = 0
+            centered_b = np.where(complete, values_b, 0)
+            centered_b -= centered_b.sum(axis=0) / counts
+            centered_b[~complete] = 0
+            denominators = np.sqrt(
+                (centered_a**2).sum(axis=0) * (centered_b**2).sum(axis=0)
+            )
+            correlations[chunk] = np.where(
+                (counts > 1) & (denominators > 0),
+                (centered_a * centered_b).sum(axis=0) / denominators,
+                np.nan,
+            )
+    return correlations
+
+
+def _pairwise_complete_rank_correlations(
+    values: np.ndarray, pair_a: np.ndarray, pair_b: np.ndarray
+) -> np.ndarray:
+    """Spearman correlations of pairs of columns, ranked among their complete rows.
+
+    Every column is sorted once. The ranks of a column among the complete rows of
+    a pair are the cumulative counts of the complete rows in its sort order, with
+    ties averaged over the complete rows of their run, so no pair is sorted again.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_samples, n_features)``. Missing values are NaN.
+    pair_a, pair_b : np.ndarray
+        Positions of both columns of every pair.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 correlations of the pairs, NaN for pairs with a constant column or
+        fewer than two complete samples.
+    """
+
+    valid = ~np.isnan(values)
+    columns = np.union1d(pair_a, pair_b)
+    # NaNs are sorted as +inf, and are never complete
+    sorted_values = np.where(valid[:, columns], values[:, columns], np.inf)
+    orders = np.argsort(sorted_values, axis=0)
+    sorted_values = np.take_along_axis(sorted_values, orders, axis=0)
+    starts_run = np.ones(sorted_values.shape, dtype=bool)
+    np.not_equal(sorted_values[1:], sorted_values[:-1], out=starts_run[1:])
+    del sorted_values
+    positions = np.searchsorted(columns, np.arange(values.shape[1]))
+
+    correlations = np.full(pair_a.shape[0], np.nan)
+    for column, chunk in _pair_chunks(values.shape[0], pair_a):
+        a, b = positions[[column]], positions[pair_b[chunk]]
+        complete = valid[:, [column]] & valid[:, pair_b[chunk]]
+        ranks_a = _centered_complete_ranks(orders[:, a], starts_run[:, a], complete)
+        ranks_b = _centered_complete_ranks(orders[:, b], starts_run[:, b], complete)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            denominators = np.sqrt(
+                np.einsum("ij,ij->j", ranks_a, ranks_a)
+                * np.einsum("ij,ij->j", ranks_b, ranks_b)
+            )
+            correlations[chunk] = np.where(
+                (complete.sum(axis=0) > 1) & (denominators > 0),
+                np.einsum("ij,ij->j", ranks_a, ranks_b) / denominators,
+                np.nan,
+            )
+    return correlations
+
+
+def _pair_chunks(
+    n_samples: int, pair_a: np.ndarray
+) -> Iterator[tuple[int, np.ndarray]]:
+    """Every first column of the pairs and chunks of the positions of its pairs,
+    so that a chunk of partner columns fits in a correlation tile."""
+    chunk_columns = max(1, correlation_tile_bytes // (8 * max(n_samples, 1)))
+    for column in np.unique(pair_a):
+        positions = np.flatnonzero(pair_a == column)
+        for start in range(0, positions.shape[0], chunk_columns):
+            yield int(column), positions[start : start + chunk_columns]
+
+
+def _centered_complete_ranks(
+    orders: np.ndarray, starts_run: np.ndarray, complete: np.ndarray
+) -> np.ndarray:
+    """Average ranks of sorted columns among their complete rows, minus their mean.
+
+    Parameters
+    ----------
+    orders : np.ndarray
+        Row order of every sorted column, of shape ``(n_samples, 1)`` or the shape
+        of ``complete``.
+    starts_run : np.ndarray
+        Whether every sorted value starts a run of tied values, like orders.
+    complete : np.ndarray
+        Boolean block of the rows to rank, of shape ``(n_samples, n_pairs)``.
+
+    Returns
+    -------
+    np.ndarray
+        Float64 centered ranks in row order, zero outside of the complete rows.
+    """
+
+    n_samples = complete.shape[0]
+    sorted_complete = np.take_along_axis(complete, orders, axis=0)
+    counts = np.cumsum(sorted_complete, axis=0)
+    if starts_run.all():
+        sorted_ranks = counts.astype(np.float64)
+    else:
+        starts_run = np.broadcast_to(starts_run, complete.shape)
+        # Complete rows before the run and up to its end, by forward and backward
+        # fills of the cumulative counts at the run boundaries
+        counts_before = np.maximum.accumulate(
+            np.where(starts_run, counts - sorted_complete, 0), axis=0
+        )
+        ends_run = np.ones(complete.shape, dtype=bool)
+        ends_run[:-1] = starts_run[1:]
+        counts_after = np.minimum.accumulate(
+            np.where(ends_run, counts, n_samples)[::-1], axis=0
+        )[::-1]
+        sorted_ranks = (counts_before + 1 + counts_after) / 2
+
+    # Average ranks of c complete rows sum to c (c + 1) / 2
+    sorted_ranks -= (counts[-1] + 1) / 2
+    sorted_ranks[~sorted_complete] = 0
+
+    ranks = np.empty(complete.shape)
+    np.put_along_axis(
+        ranks, np.broadcast_to(orders, complete.shape), sorted_ranks, axis=0
+    )
+    return ranks
+
+
+def correlation_pairs(
+    values: np.ndarray,
+    threshold: float,
+    abs_sums: Optional[np.ndarray] = None,
+    block_columns: Optional[int] = None,
+    method: str = "pearson",
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Find the pairs of columns whose correlation is above a threshold.
+
+    The correlation tiles of :func:`correlation_blocks` are reduced to the pairs
+    above the threshold as they are computed, so memory is bounded by a tile and
+    the selected pairs.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D block of shape ``(n_samples, n_features)``, see
+        :func:`correlation_blocks`.
+    threshold : float
+        Pairs with a correlation strictly greater than the threshold are yielded.
+        NaN correlations never pass it.
+    abs_sums : np.ndarray, optional
+        Float64 array of shape ``(n_features,)``. If given, the absolute
+        correlations of every column with all columns (itself included, NaNs
+        skipped) are added to it, which are complete once all pairs are yielded.
+    block_columns : int, optional
+        Number of columns per tile, see :func:`correlation_blocks`.
+    method : str, default "pearson"
+        "pearson", "spearman", or "kendall_approx", see :func:`correlation_blocks`.
+
+    Yields
+    ------
+    tuple of (np.ndarray, np.ndarray, np.ndarray)
+        For the pairs of one tile, the positions ``pair_a > pair_b`` of both
+        columns and their correlations.
+    """
+
+    for start_a, start_b, tile in correlation_blocks(values, block_columns, method):
+        if abs_sums is not None:
+            abs_tile = np.abs(tile)
+            abs_sums[start_a : start_a + tile.shape[0]] += np.nansum(abs_tile, axis=1)
+            if start_b != start_a:
+                # The tile below the diagonal is the transpose of this one
+                abs_sums[start_b : start_b + tile.shape[1]] += np.nansum(
+                    abs_tile, axis=0
+                )
+
+        rows, columns = np.nonzero(tile > threshold)
+        pair_a, pair_b = start_b + columns, start_a + rows
+        is_pair = pair_a > pair_b
+        yield pair_a[is_pair], pair_b[is_pair], tile[rows[is_pair], columns[is_pair]]
+
+
+def get_correlation_matrix(
+    population_df: pd.DataFrame, method: str = "pearson"
+) -> pd.DataFrame:
+    """Given a population dataframe, calculate the correlation matrix of its columns.
+
+    Parameters
+    ----------
+    population_df : pd.DataFrame
+        Includes only observation features.
+    method : str, default "pearson"
+        Which correlation method to use. All correlations but exact Kendall
+        correlations are assembled from the tiles of :func:`correlation_blocks`.
+
+    Returns
+    -------
+    pd.DataFrame
+        A symmetrical correlation matrix, indexed by the columns of population_df.
+    """
+
+    # Check that the input method is supported
+    corrected_method = check_correlation_method(method)
+
+    # Get a symmetrical correlation matrix. Use the correlation tiles for all
+    # methods but exact Kendall correlations.
+    if corrected_method != "kendall":
+        values = population_df.to_numpy(dtype=np.float64)
+        data_cor = np.empty((values.shape[1], values.shape[1]))
+        for start_a, start_b, tile in correlation_blocks(
+            values, method=corrected_method
+        ):
+            block_a = slice(start_a, start_a + tile.shape[0])
+            block_b = slice(start_b, start_b + tile.shape[1])
+            data_cor[block_a, block_b] = tile
+            data_cor[block_b, block_a] = tile.T
+
+        pop_names = population_df.columns
+        return pd.DataFrame(data_cor, index=pop_names, columns=pop_names)
+
+    return population_df.corr(method=corrected_method)
+
+
 def get_pairwise_correlation(
     population_df: pd.DataFrame, method: str = "pearson"
 ) -> tuple[pd.DataFrame, pd.DataFrame]:
@@ -395,33 +1040,17 @@ def get_pairwise_correlation(
         The second is a long format DataFrame of pairwise correlations.
     """
 
-    # Check that the input method is supported
-    corrected_method: Literal["pearson", "kendall", "spearman"] = (
-        check_correlation_method(method)
-    )
-
-    # Get a symmetrical correlation matrix. Use numpy for non NaN/Inf matrices.
-    has_nan = np.any(np.isnan(population_df.values))
-    has_inf = np.any(np.isinf(population_df.values))
-    if corrected_method == "pearson" and not (has_nan or has_inf):
-        pop_names = population_df.columns
-        data_cor_df = pd.DataFrame(
-            np.corrcoef(population_df.transpose()), index=pop_names, columns=pop_names
-        )
-    else:
-        data_cor_df = population_df.corr(method=corrected_method)
-
-    # Create a copy of the dataframe to generate upper triangle of zeros
-    data_cor_natri_df = data_cor_df.copy()
-
-    # Replace upper triangle in correlation matrix with NaN
-    data_cor_natri_df = data_cor_natri_df.where(
-        np.tril(np.ones(data_cor_natri_df.shape), k=-1).astype(bool)
-    )
-
-    # Acquire pairwise correlations in a long format
-    # Note that we are using the NaN upper triangle DataFrame
-    pairwise_df = data_cor_natri_df.stack().reset_index()
-    pairwise_df.columns = pd.Index(["pair_a", "pair_b", "correlation"])
+    data_cor_df = get_correlation_matrix(population_df, method=method)
+
+    # Acquire the pairwise correlations of the lower triangle in a long format,
+    # in row-major order and without missing correlations
+    pair_a, pair_b = np.tril_indices(data_cor_df.shape[0], k=-1)
+    correlations = data_cor_df.to_numpy()[pair_a, pair_b]
+    is_valid = ~np.isnan(correlations)
+    pairwise_df = pd.DataFrame({
+        "pair_a": data_cor_df.index[pair_a[is_valid]],
+        "pair_b": data_cor_df.columns[pair_b[is_valid]],
+        "correlation": correlations[is_valid],
+    })
 
     return data_cor_df, pairwise_df
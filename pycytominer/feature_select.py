@@ -2,23 +2,21 @@
 Select features to use in downstream analysis based on specified selection method
 """
 
-from typing import Any, Literal, Optional, Union
+from typing import Any, Literal, Optional, Union, cast
 
+import numpy as np
 import pandas as pd
 
 from pycytominer.cyto_utils import (
-    drop_outlier_features,
+    SampleSelection,
+    cast_features,
     get_blocklist_features,
     infer_cp_features,
     load_profiles,
 )
 from pycytominer.cyto_utils.util import write_to_file_if_user_specifies_output_details
-from pycytominer.operations import (
-    correlation_threshold,
-    get_na_columns,
-    noise_removal,
-    variance_threshold,
-)
+from pycytominer.operations import FeatureStatistics, correlation_threshold
+from pycytominer.operations.feature_statistics import operation_statistics
 
 
 @write_to_file_if_user_specifies_output_details
@@ -26,7 +24,7 @@ def feature_select(
     profiles: Union[str, pd.DataFrame],
     features: Union[str, list[str]] = "infer",
     image_features: bool = False,
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     operation: Union[str, list[str]] = "variance_threshold",
     output_file: Optional[str] = None,
     output_type: Optional[
@@ -43,6 +41,7 @@ def feature_select(
     outlier_cutoff: float = 500.0,
     noise_removal_perturb_groups: Optional[Union[str, list[str]]] = None,
     noise_removal_stdev_cutoff: Optional[float] = None,
+    dtype: Optional[np.typing.DTypeLike] = None,
 ) -> Union[pd.DataFrame, str]:
     """Performs feature selection based on the given operation.
 
@@ -61,10 +60,17 @@ def feature_select(
         non-numeric ``Image_*`` columns, which helps avoid treating image
         payload columns as profile features in mixed tables such as
         OME-Arrow-backed inputs.
-    samples : str, default "all"
-        Samples to provide operation on.
+    samples : str or SampleSelection, default "all"
+        Samples to provide operation on. A pd.DataFrame.query() expression, such as
+        "Metadata_treatment == 'control'", which is evaluated once and shared by all
+        operations.
     operation: list of str or str, default "variance_threshold
-        Operations to perform on the input profiles.
+        Operations to perform on the input profiles, in order. The statistics of
+        variance_threshold, drop_na_columns, drop_outliers, and noise_removal are
+        computed together in one scan over the features (see
+        :class:`pycytominer.operations.feature_statistics.FeatureStatistics`), and
+        correlation_threshold is computed on the features that remain after the
+        operations listed before it.
     output_file : str, optional
         If provided, will write feature selected profiles to file. If not specified, will
         return the feature selected profiles as output. We recommend that this output file be
@@ -77,7 +83,8 @@ def feature_select(
     corr_threshold : float, default 0.9
         Value between (0, 1) to exclude features above if any two features are correlated above this threshold.
     corr_method : str, default "pearson"
-        Correlation type to compute. Allowed methods are "spearman", "kendall" and "pearson".
+        Correlation type to compute. Allowed methods are "spearman", "kendall",
+        "kendall_approx" and "pearson".
     freq_cut : float, default 0.05
         Ratio (2nd most common feature val / most common). Must range between 0 and 1.
         Remove features lower than freq_cut. A low freq_cut will remove features
@@ -102,6 +109,8 @@ def feature_select(
         Perturbation groups corresponding to rows in profiles or the the name of the metadata column containing this information.
     noise_removal_stdev_cutoff: float,optional
         Maximum mean feature standard deviation to be kept for noise removal, grouped by the identity of the perturbation from perturb_list. The data must already be normalized so that this cutoff can apply to all columns.
+    dtype : dtype-like, optional
+        Float dtype of the numeric features, one of ['float32', 'float64']. Features are cast before feature selection and returned in this dtype. If not specified, input dtypes are kept.
 
     Returns
     -------
@@ -143,24 +152,42 @@ def feature_select(
 
     if features == "infer":
         features = infer_cp_features(profiles, image_features=image_features)
+    elif isinstance(features, str):
+        features = [features]
+
+    if dtype is not None:
+        profiles = cast_features(profiles, features=features, dtype=dtype)
+
+    # Evaluate the sample query once and share the selected rows across operations
+    samples = SampleSelection.from_query(profiles, samples)
+
+    if "noise_removal" in operation and (
+        noise_removal_perturb_groups is None or noise_removal_stdev_cutoff is None
+    ):
+        raise ValueError(
+            "If using noise_removal, must provide both noise_removal_perturb_groups and noise_removal_stdev_cutoff"
+        )
+
+    # Compute the statistics of all operations that exclude features one by one in
+    # a single scan. As these exclusions do not depend on other features, they are
+    # the same for the features left by the operations before them.
+    if any(op in operation_statistics for op in operation):
+        statistics = FeatureStatistics.from_profiles(
+            profiles,
+            features=features,
+            samples=samples,
+            operations=operation,
+            noise_removal_perturb_groups=noise_removal_perturb_groups,
+        )
 
     excluded_features = []
     for op in operation:
         if op == "variance_threshold":
-            exclude = variance_threshold(
-                population_df=profiles,
-                features=features,
-                samples=samples,
-                freq_cut=freq_cut,
-                unique_cut=unique_cut,
+            exclude = statistics.variance_threshold(
+                freq_cut=freq_cut, unique_cut=unique_cut
             )
         elif op == "drop_na_columns":
-            exclude = get_na_columns(
-                population_df=profiles,
-                features=features,
-                samples=samples,
-                cutoff=na_cutoff,
-            )
+            exclude = statistics.get_na_columns(cutoff=na_cutoff)
         elif op == "correlation_threshold":
             exclude = correlation_threshold(
                 population_df=profiles,
@@ -177,30 +204,14 @@ def feature_select(
             else:
                 exclude = get_blocklist_features(population_df=profiles)
         elif op == "drop_outliers":
-            exclude = drop_outlier_features(
-                population_df=profiles,
-                features=features,
-                samples=samples,
-                outlier_cutoff=outlier_cutoff,
-            )
+            exclude = statistics.drop_outlier_features(outlier_cutoff=outlier_cutoff)
         elif op == "noise_removal":
-            if (
-                noise_removal_perturb_groups is None
-                or noise_removal_stdev_cutoff is None
-            ):
-                raise ValueError(
-                    "If using noise_removal, must provide both noise_removal_perturb_groups and noise_removal_stdev_cutoff"
-                )
-
-            exclude = noise_removal(
-                population_df=profiles,
-                features=features,
-                samples=samples,
-                noise_removal_perturb_groups=noise_removal_perturb_groups,
-                noise_removal_stdev_cutoff=noise_removal_stdev_cutoff,
+            exclude = statistics.noise_removal(
+                noise_removal_stdev_cutoff=cast(float, noise_removal_stdev_cutoff)
             )
         excluded_features += exclude
-        features = [feat for feat in features if feat not in excluded_features]
+        excluded = set(excluded_features)
+        features = [feat for feat in features if feat not in excluded]
 
     excluded_features = list(set(excluded_features))
 
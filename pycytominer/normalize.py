@@ -2,16 +2,47 @@
 Normalize observation features based on specified normalization method
 """
 
+import functools
+import os
+import pathlib
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Literal, Optional, Union
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.base import clone
 from sklearn.preprocessing import RobustScaler, StandardScaler
 
 from pycytominer.cyto_utils.features import infer_cp_features
-from pycytominer.cyto_utils.load import load_profiles
-from pycytominer.cyto_utils.util import write_to_file_if_user_specifies_output_details
-from pycytominer.operations import RobustMAD, Spherize
+from pycytominer.cyto_utils.group_kernels import factorize_strata, sort_by_group
+from pycytominer.cyto_utils.load import (
+    coerce_missing_value_strings,
+    load_parquet_batches,
+    load_parquet_schema,
+    load_profiles,
+)
+from pycytominer.cyto_utils.normalizer_states import (
+    NormalizerAccumulator,
+    NormalizerState,
+)
+from pycytominer.cyto_utils.profile_matrix import ProfileMatrix
+from pycytominer.cyto_utils.sample_selection import SampleSelection
+from pycytominer.cyto_utils.util import (
+    check_approx_error,
+    check_float_dtype,
+    check_n_jobs,
+    write_to_file_if_user_specifies_output_details,
+)
+from pycytominer.operations import RankTransform, RobustMAD, Spherize
+
+# Number of reference rows per StandardScaler.partial_fit() call
+standardize_fit_batch_size = 8192
+
+# Number of rows scaled at once by the per-group transforms of normalize(groupby=...)
+groupby_transform_batch_size = 8192
 
 
 @write_to_file_if_user_specifies_output_details
@@ -20,7 +51,7 @@ def normalize(
     features: Union[str, list[str]] = "infer",
     image_features: bool = False,
     meta_features: Union[str, list[str]] = "infer",
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     method: str = "standardize",
     output_file: Optional[str] = None,
     output_type: Optional[
@@ -32,6 +63,9 @@ def normalize(
     spherize_center: bool = True,
     spherize_method: str = "ZCA-cor",
     spherize_epsilon: float = 1e-6,
+    dtype: Optional[np.typing.DTypeLike] = None,
+    groupby: Optional[Union[str, list[str]]] = None,
+    n_jobs: int = 1,
 ) -> Union[pd.DataFrame, str]:
     """Normalize profiling features
 
@@ -62,14 +96,22 @@ def normalize(
         DataFrame. All features listed must be found in `profiles`. Defaults to "infer".
         If "infer", then assume CellProfiler metadata features, identified by
         column names that begin with the `Metadata_` prefix."
-    samples : str
+    samples : str or SampleSelection
         The metadata column values to use as a normalization reference. We often use
         control samples. The function uses a pd.query() function, so you should
         structure samples in this fashion. An example is
         "Metadata_treatment == 'control'" (include all quotes). Defaults to "all".
+        A SampleSelection of the profiles reuses a query that was already evaluated.
     method : str
         How to normalize the dataframe. Defaults to "standardize". Check avail_methods
-        for available normalization methods.
+        for available normalization methods. "quantile" replaces every value by
+        the fraction of reference samples below it, and "rank_int" applies the
+        rank-based inverse normal transform (see
+        :class:`pycytominer.operations.RankTransform`); both rank the profiles
+        among the reference samples of their feature. "control_zscore" is a
+        robust z-score, ``(x - median) / (IQR / 1.349)``, of the reference
+        samples (usually controls, see ``samples``), which is fit per plate: its
+        groupby defaults to "Metadata_Plate" when the profiles have that column.
     output_file : str, optional
         If provided, will write normalized profiles to file. If not specified, will
         return the normalized profiles as output. We recommend that this output file be
@@ -98,6 +140,21 @@ def normalize(
     spherize_epsilon : float, default 1e-6.
         The sphering (aka whitening) fudge factor parameter. The function only uses
         this variable if method = "spherize".
+    dtype : dtype-like, optional
+        Float dtype of the features, one of ['float32', 'float64']. Features are
+        cast before normalization and the normalized features are returned in this
+        dtype. The spherize transform is always fit in float64. If not specified,
+        the scaler output dtype is kept.
+    groupby : str or list of str, optional
+        Metadata column(s) defining groups, e.g. "Metadata_Plate", that are
+        normalized separately. One scaler is fit per group on the rows of the group
+        that match ``samples``, and all groups are transformed in one pass over the
+        feature block. Every group needs at least one reference sample. Defaults to
+        "Metadata_Plate", if present, for method "control_zscore".
+    n_jobs : int, default 1
+        Number of processes fitting the per-group scalers when groupby is set. -1
+        uses all CPUs. Processes are worth their startup cost for large groups or
+        for the robustize, mad_robustize, and spherize methods.
 
     Returns
     -------
@@ -157,17 +214,578 @@ def normalize(
     # Load Data
     profiles = load_profiles(profiles)
 
+    if dtype is not None:
+        dtype = check_float_dtype(dtype)
+    n_jobs = check_n_jobs(n_jobs)
+
+    method, scaler = _build_scaler(
+        method,
+        mad_robustize_epsilon=mad_robustize_epsilon,
+        spherize_center=spherize_center,
+        spherize_method=spherize_method,
+        spherize_epsilon=spherize_epsilon,
+    )
+    features = _check_features(profiles, features, image_features=image_features)
+    meta_features, passthrough_image_columns = _check_meta_features(
+        profiles, features, meta_features
+    )
+
+    # Control z-scores are computed against the controls of every plate
+    if (
+        method == "control_zscore"
+        and groupby is None
+        and "Metadata_Plate" in profiles.columns
+    ):
+        groupby = "Metadata_Plate"
+
+    # Evaluate the sample query once
+    samples = SampleSelection.from_query(profiles, samples)
+
+    if groupby is None:
+        # Fit the scaler on the features of the sample query (or of all profiles).
+        # Fitting only reads the reference, so it may share memory with the profiles.
+        fitted_scaler = _fit_scaler(
+            scaler,
+            method=method,
+            reference=ProfileMatrix.from_frame(
+                profiles
+                if samples.is_all
+                else samples.select(profiles, columns=features),
+                features=features,
+                metadata_columns=[],
+                dtype=dtype,
+                copy=False,
+            ).values,
+            features=features,
+        )
+
+    # Copy the features once into a contiguous float block, which is normalized in
+    # place, and keep the metadata and image payload columns alongside it. The
+    # reference is released first, so that both copies (and the fit temporaries)
+    # are not held at the same time
+    profile_matrix = ProfileMatrix.from_frame(
+        profiles,
+        features=features,
+        metadata_columns=meta_features + passthrough_image_columns,
+        dtype=dtype,
+    )
+
+    if groupby is not None:
+        profile_matrix = _normalize_groups(
+            profiles,
+            profile_matrix=profile_matrix,
+            groupby=[groupby] if isinstance(groupby, str) else list(groupby),
+            samples=samples,
+            scaler=scaler,
+            method=method,
+            n_jobs=n_jobs,
+        )
+    else:
+        # Apply the fitted parameters; except for spherize, the feature block is
+        # scaled in place
+        profile_matrix = NormalizerState.from_scaler(
+            fitted_scaler, method=method, features=features
+        ).transform(profile_matrix)
+
+    if dtype is not None and profile_matrix.values.dtype != dtype:
+        profile_matrix.values = profile_matrix.values.astype(dtype, order="F")
+
+    normalized = profile_matrix.to_frame()
+
+    if profile_matrix.values.shape != (profiles.shape[0], len(features)):
+        error_detail = "The number of rows and columns in the feature dataframe does not match the original dataframe"
+        context = f"the `{method}` method in `pycytominer.normalize`"
+        raise ValueError(f"{error_detail}. This is likely a bug in {context}")
+
+    if (normalized.shape[0] != profiles.shape[0]) or (
+        normalized.shape[1]
+        != len(features) + len(meta_features) + len(passthrough_image_columns)
+    ):
+        error_detail = "The number of rows and columns in the normalized dataframe does not match the original dataframe"
+        context = f"the `{method}` method in `pycytominer.normalize`"
+        raise ValueError(f"{error_detail}. This is likely a bug in {context}.")
+
+    return normalized
+
+
+def fit_normalizer(
+    profiles: Union[str, pd.DataFrame],
+    features: Union[str, list[str]] = "infer",
+    image_features: bool = False,
+    samples: Union[str, SampleSelection] = "all",
+    method: str = "standardize",
+    mad_robustize_epsilon: Optional[float] = 1e-18,
+    spherize_center: bool = True,
+    spherize_method: str = "ZCA-cor",
+    spherize_epsilon: float = 1e-6,
+    dtype: Optional[np.typing.DTypeLike] = None,
+    output_file: Optional[Union[str, pathlib.Path]] = None,
+) -> Union[NormalizerState, str, pathlib.Path]:
+    """Fit normalization parameters once, to apply them to many profile tables
+
+    The fitted means, scales, medians, median absolute deviations, or whitening
+    matrix are stored in a :class:`NormalizerState`, which
+    :func:`apply_normalizer` applies to the same profiles, to new profiles, or to
+    chunks of a table that does not fit in memory.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame or path
+        Either a pandas DataFrame or a file that stores the reference profile data.
+    features, image_features, samples, method, mad_robustize_epsilon
+        See :func:`normalize`. Like :func:`normalize`, "control_zscore" is fit per
+        plate, so the profiles may only hold one "Metadata_Plate".
+    spherize_center, spherize_method, spherize_epsilon, dtype
+        See :func:`normalize`.
+    output_file : str or pathlib.Path, optional
+        If provided, the parameters are written to this NumPy .npz file, which
+        :func:`apply_normalizer` accepts in place of the state.
+
+    Returns
+    -------
+    NormalizerState
+        The fitted parameters. If output_file=None, then return the state.
+    str or pathlib.Path
+        If output_file is provided, then the function returns the path to the
+        parameter file.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from pycytominer import apply_normalizer, fit_normalizer
+
+        fit_normalizer(
+            profiles=reference_df,
+            samples="Metadata_treatment == 'control'",
+            method="mad_robustize",
+            output_file="plate_normalizer.npz",
+        )
+
+        normalized_df = apply_normalizer(
+            profiles=new_df, normalizer="plate_normalizer.npz"
+        )
+    """
+
+    profiles = load_profiles(profiles)
+
+    if dtype is not None:
+        dtype = check_float_dtype(dtype)
+
+    method, scaler = _build_scaler(
+        method,
+        mad_robustize_epsilon=mad_robustize_epsilon,
+        spherize_center=spherize_center,
+        spherize_method=spherize_method,
+        spherize_epsilon=spherize_epsilon,
+    )
+    features = _check_features(profiles, features, image_features=image_features)
+
+    # A state holds one set of parameters, whereas normalize() fits control
+    # z-scores per plate
+    if (
+        method == "control_zscore"
+        and "Metadata_Plate" in profiles.columns
+        and (n_plates := profiles["Metadata_Plate"].nunique(dropna=False)) > 1
+    ):
+        raise ValueError(
+            f"control_zscore is fit per plate, but the profiles hold {n_plates} "
+            "plates. Fit one normalizer per plate."
+        )
+
+    samples = SampleSelection.from_query(profiles, samples)
+    fitted_scaler = _fit_scaler(
+        scaler,
+        method=method,
+        reference=ProfileMatrix.from_frame(
+            profiles if samples.is_all else samples.select(profiles, columns=features),
+            features=features,
+            metadata_columns=[],
+            dtype=dtype,
+            copy=False,
+        ).values,
+        features=features,
+    )
+    state = NormalizerState.from_scaler(fitted_scaler, method=method, features=features)
+
+    if output_file is None:
+        return state
+
+    state.save(output_file)
+
+    return output_file
+
+
+@write_to_file_if_user_specifies_output_details
+def apply_normalizer(
+    profiles: Union[str, pd.DataFrame],
+    normalizer: Union[NormalizerState, str, pathlib.Path],
+    meta_features: Union[str, list[str]] = "infer",
+    output_file: Optional[str] = None,
+    output_type: Optional[
+        Literal["csv", "parquet", "anndata_h5ad", "anndata_zarr"]
+    ] = "csv",
+    compression_options: Optional[Union[str, dict[str, Any]]] = None,
+    float_format: Optional[str] = None,
+    dtype: Optional[np.typing.DTypeLike] = None,
+) -> Union[pd.DataFrame, str]:
+    """Normalize profiles with parameters fit by :func:`fit_normalizer`
+
+    Every profile is normalized independently of the other rows, so a table can be
+    normalized chunk by chunk, and the concatenated chunks equal the normalized
+    table.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame or path
+        Either a pandas DataFrame or a file that stores profile data. It must hold
+        all features of the normalizer.
+    normalizer : NormalizerState, str, or pathlib.Path
+        Fitted parameters, or the .npz file they were written to.
+    meta_features : list
+        See :func:`normalize`.
+    output_file, output_type, compression_options, float_format
+        See :func:`normalize`.
+    dtype : dtype-like, optional
+        Float dtype of the features, one of ['float32', 'float64']. See
+        :func:`normalize`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The normalized profile DataFrame. If output_file=None, then return the
+        DataFrame. If you specify output_file, then write to file and do not return
+        data.
+    str
+        If output_file is provided, then the function returns the path to the
+        output file.
+    """
+
+    profiles = load_profiles(profiles)
+
+    if dtype is not None:
+        dtype = check_float_dtype(dtype)
+
+    if not isinstance(normalizer, NormalizerState):
+        normalizer = NormalizerState.load(normalizer)
+
+    return _apply_normalizer(
+        profiles, normalizer=normalizer, meta_features=meta_features, dtype=dtype
+    )
+
+
+def _apply_normalizer(
+    profiles: pd.DataFrame,
+    normalizer: NormalizerState,
+    meta_features: Union[str, list[str]],
+    dtype: Optional[np.typing.DTypeLike],
+) -> pd.DataFrame:
+    """Normalize the features of loaded profiles with fitted parameters.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Profiles holding all features of the normalizer.
+    normalizer : NormalizerState
+        Fitted parameters.
+    meta_features, dtype
+        See :func:`apply_normalizer`.
+
+    Returns
+    -------
+    pd.DataFrame
+        The metadata, image payload columns, and normalized features.
+    """
+
+    missing_features = [
+        feature for feature in normalizer.features if feature not in profiles.columns
+    ]
+    if missing_features:
+        raise ValueError(
+            f"Features of the normalizer not found in the profiles: {missing_features}"
+        )
+
+    features = _check_features(profiles, normalizer.features, image_features=False)
+    meta_features, passthrough_image_columns = _check_meta_features(
+        profiles, features, meta_features
+    )
+
+    profile_matrix = normalizer.transform(
+        ProfileMatrix.from_frame(
+            profiles,
+            features=features,
+            metadata_columns=meta_features + passthrough_image_columns,
+            dtype=dtype,
+        )
+    )
+
+    if dtype is not None and profile_matrix.values.dtype != dtype:
+        profile_matrix.values = profile_matrix.values.astype(dtype, order="F")
+
+    return profile_matrix.to_frame()
+
+
+def normalize_parquet(
+    profiles: Union[str, pathlib.PurePath],
+    output_file: Union[str, pathlib.PurePath],
+    features: Union[str, list[str]] = "infer",
+    image_features: bool = False,
+    meta_features: Union[str, list[str]] = "infer",
+    samples: str = "all",
+    method: str = "standardize",
+    mad_robustize_epsilon: Optional[float] = 1e-18,
+    spherize_center: bool = True,
+    spherize_method: str = "ZCA-cor",
+    spherize_epsilon: float = 1e-6,
+    dtype: Optional[np.typing.DTypeLike] = None,
+    batch_size: int = 65536,
+    approx_error: float = 0.01,
+) -> str:
+    """Normalize a parquet file or dataset to a parquet file batch by batch
+
+    The profiles are read twice, one batch of at most ``batch_size`` rows at a
+    time, so peak memory is bounded by the batch size instead of the number of
+    profiles. The first pass accumulates the fit statistics of the reference
+    samples (see :class:`NormalizerAccumulator`), and the second pass normalizes
+    every batch and appends it to the output file.
+
+    Parameters
+    ----------
+    profiles : str or pathlib.PurePath
+        Parquet file, parquet dataset directory, or Iceberg-style table directory
+        with profiles.
+    output_file : str or pathlib.PurePath
+        Parquet file the normalized profiles are written to.
+    features, image_features, meta_features, samples, mad_robustize_epsilon, dtype
+        See :func:`normalize`.
+    spherize_center, spherize_method, spherize_epsilon
+        See :func:`normalize`.
+    method : str
+        How to normalize the profiles, one of ['standardize', 'robustize',
+        'mad_robustize', 'spherize', 'quantile', 'rank_int', 'control_zscore'].
+        Defaults to "standardize". The means and standard deviations of
+        "standardize" and the whitening matrix of "spherize" match
+        :func:`normalize`, up to rounding. The medians, interquartile ranges,
+        median absolute deviations, and reference ranks of the other methods are
+        estimated with quantile sketches. Like :func:`normalize`,
+        "control_zscore" is fit per plate when the profiles have a
+        "Metadata_Plate" column; all other methods normalize all profiles with one
+        set of parameters.
+    batch_size : int, default 65536
+        Number of rows to read at a time.
+    approx_error : float, default 0.01
+        Target rank error of the sketch quantiles, as a fraction of the number of
+        reference samples. References with at most ``1 / approx_error`` samples
+        are fit exactly.
+
+    Returns
+    -------
+    str
+        The path to the output file.
+    """
+
+    if dtype is not None:
+        dtype = check_float_dtype(dtype)
+    approx_error = check_approx_error(approx_error)
+    method = method.lower()
+
+    schema = load_parquet_schema(profiles)
+    schema_df = schema.empty_table().to_pandas()
+    if features == "infer":
+        # Nested arrow columns (e.g. image payloads) are never profile features
+        features = [
+            feature
+            for feature in infer_cp_features(schema_df, image_features=image_features)
+            if not pa.types.is_nested(schema.field(feature).type)
+        ]
+    elif isinstance(features, str):
+        features = [features]
+    meta_features, passthrough_image_columns = _check_meta_features(
+        schema_df, features, meta_features
+    )
+
+    # Control z-scores are computed against the controls of every plate, with one
+    # accumulator per plate
+    plate_columns = (
+        ["Metadata_Plate"]
+        if method == "control_zscore" and "Metadata_Plate" in schema.names
+        else []
+    )
+    new_accumulator = functools.partial(
+        NormalizerAccumulator,
+        method=method,
+        features=features,
+        mad_robustize_epsilon=mad_robustize_epsilon,
+        approx_error=approx_error,
+        spherize_center=spherize_center,
+        spherize_method=spherize_method,
+        spherize_epsilon=spherize_epsilon,
+    )
+    accumulators = {} if plate_columns else {None: new_accumulator()}
+    plates: set[Any] = set()
+    for batch_df in load_parquet_batches(
+        profiles,
+        columns=list(
+            dict.fromkeys(
+                plate_columns
+                + (features if samples == "all" else meta_features + features)
+            )
+        ),
+        batch_size=batch_size,
+    ):
+        plates.update(plate for plate, _ in _plate_rows(batch_df, plate_columns))
+        if samples != "all":
+            batch_df = batch_df.query(samples)
+        _check_features(batch_df, features, image_features=image_features)
+        values = ProfileMatrix.from_frame(
+            batch_df,
+            features=features,
+            metadata_columns=[],
+            dtype=dtype,
+            copy=False,
+        ).values
+        for plate, rows in _plate_rows(batch_df, plate_columns):
+            if plate not in accumulators:
+                accumulators[plate] = new_accumulator()
+            accumulators[plate].update(values[rows])
+
+    for plate in plates:
+        if plate not in accumulators:
+            raise ValueError(
+                f"No samples match {samples} in the group "
+                f"{dict(zip(plate_columns, [plate]))}"
+            )
+    normalizers = {
+        plate: accumulator.finalize() for plate, accumulator in accumulators.items()
+    }
+
+    # Write to a temporary file and move it into place once all batches are written
+    tmp_path = f"{output_file}.tmp"
+    writer = None
+    try:
+        for batch_df in load_parquet_batches(
+            profiles,
+            columns=list(
+                dict.fromkeys(
+                    plate_columns + meta_features + passthrough_image_columns + features
+                )
+            ),
+            batch_size=batch_size,
+        ):
+            plate_rows = list(_plate_rows(batch_df, plate_columns))
+            normalized_df = pd.concat([
+                _apply_normalizer(
+                    batch_df.iloc[rows],
+                    normalizer=normalizers[plate],
+                    meta_features=meta_features,
+                    dtype=dtype,
+                )
+                for plate, rows in plate_rows
+            ])
+            if len(plate_rows) > 1:
+                # Restore the row order of the batch
+                normalized_df = normalized_df.iloc[
+                    np.argsort(np.concatenate([rows for _, rows in plate_rows]))
+                ]
+            if writer is None:
+                # Keep the arrow types of the metadata and image payload columns
+                output_schema = pa.schema([
+                    schema.field(column)
+                    if column in schema.names and column not in features
+                    else pa.field(
+                        column, pa.from_numpy_dtype(normalized_df[column].dtype)
+                    )
+                    for column in normalized_df.columns
+                ])
+                writer = pq.ParquetWriter(tmp_path, output_schema, compression="snappy")
+            writer.write_table(
+                pa.Table.from_pandas(
+                    normalized_df, schema=output_schema, preserve_index=False
+                )
+            )
+
+        if writer is None:
+            # No profiles: write the columns of an empty table
+            pq.write_table(
+                pa.schema(
+                    [
+                        schema.field(column)
+                        for column in meta_features + passthrough_image_columns
+                    ]
+                    + [pa.field(feature, pa.float64()) for feature in features]
+                ).empty_table(),
+                tmp_path,
+                compression="snappy",
+            )
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp_path, output_file)
+
+    return str(output_file)
+
+
+def _plate_rows(
+    batch_df: pd.DataFrame, plate_columns: list[str]
+) -> Iterator[tuple[Any, Any]]:
+    """Every plate of a batch of profiles and the positions of its rows.
+
+    Without plate columns, all rows belong to a single plate None. Missing plates
+    are the plate None too.
+    """
+    if not plate_columns:
+        yield None, slice(None)
+        return
+    codes, uniques_df = factorize_strata(batch_df.loc[:, plate_columns])
+    order, offsets = sort_by_group(codes, n_groups=uniques_df.shape[0])
+    for group, plate in enumerate(uniques_df.iloc[:, 0].to_numpy()):
+        yield (
+            (None if pd.isna(plate) else plate),
+            order[offsets[group] : offsets[group + 1]],
+        )
+
+
+def _build_scaler(
+    method: str,
+    mad_robustize_epsilon: Optional[float] = 1e-18,
+    spherize_center: bool = True,
+    spherize_method: str = "ZCA-cor",
+    spherize_epsilon: float = 1e-6,
+) -> tuple[str, Any]:
+    """Create the unfitted scaler of a normalization method.
+
+    Parameters
+    ----------
+    method, mad_robustize_epsilon, spherize_center, spherize_method, spherize_epsilon
+        See :func:`normalize`.
+
+    Returns
+    -------
+    tuple of (str, scaler)
+        The lowercase method name and its StandardScaler, RobustScaler, RobustMAD,
+        Spherize, or RankTransform scaler.
+    """
+
     # Define which scaler to use
     method = method.lower()
 
-    avail_methods = ["standardize", "robustize", "mad_robustize", "spherize"]
+    avail_methods = [
+        "standardize",
+        "robustize",
+        "mad_robustize",
+        "spherize",
+        "quantile",
+        "rank_int",
+        "control_zscore",
+    ]
     if method not in avail_methods:
         raise ValueError(f"operation must be one {avail_methods}")
 
     if method == "standardize":
-        scaler = StandardScaler()
+        scaler = StandardScaler(copy=False)
     elif method == "robustize":
-        scaler = RobustScaler()
+        scaler = RobustScaler(copy=False)
     elif method == "mad_robustize":
         if mad_robustize_epsilon is None:
             raise ValueError("mad_robustize_epsilon must be a float")
@@ -179,6 +797,34 @@ def normalize(
             epsilon=spherize_epsilon,
             return_numpy=True,
         )
+    elif method in ["quantile", "rank_int"]:
+        scaler = RankTransform(
+            output_distribution="normal" if method == "rank_int" else "uniform"
+        )
+    elif method == "control_zscore":
+        scaler = RobustScaler(copy=False, unit_variance=True)
+
+    return method, scaler
+
+
+def _check_features(
+    profiles: pd.DataFrame, features: Union[str, list[str]], image_features: bool
+) -> list[str]:
+    """Select the numeric feature columns to normalize.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Profiles, whose missing-value string markers in feature columns are
+        replaced in place.
+    features, image_features
+        See :func:`normalize`.
+
+    Returns
+    -------
+    list of str
+        The validated feature columns.
+    """
 
     if features == "infer":
         features = infer_cp_features(profiles, image_features=image_features)
@@ -187,60 +833,10 @@ def normalize(
         raise ValueError("features must be a list of strings, not a single string")
 
     # Temporary compatibility path for accommodating CellProfiler-style imports
-    # that encode
-    # missing feature values as strings such as "nan" or "None". Only
+    # that encode missing feature values as strings such as "nan" or "None". Only
     # missing-value-like strings are coerced; other non-numeric content still
-    # fails validation below. String matching is case-insensitive after
-    # whitespace stripping and lowercasing.
-    missing_string_tokens = {"", "na", "n/a", "nan", "none", "null"}
-    for feature in features:
-        # Already-numeric feature columns do not need compatibility cleanup.
-        if pd.api.types.is_numeric_dtype(profiles[feature]):
-            continue
-
-        non_null_values = profiles[feature].dropna()
-        # A column of only missing values can pass through to downstream numeric
-        # handling without special coercion here.
-        if non_null_values.empty:
-            continue
-
-        # Split mixed object columns into string markers versus other values so
-        # we can distinguish missing-value strings from truly malformed content.
-        string_values = non_null_values[
-            non_null_values.map(lambda value: isinstance(value, str))
-        ]
-        non_string_values = non_null_values[
-            non_null_values.map(lambda value: not isinstance(value, str))
-        ]
-
-        # Non-string values must still be numeric for this compatibility path
-        # to apply.
-        non_string_values_are_numeric = non_string_values.map(
-            pd.api.types.is_number
-        ).all()
-
-        # If the column contains no strings, or mixes strings with non-numeric
-        # payloads, leave it untouched so validation can reject it below.
-        if not non_string_values_are_numeric or string_values.empty:
-            continue
-
-        # Only coerce when every remaining string is a missing-value marker;
-        # this avoids silently converting arbitrary strings to NaN.
-        if (
-            string_values
-            .map(lambda value: value.strip().lower())
-            .isin(missing_string_tokens)
-            .all()
-        ):
-            profiles[feature] = profiles[feature].map(
-                lambda value: (
-                    np.nan
-                    if isinstance(value, str)
-                    and value.strip().lower() in missing_string_tokens
-                    else value
-                )
-            )
-            profiles[feature] = pd.to_numeric(profiles[feature], errors="coerce")
+    # fails validation below.
+    coerce_missing_value_strings(profiles, columns=features)
 
     non_numeric_features = [
         feature
@@ -257,15 +853,36 @@ def normalize(
             "feature_select() first."
         )
 
-    # Separate out the features and meta
-    feature_df = profiles.loc[:, features]
+    return features
+
+
+def _check_meta_features(
+    profiles: pd.DataFrame, features: list[str], meta_features: Union[str, list[str]]
+) -> tuple[list[str], list[str]]:
+    """Select the metadata and image payload columns kept next to the features.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Profiles to normalize.
+    features : list of str
+        Feature columns to normalize.
+    meta_features
+        See :func:`normalize`.
+
+    Returns
+    -------
+    tuple of (list of str, list of str)
+        The metadata columns and the image payload columns passed through
+        unchanged.
+    """
+
     if meta_features == "infer":
         meta_features = infer_cp_features(profiles, metadata=True)
 
     if isinstance(meta_features, str):
         raise ValueError("meta_features must be a list of strings, not a single string")
 
-    meta_df = profiles.loc[:, meta_features]
     # Preserve image payload columns without normalizing them. The
     # ``ome_arrow_*`` prefix is a flexible naming convention used here for
     # OME-Arrow payload columns, not a strict upstream requirement; see the
@@ -277,38 +894,149 @@ def normalize(
         if column not in set(features).union(meta_features)
         and (column.startswith("Image_") or column.startswith("ome_arrow_"))
     ]
-    passthrough_image_df = profiles.loc[:, passthrough_image_columns]
 
-    # Fit the sklearn scaler
-    if samples == "all":
-        fitted_scaler = scaler.fit(feature_df)
-    else:
-        # Subset to only the features measured in the sample query
-        fitted_scaler = scaler.fit(profiles.query(samples).loc[:, features])
+    return meta_features, passthrough_image_columns
+
+
+def _fit_scaler(
+    scaler: Any, method: str, reference: np.ndarray, features: list[str]
+) -> Any:
+    """Fit a normalization scaler on the features of the reference profiles.
+
+    Parameters
+    ----------
+    scaler : StandardScaler, RobustScaler, RobustMAD, Spherize, or RankTransform
+        Unfitted scaler of the normalization method.
+    method : str
+        Normalization method, see :func:`normalize`.
+    reference : np.ndarray
+        2D block of reference features. It is not modified.
+    features : list of str
+        Feature names of the reference columns.
+
+    Returns
+    -------
+    StandardScaler, RobustScaler, RobustMAD, Spherize, or RankTransform
+        The fitted scaler.
+    """
 
-    fitted_scaled = fitted_scaler.transform(feature_df)
+    if method == "spherize" and reference.dtype == np.float32:
+        # The whitening matrix needs float64 precision, also for float32 profiles
+        reference = reference.astype(np.float64)
 
-    columns = fitted_scaler.columns if method == "spherize" else feature_df.columns
+    if method == "standardize" and reference.shape[0] > 0:
+        # Accumulate the float64 mean and variance over row blocks, which bounds
+        # the float64 temporaries sklearn allocates for float32 profiles
+        for start in range(0, reference.shape[0], standardize_fit_batch_size):
+            scaler.partial_fit(reference[start : start + standardize_fit_batch_size])
+        return scaler
+    elif method in ["standardize", "robustize", "control_zscore"]:
+        return scaler.fit(reference)
 
-    feature_df = pd.DataFrame(
-        fitted_scaled,
-        columns=columns,
-        index=feature_df.index,
+    return scaler.fit(pd.DataFrame(reference, columns=pd.Index(features), copy=False))
+
+
+def _normalize_groups(
+    profiles: pd.DataFrame,
+    profile_matrix: ProfileMatrix,
+    groupby: list[str],
+    samples: SampleSelection,
+    scaler: Any,
+    method: str,
+    n_jobs: int = 1,
+) -> ProfileMatrix:
+    """Normalize every group of profiles against its own reference samples.
+
+    One scaler is fit per group, optionally in a process pool. The standardize,
+    robustize, mad_robustize, and control_zscore transforms then scale the whole
+    feature block in a single pass that looks up the center and scale of every row
+    by its group code. The spherize transform multiplies every group by its
+    whitening matrix, and the quantile and rank_int transforms rank every group
+    among its own reference samples.
+
+    Parameters
+    ----------
+    profiles : pd.DataFrame
+        Profiles holding the groupby columns.
+    profile_matrix : ProfileMatrix
+        Features of ``profiles``, which are scaled in place.
+    groupby : list of str
+        Columns defining the groups.
+    samples, method, n_jobs
+        See :func:`normalize`.
+    scaler : StandardScaler, RobustScaler, RobustMAD, Spherize, or RankTransform
+        Unfitted scaler, which is cloned for every group.
+
+    Returns
+    -------
+    ProfileMatrix
+        The normalized profiles.
+    """
+
+    codes, uniques_df = factorize_strata(profiles.loc[:, groupby])
+    order, offsets = sort_by_group(codes, n_groups=uniques_df.shape[0])
+    is_reference = samples.mask
+
+    group_rows = [
+        order[offsets[group] : offsets[group + 1]]
+        for group in range(uniques_df.shape[0])
+    ]
+    references = []
+    for rows, key in zip(group_rows, uniques_df.itertuples(index=False, name=None)):
+        reference_rows = rows[is_reference[rows]]
+        if reference_rows.shape[0] == 0:
+            raise ValueError(
+                f"No samples match {samples} in the group {dict(zip(groupby, key))}"
+            )
+        references.append(profile_matrix.values[reference_rows])
+
+    fit_args = (
+        [clone(scaler) for _ in references],
+        [method] * len(references),
+        references,
+        [profile_matrix.features] * len(references),
     )
+    if n_jobs == 1:
+        fitted_scalers = list(map(_fit_scaler, *fit_args))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            fitted_scalers = list(executor.map(_fit_scaler, *fit_args))
+    del references
 
-    normalized = pd.concat([meta_df, passthrough_image_df, feature_df], axis="columns")
+    states = [
+        NormalizerState.from_scaler(
+            fitted_scaler, method=method, features=profile_matrix.features
+        )
+        for fitted_scaler in fitted_scalers
+    ]
 
-    if feature_df.shape != profiles.loc[:, features].shape:
-        error_detail = "The number of rows and columns in the feature dataframe does not match the original dataframe"
-        context = f"the `{method}` method in `pycytominer.normalize`"
-        raise ValueError(f"{error_detail}. This is likely a bug in {context}")
+    if method == "spherize":
+        # The whitened features are returned in float64, like without groupby
+        whitened = np.empty(profile_matrix.values.shape, order="F")
+        for rows, state in zip(group_rows, states):
+            whitened[rows] = state.transform_values(profile_matrix.values[rows])
+        return ProfileMatrix(
+            values=whitened,
+            features=states[0].output_features if states else profile_matrix.features,
+            metadata=profile_matrix.metadata,
+        )
 
-    if (normalized.shape[0] != profiles.shape[0]) or (
-        normalized.shape[1]
-        != len(features) + len(meta_features) + len(passthrough_image_columns)
-    ):
-        error_detail = "The number of rows and columns in the normalized dataframe does not match the original dataframe"
-        context = f"the `{method}` method in `pycytominer.normalize`"
-        raise ValueError(f"{error_detail}. This is likely a bug in {context}.")
+    if method in ["quantile", "rank_int"]:
+        for rows, state in zip(group_rows, states):
+            profile_matrix.values[rows] = state.transform_values(
+                profile_matrix.values[rows]
+            )
+        return profile_matrix
 
-    return normalized
+    n_features = len(profile_matrix.features)
+    group_centers = np.array([state.center for state in states]).reshape(-1, n_features)
+    group_scales = np.array([state.scale for state in states]).reshape(-1, n_features)
+
+    # Scale row blocks in place, which bounds the looked-up centers and scales
+    values = profile_matrix.values
+    for start in range(0, values.shape[0], groupby_transform_batch_size):
+        block = slice(start, start + groupby_transform_batch_size)
+        values[block] -= group_centers[codes[block]]
+        values[block] /= group_scales[codes[block]]
+
+    return profile_matrix
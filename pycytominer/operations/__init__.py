@@ -1,5 +1,6 @@
 from .correlation_threshold import correlation_threshold
+from .feature_statistics import FeatureStatistics
 from .get_na_columns import get_na_columns
-from .noise_removal import noise_removal
-from .transform import RobustMAD, Spherize
+from .noise_removal import get_noise_removal_groups, noise_removal
+from .transform import RankTransform, RobustMAD, Spherize
 from .variance_threshold import calculate_frequency, variance_threshold
@@ -5,19 +5,22 @@ specified threshold
 
 from typing import Union
 
+import numpy as np
 import pandas as pd
 
 from pycytominer.cyto_utils.features import infer_cp_features
+from pycytominer.cyto_utils.sample_selection import SampleSelection, select_samples
 from pycytominer.cyto_utils.util import (
     check_correlation_method,
-    get_pairwise_correlation,
+    correlation_pairs,
+    get_correlation_matrix,
 )
 
 
 def correlation_threshold(
     population_df: pd.DataFrame,
     features: Union[str, list[str]] = "infer",
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     threshold: float = 0.9,
     method: str = "pearson",
 ) -> list[str]:
@@ -32,15 +35,19 @@ def correlation_threshold(
         `population_df` DataFrame. All features listed must be found in `population_df`.
         Defaults to "infer". If "infer", then assume CellProfiler features are those
         prefixed with "Cells", "Nuclei", or "Cytoplasm".
-    samples : str, default "all"
+    samples : str or SampleSelection, default "all"
         List of samples to perform operation on. The function uses a pd.DataFrame.query()
         function, so you should  structure samples in this fashion. An example is
         "Metadata_treatment == 'control'" (include all quotes).
-        If "all", use all samples to calculate.
+        If "all", use all samples to calculate. A SampleSelection of population_df
+        reuses a query that was already evaluated (see
+        :class:`pycytominer.cyto_utils.sample_selection.SampleSelection`).
     threshold - float, default 0.9
         Must be between (0, 1) to exclude features
     method - str, default "pearson"
-        indicating which correlation metric to use to test cutoff
+        indicating which correlation metric to use to test cutoff. "kendall_approx"
+        approximates Kendall correlations from Spearman correlations, which is much
+        faster than "kendall" for many samples.
 
     Returns
     -------
@@ -55,13 +62,6 @@ def correlation_threshold(
     if not 0 <= threshold <= 1:
         raise ValueError("threshold variable must be between (0 and 1)")
 
-    # Subset dataframe and calculate correlation matrix across subset features
-    # If samples is not 'all', then subset the dataframe
-    if samples != "all":
-        # Using pandas query to filter rows based on the conditions provided in the
-        # samples parameter
-        population_df = population_df.query(expr=samples)
-
     # Infer CellProfiler features if 'features' is set to 'infer'
     if features == "infer":
         # Infer CellProfiler features
@@ -69,32 +69,46 @@ def correlation_threshold(
     elif isinstance(features, list):
         inferred_features = features
 
-    # Subset the DataFrame to only include the features of interest
-    population_df = population_df.loc[:, inferred_features]
+    # Subset the DataFrame to the samples (all of them if samples is "all") and the
+    # features of interest, copying only the selected features
+    population_df = select_samples(population_df, samples, columns=inferred_features)
+
+    values = population_df.to_numpy(dtype=np.float64)
+    if method != "kendall":
+        # Reduce the correlation tiles to the pairs of distinct features whose
+        # correlation passes the threshold, without holding the full matrix
+        cor_sum = np.zeros(values.shape[1])
+        pairs = list(
+            correlation_pairs(values, threshold, abs_sums=cor_sum, method=method)
+        )
+        pair_a = np.concatenate(
+            [np.empty(0, dtype=np.int64)] + [a for a, _, _ in pairs]
+        )
+        pair_b = np.concatenate(
+            [np.empty(0, dtype=np.int64)] + [b for _, b, _ in pairs]
+        )
+    else:
+        data_cor = get_correlation_matrix(
+            population_df=population_df, method=method
+        ).to_numpy()
+        cor_sum = np.nansum(np.abs(data_cor), axis=0)
 
-    # Get correlation matrix and lower triangle of pairwise correlations in long format
-    data_cor_df, pairwise_df = get_pairwise_correlation(
-        population_df=population_df, method=method
-    )
+        # Get the pairs of distinct features whose correlation passes the
+        # threshold. NaN correlations never pass it.
+        pair_a, pair_b = np.nonzero(data_cor > threshold)
+        is_pair = pair_a > pair_b
+        pair_a, pair_b = pair_a[is_pair], pair_b[is_pair]
 
     # Get absolute sum of correlation across features
-    # The lower the index, the less correlation to the full data frame
-    # We want to drop features with highest correlation, so drop higher index
-    variable_cor_sum = data_cor_df.abs().sum().sort_values().index
-
-    # And subset to only variable combinations that pass the threshold
-    pairwise_df = pairwise_df.query("correlation > @threshold")
-
-    # Return an empty list if nothing is over correlation threshold
-    if pairwise_df.shape[0] == 0:
-        return []
+    # The lower the rank, the less correlation to the full data frame
+    # We want to drop features with highest correlation, so drop higher rank
+    cor_sum_rank = np.empty(cor_sum.shape[0], dtype=np.int64)
+    cor_sum_rank[np.argsort(cor_sum)] = np.arange(cor_sum.shape[0])
 
-    # Output the excluded features
-    excluded = pairwise_df.apply(
-        lambda x: determine_high_cor_pair(x, variable_cor_sum), axis="columns"
-    )
+    # Of every pair, exclude the feature with the higher correlation sum rank
+    excluded = np.where(cor_sum_rank[pair_a] > cor_sum_rank[pair_b], pair_a, pair_b)
 
-    return list(set(excluded.tolist()))
+    return population_df.columns[np.unique(excluded)].tolist()
 
 
 def determine_high_cor_pair(
@@ -0,0 +1,333 @@
+"""
+Compute the per-feature statistics of several feature selection operations at once
+"""
+
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from pycytominer.cyto_utils.group_kernels import sort_columns, sorted_value_counts
+from pycytominer.cyto_utils.sample_selection import SampleSelection
+from pycytominer.operations.noise_removal import get_noise_removal_groups
+
+# Bytes of the feature blocks scanned at a time by FeatureStatistics.from_profiles()
+feature_statistics_block_bytes = 256 * 2**20
+
+# Statistics needed by every operation evaluated from FeatureStatistics
+operation_statistics = {
+    "drop_na_columns": "na",
+    "drop_outliers": "extrema",
+    "variance_threshold": "frequency",
+    "noise_removal": "noise",
+}
+
+
+class FeatureStatistics:
+    """Per-feature statistics of the selected samples of a table of profiles.
+
+    The operations of ``feature_select()`` other than correlation_threshold and
+    blocklist exclude every feature by statistics of that feature alone: missing
+    value counts (``get_na_columns``), minimums and maximums
+    (``drop_outlier_features``), unique values and the two largest value counts
+    (``variance_threshold``), and standard deviations within perturbation groups
+    (``noise_removal``). A FeatureStatistics computes the statistics these
+    operations need in one scan over blocks of features, selecting the samples of
+    every block once, and evaluates the operations from them with the results of
+    the operations themselves.
+
+    Attributes
+    ----------
+    features : list of str
+        Features the statistics were computed for.
+    n_samples : int
+        Number of selected samples.
+    na_counts : np.ndarray or None
+        Number of missing values of every feature.
+    minimums, maximums : np.ndarray or None
+        Minimum and maximum of every feature, NaN without non-missing values.
+    n_unique : np.ndarray or None
+        Number of unique non-missing values of every feature.
+    top_counts : np.ndarray or None
+        Counts of the most common and second most common value of every feature,
+        of shape ``(2, n_features)``.
+    noise_stds : np.ndarray or None
+        Mean standard deviation (``ddof=0``) of every feature within the
+        perturbation groups.
+    """
+
+    def __init__(self, features: list[str], n_samples: int):
+        self.features = features
+        self.n_samples = n_samples
+        self.na_counts: Optional[np.ndarray] = None
+        self.minimums: Optional[np.ndarray] = None
+        self.maximums: Optional[np.ndarray] = None
+        self.n_unique: Optional[np.ndarray] = None
+        self.top_counts: Optional[np.ndarray] = None
+        self.noise_stds: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_profiles(
+        cls,
+        profiles: pd.DataFrame,
+        features: list[str],
+        samples: Union[str, SampleSelection] = "all",
+        operations: Optional[list[str]] = None,
+        noise_removal_perturb_groups: Optional[Union[str, list[str]]] = None,
+    ) -> "FeatureStatistics":
+        """Compute the statistics of the features of a table of profiles.
+
+        Parameters
+        ----------
+        profiles : pd.DataFrame
+            DataFrame that includes metadata and observation features.
+        features : list of str
+            Numeric (including boolean) features to compute the statistics of.
+        samples : str or SampleSelection, default "all"
+            Samples to compute the statistics on, see
+            :meth:`pycytominer.cyto_utils.sample_selection.SampleSelection.from_query`.
+        operations : list of str, optional
+            Operations to compute the statistics of, out of "drop_na_columns",
+            "drop_outliers", "variance_threshold", and "noise_removal". Other
+            operations are ignored. Defaults to all of them but noise_removal.
+        noise_removal_perturb_groups : str or list of str, optional
+            Perturbation groups of the selected samples, or the name of the
+            metadata column holding them. Required by noise_removal.
+
+        Returns
+        -------
+        FeatureStatistics
+            Statistics of the selected samples.
+        """
+
+        if operations is None:
+            operations = ["drop_na_columns", "drop_outliers", "variance_threshold"]
+        statistics = {
+            operation_statistics[operation]
+            for operation in operations
+            if operation in operation_statistics
+        }
+
+        samples = SampleSelection.from_query(profiles, samples)
+        n_samples = samples.n_samples
+        n_features = len(features)
+        feature_statistics = cls(features, n_samples)
+
+        if "noise" in statistics:
+            if noise_removal_perturb_groups is None:
+                raise ValueError(
+                    "noise_removal requires the noise_removal_perturb_groups"
+                )
+            group_columns = (
+                [noise_removal_perturb_groups]
+                if isinstance(noise_removal_perturb_groups, str)
+                and noise_removal_perturb_groups in profiles.columns
+                else []
+            )
+            group_df = samples.select(profiles, group_columns)
+            groups = get_noise_removal_groups(group_df, noise_removal_perturb_groups)
+            if not groups.index.equals(group_df.index):
+                # Assign a list of groups to the selected samples by their index
+                groups = groups.reindex(group_df.index)
+
+            # Samples without a group are dropped by the groupby
+            group_keys = groups.to_numpy()
+            noise_stds = np.full(n_features, np.nan)
+
+        na_counts = np.zeros(n_features, dtype=np.int64)
+        minimums = np.full(n_features, np.nan)
+        maximums = np.full(n_features, np.nan)
+        n_unique = np.zeros(n_features, dtype=np.int64)
+        top_counts = np.zeros((2, n_features), dtype=np.int64)
+
+        # Numeric features are scanned as float blocks, other features (such as
+        # strings) are counted by pandas
+        is_numeric = np.array(
+            [
+                pd.api.types.is_numeric_dtype(dtype)
+                for dtype in profiles.dtypes[features]
+            ],
+            dtype=bool,
+        )
+        numeric_positions = np.flatnonzero(is_numeric)
+        other_positions = np.flatnonzero(~is_numeric)
+        if other_positions.shape[0] > 0 and statistics & {"extrema", "noise"}:
+            raise TypeError(
+                "drop_outliers and noise_removal require numeric features, not "
+                f"{[features[position] for position in other_positions[:5]]}"
+            )
+
+        block_columns = max(
+            1, feature_statistics_block_bytes // (8 * max(n_samples, 1))
+        )
+        for start in range(0, numeric_positions.shape[0], block_columns):
+            block = numeric_positions[start : start + block_columns]
+            block_df = samples.select(profiles, [features[idx] for idx in block])
+            if all(dtype.kind == "f" for dtype in block_df.dtypes):
+                values = block_df.to_numpy()
+            else:
+                # Integer, boolean, and nullable features
+                values = block_df.to_numpy(dtype=np.float64, na_value=np.nan)
+            del block_df
+
+            if "na" in statistics:
+                na_counts[block] = np.isnan(values).sum(axis=0)
+
+            if n_samples == 0:
+                continue
+
+            if "extrema" in statistics:
+                # fmin and fmax skip NaN without warning for missing features
+                minimums[block] = np.fmin.reduce(values, axis=0)
+                maximums[block] = np.fmax.reduce(values, axis=0)
+
+            if "frequency" in statistics:
+                sorted_block, n_valid = sort_columns(values)
+                n_unique[block], top_counts[:, block] = sorted_value_counts(
+                    sorted_block, n_valid
+                )
+                del sorted_block
+
+            if "noise" in statistics:
+                noise_stds[block] = (
+                    pd
+                    .DataFrame(values, copy=False)
+                    .groupby(group_keys)
+                    .std(ddof=0)
+                    .mean()
+                    .to_numpy()
+                )
+
+        if other_positions.shape[0] > 0 and statistics & {"na", "frequency"}:
+            other_df = samples.select(
+                profiles, [features[idx] for idx in other_positions]
+            )
+            if "na" in statistics:
+                na_counts[other_positions] = other_df.isna().sum().to_numpy()
+            if "frequency" in statistics:
+                for position, (_, feature_values) in zip(
+                    other_positions, other_df.items()
+                ):
+                    value_counts = feature_values.value_counts().to_numpy()[:2]
+                    n_unique[position] = feature_values.nunique()
+                    top_counts[: value_counts.shape[0], position] = value_counts
+
+        if "na" in statistics:
+            feature_statistics.na_counts = na_counts
+        if "extrema" in statistics:
+            feature_statistics.minimums = minimums
+            feature_statistics.maximums = maximums
+        if "frequency" in statistics:
+            feature_statistics.n_unique = n_unique
+            feature_statistics.top_counts = top_counts
+        if "noise" in statistics:
+            feature_statistics.noise_stds = noise_stds
+
+        return feature_statistics
+
+    def _select(self, is_excluded: np.ndarray) -> list[str]:
+        """Features of the statistics where is_excluded is True, in order."""
+        return [
+            feature for feature, excluded in zip(self.features, is_excluded) if excluded
+        ]
+
+    def get_na_columns(self, cutoff: float = 0.05) -> list[str]:
+        """Features excluded by ``get_na_columns(cutoff=cutoff)``.
+
+        Parameters
+        ----------
+        cutoff : float, default 0.05
+            Exclude features that have a certain proportion of missingness.
+
+        Returns
+        -------
+        list of str
+            Features whose proportion of missing values is above the cutoff.
+        """
+
+        if not 0 <= cutoff <= 1:
+            raise ValueError("cutoff variable must be between (0 and 1)")
+        if self.na_counts is None:
+            raise ValueError("The statistics of drop_na_columns were not computed")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._select(self.na_counts / self.n_samples > cutoff)
+
+    def drop_outlier_features(self, outlier_cutoff: float = 500) -> list[str]:
+        """Features excluded by ``drop_outlier_features(outlier_cutoff=...)``.
+
+        Parameters
+        ----------
+        outlier_cutoff : int or float, default 500
+            Threshold to remove features if absolute value is greater.
+
+        Returns
+        -------
+        list of str
+            Features whose minimum or maximum absolute value is above the cutoff.
+        """
+
+        if self.minimums is None or self.maximums is None:
+            raise ValueError("The statistics of drop_outliers were not computed")
+
+        return self._select(
+            (np.abs(self.maximums) > outlier_cutoff)
+            | (np.abs(self.minimums) > outlier_cutoff)
+        )
+
+    def variance_threshold(
+        self, freq_cut: float = 0.05, unique_cut: float = 0.01
+    ) -> list[str]:
+        """Features excluded by ``variance_threshold(freq_cut=..., unique_cut=...)``.
+
+        Parameters
+        ----------
+        freq_cut : float, default 0.05
+            Ratio (2nd most common feature val / most common) below which features
+            are excluded. Features with fewer than two unique values are excluded.
+        unique_cut : float, default 0.01
+            Ratio (num unique features / num samples) below which features are
+            excluded.
+
+        Returns
+        -------
+        list of str
+            Features with low variance.
+        """
+
+        if not 0 <= freq_cut <= 1:
+            raise ValueError("freq_cut variable must be between (0 and 1)")
+        if not 0 <= unique_cut <= 1:
+            raise ValueError("unique_cut variable must be between (0 and 1)")
+        if self.n_unique is None or self.top_counts is None:
+            raise ValueError("The statistics of variance_threshold were not computed")
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frequencies = self.top_counts[1] / self.top_counts[0]
+            unique_ratios = self.n_unique / self.n_samples
+
+        return self._select(
+            (self.n_unique < 2)
+            | (frequencies < freq_cut)
+            | (unique_ratios < unique_cut)
+        )
+
+    def noise_removal(self, noise_removal_stdev_cutoff: float) -> list[str]:
+        """Features excluded by ``noise_removal(noise_removal_stdev_cutoff=...)``.
+
+        Parameters
+        ----------
+        noise_removal_stdev_cutoff : float
+            Maximum mean stdev value for a feature to be kept, with features grouped
+            according to the perturbation groups.
+
+        Returns
+        -------
+        list of str
+            Features with too high standard deviations within perturbation groups.
+        """
+
+        if self.noise_stds is None:
+            raise ValueError("The statistics of noise_removal were not computed")
+
+        return self._select(self.noise_stds > noise_removal_stdev_cutoff)
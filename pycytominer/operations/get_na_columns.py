@@ -8,12 +8,13 @@ from typing import Union
 import pandas as pd
 
 from pycytominer.cyto_utils.features import infer_cp_features
+from pycytominer.cyto_utils.sample_selection import SampleSelection, select_samples
 
 
 def get_na_columns(
     population_df: pd.DataFrame,
     features: Union[str, list[str]] = "infer",
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     cutoff: float = 0.05,
 ) -> list[str]:
     """Get features that have more NA values than cutoff defined
@@ -27,11 +28,13 @@ def get_na_columns(
         `profiles` DataFrame. All features listed must be found in `profiles`.
         Defaults to "infer". If "infer", then assume CellProfiler features are those
         prefixed with "Cells", "Nuclei", or "Cytoplasm".
-    samples : str, default "all"
+    samples : str or SampleSelection, default "all"
         List of samples to perform operation on. The function uses a pd.DataFrame.query()
         function, so you should  structure samples in this fashion. An example is
         "Metadata_treatment == 'control'" (include all quotes).
-        If "all", use all samples to calculate.
+        If "all", use all samples to calculate. A SampleSelection of population_df
+        reuses a query that was already evaluated (see
+        :class:`pycytominer.cyto_utils.sample_selection.SampleSelection`).
     cutoff : float
         Exclude features that have a certain proportion of missingness
 
@@ -45,13 +48,6 @@ def get_na_columns(
     if not 0 <= cutoff <= 1:
         raise ValueError("cutoff variable must be between (0 and 1)")
 
-    # Subset the DataFrame if specific samples are specified
-    # If "all", use the entire DataFrame without subsetting
-    if samples != "all":
-        # Using pandas query to filter rows based on the conditions provided in the
-        # samples parameter
-        population_df = population_df.query(expr=samples)
-
     # Infer  CellProfiler features if 'features' is set to 'infer'
     if features == "infer":
         # Infer CellProfiler features
@@ -59,8 +55,9 @@ def get_na_columns(
     elif isinstance(features, list):
         inferred_features = features
 
-    # Subset the DataFrame to only include the features of interest
-    population_df = population_df.loc[:, inferred_features]
+    # Subset the DataFrame to the samples (all of them if samples is "all") and the
+    # features of interest, copying only the selected features
+    population_df = select_samples(population_df, samples, columns=inferred_features)
 
     # Get the proportion of NA values for each feature
     num_rows = population_df.shape[0]
@@ -7,13 +7,14 @@ from typing import Union
 import pandas as pd
 
 from pycytominer.cyto_utils.features import infer_cp_features
+from pycytominer.cyto_utils.sample_selection import SampleSelection, select_samples
 
 
 def noise_removal(
     population_df: pd.DataFrame,
     noise_removal_perturb_groups: Union[str, list[str]],
     features: Union[str, list[str]] = "infer",
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     noise_removal_stdev_cutoff: float = 0.8,
 ) -> list[str]:
     """
@@ -30,11 +31,13 @@ def noise_removal(
         `population_df` DataFrame. All features listed must be found in `population_df`.
         Defaults to "infer". If "infer", then assume CellProfiler features are those
         prefixed with "Cells", "Nuclei", or "Cytoplasm".
-    samples : str, default "all"
+    samples : str or SampleSelection, default "all"
         List of samples to perform operation on. The function uses a pd.DataFrame.query()
         function, so you should  structure samples in this fashion. An example is
         "Metadata_treatment == 'control'" (include all quotes).
-        If "all", use all samples to calculate.
+        If "all", use all samples to calculate. A SampleSelection of population_df
+        reuses a query that was already evaluated (see
+        :class:`pycytominer.cyto_utils.sample_selection.SampleSelection`).
     noise_removal_stdev_cutoff : float
         Maximum mean stdev value for a feature to be kept, with features grouped according to the perturbations in
         noise_removal_perturbation_groups.
@@ -48,10 +51,7 @@ def noise_removal(
 
     # Subset the DataFrame if specific samples are specified
     # If "all", use the entire DataFrame without subsetting
-    if samples != "all":
-        # Using pandas query to filter rows based on the conditions provided in the
-        # samples parameter
-        population_df = population_df.query(expr=samples)
+    population_df = select_samples(population_df, samples)
 
     # Infer  CellProfiler features if 'features' is set to 'infer'
     if features == "infer":
@@ -61,6 +61,49 @@ def noise_removal(
     elif isinstance(features, list):
         inferred_features = features
 
+    group_info = get_noise_removal_groups(population_df, noise_removal_perturb_groups)
+
+    # Subset and df and assign each row with the identity of its perturbation group
+    population_df = population_df.loc[:, inferred_features]
+    population_df = population_df.assign(group_id=group_info)
+
+    # Get the standard deviations of features within each group then calculate the mean
+    # of these standard deviations.
+    # This tells us how much the standard deviation of each feature varies within each
+    # perturbation group.
+    stdev_means_df = population_df.groupby("group_id").std(ddof=0).mean()
+
+    # With the stdev_means_df, we can identify features that have a mean stdev greater than
+    # the cutoff
+    # These features are considered to have too much variation within replicate groups
+    # and are removed. This returns a list of features to remove.
+    to_remove = stdev_means_df[
+        stdev_means_df > noise_removal_stdev_cutoff
+    ].index.tolist()
+
+    return to_remove
+
+
+def get_noise_removal_groups(
+    population_df: pd.DataFrame, noise_removal_perturb_groups: Union[str, list[str]]
+) -> pd.Series:
+    """Get the perturbation group of every row for noise removal.
+
+    Parameters
+    ----------
+    population_df : pd.DataFrame
+        DataFrame of the samples to remove noise of. Only the column named by
+        ``noise_removal_perturb_groups`` (if any) is used.
+    noise_removal_perturb_groups : list or array of str
+        The list of unique perturbations corresponding to the rows in population_df,
+        or the name of the metadata column holding them.
+
+    Returns
+    -------
+    pd.Series
+        Perturbation groups, assigned to the rows of population_df by their index.
+    """
+
     # if a Metadata columns name is specified, use that as the perturb groups
     if isinstance(noise_removal_perturb_groups, str):
         # Check if the column exists
@@ -69,7 +112,7 @@ def noise_removal(
                 'f"{perturb} not found. Are you sure it is a metadata column?'
             )
         # Assign the group info to the specified column
-        group_info = population_df[noise_removal_perturb_groups]
+        return population_df[noise_removal_perturb_groups]
 
     # Otherwise, the user specifies a list of perturbs
     elif isinstance(noise_removal_perturb_groups, list):
@@ -81,30 +124,10 @@ def noise_removal(
                 f"data: {population_df.shape[0]}"
             )
         # Assign the group info to the the noise_removal_perturb_groups
-        group_info = pd.Series(noise_removal_perturb_groups)
+        return pd.Series(noise_removal_perturb_groups)
     else:
         # Raise an error if the input is not a list or a string
         raise TypeError(
             "noise_removal_perturb_groups must be a list corresponding to row perturbations or a str \
                         specifying the name of the metadata column."
         )
-
-    # Subset and df and assign each row with the identity of its perturbation group
-    population_df = population_df.loc[:, inferred_features]
-    population_df = population_df.assign(group_id=group_info)
-
-    # Get the standard deviations of features within each group then calculate the mean
-    # of these standard deviations.
-    # This tells us how much the standard deviation of each feature varies within each
-    # perturbation group.
-    stdev_means_df = population_df.groupby("group_id").std(ddof=0).mean()
-
-    # With the stdev_means_df, we can identify features that have a mean stdev greater than
-    # the cutoff
-    # These features are considered to have too much variation within replicate groups
-    # and are removed. This returns a list of features to remove.
-    to_remove = stdev_means_df[
-        stdev_means_df > noise_removal_stdev_cutoff
-    ].index.tolist()
-
-    return to_remove
@@ -5,16 +5,177 @@ References
 .. [1] Kessy et al. 2016 "Optimal Whitening and Decorrelation" arXiv: https://arxiv.org/abs/1512.00809
 """
 
-from typing import Optional, TypeVar
+from typing import Optional, TypeVar, Union, cast
 
 import numpy as np
 import pandas as pd
-from scipy.stats import median_abs_deviation
+from scipy.special import ndtri
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from pycytominer.cyto_utils.group_kernels import (
+    centroid_median,
+    centroid_quantile,
+    compress_centroids,
+    median_mad_columns,
+    sketch_columns,
+    sketch_size,
+    sort_columns,
+    sorted_ranks,
+)
 
 Spherize_type = TypeVar("Spherize_type", bound="Spherize")
 RobustMAD_type = TypeVar("RobustMAD_type", bound="RobustMAD")
+RankTransform_type = TypeVar("RankTransform_type", bound="RankTransform")
+
+# Rows of X are scaled in blocks of at most this size by the "eigh" solver
+gram_block_bytes = 64 * 2**20
+
+# Rows are whitened in blocks of at most this size, which stay in cache between
+# scaling and the matrix product
+whiten_block_bytes = 4 * 2**20
+
+
+def _block_rows(n_features: int) -> int:
+    """Number of rows in a float64 block of at most ``gram_block_bytes``."""
+    return max(1, gram_block_bytes // (8 * max(n_features, 1)))
+
+
+def _fit_scaler(scaler: StandardScaler, X_vals: np.ndarray) -> StandardScaler:
+    """Fit a StandardScaler over blocks of rows.
+
+    ``StandardScaler.fit`` allocates temporaries the size of the whole matrix;
+    ``partial_fit`` merges the statistics of blocks instead.
+    """
+    block_rows = _block_rows(X_vals.shape[1])
+    for start in range(0, max(X_vals.shape[0], 1), block_rows):
+        scaler.partial_fit(X_vals[start : start + block_rows])
+    return scaler
+
+
+def whiten_blocks(
+    values: np.ndarray,
+    center: Optional[np.ndarray],
+    scale: Optional[np.ndarray],
+    whitening: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    n_threads: Optional[int] = None,
+) -> np.ndarray:
+    """Compute ``((values - center) / scale) @ whitening`` one block of rows at a time.
+
+    Only a block of scaled rows is held next to the result at a time, instead of a
+    scaled copy of ``values``. Every block is scaled before its product is written,
+    so ``out`` may be ``values`` itself to whiten a float64 block in place.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Block of shape ``(n_samples, n_features)``.
+    center : np.ndarray, optional
+        Subtracted from every row, if given.
+    scale : np.ndarray, optional
+        Every row is divided by it after centering, if given.
+    whitening : np.ndarray
+        Whitening matrix of shape ``(n_features, n_components)``.
+    out : np.ndarray, optional
+        Float64 array of shape ``(n_samples, n_components)`` to write the result
+        to. A new array is allocated if not given.
+    n_threads : int, optional
+        Maximum number of BLAS threads for the matrix products. The BLAS default
+        is used if not given.
+
+    Returns
+    -------
+    np.ndarray
+        The whitened block, i.e. ``out`` if given.
+    """
+    n_samples, n_features = values.shape
+    if out is None:
+        out = np.empty((n_samples, whitening.shape[1]))
+    elif out.shape != (n_samples, whitening.shape[1]) or out.dtype != np.float64:
+        raise ValueError(
+            f"out must be a float64 array of shape {(n_samples, whitening.shape[1])}"
+        )
+
+    block_rows = max(1, whiten_block_bytes // (8 * max(n_features, 1)))
+
+    with threadpool_limits(limits=n_threads, user_api="blas"):
+        for start in range(0, n_samples, block_rows):
+            # The scaled copy of the rows is complete before the product
+            # overwrites them when out is values
+            block = np.array(values[start : start + block_rows], dtype=np.float64)
+            if center is not None:
+                block -= center
+            if scale is not None:
+                block /= scale
+            np.matmul(block, whitening, out=out[start : start + block_rows])
+
+    return out
+
+
+def rank_transform(
+    values: np.ndarray,
+    quantiles: np.ndarray,
+    n_valid: np.ndarray,
+    output_distribution: str = "uniform",
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Map values to their ranks among sorted reference values of every feature.
+
+    With the mid-rank ``r`` of a value among the ``n`` non-missing reference
+    values of its feature (see
+    :func:`pycytominer.cyto_utils.group_kernels.sorted_ranks`), the "uniform"
+    output is ``r / n`` and the "normal" output is ``Phi^-1((r + 1/8) / (n + 1/4))``
+    for the standard normal quantile function ``Phi^-1``.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D float block of shape ``(n_samples, n_features)``.
+    quantiles : np.ndarray
+        Column-sorted reference values, with NaNs at the end of every column.
+    n_valid : np.ndarray
+        Number of non-missing reference values of every feature.
+    output_distribution : str, default "uniform"
+        "uniform" or "normal".
+    out : np.ndarray, optional
+        Float array of the shape of ``values`` the output is written to. It may be
+        ``values`` itself.
+
+    Returns
+    -------
+    np.ndarray
+        The transformed block. Missing values, and all values of features without
+        reference values, are NaN.
+    """
+
+    out = sorted_ranks(quantiles, n_valid, values, out=out)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if output_distribution == "normal":
+            out += 1 / 8
+            out /= np.where(n_valid > 0, n_valid + 1 / 4, np.nan)
+            ndtri(out, out=out)
+        else:
+            out /= np.where(n_valid > 0, n_valid, np.nan)
+
+    return out
+
+
+def _float_values(X: Union[pd.DataFrame, np.ndarray]) -> tuple[pd.Index, np.ndarray]:
+    """Columns and float values of a dataframe or an array."""
+    columns: pd.Index
+    if isinstance(X, pd.DataFrame):
+        columns = X.columns
+        X = X.to_numpy()
+    else:
+        columns = pd.RangeIndex(X.shape[1])
+
+    if X.dtype not in [np.float32, np.float64]:
+        X = X.astype(np.float64)
+
+    return columns, X
 
 
 class Spherize(BaseEstimator, TransformerMixin):
@@ -43,6 +204,8 @@ class Spherize(BaseEstimator, TransformerMixin):
         center: bool = True,
         method: str = "ZCA",
         return_numpy: bool = False,
+        solver: str = "auto",
+        n_threads: Optional[int] = None,
     ):
         """
         Parameters
@@ -55,12 +218,25 @@ class Spherize(BaseEstimator, TransformerMixin):
             a string indicating which class of sphering to perform
         return_numpy: bool, default False
             option to return ndarray, instead of dataframe
+        solver : str, default "auto"
+            how to decompose the (scaled) data matrix. "svd" computes a thin
+            singular value decomposition of X. "eigh" accumulates the d x d matrix
+            X^T X over blocks of rows and computes its eigendecomposition, which
+            never holds a scaled copy of X. "auto" selects "eigh" when there
+            are at least as many samples as features and "svd" otherwise, or when
+            "eigh" finds the features linearly dependent. The selected solver is
+            stored in the ``solver_`` attribute.
+        n_threads : int, optional
+            maximum number of BLAS threads used by transform. The BLAS default is
+            used if not given.
         """
         avail_methods = ["PCA", "ZCA", "PCA-cor", "ZCA-cor"]
+        avail_solvers = ["auto", "svd", "eigh"]
 
         self.epsilon = epsilon
         self.center = center
         self.return_numpy = return_numpy
+        self.n_threads = n_threads
 
         if method not in avail_methods:
             raise ValueError(
@@ -68,6 +244,12 @@ class Spherize(BaseEstimator, TransformerMixin):
             )
         self.method = method
 
+        if solver not in avail_solvers:
+            raise ValueError(
+                f"Error {solver} not supported. Select one of {avail_solvers}"
+            )
+        self.solver = solver
+
         # PCA-cor and ZCA-cor require center=True because we assumed we are
         # only ever interested in computing centered Pearson correlation
         # https://stackoverflow.com/questions/23891391/uncentered-pearson-correlation
@@ -90,38 +272,220 @@ class Spherize(BaseEstimator, TransformerMixin):
         Returns
         -------
         self
-            With computed weights attribute
+            With computed weights attribute, and the ``solver_`` and ``rank_``
+            attributes reporting the decomposition that was used
         """
         # Get Numpy representation of the DataFrame
         X_vals = X.values
 
+        # Get the number of observations and variables
+        n, d = X_vals.shape
+
+        if self.solver == "auto":
+            self.solver_ = "eigh" if n >= d else "svd"
+        else:
+            self.solver_ = self.solver
+
+        if self.solver_ == "eigh":
+            # Accumulate the scatter matrix over blocks of rows, so that a scaled
+            # copy of the data matrix is never materialized
+            self._reset_scatter(d)
+            block_rows = _block_rows(d)
+            for start in range(0, n, block_rows):
+                self._update_scatter(X_vals[start : start + block_rows])
+            Sigma, Vt, tol = self._decompose_scatter()
+
+            # The rank tolerance of "eigh" is wider than that of "svd", so nearly
+            # collinear features that look rank deficient are decomposed again
+            if self.solver == "eigh" or np.count_nonzero(Sigma > tol) == d:
+                return self._fit_whitening(Sigma, Vt, tol, n)
+            self.solver_ = "svd"
+
+        self.scatter_: Optional[np.ndarray] = None
+        self.n_samples_seen_ = n
+
         if self.method in ["PCA-cor", "ZCA-cor"]:
             # The projection matrix for PCA-cor and ZCA-cor is the same as the
             # projection matrix for PCA and ZCA, respectively, on the standardized
             # data. So, we first standardize the data, then compute the projection
 
-            self.standard_scaler = StandardScaler().fit(X_vals)
-            variances = self.standard_scaler.var_
-            if np.any(variances == 0):
-                raise ValueError(
-                    "Divide by zero error, make sure low variance columns are removed"
-                )
-
+            self.standard_scaler = _fit_scaler(StandardScaler(), X_vals)
+            self._check_variances()
             X_transformed = self.standard_scaler.transform(X_vals)
+        elif self.center:
+            self.mean_centerer = _fit_scaler(
+                StandardScaler(with_mean=True, with_std=False), X_vals
+            )
+            X_transformed = self.mean_centerer.transform(X_vals)
+        else:
+            X_transformed = np.asarray(X_vals, dtype=np.float64)
+
+        # The full V is only needed to span the null space when n < d
+        _, Sigma, Vt = np.linalg.svd(X_transformed, full_matrices=n < d)
+        del X_transformed
+
+        # The default tolerance of np.linalg.matrix_rank
+        tol = Sigma.max(initial=0) * max(n, d) * np.finfo(np.float64).eps
+
+        return self._fit_whitening(Sigma, Vt, tol, n)
+
+    def partial_fit(
+        self: Spherize_type,
+        X: Union[pd.DataFrame, np.ndarray],
+        y: Optional[np.typing.ArrayLike] = None,
+    ) -> Spherize_type:
+        """Update the sphering transform with a batch of samples
+
+        The mean and the scatter matrix of all samples seen so far are merged with
+        those of the batch, and the whitening matrix is recomputed with the "eigh"
+        solver. The transform therefore matches a fit on all batches at once, while
+        memory only depends on the number of features. Calls after a fit with the
+        "svd" solver start over.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            batch of samples, with the features of all other batches
+        y : None
+            Has no effect; only used for consistency in sklearn transform API
+
+        Returns
+        -------
+        self
+            With computed weights attribute
+        """
+        if self.solver not in ["auto", "eigh"]:
+            raise ValueError(
+                f"partial_fit requires the eigh solver, not the {self.solver} solver"
+            )
+        self.solver_ = "eigh"
+
+        X_vals = np.asarray(X)
+        if getattr(self, "scatter_", None) is None:
+            self._reset_scatter(X_vals.shape[1])
+
+        block_rows = _block_rows(X_vals.shape[1])
+        for start in range(0, X_vals.shape[0], block_rows):
+            self._update_scatter(X_vals[start : start + block_rows])
+
+        return self._fit_scatter()
+
+    def _reset_scatter(self, n_features: int) -> None:
+        """Start accumulating the scatter matrix of a new set of samples."""
+        self.n_samples_seen_ = 0
+        self.scatter_ = np.zeros((n_features, n_features))
+        if self.method in ["PCA-cor", "ZCA-cor"]:
+            self.standard_scaler = StandardScaler()
+        elif self.center:
+            self.mean_centerer = StandardScaler(with_mean=True, with_std=False)
+
+    def _update_scatter(self, block: np.ndarray) -> None:
+        """Merge a block of samples into the mean and the scatter matrix.
+
+        Without centering, the scatter matrix is X^T X. Otherwise it is the sum of
+        the outer products of the deviations from the mean, merged across blocks
+        with the pairwise update of Chan et al.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        n_block = block.shape[0]
+        if n_block == 0:
+            return
+
+        if self.method in ["PCA-cor", "ZCA-cor"]:
+            scaler: Optional[StandardScaler] = self.standard_scaler
+        elif self.center:
+            scaler = self.mean_centerer
+        else:
+            scaler = None
+
+        scatter = cast(np.ndarray, self.scatter_)
+        if scaler is None:
+            scatter += block.T @ block
         else:
-            if self.center:
-                self.mean_centerer = StandardScaler(with_mean=True, with_std=False).fit(
-                    X_vals
+            block_mean = block.mean(axis=0)
+            deviations = block - block_mean
+            scatter += deviations.T @ deviations
+            if self.n_samples_seen_ > 0:
+                delta = block_mean - scaler.mean_
+                scatter += np.outer(delta, delta) * (
+                    self.n_samples_seen_ * n_block / (self.n_samples_seen_ + n_block)
                 )
-                X_transformed = self.mean_centerer.transform(X_vals)
-            else:
-                X_transformed = X_vals
+            scaler.partial_fit(block)
 
-        # Get the number of observations and variables
-        n, d = X_transformed.shape
+        self.n_samples_seen_ += n_block
+
+    def _fit_scatter(self: Spherize_type) -> Spherize_type:
+        """Compute the whitening matrix from the accumulated scatter matrix."""
+        Sigma, Vt, tol = self._decompose_scatter()
+        return self._fit_whitening(Sigma, Vt, tol, self.n_samples_seen_)
 
-        # Checking the rank of matrix X considering the number of samples (n) and features (d).
-        r = np.linalg.matrix_rank(X_transformed)
+    def _decompose_scatter(self) -> tuple[np.ndarray, np.ndarray, float]:
+        """Singular values, right singular vectors, and rank tolerance of the
+        scaled data matrix, from the eigendecomposition of its scatter matrix."""
+        n = self.n_samples_seen_
+        if self.method in ["PCA-cor", "ZCA-cor"]:
+            self._check_variances()
+            gram = self.scatter_ / np.outer(
+                self.standard_scaler.scale_, self.standard_scaler.scale_
+            )
+        else:
+            gram = self.scatter_
+
+        # X^T X = V S^2 V^T
+        eigenvalues, eigenvectors = np.linalg.eigh(gram)
+        Sigma = np.sqrt(np.clip(eigenvalues[::-1], 0, None))
+        Vt = eigenvectors[:, ::-1].T
+
+        # Squaring X halves the number of accurate digits of small singular
+        # values, so the rank tolerance of np.linalg.matrix_rank is widened
+        tol = Sigma.max(initial=0) * np.sqrt(
+            max(n, gram.shape[0]) * np.finfo(np.float64).eps
+        )
+
+        return Sigma, Vt, tol
+
+    def _check_variances(self) -> None:
+        """Reject constant features, which cannot be standardized."""
+        if np.any(self.standard_scaler.var_ == 0):
+            raise ValueError(
+                "Divide by zero error, make sure low variance columns are removed"
+            )
+
+    def _fit_whitening(
+        self: Spherize_type, Sigma: np.ndarray, Vt: np.ndarray, tol: float, n: int
+    ) -> Spherize_type:
+        """Compute the whitening matrix from a decomposition of the scaled data.
+
+        Parameters
+        ----------
+        Sigma : np.ndarray
+            Singular values of the scaled data matrix in decreasing order
+        Vt : np.ndarray
+            Matrix whose rows are the corresponding right singular vectors
+        tol : float
+            Singular values above this tolerance count towards the rank
+        n : int
+            Number of samples
+
+        Returns
+        -------
+        self
+            With computed weights attribute
+        """
+        d = Vt.shape[1]
+
+        # The rank of the data matrix, from the same decomposition
+        r = int(np.count_nonzero(Sigma > tol))
+        self.rank_ = r
+
+        # Fix the sign of each singular vector so that solvers agree
+        signs = np.sign(Vt[np.arange(Vt.shape[0]), np.abs(Vt).argmax(axis=1)])
+        Vt = Vt * signs[:, np.newaxis]
+
+        # Complete the rows of Vt to an orthonormal basis of all d features
+        if Vt.shape[0] < d:
+            basis, _ = np.linalg.qr(Vt.T, mode="complete")
+            Vt = np.vstack((Vt, basis[:, Vt.shape[0] :].T))
 
         # Case 1: More features than samples (n < d).
         # If centered (mean of each feature subtracted), one dimension becomes dependent, reducing rank to n - 1.
@@ -129,37 +493,18 @@ class Spherize(BaseEstimator, TransformerMixin):
         # Case 2: More samples than features or equal (n >= d).
         # Here, the max rank is limited by d (number of features), assuming each provides unique information.
 
-        if not ((r == d) | (self.center & (r == n - 1)) | (not self.center & (r == n))):
+        if not (
+            (r == d) or (self.center and r == n - 1) or (not self.center and r == n)
+        ):
             raise ValueError(
-                "The data matrix X is not full rank: n = {n}, d = {d}, r = {r}."
-                "Perfect linear dependencies are unusual in data matrices so something seems amiss."
+                f"The data matrix X is not full rank: n = {n}, d = {d}, r = {r}. "
+                "Perfect linear dependencies are unusual in data matrices so something seems amiss. "
                 "Check for linear dependencies in the data and remove them."
             )
 
-        # Get the eigenvalues and eigenvectors of the covariance matrix
-        # by computing the SVD on the data matrix
-        # https://stats.stackexchange.com/q/134282/8494
-        _, Sigma, Vt = np.linalg.svd(X, full_matrices=True)
-
-        # if n <= d then Sigma has shape (n,) so it will need to be expanded to
-        # d filled with the value r'th element of Sigma
-        if n <= d:
-            # Do some error checking
-            if Sigma.shape[0] != n:
-                error_detail = f"When n <= d, Sigma should have shape (n,) i.e. ({n}, ) but it is {Sigma.shape}"
-                context = (
-                    "the call to `np.linalg.svd` in `pycytominer.transform.Spherize`"
-                )
-                raise ValueError(f"{error_detail}. This is likely a bug in {context}.")
-
-            if (r != n - 1) & (r != n):
-                error_detail = f"When n <= d, the rank should be n - 1 or n i.e. {n - 1} or {n} but it is {r}"
-                context = (
-                    "the call to `np.linalg.svd` in `pycytominer.transform.Spherize`"
-                )
-                raise ValueError(f"{error_detail}. This is likely a bug in {context}.")
-
-            Sigma = np.concatenate((Sigma[0:r], np.repeat(Sigma[r - 1], d - r)))
+        # Directions beyond the rank of X (for example, when n <= d) have no
+        # variance; they are scaled by the r'th singular value
+        Sigma = np.concatenate((Sigma[0:r], np.repeat(Sigma[r - 1], d - r)))
 
         Sigma = Sigma + self.epsilon
 
@@ -222,26 +567,24 @@ class Spherize(BaseEstimator, TransformerMixin):
             self.W = self.W @ Vt
 
         # number of columns of self.W should be equal to that of X
-        if not (self.W.shape[1] == X_transformed.shape[1]):
-            raise ValueError(
-                f"Error: W has {self.W.shape[1]} columns, X has {X_transformed.shape[1]} columns"
-            )
-
-        if self.W.shape[1] != X_transformed.shape[1]:
+        if self.W.shape[1] != d:
             error_detail = (
                 f"The number of columns of W should be equal to that of X."
-                f"However, W has {self.W.shape[1]} columns, X has {X_transformed.shape[1]} columns"
+                f"However, W has {self.W.shape[1]} columns, X has {d} columns"
             )
-            context = "the call to `np.linalg.svd` in `pycytominer.transform.Spherize`"
+            context = f"the {self.solver_} solver in `pycytominer.transform.Spherize`"
             raise ValueError(f"{error_detail}. This is likely a bug in {context}.")
 
         return self
 
     def transform(
         self, X: pd.DataFrame, y: Optional[np.typing.ArrayLike] = None
-    ) -> pd.DataFrame:
+    ) -> Union[pd.DataFrame, np.ndarray]:
         """Perform the sphering transform
 
+        Rows are scaled and multiplied with the weights in blocks (see
+        :func:`whiten_blocks`), so the only full-size allocation is the output.
+
         Parameters
         ----------
         X : pd.DataFrame
@@ -251,8 +594,8 @@ class Spherize(BaseEstimator, TransformerMixin):
 
         Returns
         -------
-        pd.DataFrame
-            Spherized dataframe
+        pd.DataFrame or np.ndarray
+            Spherized dataframe, or ndarray if return_numpy is True
         """
 
         columns = X.columns
@@ -261,26 +604,25 @@ class Spherize(BaseEstimator, TransformerMixin):
         X_vals = X.values
 
         if self.method in ["PCA-cor", "ZCA-cor"]:
-            X_transformed = self.standard_scaler.transform(X_vals)
+            center, scale = self.standard_scaler.mean_, self.standard_scaler.scale_
+        elif self.center:
+            center, scale = self.mean_centerer.mean_, None
         else:
-            if self.center:
-                X_transformed = self.mean_centerer.transform(X_vals)
-            else:
-                X_transformed = X_vals
+            center, scale = None, None
 
         if self.method in ["PCA", "PCA-cor"]:
-            columns = pd.Index([
-                "PC" + str(i) for i in range(1, X_transformed.shape[1] + 1)
-            ])
+            columns = pd.Index(["PC" + str(i) for i in range(1, X_vals.shape[1] + 1)])
 
         self.columns = columns
 
-        XW = X_transformed @ self.W
+        # Scale and whiten blocks of rows into the output, without a scaled copy
+        # of X
+        XW = whiten_blocks(X_vals, center, scale, self.W, n_threads=self.n_threads)
 
         if self.return_numpy:
             return XW
         else:
-            return pd.DataFrame(XW, columns=columns)
+            return pd.DataFrame(XW, columns=columns, copy=False)
 
 
 class RobustMAD(BaseEstimator, TransformerMixin):
@@ -292,20 +634,30 @@ class RobustMAD(BaseEstimator, TransformerMixin):
     ----------
     epsilon : float
         fudge factor parameter
+    approx_error : float
+        target rank error of the quantile sketches kept by ``partial_fit``
     """
 
-    def __init__(self, epsilon: float = 1e-18):
+    def __init__(self, epsilon: float = 1e-18, approx_error: float = 0.01):
         self.epsilon = epsilon
+        self.approx_error = approx_error
 
     def fit(
-        self: RobustMAD_type, X: pd.DataFrame, y: Optional[np.typing.ArrayLike] = None
+        self: RobustMAD_type,
+        X: Union[pd.DataFrame, np.ndarray],
+        y: Optional[np.typing.ArrayLike] = None,
     ) -> RobustMAD_type:
         """Compute the median and mad to be used for later scaling.
 
+        The median and median absolute deviation of all columns are selected with
+        NaN-aware partitions over blocks of columns (see
+        :func:`pycytominer.cyto_utils.group_kernels.median_mad_columns`).
+
         Parameters
         ----------
-        X : pd.DataFrame
-            dataframe to fit RobustMAD transform
+        X : pd.DataFrame or np.ndarray
+            dataframe to fit RobustMAD transform. Float arrays are also accepted,
+            in which case the attributes are indexed by column position.
         y : None
             Has no effect; only used for consistency in sklearn transform API
 
@@ -314,27 +666,261 @@ class RobustMAD(BaseEstimator, TransformerMixin):
         self
             With computed median and mad attributes
         """
-        # Get the mean of the features (columns) and center if specified
-        self.median = X.median()
+        columns, X = _float_values(X)
+        median, mad = median_mad_columns(X)
+
+        # Discard the sketches of previous partial_fit calls
+        self.centroid_means_: Optional[np.ndarray] = None
+        self.centroid_weights_: Optional[np.ndarray] = None
+
+        return self._set_parameters(median, mad, columns)
+
+    def partial_fit(
+        self: RobustMAD_type,
+        X: Union[pd.DataFrame, np.ndarray],
+        y: Optional[np.typing.ArrayLike] = None,
+    ) -> RobustMAD_type:
+        """Update the median and mad with a batch of samples.
+
+        Every feature keeps a quantile sketch of ``sketch_size(approx_error)``
+        weighted centroids, which is merged with a sketch of the batch (see
+        :func:`pycytominer.cyto_utils.group_kernels.compress_centroids`). The
+        median and mad are exact until more samples than centroids are seen, and
+        approximate afterwards; memory only depends on the number of features.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            batch of samples, with the features of all other batches. Missing
+            values are ignored.
+        y : None
+            Has no effect; only used for consistency in sklearn transform API
+
+        Returns
+        -------
+        self
+            With updated median and mad attributes
+        """
+        columns, X = _float_values(X)
+        n_centroids = sketch_size(self.approx_error)
+
+        means, weights = sketch_columns(X, n_centroids)
+        if getattr(self, "centroid_means_", None) is not None:
+            means, weights = compress_centroids(
+                np.concatenate([self.centroid_means_, means]),
+                np.concatenate([self.centroid_weights_, weights]),
+                n_centroids,
+            )
+        self.centroid_means_, self.centroid_weights_ = means, weights
+
+        median = centroid_median(means, weights)
+        # The absolute deviations of the centroids sketch the deviations of the
+        # samples from the median
+        deviation_means, deviation_weights = compress_centroids(
+            np.abs(means - median), weights, n_centroids
+        )
+        mad = centroid_median(deviation_means, deviation_weights)
+
+        return self._set_parameters(median, mad, columns)
+
+    def _set_parameters(
+        self: RobustMAD_type, median: np.ndarray, mad: np.ndarray, columns: pd.Index
+    ) -> RobustMAD_type:
+        """Store the median and the scaled mad of every feature."""
+        self.median = pd.Series(median, index=columns)
         # The scale param is required to preserve previous behavior. More info at:
         # https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.median_absolute_deviation.html#scipy.stats.median_absolute_deviation
-        self.mad = pd.Series(
-            median_abs_deviation(X, nan_policy="omit", scale=1 / 1.4826),
-            index=self.median.index,
-        )
+        self.mad = pd.Series(mad / (1 / 1.4826), index=columns)
         return self
 
-    def transform(self, X: pd.DataFrame, copy: Optional[bool] = None) -> pd.DataFrame:
+    def transform(
+        self, X: Union[pd.DataFrame, np.ndarray], copy: Optional[bool] = None
+    ) -> Union[pd.DataFrame, np.ndarray]:
         """Apply the RobustMAD calculation
 
         Parameters
         ----------
-        X : pd.DataFrame
-            dataframe to fit RobustMAD transform
+        X : pd.DataFrame or np.ndarray
+            dataframe to fit RobustMAD transform. Float arrays with columns in the
+            order of the fitted features are also accepted.
+        copy : bool, optional
+            Only used for array inputs. If False, the array is scaled in place.
 
         Returns
         -------
-        pd.DataFrame
-            RobustMAD transformed dataframe
+        pd.DataFrame or np.ndarray
+            RobustMAD transformed dataframe (or array, for array inputs)
         """
-        return (X - self.median) / (self.mad + self.epsilon)
+        if isinstance(X, pd.DataFrame):
+            # Scale a float copy of the features in place instead of aligning
+            # intermediate DataFrames
+            values = X.to_numpy(dtype=np.result_type(*X.dtypes, np.float32), copy=True)
+            values -= self.median.reindex(X.columns).to_numpy()
+            values /= (self.mad + self.epsilon).reindex(X.columns).to_numpy()
+            return pd.DataFrame(values, index=X.index, columns=X.columns, copy=False)
+
+        X = X.copy() if copy is not False else X
+        X -= self.median.to_numpy()
+        X /= (self.mad + self.epsilon).to_numpy()
+
+        return X
+
+
+class RankTransform(BaseEstimator, TransformerMixin):
+    """Class to map every feature to the ranks of its values among reference samples
+
+        quantile = r / n
+        rank_int = Phi^-1((r + 1/8) / (n + 1/4))
+
+    where r is the mid-rank of a value among the n non-missing reference values of
+    its feature, so that the values of the reference itself get ``rank - 0.5`` and
+    tied values share their average rank. The "uniform" output places the
+    reference at its Hazen plotting positions in (0, 1), and the "normal" output is
+    the rank-based inverse normal transform with Blom's offset.
+
+    Attributes
+    ----------
+    output_distribution : str
+        "uniform" for quantile normalization, "normal" for the rank-based inverse
+        normal transform
+    approx_error : float
+        target rank error of the quantile sketches kept by ``partial_fit``
+    """
+
+    def __init__(
+        self, output_distribution: str = "uniform", approx_error: float = 0.01
+    ):
+        avail_distributions = ["uniform", "normal"]
+        if output_distribution not in avail_distributions:
+            raise ValueError(
+                f"Error {output_distribution} not supported. Select one of "
+                f"{avail_distributions}"
+            )
+        self.output_distribution = output_distribution
+        self.approx_error = approx_error
+
+    def fit(
+        self: RankTransform_type,
+        X: Union[pd.DataFrame, np.ndarray],
+        y: Optional[np.typing.ArrayLike] = None,
+    ) -> RankTransform_type:
+        """Sort the reference values of every feature.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            reference samples. Missing values are ignored.
+        y : None
+            Has no effect; only used for consistency in sklearn transform API
+
+        Returns
+        -------
+        self
+            With the sorted reference values in ``quantiles_`` and their counts in
+            ``n_valid_``
+        """
+        columns, X = _float_values(X)
+        if X.shape[0] == 0:
+            raise ValueError("RankTransform requires at least one reference sample")
+
+        self.quantiles_, self.n_valid_ = sort_columns(X)
+        self.columns_ = columns
+
+        # Discard the sketches of previous partial_fit calls
+        self.centroid_means_: Optional[np.ndarray] = None
+        self.centroid_weights_: Optional[np.ndarray] = None
+
+        return self
+
+    def partial_fit(
+        self: RankTransform_type,
+        X: Union[pd.DataFrame, np.ndarray],
+        y: Optional[np.typing.ArrayLike] = None,
+    ) -> RankTransform_type:
+        """Update the reference values with a batch of samples.
+
+        Every feature keeps a quantile sketch of ``sketch_size(approx_error)``
+        weighted centroids (see :meth:`RobustMAD.partial_fit`). Features with more
+        samples than centroids are ranked against the sketch quantiles at the
+        midpoints of ``sketch_size(approx_error)`` equal rank bins, so their ranks
+        are approximate.
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            batch of samples, with the features of all other batches. Missing
+            values are ignored.
+        y : None
+            Has no effect; only used for consistency in sklearn transform API
+
+        Returns
+        -------
+        self
+            With updated ``quantiles_`` and ``n_valid_``
+        """
+        columns, X = _float_values(X)
+        n_centroids = sketch_size(self.approx_error)
+
+        means, weights = sketch_columns(X, n_centroids)
+        if getattr(self, "centroid_means_", None) is not None:
+            means, weights = compress_centroids(
+                np.concatenate([self.centroid_means_, means]),
+                np.concatenate([self.centroid_weights_, weights]),
+                n_centroids,
+            )
+        self.centroid_means_, self.centroid_weights_ = means, weights
+
+        # Features with at most n_centroids samples keep every sample as a
+        # centroid of weight one, sorted with the empty centroids last
+        is_exact = weights.max(axis=0, initial=0) <= 1
+        grid = np.array([
+            centroid_quantile(means, weights, (rank + 0.5) / n_centroids)
+            for rank in range(n_centroids)
+        ]).reshape(n_centroids, -1)
+        self.quantiles_ = np.where(is_exact, means, grid)
+        self.n_valid_ = np.where(
+            is_exact, (weights > 0).sum(axis=0), n_centroids * (weights.sum(axis=0) > 0)
+        )
+        self.columns_ = columns
+
+        return self
+
+    def transform(
+        self, X: Union[pd.DataFrame, np.ndarray], copy: Optional[bool] = None
+    ) -> Union[pd.DataFrame, np.ndarray]:
+        """Replace every value by its transformed rank among the reference values
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            samples with the fitted features, in the fitted order for arrays
+        copy : bool, optional
+            Only used for float array inputs. If False, the array is transformed in
+            place.
+
+        Returns
+        -------
+        pd.DataFrame or np.ndarray
+            Transformed dataframe (or array, for array inputs)
+        """
+        if isinstance(X, pd.DataFrame):
+            values = X.loc[:, self.columns_].to_numpy(dtype=np.float64, copy=True)
+            rank_transform(
+                values,
+                self.quantiles_,
+                self.n_valid_,
+                output_distribution=self.output_distribution,
+                out=values,
+            )
+            return pd.DataFrame(
+                values, index=X.index, columns=self.columns_, copy=False
+            )
+
+        _, values = _float_values(X)
+        return rank_transform(
+            values,
+            self.quantiles_,
+            self.n_valid_,
+            output_distribution=self.output_distribution,
+            out=values if copy is False and values is X else None,
+        )
@@ -9,12 +9,14 @@ import numpy as np
 import pandas as pd
 
 from pycytominer.cyto_utils.features import infer_cp_features
+from pycytominer.cyto_utils.sample_selection import SampleSelection
+from pycytominer.operations.feature_statistics import FeatureStatistics
 
 
 def variance_threshold(
     population_df: pd.DataFrame,
     features: Union[str, list[str]] = "infer",
-    samples: str = "all",
+    samples: Union[str, SampleSelection] = "all",
     freq_cut: float = 0.05,
     unique_cut: float = 0.01,
 ) -> list[str]:
@@ -29,11 +31,13 @@ def variance_threshold(
         `population_df` DataFrame. All features listed must be found in `population_df`.
         Defaults to "infer". If "infer", then assume CellProfiler features are those
         prefixed with "Cells", "Nuclei", or "Cytoplasm".
-    samples : str, default "all"
+    samples : str or SampleSelection, default "all"
         List of samples to perform operation on. The function uses a pd.DataFrame.query()
         function, so you should  structure samples in this fashion. An example is
         "Metadata_treatment == 'control'" (include all quotes).
-        If "all", use all samples to calculate.
+        If "all", use all samples to calculate. A SampleSelection of population_df
+        reuses a query that was already evaluated (see
+        :class:`pycytominer.cyto_utils.sample_selection.SampleSelection`).
     freq_cut : float, default 0.05
         Ratio (2nd most common feature val / most common). Must range between 0 and 1.
         Remove features lower than freq_cut. A low freq_cut will remove features
@@ -57,13 +61,6 @@ def variance_threshold(
     if not 0 <= unique_cut <= 1:
         raise ValueError("unique_cut variable must be between (0 and 1)")
 
-    # Subset the DataFrame if specific samples are specified
-    # If "all", use the entire DataFrame without subsetting
-    if samples != "all":
-        # Using pandas query to filter rows based on the conditions provided in the
-        # samples parameter
-        population_df = population_df.query(expr=samples)
-
     # Infer CellProfiler features if 'features' is set to 'infer'
     if features == "infer":
         # Infer CellProfiler features
@@ -71,43 +68,22 @@ def variance_threshold(
     elif isinstance(features, list):
         inferred_features = features
 
-    # Subset the DataFrame to only include the features of interest
-    population_df = population_df.loc[:, inferred_features]
-
-    # Exclude features based on frequency
-    # Frequency is the ratio of the second most common value to the most common value.
-    # Features with a frequency below the `freq_cut` threshold are flagged for exclusion.
-    excluded_features_freq = population_df.apply(
-        lambda x: calculate_frequency(x, freq_cut), axis=0
+    # Count the unique values and the two most common values of every feature. The
+    # values of numeric features are sorted in blocks of features, and the counts
+    # are the lengths of the runs of equal values.
+    statistics = FeatureStatistics.from_profiles(
+        population_df,
+        inferred_features,
+        samples=samples,
+        operations=["variance_threshold"],
     )
 
-    # Remove features with NA values
-    excluded_features_freq_index_list = excluded_features_freq[
-        excluded_features_freq.isna()
-    ].index.tolist()
-
-    # Get the number of samples
-    n = population_df.shape[0]
-
-    # Get the number of unique features
-    num_unique_features = population_df.nunique()
-
-    # Exclude features with too many (defined by unique_ratio) values in common, where
-    # unique_ratio is defined as the number of unique features divided by the total
-    # number of samples
-    unique_ratio = num_unique_features / n
-    unique_ratio_mask = unique_ratio < unique_cut
-
-    # Get the feature names that have a unique ratio less than the unique_cut
-    # This represents features that have too few unique values compared to the number
-    # of samples.
-    excluded_features_unique = unique_ratio_mask[unique_ratio_mask].index.tolist()
-
-    # Combine the two lists of features to exclude
-    excluded_features = list(
-        set(excluded_features_freq_index_list + excluded_features_unique)
-    )
-    return excluded_features
+    # Exclude features based on frequency and unique values
+    # Frequency is the ratio of the second most common value to the most common value.
+    # Features with a frequency below the `freq_cut` threshold (or with fewer than
+    # two unique values) are flagged for exclusion, as are features with a ratio of
+    # unique values to the number of samples below the `unique_cut` threshold.
+    return statistics.variance_threshold(freq_cut=freq_cut, unique_cut=unique_cut)
 
 
 def calculate_frequency(
@@ -1,9 +1,11 @@
 import os
 import tempfile
+import tracemalloc
 
 import numpy as np
 import pandas as pd
 import pytest
+from scipy.stats import trim_mean
 
 from pycytominer import aggregate
 from pycytominer.cyto_utils import infer_cp_features
@@ -354,3 +356,549 @@ def test_output_type():
 
     # check to make sure both dataframes are the same regardless of the output_type
     pd.testing.assert_frame_equal(csv_df, parquet_df)
+
+
+@pytest.mark.parametrize("operation", ["median", "mean"])
+def test_aggregate_parquet_streaming(tmp_path, operation):
+    """
+    Testing aggregate pycytominer function with streamed parquet input
+    """
+    streaming_df = pd.concat([data_df, data_missing_df.assign(g="c")]).reset_index(
+        drop=True
+    )
+    parquet_file = tmp_path / "single_cells.parquet"
+    streaming_df.to_parquet(parquet_file, engine="pyarrow", row_group_size=2)
+
+    expected_result = aggregate(
+        population_df=streaming_df,
+        strata=["g"],
+        features="infer",
+        operation=operation,
+    )
+
+    # batches smaller than a group force partial states to be merged
+    for batch_size in [1, 2, 100]:
+        aggregate_result = aggregate(
+            population_df=str(parquet_file),
+            strata=["g"],
+            features="infer",
+            operation=operation,
+            batch_size=batch_size,
+        )
+        pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+    # parquet dataset directories are streamed as well
+    parquet_dir = tmp_path / "single_cells"
+    parquet_dir.mkdir()
+    streaming_df.iloc[:5].to_parquet(parquet_dir / "part-0.parquet")
+    streaming_df.iloc[5:].to_parquet(parquet_dir / "part-1.parquet")
+
+    aggregate_result = aggregate(
+        population_df=parquet_dir,
+        strata=["g"],
+        features="infer",
+        operation=operation,
+        batch_size=3,
+    )
+    pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+
+def test_aggregate_parquet_streaming_object_count_and_subset(tmp_path):
+    """
+    Testing aggregate pycytominer function with streamed parquet input
+    """
+    parquet_file = tmp_path / "single_cells.parquet"
+    data_df.to_parquet(parquet_file, engine="pyarrow")
+
+    subset_df = pd.DataFrame({"g": ["a", "a", "b"], "Metadata_ObjectNumber": [1, 3, 4]})
+
+    for subset_data_df in [None, subset_df]:
+        expected_result = aggregate(
+            population_df=data_df,
+            strata=["g"],
+            features=["Cells_x", "Nuclei_y"],
+            operation="median",
+            compute_object_count=True,
+            subset_data_df=subset_data_df,
+        )
+        aggregate_result = aggregate(
+            population_df=parquet_file,
+            strata=["g"],
+            features=["Cells_x", "Nuclei_y"],
+            operation="median",
+            compute_object_count=True,
+            subset_data_df=subset_data_df,
+            batch_size=2,
+        )
+        pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+    # Strata with a missing value have no object count in both paths
+    missing_strata_df = data_df.assign(g=["a", None, "a", "b", None, "b"])
+    missing_strata_file = tmp_path / "missing_strata.parquet"
+    missing_strata_df.to_parquet(missing_strata_file, engine="pyarrow")
+    expected_result = aggregate(
+        population_df=missing_strata_df,
+        strata=["g"],
+        features=["Cells_x", "Nuclei_y"],
+        compute_object_count=True,
+    )
+    assert expected_result.Metadata_Object_Count.isna().tolist() == [
+        False,
+        False,
+        True,
+    ]
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=missing_strata_file,
+            strata=["g"],
+            features=["Cells_x", "Nuclei_y"],
+            compute_object_count=True,
+            batch_size=2,
+        ),
+        expected_result,
+    )
+
+    with pytest.raises(KeyError, match="DOES NOT EXIST"):
+        aggregate(
+            population_df=parquet_file,
+            strata=["g"],
+            compute_object_count=True,
+            object_feature="DOES NOT EXIST",
+        )
+
+
+def test_aggregate_subset_semi_join():
+    """
+    Testing that subsetting matches an inner merge with the subset rows
+    """
+    # Repeated subset rows (sampling with replacement) weigh repeated cells
+    subset_df = pd.DataFrame({
+        "g": ["b", "a", "a", "a", "b"],
+        "Metadata_ObjectNumber": [4, 3, 1, 3, 9],
+    })
+    expected_population_df = subset_df.merge(
+        data_df, how="inner", on=subset_df.columns.tolist()
+    ).reindex(data_df.columns, axis="columns")
+
+    for operation in ["median", "mean"]:
+        pd.testing.assert_frame_equal(
+            aggregate(
+                population_df=data_df,
+                strata=["g"],
+                operation=operation,
+                compute_object_count=True,
+                subset_data_df=subset_df,
+            ),
+            aggregate(
+                population_df=expected_population_df,
+                strata=["g"],
+                operation=operation,
+                compute_object_count=True,
+            ),
+        )
+
+    # Non-unique population keys fall back to matching every pair
+    duplicated_df = pd.concat([data_df, data_df]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=duplicated_df,
+            strata=["g"],
+            compute_object_count=True,
+            subset_data_df=subset_df,
+        ),
+        aggregate(
+            population_df=pd.concat([expected_population_df] * 2),
+            strata=["g"],
+            compute_object_count=True,
+        ),
+    )
+
+
+@pytest.mark.parametrize("engine", ["pandas", "numpy"])
+def test_aggregate_no_features(engine):
+    """
+    Testing that aggregating without features returns the strata
+    """
+    for compute_object_count in [False, True]:
+        aggregate_result = aggregate(
+            population_df=data_df[["g", "Metadata_ObjectNumber"]],
+            strata=["g"],
+            features=[],
+            compute_object_count=compute_object_count,
+            object_feature="Metadata_ObjectNumber",
+            engine=engine,
+        )
+        expected_result = pd.DataFrame({"g": ["a", "b"]})
+        if compute_object_count:
+            expected_result["Metadata_Object_Count"] = [3, 3]
+        pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+
+@pytest.mark.parametrize("operation", ["median", "mean"])
+def test_aggregate_numpy_engine(operation):
+    """
+    Testing aggregate pycytominer function with the numpy engine
+    """
+    engine_df = pd.concat([
+        data_df,
+        data_missing_df.assign(g="c"),
+        pd.DataFrame({"g": np.nan, "Cells_x": [1, 3, 8], "Nuclei_y": [np.nan] * 3}),
+    ]).reset_index(drop=True)
+
+    for compute_object_count in [False, True]:
+        expected_result = aggregate(
+            population_df=engine_df,
+            strata=["g"],
+            features="infer",
+            operation=operation,
+            compute_object_count=compute_object_count,
+        )
+        aggregate_result = aggregate(
+            population_df=engine_df,
+            strata=["g"],
+            features="infer",
+            operation=operation,
+            compute_object_count=compute_object_count,
+            engine="numpy",
+        )
+        pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+    # multiple strata columns
+    multi_strata_df = engine_df.assign(h=np.arange(engine_df.shape[0]) % 2)
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=multi_strata_df,
+            strata=["g", "h"],
+            operation=operation,
+            engine="numpy",
+        ),
+        aggregate(
+            population_df=multi_strata_df, strata=["g", "h"], operation=operation
+        ),
+    )
+
+
+@pytest.mark.parametrize("operation", ["median", "mean"])
+def test_aggregate_n_jobs(operation, tmp_path):
+    """
+    Testing that threaded aggregation matches serial aggregation exactly
+    """
+    random_state = np.random.default_rng(7)
+    n_rows = 3000
+    parallel_df = pd.DataFrame(
+        random_state.normal(size=(n_rows, 8)),
+        columns=[f"Cells_x{idx}" for idx in range(8)],
+    )
+    parallel_df = parallel_df.mask(random_state.random(parallel_df.shape) < 0.05)
+    parallel_df.insert(0, "g", random_state.integers(0, 50, size=n_rows))
+
+    expected_result = aggregate(
+        population_df=parallel_df, strata=["g"], operation=operation, engine="numpy"
+    )
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=parallel_df,
+            strata=["g"],
+            operation=operation,
+            engine="numpy",
+            n_jobs=4,
+        ),
+        expected_result,
+        check_exact=True,
+    )
+
+    parquet_path = tmp_path / "parallel.parquet"
+    parallel_df.to_parquet(parquet_path)
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=parquet_path,
+            strata=["g"],
+            operation=operation,
+            n_jobs=4,
+            batch_size=500,
+        ),
+        aggregate(
+            population_df=parquet_path,
+            strata=["g"],
+            operation=operation,
+            batch_size=500,
+        ),
+        check_exact=True,
+    )
+
+    with pytest.raises(ValueError, match="requires engine='numpy'"):
+        aggregate(population_df=parallel_df, strata=["g"], n_jobs=2)
+
+    with pytest.raises(ValueError, match="not supported, select one of"):
+        aggregate(population_df=data_df, strata=["g"], engine="DOES NOT EXIST")
+
+
+@pytest.mark.parametrize("engine", ["pandas", "numpy"])
+def test_aggregate_float32(engine, tmp_path):
+    """
+    Testing that aggregate processes and returns features in the requested dtype
+    """
+    random_state = np.random.default_rng(11)
+    n_rows = 400
+    float32_df = pd.DataFrame(
+        random_state.normal(size=(n_rows, 5)).astype(np.float32),
+        columns=[f"Cells_x{idx}" for idx in range(5)],
+    )
+    float32_df = float32_df.mask(random_state.random(float32_df.shape) < 0.1)
+    float32_df.insert(0, "g", random_state.integers(0, 7, size=n_rows))
+
+    parquet_path = tmp_path / "float32.parquet"
+    float32_df.to_parquet(parquet_path)
+
+    for operation in ["median", "mean"]:
+        expected_result = aggregate(
+            population_df=float32_df, strata=["g"], operation=operation, engine=engine
+        )
+        for population_df in [float32_df, parquet_path]:
+            aggregate_result = aggregate(
+                population_df=population_df,
+                strata=["g"],
+                operation=operation,
+                engine=engine,
+                dtype="float32",
+            )
+            assert (
+                aggregate_result.drop("g", axis="columns").dtypes == np.float32
+            ).all()
+            pd.testing.assert_frame_equal(
+                aggregate_result, expected_result, check_dtype=False, rtol=1e-6
+            )
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_aggregate_peak_memory(dtype):
+    """
+    Testing that aggregate reads features already in the requested dtype in place
+    """
+    random_state = np.random.default_rng(3)
+    features = [f"Cells_x{idx}" for idx in range(100)]
+    population_df = pd.DataFrame(
+        random_state.normal(size=(5000, 100)).astype(dtype), columns=features
+    )
+    population_df.insert(0, "g", random_state.integers(0, 96, size=5000))
+
+    tracemalloc.start()
+    try:
+        aggregate(
+            population_df=population_df,
+            strata=["g"],
+            features=features,
+            operation="mean",
+            engine="pandas",
+            dtype=dtype,
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # A copy of the features would take 5000 * 100 * itemsize bytes
+    assert peak < 0.5 * 5000 * 100 * np.dtype(dtype).itemsize
+
+
+@pytest.mark.parametrize("engine", ["pandas", "numpy"])
+def test_aggregate_trimmed_weighted_mean(engine, tmp_path):
+    """
+    Testing that trimmed and weighted means match their per-stratum definitions
+    """
+    random_state = np.random.default_rng(17)
+    n_rows = 1500
+    features = [f"Cells_x{idx}" for idx in range(3)]
+    robust_df = pd.DataFrame(
+        random_state.standard_t(2, size=(n_rows, 3)), columns=features
+    )
+    robust_df = robust_df.mask(random_state.random(robust_df.shape) < 0.1)
+    robust_df.insert(0, "g", random_state.integers(0, 4, size=n_rows))
+    robust_df["Cells_Area"] = random_state.integers(20, 200, size=n_rows).astype(float)
+    robust_df.loc[:10, "Cells_Area"] = np.nan
+
+    expected_trimmed = robust_df.groupby("g")[features].agg(
+        lambda column: trim_mean(column.dropna(), 0.05)
+    )
+    expected_weighted = robust_df.groupby("g")[features].agg(
+        lambda column: np.average(
+            column[column.notna() & robust_df.Cells_Area.notna()],
+            weights=robust_df.Cells_Area[column.notna() & robust_df.Cells_Area.notna()],
+        )
+    )
+    expected_result = pd.concat(
+        [
+            expected_trimmed.add_suffix("_trimmed_mean"),
+            expected_weighted.add_suffix("_weighted_mean"),
+        ],
+        axis="columns",
+    ).reset_index()
+
+    aggregate_result = aggregate(
+        population_df=robust_df,
+        strata=["g"],
+        features=features,
+        operation=["trimmed_mean", "weighted_mean"],
+        weight_feature="Cells_Area",
+        engine=engine,
+    )
+    pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+    # Streamed parquet inputs merge weighted sums and trimmed values across batches
+    parquet_path = tmp_path / "robust.parquet"
+    robust_df.to_parquet(parquet_path)
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=parquet_path,
+            strata=["g"],
+            features=features,
+            operation=["trimmed_mean", "weighted_mean"],
+            weight_feature="Cells_Area",
+            batch_size=200,
+        ),
+        expected_result,
+    )
+
+    # Without trimming, the trimmed mean is the mean
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=robust_df,
+            strata=["g"],
+            features=features,
+            operation="trimmed_mean",
+            trim_fraction=0,
+            engine=engine,
+        ),
+        aggregate(
+            population_df=robust_df, strata=["g"], features=features, operation="mean"
+        ),
+    )
+
+    with pytest.raises(ValueError, match="requires a weight_feature"):
+        aggregate(population_df=robust_df, strata=["g"], operation="weighted_mean")
+
+    with pytest.raises(ValueError, match="trim_fraction must be"):
+        aggregate(
+            population_df=robust_df,
+            strata=["g"],
+            operation="trimmed_mean",
+            trim_fraction=0.5,
+        )
+
+
+def test_aggregate_approx_median(tmp_path):
+    """
+    Testing that approx_median stays within its rank error and merges across batches
+    """
+    random_state = np.random.default_rng(5)
+    n_rows = 6000
+    approx_df = pd.DataFrame(
+        random_state.lognormal(size=(n_rows, 4)),
+        columns=[f"Cells_x{idx}" for idx in range(4)],
+    )
+    approx_df = approx_df.mask(random_state.random(approx_df.shape) < 0.05)
+    approx_df.insert(0, "g", random_state.integers(0, 3, size=n_rows))
+    # A small stratum gets its exact median
+    approx_df.loc[:9, "g"] = 3
+
+    parquet_path = tmp_path / "approx.parquet"
+    approx_df.to_parquet(parquet_path)
+
+    exact_result = aggregate(population_df=approx_df, strata=["g"])
+    for population_df in [approx_df, parquet_path]:
+        approx_result = aggregate(
+            population_df=population_df,
+            strata=["g"],
+            operation="approx_median",
+            approx_error=0.02,
+            batch_size=1000,
+        )
+        pd.testing.assert_frame_equal(
+            approx_result.query("g == 3"), exact_result.query("g == 3")
+        )
+
+        # Estimates lie within the requested fraction of ranks around the median
+        for group, group_df in approx_df.query("g != 3").groupby("g"):
+            estimates = approx_result.query("g == @group").iloc[0, 1:]
+            for feature, estimate in estimates.items():
+                feature_values = group_df[feature].dropna()
+                rank = (feature_values < estimate).mean()
+                assert abs(rank - 0.5) <= 0.02
+
+    with pytest.raises(ValueError, match="approx_error must be between 0 and 1"):
+        aggregate(
+            population_df=approx_df,
+            strata=["g"],
+            operation="approx_median",
+            approx_error=0,
+        )
+
+
+@pytest.mark.parametrize("engine", ["pandas", "numpy"])
+def test_aggregate_multiple_operations(engine, tmp_path):
+    """
+    Testing that a list of operations is computed in one call with suffixed columns
+    """
+    random_state = np.random.default_rng(13)
+    n_rows = 2000
+    stats_df = pd.DataFrame(
+        random_state.normal(size=(n_rows, 3)),
+        columns=[f"Cells_x{idx}" for idx in range(3)],
+    )
+    stats_df = stats_df.mask(random_state.random(stats_df.shape) < 0.1)
+    stats_df.insert(0, "g", random_state.integers(0, 5, size=n_rows))
+    # A single-cell stratum has no standard deviation
+    stats_df.loc[0, "g"] = 9
+
+    operations = ["mean", "std", "q25", "q75", "mad", "count"]
+    aggregate_result = aggregate(
+        population_df=stats_df, strata=["g"], operation=operations, engine=engine
+    )
+
+    grouped = stats_df.groupby("g")
+    features = ["Cells_x0", "Cells_x1", "Cells_x2"]
+    expected_result = pd.concat(
+        [
+            grouped.mean().add_suffix("_mean"),
+            grouped.std().add_suffix("_std"),
+            grouped.quantile(0.25).add_suffix("_q25"),
+            grouped.quantile(0.75).add_suffix("_q75"),
+            (stats_df[features] - grouped[features].transform("median"))
+            .abs()
+            .groupby(stats_df.g)
+            .median()
+            .add_suffix("_mad"),
+            grouped.count().astype(float).add_suffix("_count"),
+        ],
+        axis="columns",
+    ).reset_index()
+
+    assert aggregate_result.columns.tolist()[1:4] == [
+        "Cells_x0_mean",
+        "Cells_x1_mean",
+        "Cells_x2_mean",
+    ]
+    pd.testing.assert_frame_equal(aggregate_result, expected_result)
+
+    # Streamed parquet inputs merge the same statistics across batches
+    parquet_path = tmp_path / "stats.parquet"
+    stats_df.to_parquet(parquet_path)
+    pd.testing.assert_frame_equal(
+        aggregate(
+            population_df=parquet_path,
+            strata=["g"],
+            operation=operations,
+            batch_size=300,
+        ),
+        expected_result,
+    )
+
+    # A single operation keeps the feature names
+    pd.testing.assert_frame_equal(
+        aggregate(population_df=stats_df, strata=["g"], operation="q75", engine=engine),
+        expected_result.loc[
+            :, ["g", "Cells_x0_q75", "Cells_x1_q75", "Cells_x2_q75"]
+        ].rename(columns=lambda column: column.replace("_q75", "")),
+    )
+
+    with pytest.raises(ValueError, match="one or more distinct operations"):
+        aggregate(population_df=stats_df, strata=["g"], operation=["mean", "mean"])
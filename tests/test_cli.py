@@ -102,6 +102,36 @@ def test_cli_normalize(tmp_path: pathlib.Path) -> None:
     assert np.isclose(result["Feature_2"].mean(), 0.0, atol=1e-7)
 
 
+def test_cli_normalize_parquet_batches(tmp_path: pathlib.Path) -> None:
+    """Ensure CLI normalize streams parquet profiles when batch_size is set."""
+    df, _ = _write_profiles(tmp_path)
+    profiles_path = tmp_path / "profiles.parquet"
+    df.to_parquet(profiles_path, row_group_size=2)
+    output_path = tmp_path / "normalized.parquet"
+
+    cli = PycytominerCLI()
+    cli.normalize(
+        profiles=str(profiles_path),
+        output_file=str(output_path),
+        features="Feature_1,Feature_2",
+        meta_features="Metadata_Plate,Metadata_Well",
+        method="standardize",
+        output_type="parquet",
+        batch_size=2,
+    )
+
+    result = pd.read_parquet(output_path)
+    assert result.shape == (4, 4)
+    assert np.isclose(result["Feature_1"].mean(), 0.0, atol=1e-7)
+
+    with pytest.raises(ValueError, match="batch_size requires"):
+        cli.normalize(
+            profiles=str(profiles_path),
+            output_file=str(tmp_path / "normalized.csv"),
+            batch_size=2,
+        )
+
+
 def test_cli_feature_select(tmp_path: pathlib.Path) -> None:
     """Ensure CLI feature_select drops low-variance features."""
     _, profiles_path = _write_profiles(tmp_path)
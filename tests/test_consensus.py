@@ -99,6 +99,26 @@ def test_consensus_modz():
     pd.testing.assert_frame_equal(modz_df, pd.read_csv(output_test_file_csv))
 
 
+def test_consensus_float32():
+    for operation in ["mean", "median", "modz"]:
+        float64_df = consensus(
+            data_df, replicate_columns=["Metadata_treatment"], operation=operation
+        )
+        float32_df = consensus(
+            data_df,
+            replicate_columns=["Metadata_treatment"],
+            operation=operation,
+            dtype=np.float32,
+        )
+
+        assert (
+            float32_df.drop("Metadata_treatment", axis="columns").dtypes == np.float32
+        ).all()
+        pd.testing.assert_frame_equal(
+            float32_df, float64_df, check_dtype=False, rtol=1e-5
+        )
+
+
 def test_output_type():
     # dictionary with the output name associated with the file type
     output_dict = {"csv": output_test_file_csv, "parquet": output_test_file_parquet}
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycytominer import aggregate
+from pycytominer.cyto_utils.aggregate_states import AggregateState
+
+data_df = pd.DataFrame({
+    "Metadata_Plate": ["p1", "p1", "p1", "p1", "p2", "p2", None, None],
+    "Metadata_Well": ["A01", "A01", "A02", "A02", "A01", "A01", "A01", "A01"],
+    "Metadata_ObjectNumber": [1, 2, 3, 4, 5, 6, 7, np.nan],
+    "Cells_x": [1.0, 3.0, 8.0, np.nan, 5.0, 2.0, 4.0, 6.0],
+    "Nuclei_y": [5.0, 3.0, 1.0, 7.0, np.nan, np.nan, 2.0, 9.0],
+    "Cells_Area": [2.0, 1.0, 1.0, 3.0, 1.0, 4.0, np.nan, 2.0],
+})
+strata = ["Metadata_Plate", "Metadata_Well"]
+features = ["Cells_x", "Nuclei_y"]
+
+
+@pytest.mark.parametrize(
+    "operation", ["mean", "median", "approx_median", ["std", "mad", "q75", "count"]]
+)
+def test_aggregate_state_merge_matches_aggregate(operation):
+    expected_df = aggregate(
+        population_df=data_df,
+        strata=strata,
+        features=features,
+        operation=operation,
+    )
+
+    # Build partial states from shuffled chunks and merge them
+    shuffled_df = data_df.sample(frac=1, random_state=123)
+    states = [
+        AggregateState(strata=strata, features=features, operation=operation).update(
+            chunk_df
+        )
+        for chunk_df in [
+            shuffled_df.iloc[:3],
+            shuffled_df.iloc[3:5],
+            shuffled_df.iloc[5:],
+        ]
+    ]
+    merged_state = states[0]
+    for state in states[1:]:
+        merged_state.merge(state)
+
+    pd.testing.assert_frame_equal(merged_state.finalize(), expected_df)
+
+
+def test_aggregate_state_object_count():
+    state = AggregateState(
+        strata=["Metadata_Well"],
+        features=features,
+        operation="mean",
+        compute_object_count=True,
+    )
+    state.update(data_df.iloc[:5]).update(data_df.iloc[5:])
+
+    result_df = state.finalize()
+
+    assert result_df.columns.tolist() == [
+        "Metadata_Well",
+        "Metadata_Object_Count",
+        "Cells_x",
+        "Nuclei_y",
+    ]
+    assert result_df.Metadata_Object_Count.tolist() == [5, 2]
+
+
+def test_aggregate_state_incompatible_merge():
+    with pytest.raises(ValueError, match="Cannot merge aggregate states"):
+        AggregateState(strata=strata, features=features, operation="mean").merge(
+            AggregateState(strata=strata, features=features, operation="median")
+        )
+
+
+@pytest.mark.parametrize(
+    "operation", ["mean", "median", "approx_median", ["mean", "std"]]
+)
+def test_aggregate_state_save_load(tmp_path, operation):
+    state = AggregateState(
+        strata=strata,
+        features=features,
+        operation=operation,
+        compute_object_count=True,
+        dtype=np.float32,
+    ).update(data_df.iloc[:5])
+    state.save(tmp_path / "state.npz")
+
+    loaded_state = AggregateState.load(tmp_path / "state.npz")
+    assert loaded_state.dtype == np.float32
+    pd.testing.assert_frame_equal(loaded_state.finalize(), state.finalize())
+
+    # The loaded state keeps accumulating like the original state
+    pd.testing.assert_frame_equal(
+        loaded_state.update(data_df.iloc[5:]).finalize(),
+        state.update(data_df.iloc[5:]).finalize(),
+    )
+
+
+@pytest.mark.parametrize("operation", ["mean", "median", "approx_median"])
+def test_aggregate_state_drop_strata(operation):
+    state = AggregateState(strata=strata, features=features, operation=operation)
+    state.update(data_df).drop_strata([("p1", "A02"), (None, "A01")])
+
+    expected_df = aggregate(
+        population_df=data_df
+        .query("Metadata_Plate != 'p1' or Metadata_Well != 'A02'")
+        .dropna(subset="Metadata_Plate")
+        .reset_index(drop=True),
+        strata=strata,
+        features=features,
+        operation=operation,
+    )
+
+    pd.testing.assert_frame_equal(state.finalize(), expected_df)
+
+    # Dropped strata can be rebuilt from new data
+    state.update(data_df.query("Metadata_Well == 'A02'"))
+    assert state.finalize().shape[0] == 3
+
+
+def test_aggregate_state_trimmed_weighted_mean(tmp_path):
+    operation = ["trimmed_mean", "weighted_mean"]
+    settings = {"trim_fraction": 0.25, "weight_feature": "Cells_Area"}
+    expected_df = aggregate(
+        population_df=data_df,
+        strata=strata,
+        features=features,
+        operation=operation,
+        **settings,
+    )
+
+    state = AggregateState(
+        strata=strata, features=features, operation=operation, **settings
+    ).update(data_df.iloc[:4])
+    state.save(tmp_path / "state.npz")
+
+    loaded_state = AggregateState.load(tmp_path / "state.npz")
+    assert loaded_state.weight_feature == "Cells_Area"
+    loaded_state.merge(
+        AggregateState(
+            strata=strata, features=features, operation=operation, **settings
+        ).update(data_df.iloc[4:])
+    )
+    pd.testing.assert_frame_equal(loaded_state.finalize(), expected_df)
+
+    with pytest.raises(ValueError, match="Cannot merge aggregate states"):
+        loaded_state.merge(
+            AggregateState(
+                strata=strata,
+                features=features,
+                operation=operation,
+                trim_fraction=0.1,
+                weight_feature="Cells_Area",
+            )
+        )
+
+    with pytest.raises(ValueError, match="requires a weight_feature"):
+        AggregateState(strata=strata, features=features, operation="weighted_mean")
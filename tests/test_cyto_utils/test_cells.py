@@ -15,7 +15,11 @@ from pycytominer.cyto_utils import (
     get_default_linking_cols,
     infer_cp_features,
 )
-from pycytominer.cyto_utils.cells import SingleCells, _sqlite_strata_conditions
+from pycytominer.cyto_utils.cells import (
+    SingleCells,
+    _sqlite_key_condition,
+    _sqlite_strata_conditions,
+)
 
 random.seed(123)
 
@@ -835,6 +839,9 @@ def test_aggregate_profiles():
         sc_aggregated_df,
     )
 
+    # Confirm the numpy engine matches the pandas engine
+    pd.testing.assert_frame_equal(AP.aggregate_profiles(engine="numpy"), result)
+
 
 def test_aggregate_subsampling_count_cells():
     count_df = AP_SUBSAMPLE.count_cells()
@@ -875,6 +882,57 @@ def test_aggregate_subsampling_profile():
     pd.testing.assert_frame_equal(AP_SUBSAMPLE.subset_data_df, expected_subset)
 
 
+def test_aggregate_subsampling_pushdown():
+    ap_subsample = SingleCells(
+        sql_file=TMP_SQLITE_FILE,
+        subsample_n=2,
+        subsampling_random_state=123,
+    )
+    ap_subsample.load_image()
+    ap_subsample.get_subsample(compartment="cells")
+
+    # Only the sampled objects are loaded from SQLite
+    for n_aggregation_memory_strata in [1, 2]:
+        compartment_df = pd.concat(
+            ap_subsample._compartment_df_generator(
+                compartment="cells",
+                n_aggregation_memory_strata=n_aggregation_memory_strata,
+            )
+        )
+        loaded_keys = set(
+            compartment_df.loc[
+                :, ["TableNumber", "ImageNumber", "ObjectNumber"]
+            ].itertuples(index=False, name=None)
+        )
+        subset_keys = set(
+            ap_subsample.subset_data_df.loc[
+                :, ["TableNumber", "ImageNumber", "Metadata_ObjectNumber"]
+            ].itertuples(index=False, name=None)
+        )
+        assert loaded_keys == subset_keys
+        assert compartment_df.shape[0] == len(subset_keys)
+
+
+def test_sqlite_key_condition():
+    df = pd.DataFrame({
+        "TableNumber": ["x_hash", "it's"],
+        "ImageNumber": [1, 2],
+        "ObjectNumber": [3, 1],
+    })
+
+    assert _sqlite_key_condition(
+        df,
+        dtypes={
+            "TableNumber": "text",
+            "ImageNumber": "integer",
+            "ObjectNumber": "integer",
+        },
+    ) == (
+        "(TableNumber, ImageNumber, ObjectNumber) in "
+        "(values ('x_hash', 1, 3), ('it''s', 2, 1))"
+    )
+
+
 def test_aggregate_subsampling_profile_output():
     expected_result = pd.DataFrame({
         "Metadata_Plate": ["plate", "plate"],
@@ -1212,3 +1270,114 @@ def test_load_non_canonical_image_table():
         result.sort_index(axis="columns").drop("Metadata_Site_Count", axis="columns"),
         sc_aggregated_df,
     )
+
+
+def test_aggregate_profiles_cache(tmp_path, monkeypatch):
+    tmp_sqlite_file = f"sqlite:///{tmp_path}/test_cache.sqlite"
+    test_engine = create_engine(tmp_sqlite_file)
+    cache_dir = tmp_path / "cache"
+
+    IMAGE_DF.iloc[:1].to_sql(
+        name="image", con=test_engine, index=False, if_exists="replace"
+    )
+    CELLS_DF.to_sql(name="cells", con=test_engine, index=False, if_exists="replace")
+    CYTOPLASM_DF.to_sql(
+        name="cytoplasm", con=test_engine, index=False, if_exists="replace"
+    )
+    NUCLEI_DF.to_sql(name="nuclei", con=test_engine, index=False, if_exists="replace")
+
+    for operation in ["median", "mean"]:
+        ap = SingleCells(sql_file=tmp_sqlite_file, aggregation_operation=operation)
+        pd.testing.assert_frame_equal(
+            ap.aggregate_profiles(compute_counts=True, cache_dir=cache_dir / operation),
+            ap.aggregate_profiles(compute_counts=True),
+        )
+
+    # Append a new image, only its objects are read on the next call
+    IMAGE_DF.iloc[1:].to_sql(
+        name="image", con=test_engine, index=False, if_exists="append"
+    )
+    read_sql = pd.read_sql
+    queries = []
+
+    def logged_read_sql(sql, con, **kwargs):
+        queries.append(sql)
+        return read_sql(sql=sql, con=con, **kwargs)
+
+    monkeypatch.setattr(pd, "read_sql", logged_read_sql)
+
+    ap = SingleCells(sql_file=tmp_sqlite_file)
+    cached_df = ap.aggregate_profiles(
+        compute_counts=True, cache_dir=cache_dir / "median"
+    )
+    compartment_queries = [query for query in queries if "where" in query]
+    assert len(compartment_queries) == 3
+    assert all("y_hash" in query for query in compartment_queries)
+    assert not any("x_hash" in query for query in compartment_queries)
+    pd.testing.assert_frame_equal(cached_df, AP.aggregate_profiles(compute_counts=True))
+
+    # Nothing is read when no image changed
+    queries.clear()
+    ap.aggregate_profiles(compute_counts=True, cache_dir=cache_dir / "median")
+    assert not [query for query in queries if "where" in query]
+
+    # Removed images drop out of the cached aggregates
+    IMAGE_DF.iloc[1:].to_sql(
+        name="image", con=test_engine, index=False, if_exists="replace"
+    )
+    ap = SingleCells(sql_file=tmp_sqlite_file)
+    pd.testing.assert_frame_equal(
+        ap.aggregate_profiles(compute_counts=True, cache_dir=cache_dir / "median"),
+        ap.aggregate_profiles(compute_counts=True),
+    )
+
+    with pytest.raises(ValueError, match="cannot be combined with subsampling"):
+        SingleCells(sql_file=tmp_sqlite_file, subsample_n=2).aggregate_profiles(
+            cache_dir=cache_dir
+        )
+
+
+def test_aggregate_trimmed_weighted_mean(tmp_path):
+    # Every compartment is weighted by its own "a" measurement
+    ap = SingleCells(
+        sql_file=TMP_SQLITE_FILE,
+        aggregation_operation="weighted_mean",
+        aggregation_weight_feature="a",
+    )
+    cells_df = ap.aggregate_compartment("cells")
+
+    merged_df = IMAGE_DF.merge(CELLS_DF, on=["TableNumber", "ImageNumber"])
+    for _, row in cells_df.iterrows():
+        well_df = merged_df.query("Metadata_Well == @row.Metadata_Well")
+        assert row.Cells_b == pytest.approx(
+            np.average(well_df.Cells_b, weights=well_df.Cells_a)
+        )
+
+    # The cached aggregation keeps the same weighted sums
+    pd.testing.assert_frame_equal(
+        ap.aggregate_profiles(cache_dir=tmp_path / "weighted"),
+        ap.aggregate_profiles(),
+    )
+
+    ap = SingleCells(
+        sql_file=TMP_SQLITE_FILE,
+        aggregation_operation="trimmed_mean",
+        aggregation_trim_fraction=0.1,
+    )
+    pd.testing.assert_frame_equal(
+        ap.aggregate_compartment("nuclei"),
+        aggregate(
+            population_df=IMAGE_DF.merge(NUCLEI_DF, on=["TableNumber", "ImageNumber"]),
+            strata=["Metadata_Plate", "Metadata_Well"],
+            features=["Nuclei_a", "Nuclei_b", "Nuclei_c", "Nuclei_d"],
+            operation="trimmed_mean",
+            trim_fraction=0.1,
+        ),
+    )
+    pd.testing.assert_frame_equal(
+        ap.aggregate_profiles(cache_dir=tmp_path / "trimmed"),
+        ap.aggregate_profiles(),
+    )
+
+    with pytest.raises(ValueError, match="requires an aggregation_weight_feature"):
+        SingleCells(sql_file=TMP_SQLITE_FILE, aggregation_operation="weighted_mean")
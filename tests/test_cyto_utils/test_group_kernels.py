@@ -0,0 +1,375 @@
+import functools
+import unittest.mock
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.stats import median_abs_deviation, rankdata, trim_mean
+
+from pycytominer.cyto_utils.group_kernels import (
+    aggregate_groups,
+    centroid_median,
+    centroid_quantile,
+    compress_centroids,
+    factorize_strata,
+    group_approx_median,
+    group_mean,
+    group_median,
+    group_statistics,
+    median_mad_columns,
+    nanmedian_columns,
+    rank_columns,
+    sketch_columns,
+    sketch_size,
+    sort_by_group,
+    sort_columns,
+    sorted_ranks,
+    sorted_value_counts,
+    split_groups,
+)
+
+random_state = np.random.default_rng(123)
+
+strata_df = pd.DataFrame({
+    "Metadata_Plate": ["b", "a", "b", None, "a", "a"],
+    "Metadata_Well": ["A01", "A02", "A01", "A01", "A01", "A02"],
+})
+values = np.array([
+    [1.0, 2.0],
+    [3.0, np.nan],
+    [5.0, 6.0],
+    [7.0, np.nan],
+    [9.0, 10.0],
+    [11.0, 12.0],
+])
+
+
+def test_factorize_strata_matches_groupby_order():
+    codes, uniques_df = factorize_strata(strata_df)
+
+    expected_uniques = (
+        strata_df
+        .groupby(strata_df.columns.tolist(), dropna=False)
+        .size()
+        .reset_index()
+        .drop(columns=0)
+    )
+
+    pd.testing.assert_frame_equal(uniques_df, expected_uniques)
+    assert codes.tolist() == [2, 1, 2, 3, 0, 1]
+
+
+def test_sort_by_group():
+    codes, uniques_df = factorize_strata(strata_df)
+    order, offsets = sort_by_group(codes, n_groups=uniques_df.shape[0])
+
+    assert offsets.tolist() == [0, 1, 3, 5, 6]
+    assert codes[order].tolist() == [0, 1, 1, 2, 2, 3]
+    # sorting is stable within groups
+    assert order.tolist() == [4, 1, 5, 0, 2, 3]
+
+
+def test_group_mean_and_median():
+    codes, uniques_df = factorize_strata(strata_df)
+    order, offsets = sort_by_group(codes, n_groups=uniques_df.shape[0])
+    sorted_values = values[order]
+
+    feature_df = pd.DataFrame(values, columns=["x", "y"])
+    grouped = pd.concat([strata_df, feature_df], axis="columns").groupby(
+        strata_df.columns.tolist(), dropna=False
+    )
+
+    np.testing.assert_array_equal(
+        group_mean(sorted_values, offsets), grouped.mean().to_numpy()
+    )
+    np.testing.assert_array_equal(
+        group_median(sorted_values, offsets), grouped.median().to_numpy()
+    )
+
+
+def test_nanmedian_columns():
+    block = random_state.normal(size=(101, 20))
+    block[random_state.random(block.shape) < 0.3] = np.nan
+    block[:, 5] = np.nan
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        expected = np.nanmedian(block, axis=0)
+
+    for n_rows in [1, 2, 3, 101]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            expected = np.nanmedian(block[:n_rows], axis=0)
+        np.testing.assert_array_equal(nanmedian_columns(block[:n_rows]), expected)
+
+    # NaN-free blocks use the partition-based median
+    np.testing.assert_array_equal(
+        nanmedian_columns(np.nan_to_num(block)), np.median(np.nan_to_num(block), axis=0)
+    )
+    assert np.isnan(nanmedian_columns(np.empty((0, 3)))).all()
+
+
+def test_median_mad_columns():
+    block = random_state.normal(size=(101, 20))
+    block[random_state.random(block.shape) < 0.3] = np.nan
+    block[:, 5] = np.nan
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for n_rows in [1, 2, 101]:
+            medians, mads = median_mad_columns(block[:n_rows])
+            np.testing.assert_array_equal(medians, np.nanmedian(block[:n_rows], axis=0))
+            np.testing.assert_array_equal(
+                mads, median_abs_deviation(block[:n_rows], nan_policy="omit")
+            )
+
+    # NaN-free and single precision blocks
+    medians, mads = median_mad_columns(np.nan_to_num(block).astype(np.float32))
+    np.testing.assert_allclose(medians, np.median(np.nan_to_num(block), axis=0))
+    np.testing.assert_allclose(
+        mads, median_abs_deviation(np.nan_to_num(block)), rtol=1e-6
+    )
+
+
+def test_sorted_ranks():
+    block = random_state.integers(0, 5, size=(30, 3)).astype(float)
+    block[random_state.random(block.shape) < 0.2] = np.nan
+    sorted_block, n_valid = sort_columns(block)
+
+    # Ranking the reference against itself gives its average ranks minus 0.5
+    ranks = sorted_ranks(sorted_block, n_valid, block)
+    np.testing.assert_array_equal(
+        ranks, rankdata(block, axis=0, nan_policy="omit") - 0.5
+    )
+
+    # New values are ranked by the reference values below and equal to them
+    new_values = np.array([[-1.0, 2.0, np.nan], [10.0, 2.5, 0.0]])
+    ranks = sorted_ranks(sorted_block, n_valid, new_values.copy())
+    for column in range(3):
+        reference = block[~np.isnan(block[:, column]), column]
+        for row in range(2):
+            value = new_values[row, column]
+            expected = (reference < value).sum() + (reference == value).sum() / 2
+            if np.isnan(value):
+                assert np.isnan(ranks[row, column])
+            else:
+                assert ranks[row, column] == expected
+
+    # Ranks can be written into the ranked block
+    out = block.copy()
+    assert sorted_ranks(sorted_block, n_valid, out, out=out) is out
+
+
+def test_rank_columns():
+    block = random_state.integers(0, 5, size=(40, 4)).astype(float)
+    block[random_state.random(block.shape) < 0.2] = np.nan
+    # Infinite values are ranked apart from the missing values sorted with them
+    block[:3, 1] = np.inf
+    block[3, 2] = -np.inf
+    expected_ranks = pd.DataFrame(block).rank().to_numpy()
+
+    np.testing.assert_array_equal(rank_columns(block), expected_ranks)
+
+    # Blocks of columns are ranked at a time
+    with unittest.mock.patch(
+        "pycytominer.cyto_utils.group_kernels.rank_block_bytes", 8 * 40 * 3
+    ):
+        np.testing.assert_array_equal(rank_columns(block), expected_ranks)
+
+    # Without ties, the ranks are the positions in every sorted column
+    block = random_state.normal(size=(25, 3))
+    np.testing.assert_array_equal(rank_columns(block), rankdata(block, axis=0))
+
+
+def test_sorted_value_counts():
+    block = random_state.integers(0, 4, size=(40, 5)).astype(float)
+    block[random_state.random(block.shape) < 0.3] = np.nan
+    block[:, 3] = np.nan
+    block[:, 4] = 7.0
+    n_unique, top_counts = sorted_value_counts(*sort_columns(block))
+
+    block_df = pd.DataFrame(block)
+    np.testing.assert_array_equal(n_unique, block_df.nunique())
+    for column in range(5):
+        value_counts = block_df[column].value_counts().to_numpy()[:2]
+        expected_counts = np.pad(value_counts, (0, 2 - value_counts.shape[0]))
+        np.testing.assert_array_equal(top_counts[:, column], expected_counts)
+
+
+def test_split_groups():
+    offsets = np.array([0, 10, 11, 12, 30, 31])
+    chunks = split_groups(offsets, n_chunks=3)
+
+    assert chunks[0][0] == 0
+    assert chunks[-1][1] == offsets.shape[0] - 1
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(chunks[:-1], chunks[1:]))
+    assert split_groups(offsets, n_chunks=100) == [(i, i + 1) for i in range(5)]
+
+
+def test_aggregate_groups_threads_match_serial():
+    n_rows = 5000
+    codes = random_state.integers(0, 97, size=n_rows)
+    block = np.asfortranarray(random_state.normal(size=(n_rows, 13)))
+    block[random_state.random(block.shape) < 0.1] = np.nan
+    order, offsets = sort_by_group(codes, n_groups=97)
+
+    for reducer in [group_median, group_mean]:
+        expected = reducer(block[order], offsets)
+        for n_jobs in [1, 2, 3]:
+            np.testing.assert_array_equal(
+                aggregate_groups(block, order, offsets, reducer, n_jobs=n_jobs),
+                expected,
+            )
+
+
+def test_approx_median_sketch():
+    block = random_state.normal(size=(20000, 6))
+    block[random_state.random(block.shape) < 0.2] = np.nan
+    block[:, 5] = np.nan
+    n_centroids = sketch_size(0.01)
+    assert n_centroids == 100
+
+    # Small blocks keep every value and yield the exact median
+    for n_rows in [1, 2, 3, 100]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            expected = np.nanmedian(block[:n_rows], axis=0)
+        np.testing.assert_allclose(
+            centroid_median(*sketch_columns(block[:n_rows], n_centroids)), expected
+        )
+
+    # Sketches of chunks merge into a sketch of the whole block
+    sketches = [
+        sketch_columns(chunk, n_centroids) for chunk in np.array_split(block, 7)
+    ] + [sketch_columns(np.nan_to_num(block[:5000]), n_centroids)]
+    means, weights = compress_centroids(
+        np.concatenate([sketch[0] for sketch in sketches]),
+        np.concatenate([sketch[1] for sketch in sketches]),
+        n_centroids,
+    )
+    assert means.shape == weights.shape == (n_centroids, 6)
+
+    merged_block = np.concatenate([block, np.nan_to_num(block[:5000])])
+    medians = centroid_median(means, weights)
+    for feature in range(5):
+        feature_values = merged_block[:, feature]
+        feature_values = feature_values[~np.isnan(feature_values)]
+        assert weights[:, feature].sum() == feature_values.shape[0]
+        # Ties (the zeros) span a range of ranks
+        assert (feature_values < medians[feature]).mean() - 0.01 <= 0.5
+        assert (feature_values <= medians[feature]).mean() + 0.01 >= 0.5
+    assert np.isnan(centroid_median(*sketch_columns(block, n_centroids))[5])
+
+    offsets = np.array([0, 10, 20000])
+    np.testing.assert_array_equal(
+        group_approx_median(block, offsets, n_centroids)[0],
+        centroid_median(*sketch_columns(block[:10], n_centroids)),
+    )
+
+
+def test_centroid_quantile():
+    block = random_state.normal(size=(50000, 3))
+    n_centroids = sketch_size(0.01)
+
+    # Small blocks keep every value and yield the exact quantiles
+    for quantile in [0, 0.1, 0.25, 0.75, 1]:
+        np.testing.assert_allclose(
+            centroid_quantile(*sketch_columns(block[:37], n_centroids), quantile),
+            np.quantile(block[:37], quantile, axis=0),
+        )
+
+    sketch = sketch_columns(block, n_centroids)
+    for quantile in [0.25, 0.75]:
+        estimates = centroid_quantile(*sketch, quantile)
+        assert (np.abs((block < estimates).mean(axis=0) - quantile) <= 0.01).all()
+
+
+def test_group_statistics():
+    codes, uniques_df = factorize_strata(strata_df)
+    order, offsets = sort_by_group(codes, n_groups=uniques_df.shape[0])
+    sorted_values = values[order]
+
+    feature_df = pd.DataFrame(values, columns=["x", "y"])
+    grouped = pd.concat([strata_df, feature_df], axis="columns").groupby(
+        strata_df.columns.tolist(), dropna=False
+    )
+
+    operations = ["std", "q25", "count", "mean"]
+    statistics = group_statistics(sorted_values, offsets, operations)
+    assert statistics.shape == (4, 8)
+
+    np.testing.assert_allclose(statistics[:, 0:2], grouped.std().to_numpy())
+    np.testing.assert_allclose(statistics[:, 2:4], grouped.quantile(0.25).to_numpy())
+    np.testing.assert_array_equal(statistics[:, 4:6], grouped.count().to_numpy())
+    np.testing.assert_array_equal(
+        statistics[:, 6:8], group_mean(sorted_values, offsets)
+    )
+
+    # Median absolute deviation of [1, 5] is 2 and of [3, 11] is 4
+    np.testing.assert_array_equal(
+        group_statistics(sorted_values, offsets, ["mad"])[:, 0], [0, 4, 2, 0]
+    )
+
+
+def test_trimmed_and_weighted_mean():
+    group_values = random_state.normal(size=(400, 3))
+    group_values[random_state.random(group_values.shape) < 0.1] = np.nan
+    weights = random_state.random(400)
+    weights[:5] = np.nan
+    codes = random_state.integers(0, 4, size=400)
+    order, offsets = sort_by_group(codes, n_groups=4)
+
+    statistics = group_statistics(
+        group_values[order],
+        offsets,
+        ["trimmed_mean", "weighted_mean"],
+        trim_fraction=0.1,
+        sorted_weights=weights[order],
+    )
+
+    for group in range(4):
+        group_block = group_values[codes == group]
+        group_weights = weights[codes == group]
+        for feature in range(3):
+            column = group_block[:, feature]
+            valid = ~np.isnan(column)
+            np.testing.assert_allclose(
+                statistics[group, feature], trim_mean(column[valid], 0.1)
+            )
+            valid &= ~np.isnan(group_weights)
+            np.testing.assert_allclose(
+                statistics[group, 3 + feature],
+                np.average(column[valid], weights=group_weights[valid]),
+            )
+
+    # Threads gather the same weights as a serial run
+    np.testing.assert_array_equal(
+        aggregate_groups(
+            group_values,
+            order,
+            offsets,
+            reducer=functools.partial(group_statistics, operations=["weighted_mean"]),
+            n_jobs=3,
+            weights=weights,
+        ),
+        statistics[:, 3:],
+    )
+
+    # Only non-missing values are trimmed, and empty columns are missing
+    np.testing.assert_array_equal(
+        group_statistics(
+            np.array([[1.0], [np.nan]]),
+            np.array([0, 2]),
+            ["trimmed_mean"],
+            trim_fraction=0.4,
+        ),
+        [[1.0]],
+    )
+    assert np.isnan(
+        group_statistics(
+            np.array([[np.nan]]),
+            np.array([0, 1]),
+            ["trimmed_mean", "weighted_mean"],
+            sorted_weights=np.array([1.0]),
+        )
+    ).all()
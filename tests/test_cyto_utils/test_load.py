@@ -7,9 +7,11 @@ import tempfile
 import anndata as ad
 import numpy as np
 import pandas as pd
+import pyarrow.compute as pc
 import pytest
 
 from pycytominer.cyto_utils import (
+    coerce_missing_value_strings,
     load_cytotable_profiles,
     load_npz_features,
     load_npz_locations,
@@ -20,6 +22,8 @@ from pycytominer.cyto_utils.load import (
     infer_delim,
     is_path_a_parquet_dataset_dir,
     is_path_a_parquet_file,
+    load_parquet_batches,
+    load_parquet_schema,
     resolve_cytotable_profiles_target,
     resolve_parquet_path,
 )
@@ -213,6 +217,49 @@ def test_load_profiles():
         load_profiles(ROOT_DIR / "tests" / "test_data" / "missing.parquet")
 
 
+def test_coerce_missing_value_strings():
+    profiles = pd.DataFrame({
+        "Metadata_Well": ["A01", "A02", "A03"],
+        "x": pd.Series([1.5, " NaN ", None], dtype=object),
+        "y": pd.Series([2, "null", "N/A"], dtype=object),
+        "numeric_string": pd.Series([1.0, "2.5", "nan"], dtype=object),
+        "payload": pd.Series([{"a": 1}, "nan", 2.0], dtype=object),
+        "all_missing": pd.Series(["nan", "None", ""], dtype=object),
+        "z": [1.0, 2.0, 3.0],
+    })
+
+    coerced_columns = coerce_missing_value_strings(profiles)
+
+    assert coerced_columns == ["x", "y", "all_missing"]
+    pd.testing.assert_series_equal(
+        profiles["x"], pd.Series([1.5, np.nan, np.nan], name="x")
+    )
+    pd.testing.assert_series_equal(
+        profiles["y"], pd.Series([2.0, np.nan, np.nan], name="y")
+    )
+    assert profiles["all_missing"].isna().all()
+    # Other strings and non-numeric values leave the column untouched
+    assert profiles["numeric_string"].dtype == object
+    assert profiles["payload"].dtype == object
+    assert profiles["Metadata_Well"].tolist() == ["A01", "A02", "A03"]
+
+    assert coerce_missing_value_strings(profiles, columns=["z"]) == []
+
+
+def test_load_profiles_coerce_missing_strings():
+    profiles = data_df.copy()
+    profiles["x"] = profiles["x"].astype(object)
+    profiles.loc[0, "x"] = "None"
+
+    with pytest.warns(UserWarning, match="in 1 columns: \\['x'\\]"):
+        coerced_profiles = load_profiles(profiles, coerce_missing_strings=True)
+
+    assert coerced_profiles["x"].dtype == np.float64
+    assert pd.isna(coerced_profiles.loc[0, "x"])
+    # The input frame is not modified
+    assert profiles.loc[0, "x"] == "None"
+
+
 def test_resolve_cytotable_profiles_target_ambiguous(tmp_path):
     warehouse_root = tmp_path / "warehouse"
     first_table = warehouse_root / "profiles" / "joined_profiles" / "data"
@@ -300,6 +347,42 @@ def test_resolve_parquet_path_missing_file(tmp_path):
     assert resolve_parquet_path(tmp_path / "missing.parquet") is None
 
 
+def test_load_parquet_batches(tmp_path):
+    parquet_dir = tmp_path / "parquet_dir"
+    parquet_dir.mkdir()
+    data_df.to_parquet(parquet_dir / "part-00000.parquet", engine="pyarrow")
+    data_df.to_parquet(parquet_dir / "part-00001.parquet", engine="pyarrow")
+
+    batches = list(load_parquet_batches(parquet_dir, columns=["x", "y"], batch_size=2))
+
+    assert all(batch.shape[0] <= 2 for batch in batches)
+    assert all(batch.columns.tolist() == ["x", "y"] for batch in batches)
+
+    expected_df = pd.concat([data_df, data_df]).loc[:, ["x", "y"]]
+    pd.testing.assert_frame_equal(
+        pd.concat(batches).reset_index(drop=True),
+        expected_df.reset_index(drop=True),
+    )
+    assert load_parquet_schema(parquet_dir).names == data_df.columns.tolist()
+
+    # Filters are pushed down to the reader
+    filtered_df = pd.concat(
+        load_parquet_batches(
+            parquet_dir, filter_expression=pc.field("x").isin([1, 3]), batch_size=2
+        )
+    ).reset_index(drop=True)
+    pd.testing.assert_frame_equal(
+        filtered_df,
+        pd.concat([data_df, data_df]).query("x in [1, 3]").reset_index(drop=True),
+    )
+
+    with pytest.raises(ValueError, match="batch_size must be a positive integer"):
+        next(load_parquet_batches(parquet_dir, batch_size=0))
+
+    with pytest.raises(ValueError, match="not a parquet file or dataset"):
+        next(load_parquet_batches(tmp_path / "missing.parquet"))
+
+
 def test_load_cytotable_profiles():
     expected_profiles = pd.read_parquet(
         resolve_parquet_path(example_iceberg_profiles_table), engine="pyarrow"
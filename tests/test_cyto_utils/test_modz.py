@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 from pycytominer.cyto_utils import modz
@@ -42,6 +43,31 @@ def test_modz_base():
     )
 
 
+def test_modz_base_correlation_tiles():
+    # Weights come from correlation tiles, also with missing values for Pearson
+    random_state = np.random.default_rng(3)
+    samples_df = pd.DataFrame(
+        random_state.normal(size=(6, 30)) + random_state.normal(size=30)
+    )
+
+    for method in ["pearson", "spearman"]:
+        if method == "pearson":
+            samples_df.iloc[2, 4] = np.nan
+        else:
+            samples_df.iloc[2, 4] = 0.5
+
+        cor = samples_df.transpose().corr(method=method).to_numpy(copy=True)
+        np.fill_diagonal(cor, np.nan)
+        raw_weights = np.clip(np.nanmean(np.clip(cor, 0, None), axis=1), 0.01, None)
+        weights = (raw_weights / raw_weights.sum()).round(precision)
+        expected_result = (samples_df.transpose() * weights).sum(axis="columns")
+
+        pd.testing.assert_series_equal(
+            modz_base(samples_df, method=method, precision=precision),
+            expected_result,
+        )
+
+
 def test_modz():
     # The expected result is to completely remove influence of anticorrelated sample
     consensus_df = modz(
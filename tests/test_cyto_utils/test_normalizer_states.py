@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import norm
+
+from pycytominer.cyto_utils.normalizer_states import (
+    NormalizerAccumulator,
+    NormalizerState,
+)
+from pycytominer.cyto_utils.profile_matrix import ProfileMatrix
+from pycytominer.operations import Spherize
+
+features = ["x", "y"]
+profiles_df = pd.DataFrame({
+    "Metadata_Well": ["A01", "A02", "A03"],
+    "x": [1.0, 2.0, 3.0],
+    "y": [4.0, 6.0, 8.0],
+})
+
+
+def test_normalizer_state_transform():
+    """
+    Test that the affine parameters and the whitening matrix are applied
+    """
+    state = NormalizerState(
+        method="standardize",
+        features=features,
+        center=np.array([2.0, 6.0]),
+        scale=np.array([1.0, 2.0]),
+    )
+    matrix = ProfileMatrix.from_frame(profiles_df, features=features)
+    result = state.transform(matrix)
+
+    assert np.shares_memory(result.values, matrix.values)
+    np.testing.assert_array_equal(result.values, [[-1, -1], [0, 0], [1, 1]])
+
+    whitening_state = NormalizerState(
+        method="spherize",
+        features=features,
+        center=np.zeros(2),
+        scale=np.ones(2),
+        whitening=np.array([[0.0, 1.0], [1.0, 0.0]]),
+        output_features=["PC1", "PC2"],
+    )
+    whitening_matrix = ProfileMatrix.from_frame(profiles_df, features=features)
+    result = whitening_state.transform(whitening_matrix, n_threads=1)
+    assert result.features == ["PC1", "PC2"]
+    # Float64 blocks are whitened in place
+    assert np.shares_memory(result.values, whitening_matrix.values)
+    np.testing.assert_array_equal(result.values, profiles_df.loc[:, ["y", "x"]])
+
+    with pytest.raises(ValueError, match="do not match the features"):
+        state.transform(ProfileMatrix.from_frame(profiles_df, features=["y", "x"]))
+
+
+def test_normalizer_state_save_load(tmp_path):
+    """
+    Test that saved parameters are restored exactly
+    """
+    rank_state = NormalizerState(
+        method="rank_int",
+        features=features,
+        center=np.zeros(2),
+        scale=np.ones(2),
+        quantiles=np.array([[1.0, 2.0], [3.0, np.nan]]),
+    )
+    rank_state.save(tmp_path / "rank_int.npz")
+    loaded_state = NormalizerState.load(tmp_path / "rank_int.npz")
+    np.testing.assert_array_equal(loaded_state.quantiles, rank_state.quantiles)
+    np.testing.assert_allclose(
+        loaded_state.transform_values(np.array([[2.0, 2.0]])),
+        norm.ppf([[(1 + 1 / 8) / (2 + 1 / 4), (0.5 + 1 / 8) / (1 + 1 / 4)]]),
+    )
+
+    for whitening in [None, np.array([[1.0, 0.5], [0.5, 1.0]])]:
+        state = NormalizerState(
+            method="spherize" if whitening is not None else "robustize",
+            features=features,
+            center=np.array([0.1, 0.2]),
+            scale=np.array([3.0, 4.0]),
+            whitening=whitening,
+        )
+        state_file = tmp_path / "normalizer.npz"
+        state.save(state_file)
+        loaded_state = NormalizerState.load(state_file)
+
+        assert loaded_state.method == state.method
+        assert loaded_state.features == features
+        assert loaded_state.output_features == features
+        np.testing.assert_array_equal(loaded_state.center, state.center)
+        np.testing.assert_array_equal(loaded_state.scale, state.scale)
+        if whitening is None:
+            assert loaded_state.whitening is None
+        else:
+            np.testing.assert_array_equal(loaded_state.whitening, whitening)
+
+
+def test_normalizer_state_shape():
+    """
+    Test that parameters must match the features
+    """
+    with pytest.raises(ValueError, match="do not match the 2 features"):
+        NormalizerState(
+            method="standardize",
+            features=features,
+            center=np.zeros(3),
+            scale=np.ones(2),
+        )
+
+
+def test_normalizer_accumulator():
+    """
+    Test that statistics accumulated over batches match a fit on all profiles
+    """
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=(50, 3)) * [1.0, 10.0, 0.0]
+    values[4, 0] = np.nan
+
+    for method in ["standardize", "robustize"]:
+        accumulator = NormalizerAccumulator(method=method, features=["x", "y", "z"])
+        for start in range(0, 50, 12):
+            accumulator.update(values[start : start + 12])
+        state = accumulator.finalize()
+
+        if method == "standardize":
+            expected_center = np.nanmean(values, axis=0)
+            expected_scale = np.nanstd(values, axis=0)
+        else:
+            expected_center = np.nanmedian(values, axis=0)
+            expected_scale = np.subtract(*np.nanquantile(values, [0.75, 0.25], axis=0))
+        # Constant features are scaled by one
+        expected_scale[2] = 1
+
+        np.testing.assert_allclose(state.center, expected_center)
+        np.testing.assert_allclose(state.scale, expected_scale)
+
+    # Batches of at most as many profiles as centroids are sketched exactly
+    accumulator = NormalizerAccumulator(method="mad_robustize", features=["x", "y"])
+    for start in range(0, 50, 12):
+        accumulator.update(values[start : start + 12, :2])
+    state = accumulator.finalize()
+    np.testing.assert_allclose(state.center, np.nanmedian(values[:, :2], axis=0))
+
+    # The scatter matrix of the batches gives the whitening matrix of all profiles
+    full_rank_values = rng.normal(size=(50, 3))
+    accumulator = NormalizerAccumulator(method="spherize", features=["x", "y", "z"])
+    for start in range(0, 50, 12):
+        accumulator.update(full_rank_values[start : start + 12])
+    state = accumulator.finalize()
+    expected_scaler = Spherize(method="ZCA-cor", solver="svd").fit(
+        pd.DataFrame(full_rank_values)
+    )
+    np.testing.assert_allclose(state.whitening, expected_scaler.W)
+    np.testing.assert_allclose(state.center, full_rank_values.mean(axis=0))
+
+    # Ranks against a sketch are within the rank error of the exact ranks
+    many_values = rng.normal(size=(2000, 2))
+    for method in ["quantile", "rank_int"]:
+        accumulator = NormalizerAccumulator(method=method, features=["x", "y"])
+        for start in range(0, 2000, 300):
+            accumulator.update(many_values[start : start + 300])
+        state = accumulator.finalize()
+        assert state.quantiles.shape == (100, 2)
+        ranks = state.transform_values(many_values.copy())
+        if method == "rank_int":
+            ranks = norm.cdf(ranks)
+        expected_ranks = (
+            np.argsort(np.argsort(many_values, axis=0), axis=0) + 0.5
+        ) / 2000
+        assert np.abs(ranks - expected_ranks).max() < 0.02
+
+    with pytest.raises(ValueError, match="cannot be accumulated"):
+        NormalizerAccumulator(method="minmax", features=["x"])
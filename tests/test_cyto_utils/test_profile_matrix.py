@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycytominer.cyto_utils.profile_matrix import ProfileMatrix
+
+profiles_df = pd.DataFrame({
+    "Metadata_Well": ["A01", "A02", "A03"],
+    "x": [1.0, 2.0, 3.0],
+    "Metadata_Plate": ["p", "p", "p"],
+    "y": np.array([4.0, 5.0, 6.0], dtype=np.float32),
+    "z": [7, 8, 9],
+}).set_index(pd.Index([10, 11, 12]))
+features = ["x", "y", "z"]
+
+
+def test_profile_matrix_from_frame():
+    """
+    Test that profiles are copied into a single contiguous float block
+    """
+    matrix = ProfileMatrix.from_frame(profiles_df, features=features)
+
+    assert matrix.values.dtype == np.float64
+    assert matrix.values.flags.f_contiguous
+    assert matrix.features == features
+    assert matrix.metadata.columns.tolist() == ["Metadata_Well", "Metadata_Plate"]
+    np.testing.assert_array_equal(
+        matrix.values, profiles_df.loc[:, features].to_numpy(dtype=np.float64)
+    )
+
+    float32_matrix = ProfileMatrix.from_frame(
+        profiles_df, features=["y"], metadata_columns=["Metadata_Well"]
+    )
+    assert float32_matrix.values.dtype == np.float32
+    assert float32_matrix.metadata.columns.tolist() == ["Metadata_Well"]
+
+    matrix = ProfileMatrix.from_frame(profiles_df, features=features, dtype="float32")
+    assert matrix.values.dtype == np.float32
+
+
+def test_profile_matrix_copy():
+    """
+    Test that the feature block is only shared with the input when requested
+    """
+    float_df = pd.DataFrame(np.arange(12.0).reshape(4, 3), columns=features)
+
+    matrix = ProfileMatrix.from_frame(float_df, features=features)
+    matrix.values[:] = 0
+    assert (float_df.to_numpy() != 0).any()
+
+    view_matrix = ProfileMatrix.from_frame(float_df, features=features, copy=False)
+    assert np.shares_memory(view_matrix.values, float_df.to_numpy())
+
+    # A dtype conversion always copies
+    cast_matrix = ProfileMatrix.from_frame(
+        float_df, features=features, dtype="float32", copy=False
+    )
+    assert not np.shares_memory(cast_matrix.values, float_df.to_numpy())
+
+
+def test_profile_matrix_to_frame():
+    """
+    Test that the feature block is wrapped in DataFrames without copies
+    """
+    matrix = ProfileMatrix.from_frame(profiles_df, features=features)
+
+    feature_df = matrix.feature_frame()
+    assert feature_df.columns.tolist() == features
+    assert feature_df.index.equals(profiles_df.index)
+    assert np.shares_memory(feature_df.to_numpy(), matrix.values)
+
+    result_df = matrix.to_frame()
+    assert result_df.columns.tolist() == ["Metadata_Well", "Metadata_Plate", *features]
+    pd.testing.assert_frame_equal(
+        result_df,
+        profiles_df.loc[:, result_df.columns.tolist()].astype(
+            dict.fromkeys(features, np.float64)
+        ),
+    )
+    assert np.shares_memory(result_df.loc[:, features].to_numpy(), matrix.values)
+
+
+def test_profile_matrix_shape():
+    """
+    Test that values must match the features and metadata
+    """
+    with pytest.raises(ValueError, match="do not match 3 profiles and 2 features"):
+        ProfileMatrix(
+            values=np.zeros((3, 3)),
+            features=["x", "y"],
+            metadata=profiles_df.loc[:, ["Metadata_Well"]],
+        )
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycytominer.cyto_utils import SampleSelection, select_samples
+
+profiles_df = pd.DataFrame({
+    "Metadata_treatment": ["control", "drug", "control", "drug"],
+    "x": [1.0, 2.0, 3.0, 4.0],
+    "y": [5.0, 6.0, 7.0, 8.0],
+})
+
+
+def test_sample_selection_from_query():
+    selection = SampleSelection.from_query(
+        profiles_df, "Metadata_treatment == 'control'"
+    )
+    assert selection.n_samples == 2
+    assert not selection.is_all
+    assert str(selection) == "Metadata_treatment == 'control'"
+    np.testing.assert_array_equal(selection.mask, [True, False, True, False])
+
+    expected_df = profiles_df.query("Metadata_treatment == 'control'")
+    pd.testing.assert_frame_equal(selection.select(profiles_df), expected_df)
+    pd.testing.assert_frame_equal(
+        selection.select(profiles_df, columns=["x"]), expected_df.loc[:, ["x"]]
+    )
+
+    # An existing selection is reused as is
+    assert SampleSelection.from_query(profiles_df, selection) is selection
+    pd.testing.assert_frame_equal(
+        select_samples(profiles_df, selection, columns=["y"]),
+        expected_df.loc[:, ["y"]],
+    )
+
+
+def test_sample_selection_all():
+    selection = SampleSelection.from_query(profiles_df, "all")
+    assert selection.is_all
+    assert selection.select(profiles_df) is profiles_df
+    pd.testing.assert_frame_equal(
+        select_samples(profiles_df, columns=["x", "y"]),
+        profiles_df.loc[:, ["x", "y"]],
+    )
+
+
+def test_sample_selection_errors():
+    with pytest.raises(ValueError, match="does not evaluate to one boolean"):
+        SampleSelection.from_query(profiles_df, "x + 1")
+
+    with pytest.raises(ValueError, match="boolean array with one entry"):
+        SampleSelection(np.array([1, 0, 1, 0]), profiles_df.index)
+
+    selection = SampleSelection.from_query(profiles_df, "x > 1")
+    with pytest.raises(ValueError, match="different table of profiles"):
+        selection.select(profiles_df.iloc[:3])
+    with pytest.raises(ValueError, match="different table of profiles"):
+        selection.select(profiles_df.set_index("Metadata_treatment"))
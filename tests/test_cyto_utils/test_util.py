@@ -3,18 +3,29 @@ import tempfile
 import warnings
 from typing import Any, Optional, Union
 
+import numpy as np
 import pandas as pd
 import pytest
 
 from pycytominer.cyto_utils.util import (
+    cast_features,
+    check_aggregate_engine,
     check_aggregate_operation,
+    check_aggregate_operations,
+    check_approx_error,
     check_compartments,
     check_consensus_operation,
     check_correlation_method,
     check_fields_of_view,
     check_fields_of_view_format,
+    check_float_dtype,
     check_image_features,
+    check_n_jobs,
+    check_trim_fraction,
+    correlation_blocks,
+    correlation_pairs,
     extract_image_features,
+    get_correlation_matrix,
     get_default_compartments,
     get_pairwise_correlation,
     load_known_metadata_dictionary,
@@ -106,6 +117,7 @@ def test_check_correlation_method():
     expected_method = "pearson"
 
     assert method == expected_method
+    assert check_correlation_method(method="kendall_approx") == "kendall_approx"
 
     with pytest.raises(ValueError) as nomethod:
         method = check_correlation_method(method="DOES NOT EXIST")
@@ -125,6 +137,90 @@ def test_check_aggregate_operation_method():
     assert "not supported, select one of" in str(nomethod.value)
 
 
+def test_check_aggregate_engine():
+    assert check_aggregate_engine(engine="NumPy") == "numpy"
+
+    with pytest.raises(ValueError) as noengine:
+        check_aggregate_engine(engine="DOES NOT EXIST")
+
+    assert "not supported, select one of" in str(noengine.value)
+
+
+def test_check_n_jobs():
+    assert check_n_jobs(n_jobs=3) == 3
+    assert check_n_jobs(n_jobs=-1) == os.cpu_count()
+    assert check_n_jobs(n_jobs=-1000) == 1
+
+    with pytest.raises(ValueError) as nojobs:
+        check_n_jobs(n_jobs=0)
+
+    assert "n_jobs must be a non-zero integer" in str(nojobs.value)
+
+
+def test_check_aggregate_operations():
+    assert check_aggregate_operations(operations=["MEAN", "std", "Q25"]) == [
+        "mean",
+        "std",
+        "q25",
+    ]
+
+    for operations in [[], ["mean", "MEAN"]]:
+        with pytest.raises(ValueError, match="one or more distinct operations"):
+            check_aggregate_operations(operations=operations)
+
+    with pytest.raises(ValueError, match="not supported"):
+        check_aggregate_operations(operations=["mean", "DOES NOT EXIST"])
+
+
+def test_check_approx_error():
+    assert check_approx_error(approx_error=0.01) == 0.01
+
+    for approx_error in [0, 1, -0.5]:
+        with pytest.raises(ValueError, match="approx_error must be between 0 and 1"):
+            check_approx_error(approx_error=approx_error)
+
+
+def test_check_trim_fraction():
+    assert check_trim_fraction(trim_fraction=0.05) == 0.05
+    assert check_trim_fraction(trim_fraction=0) == 0
+
+    for trim_fraction in [0.5, -0.1]:
+        with pytest.raises(ValueError, match="trim_fraction must be at least 0"):
+            check_trim_fraction(trim_fraction=trim_fraction)
+
+
+def test_check_float_dtype():
+    assert check_float_dtype("float32") == np.float32
+    assert check_float_dtype(np.float64) == np.float64
+    assert check_float_dtype(float) == np.float64
+
+    for dtype in [np.int64, "float16", "not a dtype"]:
+        with pytest.raises(ValueError, match="not supported, select one of"):
+            check_float_dtype(dtype)
+
+
+def test_cast_features():
+    df = pd.DataFrame({
+        "Metadata_x": [1, 2],
+        "Cells_x": [1, 2],
+        "Cells_y": [0.5, 1.5],
+        "Image_payload": ["a", "b"],
+    })
+
+    cast_df = cast_features(
+        df, features=["Cells_x", "Cells_y", "Image_payload"], dtype="float32"
+    )
+    assert cast_df.dtypes.to_dict() == {
+        "Metadata_x": np.int64,
+        "Cells_x": np.float32,
+        "Cells_y": np.float32,
+        "Image_payload": object,
+    }
+
+    # Nothing to cast returns the input as is
+    assert cast_features(df, features=["Cells_y"], dtype=float) is df
+
+
 def test_check_consensus_operation_method():
     for test_operation in ["MeaN", "meDIAN", "modZ"]:
         operation = check_consensus_operation(operation=test_operation)
@@ -323,6 +419,94 @@ def test_pairwise_corr_with_inf_and_nan():
     _assert_pairwise_corr_helper(data_df, expected_result)
 
 
+def test_correlation_blocks():
+    random_state = np.random.default_rng(5)
+    values = random_state.normal(size=(50, 11)) @ random_state.normal(size=(11, 11))
+    values[:, 4] = 3.0
+
+    for nan_fraction in [0.0, 0.2]:
+        block = values.copy()
+        block[random_state.random(block.shape) < nan_fraction] = np.nan
+        # A column with a single complete value has no correlations
+        block[1:, 7] = np.nan
+        expected_cor = pd.DataFrame(block).corr().to_numpy()
+
+        for block_columns in [3, 11]:
+            cor = np.full((11, 11), -2.0)
+            for start_a, start_b, tile in correlation_blocks(block, block_columns):
+                assert start_a <= start_b
+                rows = slice(start_a, start_a + block_columns)
+                columns = slice(start_b, start_b + block_columns)
+                cor[rows, columns] = tile
+                cor[columns, rows] = tile.T
+            np.testing.assert_allclose(cor, expected_cor, atol=1e-12)
+
+        # Only pairs above the threshold are kept, and absolute sums skip NaN
+        abs_sums = np.zeros(11)
+        pairs = list(correlation_pairs(block, 0.3, abs_sums=abs_sums, block_columns=3))
+        pair_a = np.concatenate([a for a, _, _ in pairs])
+        pair_b = np.concatenate([b for _, b, _ in pairs])
+        correlations = np.concatenate([c for _, _, c in pairs])
+        expected_b, expected_a = np.nonzero(np.triu(expected_cor > 0.3, k=1))
+        assert sorted(zip(pair_a, pair_b)) == sorted(zip(expected_a, expected_b))
+        np.testing.assert_allclose(correlations, expected_cor[pair_a, pair_b])
+        np.testing.assert_allclose(
+            abs_sums, np.nansum(np.abs(expected_cor), axis=0), atol=1e-12
+        )
+
+
+def test_correlation_blocks_masked_outlier():
+    random_state = np.random.default_rng(7)
+    values = random_state.normal(size=(50, 3))
+    values[:, 1] += 0.2 * values[:, 0]
+    values[:, 2] = values[:, 1]
+    # A large value in a row that is missing in the partner column
+    values[0, 0] = np.nan
+
+    for outlier in [1e9, 1e12]:
+        values[0, 1] = outlier
+        expected_cor = pd.DataFrame(values).corr().to_numpy()
+        cor = get_correlation_matrix(pd.DataFrame(values)).to_numpy()
+        np.testing.assert_allclose(cor, expected_cor, atol=1e-12)
+
+
+def test_correlation_blocks_rank_methods():
+    random_state = np.random.default_rng(6)
+    values = random_state.normal(size=(400, 5)) @ random_state.normal(size=(5, 5))
+    values = np.round(np.exp(values), 1)
+
+    # Spearman tiles equal pandas, also with ties
+    expected_cor = pd.DataFrame(values).corr(method="spearman").to_numpy()
+    cor = get_correlation_matrix(pd.DataFrame(values), method="spearman").to_numpy()
+    np.testing.assert_allclose(cor, expected_cor, atol=1e-12)
+
+    # Approximate Kendall correlations are close to the exact ones of pandas
+    expected_cor = pd.DataFrame(values).corr(method="kendall").to_numpy()
+    cor = get_correlation_matrix(pd.DataFrame(values), method="kendall_approx")
+    np.testing.assert_allclose(cor.to_numpy(), expected_cor, atol=0.02)
+
+    # Pairs with missing values are ranked among their complete samples, like pandas
+    values[random_state.random(values.shape) < 0.1] = np.nan
+    values[:, 4] = np.round(values[:, 0])
+    expected_cor = pd.DataFrame(values).corr(method="spearman").to_numpy()
+    cor = np.full((5, 5), -2.0)
+    for start_a, start_b, tile in correlation_blocks(values, 2, method="spearman"):
+        cor[start_a : start_a + 2, start_b : start_b + 2] = tile
+        cor[start_b : start_b + 2, start_a : start_a + 2] = tile.T
+    np.testing.assert_allclose(cor, expected_cor, atol=1e-12)
+
+    # Infinite values are missing, like in pandas
+    infinite_values = np.where(np.isnan(values), np.inf, values)
+    for method in ["pearson", "spearman"]:
+        np.testing.assert_array_equal(
+            get_correlation_matrix(pd.DataFrame(infinite_values), method=method),
+            get_correlation_matrix(pd.DataFrame(values), method=method),
+        )
+
+    with pytest.raises(ValueError, match="kendall_approx"):
+        next(correlation_blocks(values, method="kendall"))
+
+
 def test_write_to_file_if_user_specifies_output_details(tmpdir):
     """
     Test for write_to_file_if_user_specifies_output_details
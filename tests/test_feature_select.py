@@ -6,7 +6,14 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from pycytominer.cyto_utils import SampleSelection, drop_outlier_features
 from pycytominer.feature_select import feature_select
+from pycytominer.operations import (
+    correlation_threshold,
+    get_na_columns,
+    noise_removal,
+    variance_threshold,
+)
 
 random.seed(123)
 
@@ -330,6 +337,23 @@ def test_feature_select_variance_threshold():
     pd.testing.assert_frame_equal(result, expected_result)
 
 
+def test_feature_select_float32():
+    """
+    Testing feature_select returns the requested float dtype
+    """
+    features = data_unique_test_df.columns.tolist()
+    operation = ["variance_threshold", "correlation_threshold"]
+    expected_result = feature_select(
+        data_unique_test_df, features=features, operation=operation
+    )
+    result = feature_select(
+        data_unique_test_df, features=features, operation=operation, dtype="float32"
+    )
+
+    assert (result.dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(result, expected_result, check_dtype=False)
+
+
 def test_feature_select_correlation_threshold():
     """
     Testing feature_select and correlation_threshold pycytominer function
@@ -401,6 +425,56 @@ def test_feature_select_all():
     pd.testing.assert_frame_equal(result, expected_result)
 
 
+def test_feature_select_matches_operations():
+    # Operations evaluated from shared statistics exclude the same features as the
+    # operations run one after another on the remaining features
+    random_state = np.random.default_rng(7)
+    latent = random_state.normal(size=(80, 3))
+    profiles_df = pd.DataFrame(
+        np.round(
+            latent[:, np.arange(15) % 3]
+            + random_state.normal(scale=0.6, size=(80, 15)),
+            1,
+        ),
+        columns=[f"Cells_x{idx}" for idx in range(15)],
+    )
+    profiles_df["Cells_x0"] = np.repeat([0.0, 1.0], [78, 2])
+    profiles_df.loc[:20, "Cells_x1"] = np.nan
+    profiles_df.loc[0, "Cells_x7"] = 1000
+    profiles_df["Metadata_group"] = np.arange(80) % 10
+    features = profiles_df.columns[:-1].tolist()
+    operations = [
+        "variance_threshold",
+        "drop_outliers",
+        "correlation_threshold",
+        "drop_na_columns",
+        "noise_removal",
+    ]
+
+    result = feature_select(
+        profiles_df,
+        features=features,
+        operation=operations,
+        corr_threshold=0.7,
+        noise_removal_perturb_groups="Metadata_group",
+        noise_removal_stdev_cutoff=0.95,
+    )
+
+    remaining = features
+    for exclude_features in [
+        lambda: variance_threshold(profiles_df, remaining),
+        lambda: drop_outlier_features(profiles_df, remaining),
+        lambda: correlation_threshold(profiles_df, remaining, threshold=0.7),
+        lambda: get_na_columns(profiles_df, remaining),
+        lambda: noise_removal(profiles_df, "Metadata_group", remaining, "all", 0.95),
+    ]:
+        excluded = exclude_features()
+        assert excluded
+        remaining = [feature for feature in remaining if feature not in excluded]
+
+    assert result.columns.tolist() == [*remaining, "Metadata_group"]
+
+
 def test_feature_select_compress():
     compress_file = os.path.join(tmpdir, "test_feature_select_compress.csv.gz")
     _ = feature_select(
@@ -556,3 +630,14 @@ def test_samples_parameter_in_feature_select():
         assert results6b.shape[0] == data_unique_test_df3.shape[0], (
             f"Row counts do not match: {results6a[0]} != {data_unique_test_df3.shape[0]} in operation: {concat_operations}"
         )
+
+        # a selection evaluated once gives the same features as the query
+        results6c = feature_select(
+            profiles=data_unique_test_df3,
+            features=data_unique_test_df3_features,
+            operation=concat_operations,
+            samples=SampleSelection.from_query(data_unique_test_df3, sample_query),
+            noise_removal_perturb_groups="perturb_group",
+            noise_removal_stdev_cutoff=500,
+        )
+        pd.testing.assert_frame_equal(results6c, results6b)
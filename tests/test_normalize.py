@@ -1,12 +1,21 @@
+import importlib
 import os
 import random
 import tempfile
+import tracemalloc
 
 import numpy as np
 import pandas as pd
 import pytest
-
-from pycytominer.normalize import normalize
+from scipy.stats import norm
+
+from pycytominer.cyto_utils import SampleSelection
+from pycytominer.normalize import (
+    apply_normalizer,
+    fit_normalizer,
+    normalize,
+    normalize_parquet,
+)
 
 random.seed(123)
 
@@ -429,6 +438,17 @@ def test_normalize_standardize_ctrlsamples():
 
     pd.testing.assert_frame_equal(normalize_result, expected_result)
 
+    # A selection evaluated once is reused instead of the query
+    selection = SampleSelection.from_query(data_df, "Metadata_treatment == 'control'")
+    normalize_result = normalize(
+        profiles=data_df,
+        features=["x", "y", "z", "zz"],
+        meta_features="infer",
+        samples=selection,
+        method="standardize",
+    ).round(1)
+    pd.testing.assert_frame_equal(normalize_result, expected_result)
+
 
 def test_normalize_robustize_allsamples():
     """
@@ -780,6 +800,387 @@ def test_normalize_spherize():
                 assert non_spherize_result_cov >= expected_result - 5
 
 
+@pytest.mark.parametrize(
+    "method",
+    [
+        "standardize",
+        "robustize",
+        "mad_robustize",
+        "spherize",
+        "quantile",
+        "rank_int",
+        "control_zscore",
+    ],
+)
+def test_normalize_float32(method):
+    """
+    Test that normalize processes and returns features in the requested dtype
+    """
+    features = ["a", "b", "c", "d"]
+    float64_df = normalize(
+        data_spherize_df, features=features, meta_features=["id"], method=method
+    )
+    float32_df = normalize(
+        data_spherize_df.astype(dict.fromkeys(features, np.float32)),
+        features=features,
+        meta_features=["id"],
+        method=method,
+        dtype="float32",
+    )
+
+    assert (float32_df.drop("id", axis="columns").dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(
+        float32_df, float64_df, check_dtype=False, rtol=1e-4, atol=1e-5
+    )
+
+    with pytest.raises(ValueError, match="not supported, select one of"):
+        normalize(data_spherize_df, features=features, meta_features=["id"], dtype=int)
+
+
+def test_normalize_standardize_blocked_fit(monkeypatch):
+    """
+    Test that fitting standardize over row blocks matches a single fit
+    """
+    features = ["a", "b", "c", "d"]
+    expected_result = normalize(
+        data_spherize_df, features=features, meta_features=["id"]
+    )
+
+    monkeypatch.setattr(
+        importlib.import_module("pycytominer.normalize"),
+        "standardize_fit_batch_size",
+        3,
+    )
+    result = normalize(data_spherize_df, features=features, meta_features=["id"])
+
+    pd.testing.assert_frame_equal(result, expected_result)
+
+
+@pytest.mark.parametrize("method", ["standardize", "robustize"])
+def test_normalize_peak_memory(method):
+    """
+    Test that normalize copies the features once and scales them in place
+    """
+    rng = np.random.default_rng(0)
+    features = [f"Cells_x{idx}" for idx in range(100)]
+    profiles_df = pd.DataFrame(rng.standard_normal((5000, 100)), columns=features)
+    profiles_df.insert(0, "Metadata_Well", rng.integers(0, 96, 5000).astype(str))
+    original_df = profiles_df.copy()
+
+    tracemalloc.start()
+    try:
+        result = normalize(
+            profiles_df,
+            features=features,
+            meta_features=["Metadata_Well"],
+            method=method,
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    # A single copy of the features takes 5000 * 100 * 8 bytes
+    assert peak < 1.5 * 5000 * 100 * 8
+    # The input profiles are left untouched
+    pd.testing.assert_frame_equal(profiles_df, original_df)
+    assert not np.shares_memory(
+        result.loc[:, features].to_numpy(), profiles_df.loc[:, features].to_numpy()
+    )
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "standardize",
+        "robustize",
+        "mad_robustize",
+        "spherize",
+        "quantile",
+        "rank_int",
+        "control_zscore",
+    ],
+)
+def test_normalize_groupby(method):
+    """
+    Test that grouped normalization matches normalizing every group separately
+    """
+    rng = np.random.default_rng(7)
+    features = ["Cells_a", "Cells_b", "Cells_c"]
+    grouped_df = pd.DataFrame(rng.normal(size=(90, 3)), columns=features)
+    grouped_df.insert(0, "Metadata_plate", rng.choice(["p1", "p2", "p3"], size=90))
+    grouped_df.insert(1, "Metadata_treatment", ["DMSO", "drug", "drug"] * 30)
+    grouped_df.loc[grouped_df.Metadata_plate == "p2", features] *= 10
+
+    samples = "Metadata_treatment == 'DMSO'" if method != "spherize" else "all"
+    settings = {
+        "features": features,
+        "meta_features": ["Metadata_plate", "Metadata_treatment"],
+        "samples": samples,
+        "method": method,
+    }
+    expected_result = pd.concat([
+        normalize(plate_df, **settings)
+        for _, plate_df in grouped_df.groupby("Metadata_plate")
+    ]).loc[grouped_df.index]
+
+    pd.testing.assert_frame_equal(
+        normalize(grouped_df, groupby="Metadata_plate", **settings), expected_result
+    )
+    pd.testing.assert_frame_equal(
+        normalize(grouped_df, groupby=["Metadata_plate"], n_jobs=2, **settings),
+        expected_result,
+    )
+
+    with pytest.raises(ValueError, match="No samples match"):
+        normalize(
+            grouped_df,
+            groupby="Metadata_plate",
+            **{**settings, "samples": "Metadata_plate == 'p1'"},
+        )
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "standardize",
+        "robustize",
+        "mad_robustize",
+        "spherize",
+        "quantile",
+        "rank_int",
+        "control_zscore",
+    ],
+)
+def test_fit_apply_normalizer(method, tmp_path):
+    """
+    Test that fitted parameters reproduce normalize() on whole and chunked profiles
+    """
+    rng = np.random.default_rng(11)
+    features = ["Cells_a", "Cells_b", "Cells_c"]
+    profiles_df = pd.DataFrame(rng.normal(size=(60, 3)), columns=features)
+    profiles_df.insert(0, "Metadata_treatment", ["DMSO", "drug", "drug"] * 20)
+
+    settings = {
+        "samples": "Metadata_treatment == 'DMSO'" if method != "spherize" else "all",
+        "method": method,
+        "spherize_method": "PCA",
+    }
+    expected_result = normalize(profiles_df, **settings)
+
+    state = fit_normalizer(profiles_df, **settings)
+    pd.testing.assert_frame_equal(
+        apply_normalizer(profiles_df, normalizer=state), expected_result
+    )
+
+    # Parameters written to disk normalize chunks independently
+    state_file = tmp_path / "normalizer.npz"
+    assert fit_normalizer(profiles_df, output_file=state_file, **settings) == (
+        state_file
+    )
+    chunked_result = pd.concat([
+        apply_normalizer(chunk_df, normalizer=state_file)
+        for chunk_df in [
+            profiles_df.iloc[start : start + 16] for start in range(0, 60, 16)
+        ]
+    ])
+    pd.testing.assert_frame_equal(chunked_result, expected_result)
+
+    float32_result = apply_normalizer(profiles_df, normalizer=state, dtype="float32")
+    assert (
+        float32_result.loc[:, expected_result.columns[1:]].dtypes == np.float32
+    ).all()
+
+    with pytest.raises(ValueError, match="not found"):
+        apply_normalizer(profiles_df.drop(columns="Cells_b"), normalizer=state)
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        "standardize",
+        "robustize",
+        "mad_robustize",
+        "quantile",
+        "rank_int",
+        "control_zscore",
+    ],
+)
+def test_normalize_parquet(method, tmp_path):
+    """
+    Test that streaming parquet normalization matches normalize()
+    """
+    rng = np.random.default_rng(13)
+    features = ["Cells_a", "Cells_b", "Cells_c"]
+    profiles_df = pd.DataFrame(rng.normal(size=(70, 3)), columns=features)
+    profiles_df.insert(0, "Metadata_treatment", ["DMSO", "drug"] * 35)
+    profiles_df.loc[5, "Cells_b"] = np.nan
+    profiles_path = tmp_path / "profiles.parquet"
+    profiles_df.to_parquet(profiles_path, row_group_size=16)
+
+    settings = {"samples": "Metadata_treatment == 'DMSO'", "method": method}
+    expected_result = normalize(profiles_df, **settings)
+
+    output_path = normalize_parquet(
+        profiles_path, tmp_path / "normalized.parquet", batch_size=16, **settings
+    )
+    assert output_path == str(tmp_path / "normalized.parquet")
+    # Fewer reference samples than sketch centroids are fit exactly
+    pd.testing.assert_frame_equal(pd.read_parquet(output_path), expected_result)
+
+    float32_result = pd.read_parquet(
+        normalize_parquet(
+            profiles_path, tmp_path / "float32.parquet", dtype="float32", **settings
+        )
+    )
+    assert (float32_result.loc[:, features].dtypes == np.float32).all()
+
+    if method == "mad_robustize":
+        # Like normalize(), the streaming path requires a float epsilon
+        for normalize_function, arguments in [
+            (normalize, [profiles_df]),
+            (normalize_parquet, [profiles_path, tmp_path / "none.parquet"]),
+        ]:
+            with pytest.raises(ValueError, match="mad_robustize_epsilon must be"):
+                normalize_function(*arguments, mad_robustize_epsilon=None, **settings)
+
+
+@pytest.mark.parametrize("spherize_method", ["ZCA-cor", "PCA"])
+def test_normalize_parquet_spherize(spherize_method, tmp_path):
+    """
+    Test that the streaming whitening matrix matches normalize()
+    """
+    rng = np.random.default_rng(17)
+    features = ["Cells_a", "Cells_b", "Cells_c"]
+    profiles_df = pd.DataFrame(
+        rng.normal(size=(70, 3)) @ rng.normal(size=(3, 3)), columns=features
+    )
+    profiles_df.insert(0, "Metadata_treatment", ["DMSO", "drug"] * 35)
+    profiles_path = tmp_path / "profiles.parquet"
+    profiles_df.to_parquet(profiles_path, row_group_size=16)
+
+    settings = {
+        "samples": "Metadata_treatment == 'DMSO'",
+        "method": "spherize",
+        "spherize_method": spherize_method,
+    }
+    expected_result = normalize(profiles_df, **settings)
+    result = pd.read_parquet(
+        normalize_parquet(
+            profiles_path, tmp_path / "spherized.parquet", batch_size=16, **settings
+        )
+    )
+
+    pd.testing.assert_frame_equal(result, expected_result, rtol=1e-8)
+
+
+def test_normalize_rank_methods():
+    """
+    Test that quantile and rank_int rank the profiles among the reference samples
+    """
+    rng = np.random.default_rng(19)
+    features = ["Cells_a", "Cells_b"]
+    profiles_df = pd.DataFrame(rng.normal(size=(40, 2)), columns=features)
+    profiles_df.insert(0, "Metadata_treatment", ["DMSO", "drug"] * 20)
+    # Ties share their average rank and missing values stay missing
+    profiles_df.loc[[2, 4, 6], "Cells_a"] = 0.5
+    profiles_df.loc[8, "Cells_b"] = np.nan
+
+    ranks = profiles_df.loc[:, features].rank()
+    n_valid = profiles_df.loc[:, features].count()
+
+    quantile_df = normalize(profiles_df, method="quantile")
+    pd.testing.assert_frame_equal(quantile_df.loc[:, features], (ranks - 0.5) / n_valid)
+
+    rank_int_df = normalize(profiles_df, method="rank_int")
+    pd.testing.assert_frame_equal(
+        rank_int_df.loc[:, features],
+        pd.DataFrame(norm.ppf((ranks - 3 / 8) / (n_valid + 1 / 4)), columns=features),
+    )
+
+    # Profiles are ranked among the control samples only
+    control_df = profiles_df.query("Metadata_treatment == 'DMSO'")
+    quantile_df = normalize(
+        profiles_df, method="quantile", samples="Metadata_treatment == 'DMSO'"
+    )
+    expected_b = [
+        ((control_df.Cells_b < value).sum() + (control_df.Cells_b == value).sum() / 2)
+        / control_df.Cells_b.count()
+        for value in profiles_df.Cells_b
+    ]
+    expected_b[8] = np.nan
+    np.testing.assert_allclose(quantile_df.Cells_b, expected_b)
+
+
+def test_normalize_control_zscore(tmp_path):
+    """
+    Test that control_zscore is a robust z-score against the controls of every plate
+    """
+    rng = np.random.default_rng(23)
+    features = ["Cells_a", "Cells_b"]
+    profiles_df = pd.DataFrame(rng.normal(size=(60, 2)), columns=features)
+    profiles_df.insert(0, "Metadata_Plate", ["p1", "p2", "p3"] * 20)
+    profiles_df.insert(1, "Metadata_treatment", ["DMSO", "drug"] * 30)
+    profiles_df.loc[profiles_df.Metadata_Plate == "p2", features] += 5
+
+    samples = "Metadata_treatment == 'DMSO'"
+    result = normalize(profiles_df, method="control_zscore", samples=samples)
+
+    for _, plate_df in profiles_df.groupby("Metadata_Plate"):
+        controls_df = plate_df.query(samples).loc[:, features]
+        iqr = controls_df.quantile(0.75) - controls_df.quantile(0.25)
+        expected_df = (plate_df.loc[:, features] - controls_df.median()) / (
+            iqr / (norm.ppf(0.75) - norm.ppf(0.25))
+        )
+        pd.testing.assert_frame_equal(result.loc[plate_df.index, features], expected_df)
+
+    # Batches that mix plates are normalized against the controls of every plate
+    profiles_path = tmp_path / "profiles.parquet"
+    profiles_df.to_parquet(profiles_path, row_group_size=16)
+    output_path = normalize_parquet(
+        profiles_path,
+        tmp_path / "normalized.parquet",
+        method="control_zscore",
+        samples=samples,
+        batch_size=16,
+    )
+    pd.testing.assert_frame_equal(pd.read_parquet(output_path), result)
+    with pytest.raises(ValueError, match="No samples match"):
+        normalize_parquet(
+            profiles_path,
+            tmp_path / "no_controls.parquet",
+            method="control_zscore",
+            samples="Metadata_treatment == 'DMSO' and Metadata_Plate != 'p3'",
+        )
+
+    # A fitted state holds the parameters of a single plate
+    with pytest.raises(ValueError, match="Fit one normalizer per plate"):
+        fit_normalizer(profiles_df, method="control_zscore", samples=samples)
+    plate_df = profiles_df.query("Metadata_Plate == 'p2'")
+    pd.testing.assert_frame_equal(
+        apply_normalizer(
+            plate_df,
+            fit_normalizer(plate_df, method="control_zscore", samples=samples),
+        ),
+        result.loc[plate_df.index],
+    )
+
+    # Without a plate column, all profiles are scaled against all controls
+    robustize_df = normalize(
+        profiles_df.drop(columns="Metadata_Plate"), method="robustize", samples=samples
+    )
+    pd.testing.assert_frame_equal(
+        normalize(
+            profiles_df.drop(columns="Metadata_Plate"),
+            method="control_zscore",
+            samples=samples,
+        ),
+        robustize_df.assign(**{
+            feature: robustize_df[feature] * (norm.ppf(0.75) - norm.ppf(0.25))
+            for feature in features
+        }),
+    )
+
+
 def test_spherize_epsilon():
     """
     Test that epsilon is successfully passed to the spherize transform method
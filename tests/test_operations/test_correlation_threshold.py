@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 from pycytominer.operations import correlation_threshold
+from pycytominer.operations.correlation_threshold import determine_high_cor_pair
 
 # Build data to use in tests
 data_df = pd.DataFrame({
@@ -100,3 +102,36 @@ def test_correlation_threshold_featureinfer():
     expected_result = ["Cells_y"]
 
     assert correlation_threshold_result == expected_result
+
+
+def test_correlation_threshold_matches_pairwise_table():
+    # Groups of features share a latent factor, so many pairs pass the threshold
+    random_state = np.random.default_rng(0)
+    latent = random_state.normal(size=(200, 8))
+    features = [f"Cells_x{idx}" for idx in range(40)]
+    feature_df = pd.DataFrame(
+        latent[:, np.arange(40) % 8]
+        + random_state.normal(scale=np.linspace(0.05, 1, 40), size=(200, 40)),
+        columns=features,
+    )
+    feature_df.iloc[3, 5] = np.nan
+
+    for threshold in [0.5, 0.9]:
+        # Exclusions of the long-form table of pandas correlations
+        data_cor_df = feature_df.corr()
+        pairwise_df = (
+            data_cor_df
+            .where(np.tril(np.ones(data_cor_df.shape), k=-1).astype(bool))
+            .stack()
+            .reset_index()
+        )
+        pairwise_df.columns = pd.Index(["pair_a", "pair_b", "correlation"])
+        variable_cor_sum = data_cor_df.abs().sum().sort_values().index
+        expected_result = {
+            determine_high_cor_pair(row, variable_cor_sum)
+            for _, row in pairwise_df.query("correlation > @threshold").iterrows()
+        }
+
+        result = correlation_threshold(feature_df, threshold=threshold)
+        assert set(result) == expected_result
+        assert result == [feature for feature in features if feature in result]
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycytominer.cyto_utils import drop_outlier_features
+from pycytominer.operations import (
+    FeatureStatistics,
+    get_na_columns,
+    noise_removal,
+    variance_threshold,
+)
+
+random_state = np.random.default_rng(42)
+n_samples = 120
+features = [f"Cells_x{idx}" for idx in range(12)]
+
+profiles_df = pd.DataFrame(
+    np.round(random_state.normal(scale=3, size=(n_samples, 12)), 1), columns=features
+)
+# Few unique values, a dominant value, missing values, outliers, and an empty feature
+profiles_df["Cells_x0"] = random_state.integers(0, 3, n_samples).astype(float)
+profiles_df.loc[:110, "Cells_x1"] = 0.0
+profiles_df.loc[random_state.random(n_samples) < 0.3, "Cells_x2"] = np.nan
+profiles_df.loc[5, "Cells_x3"] = -1000
+profiles_df["Cells_x4"] = np.nan
+profiles_df["Cells_x5"] *= 100
+profiles_df.insert(0, "Metadata_group", random_state.integers(0, 8, n_samples))
+profiles_df.insert(1, "Metadata_treatment", np.repeat(["drug", "control"], 60))
+profiles_df.loc[3, "Metadata_group"] = None
+profiles_df.index = profiles_df.index + 10
+
+
+@pytest.mark.parametrize("samples", ["all", "Metadata_treatment == 'drug'"])
+def test_feature_statistics(samples):
+    statistics = FeatureStatistics.from_profiles(
+        profiles_df,
+        features,
+        samples=samples,
+        operations=[
+            "variance_threshold",
+            "drop_na_columns",
+            "correlation_threshold",
+            "drop_outliers",
+            "noise_removal",
+        ],
+        noise_removal_perturb_groups="Metadata_group",
+    )
+
+    for freq_cut, unique_cut in [(0.05, 0.01), (0.2, 0.1)]:
+        assert statistics.variance_threshold(freq_cut, unique_cut) == sorted(
+            variance_threshold(profiles_df, features, samples, freq_cut, unique_cut),
+            key=features.index,
+        )
+    for cutoff in [0.05, 0.5]:
+        assert statistics.get_na_columns(cutoff) == sorted(
+            get_na_columns(profiles_df, features, samples, cutoff), key=features.index
+        )
+    assert statistics.drop_outlier_features(100) == drop_outlier_features(
+        profiles_df, features, samples, outlier_cutoff=100
+    )
+    for cutoff in [2, 2.9, 50]:
+        assert statistics.noise_removal(cutoff) == noise_removal(
+            profiles_df,
+            "Metadata_group",
+            features,
+            samples,
+            noise_removal_stdev_cutoff=cutoff,
+        )
+
+
+def test_feature_statistics_blocks_and_groups():
+    groups = random_state.integers(0, 5, n_samples).tolist()
+
+    # Statistics are scanned in blocks of features
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            "pycytominer.operations.feature_statistics.feature_statistics_block_bytes",
+            8 * n_samples * 5,
+        )
+        statistics = FeatureStatistics.from_profiles(
+            profiles_df.reset_index(drop=True),
+            features,
+            operations=["noise_removal", "variance_threshold"],
+            noise_removal_perturb_groups=groups,
+        )
+
+    assert statistics.na_counts is None
+    assert statistics.variance_threshold() == sorted(
+        variance_threshold(profiles_df, features), key=features.index
+    )
+    assert statistics.noise_removal(2.5) == noise_removal(
+        profiles_df.reset_index(drop=True),
+        groups,
+        features,
+        noise_removal_stdev_cutoff=2.5,
+    )
+
+    with pytest.raises(ValueError, match="were not computed"):
+        statistics.get_na_columns()
+    with pytest.raises(ValueError, match="freq_cut variable must be between"):
+        statistics.variance_threshold(freq_cut=2)
+    with pytest.raises(ValueError, match="requires the noise_removal_perturb_groups"):
+        FeatureStatistics.from_profiles(
+            profiles_df, features, operations=["noise_removal"]
+        )
+    with pytest.raises(ValueError, match="The length of input list"):
+        FeatureStatistics.from_profiles(
+            profiles_df,
+            features,
+            operations=["noise_removal"],
+            noise_removal_perturb_groups=groups[1:],
+        )
+    with pytest.raises(TypeError, match="require numeric features"):
+        FeatureStatistics.from_profiles(
+            profiles_df, ["Metadata_treatment"], operations=["drop_outliers"]
+        )
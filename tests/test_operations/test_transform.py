@@ -3,9 +3,14 @@ import random
 import numpy as np
 import pandas as pd
 import pytest
-from scipy.stats import median_abs_deviation
+from scipy.stats import median_abs_deviation, norm, rankdata
 
-from pycytominer.operations.transform import RobustMAD, Spherize
+from pycytominer.operations.transform import (
+    RankTransform,
+    RobustMAD,
+    Spherize,
+    whiten_blocks,
+)
 
 random.seed(123)
 
@@ -79,6 +84,122 @@ def test_spherize_precenter():
         assert int(result) == expected_result
 
 
+def test_spherize_solvers():
+    """
+    Test that the solvers agree and report the decomposition they used
+    """
+    rng = np.random.default_rng(0)
+    tall_df = pd.DataFrame(rng.normal(size=(200, 6)) @ rng.normal(size=(6, 6)))
+    wide_df = pd.DataFrame(rng.normal(size=(8, 12)))
+
+    for method in ["PCA", "ZCA", "ZCA-cor"]:
+        reference = Spherize(method=method, solver="svd").fit(tall_df)
+        scaler = Spherize(method=method, solver="eigh").fit(tall_df)
+        assert scaler.solver_ == "eigh"
+        assert scaler.rank_ == tall_df.shape[1]
+        np.testing.assert_allclose(scaler.W, reference.W, atol=1e-10)
+
+        # Without a unique null space basis, only ZCA is identical across solvers
+        reference = Spherize(method=method, solver="svd").fit(wide_df)
+        scaler = Spherize(method=method, solver="eigh").fit(wide_df)
+        assert scaler.rank_ == wide_df.shape[0] - 1
+        if method != "PCA":
+            np.testing.assert_allclose(scaler.W, reference.W, atol=1e-10)
+
+    assert Spherize().fit(tall_df).solver_ == "eigh"
+    assert Spherize().fit(wide_df).solver_ == "svd"
+
+    # Linearly dependent features are rejected by every solver
+    dependent_df = tall_df.assign(dependent=tall_df[0] + tall_df[1])
+    for solver in ["svd", "eigh"]:
+        with pytest.raises(ValueError, match="not full rank"):
+            Spherize(solver=solver).fit(dependent_df)
+
+    # Nearly collinear features look dependent to eigh, so auto falls back to svd
+    rng = np.random.default_rng(1)
+    collinear_df = pd.DataFrame(rng.normal(size=(5000, 10)))
+    collinear_df[1] = collinear_df[0] + 1e-6 * rng.normal(size=5000)
+    reference = Spherize(method="ZCA-cor", solver="svd").fit(collinear_df)
+    scaler = Spherize(method="ZCA-cor").fit(collinear_df)
+    assert scaler.solver_ == "svd"
+    assert scaler.rank_ == collinear_df.shape[1]
+    np.testing.assert_array_equal(scaler.W, reference.W)
+    with pytest.raises(ValueError, match="not full rank"):
+        Spherize(method="ZCA-cor", solver="eigh").fit(collinear_df)
+
+    for solver in ["qr", "randomized"]:
+        with pytest.raises(ValueError, match="not supported"):
+            Spherize(solver=solver)
+
+
+def test_partial_fit():
+    """
+    Test that fitting batch by batch matches a fit on all samples
+    """
+    rng = np.random.default_rng(1)
+    samples_df = pd.DataFrame(rng.normal(size=(300, 5)) @ rng.normal(size=(5, 5)))
+    batches = [samples_df.iloc[start : start + 70] for start in range(0, 300, 70)]
+
+    for method in ["PCA", "ZCA", "ZCA-cor"]:
+        for center in [True, False]:
+            if method == "ZCA-cor" and not center:
+                continue
+            expected = Spherize(method=method, center=center, solver="svd")
+            expected = expected.fit(samples_df)
+            scaler = Spherize(method=method, center=center)
+            for batch_df in batches:
+                scaler = scaler.partial_fit(batch_df)
+
+            assert scaler.n_samples_seen_ == samples_df.shape[0]
+            np.testing.assert_allclose(scaler.W, expected.W, atol=1e-8)
+            pd.testing.assert_frame_equal(
+                scaler.transform(samples_df), expected.transform(samples_df)
+            )
+
+    with pytest.raises(ValueError, match="requires the eigh solver"):
+        Spherize(solver="svd").partial_fit(samples_df)
+
+    # The sketches are exact while there are fewer samples than centroids
+    scaler = RobustMAD()
+    scaler = scaler.partial_fit(samples_df.iloc[:60])
+    scaler = scaler.partial_fit(samples_df.iloc[60:100].to_numpy())
+    expected = RobustMAD().fit(samples_df.iloc[:100])
+    pd.testing.assert_series_equal(scaler.median, expected.median)
+    pd.testing.assert_series_equal(scaler.mad, expected.mad)
+
+
+def test_whiten_blocks(monkeypatch):
+    """
+    Test that blockwise whitening matches the full matrix product, also in place
+    """
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=(50, 4))
+    center, scale = values.mean(axis=0), values.std(axis=0)
+    whitening = rng.normal(size=(4, 4))
+    expected = ((values - center) / scale) @ whitening
+
+    # Blocks of 3 rows
+    monkeypatch.setattr(
+        "pycytominer.operations.transform.whiten_block_bytes", 3 * 8 * 4
+    )
+    np.testing.assert_allclose(
+        whiten_blocks(values, center, scale, whitening, n_threads=1), expected
+    )
+
+    in_place = np.asfortranarray(values)
+    result = whiten_blocks(in_place, center, scale, whitening, out=in_place)
+    assert result is in_place
+    np.testing.assert_allclose(result, expected)
+
+    np.testing.assert_allclose(
+        whiten_blocks(values.astype(np.float32), None, None, whitening),
+        values.astype(np.float32).astype(np.float64) @ whitening,
+    )
+
+    with pytest.raises(ValueError, match="out must be a float64 array"):
+        whiten_blocks(values, center, scale, whitening, out=np.empty((50, 3)))
+
+
 def test_robust_mad():
     """
     Testing the RobustMAD class
@@ -98,3 +219,44 @@ def test_robust_mad():
     expected_result = data_df.shape[1]
 
     assert int(result) == expected_result
+
+    # Arrays are fit with the same parameters and NaN is ignored
+    array_scaler = RobustMAD().fit(data_df.to_numpy())
+    np.testing.assert_array_equal(array_scaler.median, scaler.median)
+    np.testing.assert_array_equal(array_scaler.mad, scaler.mad)
+
+    nan_df = data_df.astype(float)
+    nan_df.iloc[0, 0] = np.nan
+    nan_scaler = RobustMAD().fit(nan_df)
+    assert nan_scaler.median["a"] == nan_df["a"].median()
+    transform_df = nan_scaler.transform(nan_df)
+    assert np.isnan(transform_df.iloc[0, 0])
+    assert transform_df.columns.tolist() == nan_df.columns.tolist()
+
+
+def test_rank_transform():
+    """
+    Testing the RankTransform class
+    """
+    ranks = rankdata(data_df, axis=0)
+    n_samples = data_df.shape[0]
+
+    uniform_df = RankTransform().fit(data_df).transform(data_df)
+    np.testing.assert_allclose(uniform_df, (ranks - 0.5) / n_samples)
+    assert uniform_df.columns.tolist() == data_df.columns.tolist()
+
+    scaler = RankTransform(output_distribution="normal").fit(data_df.to_numpy())
+    values = data_df.to_numpy(dtype=float, copy=True)
+    assert scaler.transform(values, copy=False) is values
+    np.testing.assert_allclose(values, norm.ppf((ranks - 3 / 8) / (n_samples + 1 / 4)))
+
+    # Small batches are kept exactly by partial_fit
+    partial_scaler = RankTransform(output_distribution="normal")
+    for start in range(0, n_samples, 4):
+        partial_scaler.partial_fit(data_df.iloc[start : start + 4])
+    np.testing.assert_allclose(partial_scaler.transform(data_df), values)
+
+    with pytest.raises(ValueError, match="not supported"):
+        RankTransform(output_distribution="laplace")
+    with pytest.raises(ValueError, match="at least one reference sample"):
+        RankTransform().fit(data_df.iloc[:0])
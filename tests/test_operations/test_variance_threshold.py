@@ -146,3 +146,52 @@ def test_variance_threshold_samples():
     )
     expected_result = ["a", "b"]
     assert sorted(excluded_features) == sorted(expected_result)
+
+
+def test_variance_threshold_matches_value_counts():
+    # Counts of the sorted numeric columns exclude the same features as value_counts
+    random_state = np.random.default_rng(9)
+    n_samples = 400
+    profiles_df = pd.DataFrame({
+        f"Cells_x{idx}": random_state.choice(
+            random_state.normal(size=n_unique),
+            size=n_samples,
+            p=random_state.dirichlet(np.full(n_unique, 0.3)),
+        )
+        for idx, n_unique in enumerate([1, 2, 3, 4, 5, 8, 20, 400])
+    })
+    profiles_df.loc[random_state.random(n_samples) < 0.1, "Cells_x6"] = np.nan
+    profiles_df["Cells_int"] = random_state.integers(0, 3, n_samples)
+    profiles_df["Cells_bool"] = random_state.random(n_samples) < 0.02
+    profiles_df["Cells_nullable"] = pd.array(
+        random_state.integers(0, 9, n_samples), dtype="Int64"
+    )
+    profiles_df.loc[:50, "Cells_nullable"] = pd.NA
+    profiles_df["Cells_str"] = np.repeat(["a", "b"], [390, 10])
+    profiles_df["Cells_nan"] = np.nan
+    features = profiles_df.columns.tolist()
+
+    for freq_cut, unique_cut in [(0.05, 0.01), (0.1, 0.02), (0.3, 0.005)]:
+        frequencies = profiles_df.apply(lambda x: calculate_frequency(x, freq_cut))
+        n_unique = profiles_df.nunique()
+        expected_result = [
+            feature
+            for feature in features
+            if pd.isna(frequencies[feature])
+            or n_unique[feature] / n_samples < unique_cut
+        ]
+
+        result = variance_threshold(
+            profiles_df, features, freq_cut=freq_cut, unique_cut=unique_cut
+        )
+        assert result == expected_result
+        assert 0 < len(result) < len(features)
+
+    # Features are sorted in blocks
+    expected_result = variance_threshold(profiles_df, features)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            "pycytominer.operations.feature_statistics.feature_statistics_block_bytes",
+            8 * n_samples * 3,
+        )
+        assert variance_threshold(profiles_df, features) == expected_result